@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""Benchmarks for the conversion pipeline.
+
+Runs on synthetic inputs generated in a temporary folder, so no sample files
+are needed. Results are printed as plain tables:
+
+    python benchmark.py                     # all benchmarks
+    python benchmark.py first_page --pages 300
+    python benchmark.py merge --pages 2000 --chunk-sizes 0,100,500
+    python benchmark.py thumbnails --pages 20
+    python benchmark.py catalog --entries 100000
+"""
+
+import argparse
+import io
+import os
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from PIL import Image
+
+
+def make_images(folder, count, size=(1240, 1754)):
+    """Write ``count`` scan-like JPEG pages and return their paths."""
+    paths = []
+    for i in range(count):
+        img = Image.effect_noise(size, 40 + i % 20).convert('RGB')
+        path = os.path.join(folder, f"page_{i:05d}.jpg")
+        img.save(path, 'JPEG', quality=85)
+        paths.append(path)
+    return paths
+
+
+def exif_with_thumbnail(thumbnail_jpeg):
+    """Minimal EXIF block (orientation + IFD1) embedding ``thumbnail_jpeg``, as cameras write it."""
+    tiff = b'II*\x00' + struct.pack('<I', 8)
+    tiff += struct.pack('<H', 1) + struct.pack('<HHII', 0x0112, 3, 1, 1) + struct.pack('<I', 26)
+    tiff += struct.pack('<H', 2) + struct.pack('<HHII', 0x0201, 4, 1, 56)
+    tiff += struct.pack('<HHII', 0x0202, 4, 1, len(thumbnail_jpeg)) + struct.pack('<I', 0)
+    return b'Exif\x00\x00' + tiff + thumbnail_jpeg
+
+
+def make_photos(folder, count, size=(6000, 4000)):
+    """Write ``count`` camera-like JPEGs (24 MP by default) with EXIF thumbnails."""
+    base = Image.merge('RGB', (
+        Image.linear_gradient('L').resize(size),
+        Image.effect_noise(size, 60),
+        Image.radial_gradient('L').resize(size),
+    ))
+    thumbnail = io.BytesIO()
+    base.resize((160, 160 * size[1] // size[0])).save(thumbnail, 'JPEG', quality=80)
+    exif = exif_with_thumbnail(thumbnail.getvalue())
+    paths = []
+    for i in range(count):
+        path = os.path.join(folder, f"photo_{i:05d}.jpg")
+        base.save(path, 'JPEG', quality=80 + i % 15, exif=exif)
+        paths.append(path)
+    return paths
+
+
+def print_table(title, header, rows):
+    widths = [max(len(str(v)) for v in column) for column in zip(header, *rows)]
+    print(f"\n{title}")
+    print("  ".join(str(h).ljust(w) for h, w in zip(header, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  ".join(str(v).ljust(w) for v, w in zip(row, widths)))
+
+
+def bench_first_page(args, workdir):
+    """Time until page 1 can be shown when the PDF is streamed over a network.
+
+    A regular PDF keeps its cross-reference table at the end, so a viewer
+    reading the file front to back needs all of it; a linearized PDF only
+    needs the first-page section (its /E offset).
+    """
+    from pypdf import PdfReader
+
+    from img_to_pdf.core.image_encoder import encode_image
+    from img_to_pdf.core.pdf_linearizer import linearize_pdf
+    from img_to_pdf.core.pdf_writer import write_image_pdf
+
+    images = make_images(workdir, args.pages)
+    plain = os.path.join(workdir, 'merged.pdf')
+    write_image_pdf(plain, (encode_image(Image.open(p), 85, auto_codec=False) for p in images))
+    linearized = os.path.join(workdir, 'merged_linearized.pdf')
+    report = linearize_pdf(plain, linearized)
+
+    bytes_per_second = args.bandwidth * 1_000_000 / 8
+    rows = []
+    for label, path, needed in (
+        ("regular", plain, os.path.getsize(plain)),
+        ("linearized", linearized, report.first_page_bytes),
+    ):
+        started = time.perf_counter()
+        PdfReader(path).pages[0].images[0].image.load()
+        parse = time.perf_counter() - started
+        download = needed / bytes_per_second
+        rows.append((label, f"{os.path.getsize(path):,}", f"{needed:,}",
+                     f"{download:.3f}", f"{parse:.3f}", f"{download + parse:.3f}"))
+    print_table(
+        f"First page display, {args.pages} pages at {args.bandwidth} Mbit/s "
+        f"(linearizing took {report.seconds:.2f}s)",
+        ("layout", "file bytes", "bytes needed", "download s", "parse s", "first page s"),
+        rows,
+    )
+
+
+def bench_merge(args, workdir):
+    """Merge throughput of one-page PDFs for different chunk sizes.
+
+    Chunk size 0 copies every input serially in one process; other sizes
+    merge chunks of that many inputs in worker processes and stitch them.
+    """
+    from img_to_pdf.core.image_encoder import encode_image
+    from img_to_pdf.core.parallel_merge import MergeInput, ParallelMerger
+    from img_to_pdf.core.pdf_writer import write_image_pdf
+
+    sample = make_images(workdir, 1)[0]
+    encoded = encode_image(Image.open(sample), 85, auto_codec=False)
+    inputs = []
+    for i in range(args.pages):
+        inputs.append(MergeInput(write_image_pdf(os.path.join(workdir, f"page_{i:05d}.pdf"), [encoded])))
+
+    rows = []
+    output = os.path.join(workdir, 'merged.pdf')
+    for chunk_size in args.chunk_sizes:
+        merger = ParallelMerger(chunk_size or args.pages, args.workers if chunk_size else 1)
+        report = merger.merge(inputs, output)
+        rows.append((chunk_size or "serial", report.chunks, report.workers, f"{report.seconds:.2f}",
+                     f"{report.pages_per_second:,.0f}",
+                     f"{report.output_bytes / 1048576.0 / report.seconds:.1f}"))
+    print_table(f"Merge of {args.pages} one-page PDFs", ("chunk size", "chunks", "processes", "seconds",
+                                                         "pages/s", "MB/s"), rows)
+
+
+def bench_thumbnails(args, workdir):
+    """List thumbnails per second on a folder of large camera JPEGs."""
+    from img_to_pdf.core.thumbnails import load_thumbnail
+
+    photos = make_photos(workdir, args.pages)
+    rows = []
+    for label, options in (
+        ("full decode", {'use_exif': False, 'scaled': False}),
+        ("DCT-scaled decode", {'use_exif': False}),
+        ("EXIF thumbnail", {}),
+    ):
+        started = time.perf_counter()
+        for path in photos:
+            load_thumbnail(path, 64, **options)
+        seconds = time.perf_counter() - started
+        rows.append((label, f"{1000 * seconds / len(photos):.1f}", f"{len(photos) / seconds:,.1f}"))
+    print_table(f"Thumbnails of {len(photos)} 24 MP photos", ("method", "ms/thumbnail", "thumbnails/s"), rows)
+
+
+def bench_catalog(args, workdir):
+    """File list operations on ``--entries`` queued files: list of dicts vs the file catalog.
+
+    No files are created; only the in-memory bookkeeping is measured.
+    """
+    from img_to_pdf.core.file_catalog import FileCatalog
+
+    count = args.entries
+    paths = [os.path.join(workdir, f"folder_{i // 1000:03d}", f"img_{i:06d}.jpg") for i in range(count)]
+    dropped = [os.path.join(workdir, "dropped", f"img_{i:06d}.jpg") for i in range(1000)] + paths[:1000]
+    removed = list(range(0, count, max(1, count // 1000)))
+
+    def timed(fn):
+        started = time.perf_counter()
+        fn()
+        return time.perf_counter() - started
+
+    # The list of dicts as the file list used to keep it
+    tracemalloc.start()
+    files = [{'path': p, 'type': 'image'} for p in paths]
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    def dict_add():
+        existing_paths = [item['path'] for item in files]
+        files.extend({'path': f, 'type': 'image'} for f in dropped if f not in existing_paths)
+
+    def dict_move():
+        for row in range(count - 1, count - 101, -1):
+            files.insert(row - 1, files.pop(row))
+
+    def dict_remove():
+        for index in sorted(removed, reverse=True):
+            del files[index]
+
+    tracemalloc.start()
+    catalog = FileCatalog()
+    catalog.extend(catalog.new_entries(paths))
+    catalog_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    def catalog_move():
+        for row in range(count - 1, count - 101, -1):
+            catalog.move_block(row, row, row - 1)
+
+    rows = [
+        ("memory (MB)", f"{dict_bytes / 1048576:.1f}", f"{catalog_bytes / 1048576:.1f}"),
+        ("drop 2,000 files (half queued)", f"{1000 * timed(dict_add):.1f}",
+         f"{1000 * timed(lambda: catalog.extend(catalog.new_entries(dropped))):.1f}"),
+        ("move up x100", f"{1000 * timed(dict_move):.1f}", f"{1000 * timed(catalog_move):.1f}"),
+        (f"remove {len(removed):,} rows", f"{1000 * timed(dict_remove):.1f}",
+         f"{1000 * timed(lambda: catalog.remove_rows(removed)):.1f}"),
+    ]
+    print_table(f"File list with {count:,} entries", ("operation", "list of dicts (ms)", "catalog (ms)"), rows)
+
+
+def bench_ingest(args, workdir):
+    """Recursive folder scan of ``--entries`` empty files: blocking os.walk vs streamed batches."""
+    from img_to_pdf.core.folder_ingest import INPUT_EXTENSIONS, FolderIngest
+
+    root = os.path.join(workdir, "tree")
+    for i in range(args.entries):
+        folder = os.path.join(root, f"year_{i // 10000:02d}", f"album_{i // 500:04d}")
+        if i % 500 == 0:
+            os.makedirs(folder)
+        open(os.path.join(folder, f"img_{i:06d}.jpg"), 'wb').close()
+
+    started = time.perf_counter()
+    found = [os.path.join(dirpath, name) for dirpath, _, names in os.walk(root)
+             for name in names if name.lower().endswith(INPUT_EXTENSIONS)]
+    walk_total = time.perf_counter() - started
+
+    first = []
+    started = time.perf_counter()
+    stats = FolderIngest().run([root], lambda batch: first or first.append(time.perf_counter() - started))
+    ingest_total = time.perf_counter() - started
+    assert stats.files == len(found)
+
+    rows = [
+        ("first files in the list", f"{1000 * walk_total:.1f}", f"{1000 * first[0]:.1f}"),
+        ("whole tree", f"{1000 * walk_total:.1f}", f"{1000 * ingest_total:.1f}"),
+    ]
+    print_table(f"Folder scan of {len(found):,} files", ("", "os.walk (ms)", "streamed (ms)"), rows)
+
+
+BENCHMARKS = {
+    'first_page': bench_first_page,
+    'merge': bench_merge,
+    'thumbnails': bench_thumbnails,
+    'catalog': bench_catalog,
+    'ingest': bench_ingest,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", metavar="name",
+                        help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--bandwidth", type=float, default=20.0, help="simulated link speed in Mbit/s")
+    parser.add_argument("--chunk-sizes", type=lambda v: [int(x) for x in v.split(',')], default=[0, 50, 200, 1000],
+                        help="comma-separated inputs per merge chunk, 0 for serial (default: 0,50,200,1000)")
+    parser.add_argument("--workers", type=int, default=0, help="merge processes (default: one per CPU core)")
+    parser.add_argument("--entries", type=int, default=100_000, help="files for the catalog and ingest benchmarks")
+    args = parser.parse_args()
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(sorted(unknown))}")
+
+    for name in args.names or BENCHMARKS:
+        with tempfile.TemporaryDirectory() as workdir:
+            BENCHMARKS[name](args, workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,7 @@ def get_hidden_imports():
         "PIL",
         "PIL.Image",
         "PIL.ImageQt",
+        "numpy",
     ]
 
 
@@ -10,6 +10,7 @@ REQUIRED = [
     "PyQt6-Fluent-Widgets",
     "Pillow",
     "pypdf",
+    "numpy",
     "selenium"
 ]
 
@@ -5,5 +5,8 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 if __name__ == "__main__":
+    # Needed by the merge worker processes in the frozen executable
+    import multiprocessing
+    multiprocessing.freeze_support()
     from img_to_pdf.__main__ import main
     sys.exit(main())
@@ -4,13 +4,6 @@ import sys
 import logging
 import os
 import ctypes
-from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QIcon
-
-from .core.config_manager import ConfigManager
-from .core.theme_manager import ThemeManager
-from .gui.main_window import MainWindow
 
 # Setup logging
 logging.basicConfig(
@@ -21,7 +14,22 @@ logger = logging.getLogger(__name__)
 
 
 def main() -> int:
-    """Main entry point."""
+    """Main entry point: the GUI, or streaming conversion with ``--stream``."""
+    if sys.argv[1:2] == ['--stream']:
+        # No Qt needed; stdout carries the PDF, logs go to stderr
+        from .cli import main as stream_main
+        return stream_main(sys.argv[2:])
+    return run_gui()
+
+
+def run_gui() -> int:
+    """Start the application window."""
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtGui import QIcon
+
+    from .gui.main_window import MainWindow
+
     logger.info("Starting application")
     
     # Enable High DPI BEFORE QApplication
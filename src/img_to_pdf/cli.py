@@ -0,0 +1,110 @@
+"""Streaming conversion from the command line, for shell pipelines.
+
+    python run.py --stream scans.cbz extra.pdf > book.pdf
+    find scans -name '*.jpg' | sort | python run.py --stream -o scans.pdf
+    curl -s https://example.com/pages.zip | python run.py --stream | lpr
+
+Inputs are image, PDF and archive paths given as arguments. Without
+arguments they are read from stdin: either an archive piped in as-is, or
+one path per line, each converted as soon as its line arrives. The PDF is
+written to stdout unless ``--output`` names a file; it is written front to
+back, so any non-seekable target works.
+"""
+
+import argparse
+import io
+import logging
+import os
+import stat
+import sys
+from typing import BinaryIO, List, Optional
+
+from .core.archive_input import ORDER_ARCHIVE, ORDER_NATURAL, looks_like_archive, peek_stream
+from .core.config_manager import ConfigManager
+from .core.output_files import move_into_place, partial_path
+from .core.page_layout import PAGE_FIT, PAGE_SIZES, PageLayout
+from .core.stream_convert import OutputError, StreamConverter
+from .core.tiled_image import MB
+
+logger = logging.getLogger(__name__)
+
+
+def build_parser(config: ConfigManager) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="img_to_pdf --stream",
+                                     description="Convert images, PDFs and ZIP/CBZ/TAR archives to one PDF stream.")
+    parser.add_argument("inputs", nargs="*", help="input files (default: an archive or a list of paths on stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output PDF (default: stdout)")
+    parser.add_argument("--order", choices=(ORDER_NATURAL, ORDER_ARCHIVE), default=ORDER_NATURAL,
+                        help="order of archive members: natural name order or as stored")
+    parser.add_argument("--page-size", choices=sorted(PAGE_SIZES) + [PAGE_FIT], default=config.get_page_size())
+    parser.add_argument("--landscape", action="store_true")
+    parser.add_argument("--margin-mm", type=float, default=config.get_page_margin_mm())
+    parser.add_argument("--max-dpi", type=int, default=config.get_max_dpi(), help="0 keeps full resolution")
+    parser.add_argument("--quality", type=int, default=95, help="JPEG quality 1-100")
+    parser.add_argument("--no-auto-codec", dest="auto_codec", action="store_false",
+                        help="always use JPEG instead of picking a codec per page")
+    return parser
+
+
+def convert_stdin(converter: StreamConverter, stdin: BinaryIO) -> None:
+    """Add what stdin holds: a whole archive, or one input path per line."""
+    head, stdin = peek_stream(stdin)
+    if looks_like_archive(head):
+        converter.add_archive(stdin)
+        return
+    for line in io.TextIOWrapper(stdin, encoding='utf-8', errors='surrogateescape'):
+        path = line.strip()
+        if path:
+            converter.add(path)
+
+
+def _is_regular_target(path: str) -> bool:
+    """Whether ``path`` is (or would be) a regular file, rather than a FIFO or device."""
+    try:
+        return stat.S_ISREG(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return True
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    config = ConfigManager()
+    config.load()
+    args = build_parser(config).parse_args(argv)
+    layout = PageLayout(args.page_size, portrait=not args.landscape, margin_mm=args.margin_mm,
+                        max_dpi=args.max_dpi)
+
+    temp_path = None
+    if args.output == '-':
+        out = sys.stdout.buffer
+    elif _is_regular_target(args.output):
+        # Written under a temporary name and renamed into place when complete
+        temp_path = partial_path(args.output)
+        out = open(temp_path, 'wb')
+    else:
+        out = open(args.output, 'wb')
+
+    converter = StreamConverter(out, layout, args.quality, args.auto_codec, args.order,
+                                max_pixels=config.get_max_image_pixels(),
+                                memory_limit=config.get_tile_memory_mb() * MB)
+    try:
+        if args.inputs:
+            for path in args.inputs:
+                converter.add(path)
+        else:
+            convert_stdin(converter, sys.stdin.buffer)
+        stats = converter.close()
+    except Exception as e:
+        if temp_path is not None:
+            out.close()
+            os.unlink(temp_path)
+        if isinstance(e, OutputError) and isinstance(e.__cause__, BrokenPipeError):
+            # The reader went away (e.g. piped into head); keep the exit flush quiet too
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 1
+        raise
+    if out is not sys.stdout.buffer:
+        out.close()
+        if temp_path is not None:
+            move_into_place(temp_path, args.output)
+    logger.info(f"Wrote {stats.summary()}")
+    return 0 if stats.pages else 1
@@ -0,0 +1,261 @@
+"""Reading ZIP/CBZ and TAR archives as inputs, member by member.
+
+Nothing is extracted to disk: image and PDF members are read one at a time,
+so memory holds a single member however large the archive is. Members come
+in archive order or in natural name order (``page2`` before ``page10``),
+skipping folders, hidden entries and macOS resource forks.
+
+Archives can also come from a non-seekable stream such as stdin. A TAR
+stream in archive order is read as it arrives; a ZIP (whose directory sits at
+the end) or a natural-order listing needs random access, so the stream is
+first spooled to a temporary file that only stays in memory while small.
+
+A member that cannot be read (bad CRC, corrupt compressed data, a TAR cut
+short) is skipped and recorded, and reading goes on with the next one.
+"""
+
+import io
+import logging
+import lzma
+import tarfile
+import tempfile
+import zipfile
+import zlib
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+
+from .file_catalog import ARCHIVE_EXTENSIONS
+from .file_metadata import natural_key
+
+logger = logging.getLogger(__name__)
+
+MEMBER_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tiff", ".tif", ".webp", ".pdf")
+ORDER_ARCHIVE = 'archive'
+ORDER_NATURAL = 'natural'
+SPOOL_BYTES = 32 * 1024 * 1024          # Spooled streams move to disk beyond this
+MAX_MEMBER_BYTES = 1024 * 1024 * 1024   # Members claiming more are skipped (zip bombs)
+
+# Leading bytes of the archive formats (TAR is recognised by its header instead)
+_ZIP_MAGIC = (b'PK\x03\x04', b'PK\x05\x06')
+_COMPRESSED_MAGIC = (b'\x1f\x8b', b'BZh', b'\xfd7zXZ\x00')
+_HEAD_BYTES = 512
+
+# What reading one damaged member raises; encrypted or unsupported ZIP
+# members raise RuntimeError and NotImplementedError
+MEMBER_ERRORS = (zipfile.BadZipFile, tarfile.TarError, EOFError, zlib.error, lzma.LZMAError,
+                 RuntimeError, NotImplementedError)
+
+
+def is_archive(path: str) -> bool:
+    return path.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def looks_like_archive(head: bytes) -> bool:
+    """Whether ``head`` (the first 512 bytes of a stream) starts a ZIP or (compressed) TAR archive."""
+    if head.startswith(_ZIP_MAGIC) or head.startswith(_COMPRESSED_MAGIC):
+        return True
+    return len(head) >= 262 and head[257:262] == b'ustar'
+
+
+def _wanted(name: str) -> bool:
+    parts = name.replace('\\', '/').split('/')
+    if any(part.startswith('.') or part == '__MACOSX' for part in parts):
+        return False
+    return name.lower().endswith(MEMBER_EXTENSIONS)
+
+
+class _Prefixed(io.RawIOBase):
+    """A stream with bytes already read from it put back in front."""
+
+    def __init__(self, head: bytes, rest: BinaryIO):
+        self._head = head
+        self._rest = rest
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._head:
+            n = min(len(buffer), len(self._head))
+            buffer[:n] = self._head[:n]
+            self._head = self._head[n:]
+            return n
+        data = self._rest.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def peek_stream(stream: BinaryIO, size: int = _HEAD_BYTES) -> Tuple[bytes, BinaryIO]:
+    """The first ``size`` bytes of a non-seekable ``stream`` and a stream still starting with them."""
+    head = b''
+    while len(head) < size:
+        chunk = stream.read(size - len(head))
+        if not chunk:
+            break
+        head += chunk
+    return head, io.BufferedReader(_Prefixed(head, stream))
+
+
+class ArchiveReader:
+    """Input members of a ZIP or TAR archive given as a path or a binary stream.
+
+    Iterating yields ``(name, data)`` pairs, one member in memory at a time.
+    Members left out while iterating are listed in ``skipped`` as
+    ``(name, reason)``; the name is '' when the rest of the archive is lost.
+    """
+
+    def __init__(self, source: Union[str, BinaryIO], order: str = ORDER_NATURAL, spool_bytes: int = SPOOL_BYTES):
+        self.order = order
+        name = source if isinstance(source, str) else getattr(source, 'name', None)
+        # Streams opened from a descriptor are named by its number
+        self.name = name if isinstance(name, str) else '<stream>'
+        self._owned = []
+        self._zip = None
+        self._tar = None
+        self._streaming = False
+        self.skipped: List[Tuple[str, str]] = []
+        fp = open(source, 'rb') if isinstance(source, str) else source
+        if isinstance(source, str):
+            self._owned.append(fp)
+        try:
+            if not _seekable(fp):
+                head, fp = peek_stream(fp)
+                if head.startswith(_ZIP_MAGIC) or order != ORDER_ARCHIVE:
+                    fp = self._spool(fp, spool_bytes)
+                else:
+                    self._tar = tarfile.open(fileobj=fp, mode='r|*')
+                    self._streaming = True
+                    return
+            self._fp = fp
+            if zipfile.is_zipfile(fp):
+                fp.seek(0)
+                self._zip = zipfile.ZipFile(fp)
+            else:
+                fp.seek(0)
+                self._tar = tarfile.open(fileobj=fp, mode='r:*')
+        except (zipfile.BadZipFile, tarfile.TarError) as e:
+            self.close()
+            raise ValueError(f"{self.name}: not a readable ZIP or TAR archive ({e})") from e
+        except Exception:
+            self.close()
+            raise
+
+    def _spool(self, stream: BinaryIO, spool_bytes: int) -> BinaryIO:
+        spool = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+        self._owned.append(spool)
+        while True:
+            chunk = stream.read(1024 * 1024)
+            if not chunk:
+                break
+            spool.write(chunk)
+        spool.seek(0)
+        return spool
+
+    @property
+    def format(self) -> str:
+        return 'ZIP' if self._zip is not None else 'TAR'
+
+    def names(self) -> List[str]:
+        """Names of the input members in reading order (not available for streamed TAR input)."""
+        if self._streaming:
+            raise ValueError("member names of a streamed archive are only known while reading it")
+        if self._zip is not None:
+            names = [info.filename for info in self._zip.infolist() if not info.is_dir() and _wanted(info.filename)]
+        else:
+            names = [member.name for member in self._tar.getmembers() if member.isfile() and _wanted(member.name)]
+        if self.order == ORDER_NATURAL:
+            names.sort(key=natural_key)
+        return names
+
+    def __iter__(self) -> Iterator[Tuple[str, bytes]]:
+        if self._streaming:
+            yield from self._iter_stream()
+            return
+        for name, member in self._listing():
+            try:
+                data = self._read_zip(name) if member is None else self._read_tar(member)
+            except MEMBER_ERRORS as e:
+                self._skip(name, f"damaged member: {e}")
+                continue
+            if data is not None:
+                yield name, data
+
+    def _iter_stream(self) -> Iterator[Tuple[str, bytes]]:
+        # A stream cannot be re-synchronised after damage, so reading stops there
+        name = ''
+        try:
+            for member in self._tar:
+                name = ''
+                if member.isfile() and _wanted(member.name):
+                    name = member.name
+                    data = self._read_tar(member)
+                    if data is not None:
+                        yield member.name, data
+        except MEMBER_ERRORS as e:
+            self._skip(name, f"damaged archive, the rest is lost: {e}")
+
+    def _listing(self) -> List[Tuple[str, Optional[tarfile.TarInfo]]]:
+        """Input members in reading order, with their TAR headers.
+
+        Unlike :meth:`names`, a TAR cut short lists the members before the
+        damage; it is reopened, since the failed read leaves a compressed
+        stream unusable.
+        """
+        if self._zip is not None:
+            return [(name, None) for name in self.names()]
+        try:
+            members = self._tar.getmembers()
+        except MEMBER_ERRORS as e:
+            self._skip('', f"damaged archive, the rest is lost: {e}")
+            members = list(self._tar.members)
+            self._tar.close()
+            self._fp.seek(0)
+            self._tar = tarfile.open(fileobj=self._fp, mode='r:*')
+        listing = [(member.name, member) for member in members if member.isfile() and _wanted(member.name)]
+        if self.order == ORDER_NATURAL:
+            listing.sort(key=lambda item: natural_key(item[0]))
+        return listing
+
+    def _read_zip(self, name: str):
+        info = self._zip.getinfo(name)
+        if info.file_size > MAX_MEMBER_BYTES:
+            self._skip(name, f"{info.file_size:,} bytes uncompressed")
+            return None
+        with self._zip.open(info) as member:
+            # The declared size is not trusted: never read more than the limit
+            data = member.read(MAX_MEMBER_BYTES + 1)
+        if len(data) > MAX_MEMBER_BYTES:
+            self._skip(name, f"more than {MAX_MEMBER_BYTES:,} bytes uncompressed")
+            return None
+        return data
+
+    def _read_tar(self, member: tarfile.TarInfo):
+        if member.size > MAX_MEMBER_BYTES:
+            self._skip(member.name, f"{member.size:,} bytes")
+            return None
+        fp = self._tar.extractfile(member)
+        return fp.read() if fp is not None else None
+
+    def _skip(self, name: str, reason: str) -> None:
+        logger.warning(f"Skipping {self.name}:{name}: {reason}")
+        self.skipped.append((name, reason))
+
+    def close(self) -> None:
+        for archive in (self._zip, self._tar):
+            if archive is not None:
+                archive.close()
+        for fp in self._owned:
+            fp.close()
+        self._owned = []
+
+    def __enter__(self) -> 'ArchiveReader':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _seekable(fp) -> bool:
+    try:
+        return fp.seekable()
+    except (AttributeError, ValueError):
+        return False
@@ -9,6 +9,16 @@ from typing import Any, Optional
 logger = logging.getLogger(__name__)
 
 
+# Output profiles produced in one run when fan-out is enabled
+DEFAULT_OUTPUT_PROFILES = [
+    {'name': 'archive', 'quality': 100, 'page_size': 'fit', 'method': 1},
+    {'name': 'preview', 'quality': 50, 'page_size': 'a4', 'margin_mm': 10, 'max_dpi': 150, 'method': 1},
+]
+
+# Threads per executor (see core.executors); 0 picks a default from the CPU count
+DEFAULT_EXECUTOR_WORKERS = {'interactive': 0, 'batch_cpu': 0, 'batch_io': 0, 'browser': 0}
+
+
 class ConfigManager:
     """Manages application configuration."""
     
@@ -65,9 +75,158 @@ class ConfigManager:
     def set_language(self, language: str) -> None:
         self.set('language', language)
     
+    def get_auto_codec(self) -> bool:
+        return self.get('auto_codec', True)
+
+    def set_auto_codec(self, enabled: bool) -> None:
+        self.set('auto_codec', enabled)
+    
+    def get_optimize_output(self) -> bool:
+        return self.get('optimize_output', False)
+
+    def set_optimize_output(self, enabled: bool) -> None:
+        self.set('optimize_output', enabled)
+
+    def get_linearize_output(self) -> bool:
+        return self.get('linearize_output', False)
+
+    def set_linearize_output(self, enabled: bool) -> None:
+        self.set('linearize_output', enabled)
+
+    def get_fanout_enabled(self) -> bool:
+        return self.get('fanout_enabled', False)
+
+    def set_fanout_enabled(self, enabled: bool) -> None:
+        self.set('fanout_enabled', enabled)
+
+    def get_output_profiles(self) -> list:
+        return self.get('output_profiles', DEFAULT_OUTPUT_PROFILES)
+
+    def get_drop_blank_pages(self) -> bool:
+        return self.get('drop_blank_pages', False)
+
+    def set_drop_blank_pages(self, enabled: bool) -> None:
+        self.set('drop_blank_pages', enabled)
+
+    def get_trim_borders(self) -> bool:
+        return self.get('trim_borders', False)
+
+    def set_trim_borders(self, enabled: bool) -> None:
+        self.set('trim_borders', enabled)
+
+    def get_blank_ink_delta(self) -> int:
+        return self.get('blank_ink_delta', 48)
+
+    def get_blank_ink_fraction(self) -> float:
+        return self.get('blank_ink_fraction', 0.002)
+
+    def get_executor_workers(self) -> dict:
+        """Concurrency limit per named executor (0 picks one from the CPU count)."""
+        return self.get('executor_workers', dict(DEFAULT_EXECUTOR_WORKERS))
+
+    def get_merge_chunk_size(self) -> int:
+        return self.get('merge_chunk_size', 200)
+
+    def get_merge_workers(self) -> int:
+        return self.get('merge_workers', 0)
+
+    def get_page_cache_enabled(self) -> bool:
+        return self.get('page_cache_enabled', False)
+
+    def set_page_cache_enabled(self, enabled: bool) -> None:
+        self.set('page_cache_enabled', enabled)
+
+    def get_page_cache_mb(self) -> int:
+        return self.get('page_cache_mb', 2048)
+
+    def get_page_cache_hash_content(self) -> bool:
+        return self.get('page_cache_hash_content', False)
+
+    def get_thumbnail_cache_mb(self) -> int:
+        return self.get('thumbnail_cache_mb', 256)
+
+    def get_html_previews(self) -> bool:
+        return self.get('html_previews', False)
+
+    def set_html_previews(self, enabled: bool) -> None:
+        self.set('html_previews', enabled)
+
+    def get_ingest_include(self) -> list:
+        return self.get('ingest_include', [])
+
+    def get_ingest_exclude(self) -> list:
+        return self.get('ingest_exclude', ['.*'])
+
+    def get_watch_settle_seconds(self) -> float:
+        return self.get('watch_settle_seconds', 2.0)
+
+    def get_watch_polling(self) -> bool:
+        # inotify does not see files written by other machines to a network share
+        return self.get('watch_polling', False)
+
+    def get_archive_order(self) -> str:
+        # 'natural' sorts members by name (page2 before page10); 'archive' keeps the stored order
+        return self.get('archive_order', 'natural')
+
+    def get_volume_size_mb(self) -> int:
+        return self.get('volume_size_mb', 0)
+
+    def set_volume_size_mb(self, size_mb: int) -> None:
+        self.set('volume_size_mb', size_mb)
+
+    def get_volume_max_pages(self) -> int:
+        return self.get('volume_max_pages', 0)
+
+    def get_page_size(self) -> str:
+        return self.get('page_size', 'a4')
+
+    def set_page_size(self, page_size: str) -> None:
+        self.set('page_size', page_size)
+
+    def get_page_margin_mm(self) -> float:
+        return self.get('page_margin_mm', 10)
+
+    def get_max_dpi(self) -> int:
+        return self.get('max_dpi', 300)
+
+    def get_max_image_pixels(self) -> int:
+        return self.get('max_image_pixels', 1_500_000_000)
+
+    def get_tile_memory_mb(self) -> int:
+        return self.get('tile_memory_mb', 512)
+    
     def _defaults(self) -> dict:
         return {
             'theme': 'dark',
             'language': 'vi',
+            'auto_codec': True,
+            'archive_order': 'natural',
+            'optimize_output': False,
+            'linearize_output': False,
+            'fanout_enabled': False,
+            'output_profiles': [dict(profile) for profile in DEFAULT_OUTPUT_PROFILES],
+            'drop_blank_pages': False,
+            'trim_borders': False,
+            'blank_ink_delta': 48,
+            'blank_ink_fraction': 0.002,
+            'executor_workers': dict(DEFAULT_EXECUTOR_WORKERS),
+            'merge_chunk_size': 200,
+            'merge_workers': 0,
+            'page_cache_enabled': False,
+            'page_cache_mb': 2048,
+            'page_cache_hash_content': False,
+            'thumbnail_cache_mb': 256,
+            'html_previews': False,
+            'ingest_include': [],
+            'ingest_exclude': ['.*'],
+            'watch_settle_seconds': 2.0,
+            'watch_polling': False,
+            'volume_size_mb': 0,
+            'volume_max_pages': 0,
+            'page_size': 'a4',
+            'page_margin_mm': 10,
+            'max_dpi': 300,
+            'max_image_pixels': 1_500_000_000,
+            'tile_memory_mb': 512,
             'window_geometry': None,
         }
@@ -0,0 +1,163 @@
+"""Size-capped on-disk key/value store with least-recently-used eviction.
+
+Each entry is one file named after its key. Recency is kept in the files'
+modification times, so it survives restarts; the index of sizes and times
+is rebuilt from a directory scan on first use, or ahead of time by calling
+:meth:`DiskCache.load` from a background thread.
+"""
+
+import logging
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TEMP_SUFFIX = '.tmp'
+
+
+class DiskCache:
+    """Entries ``<key><suffix>`` in ``directory``, evicted to stay under ``budget_bytes``.
+
+    Safe to share between threads. New entries are written to a temporary
+    file first and renamed into place by :meth:`commit`, so readers never see
+    a partial entry. Creating one touches no files; if the directory cannot
+    be created or read the store stays empty and :attr:`available` is false.
+    """
+
+    def __init__(self, directory: str, budget_bytes: int, suffix: str):
+        self.directory = directory
+        self.budget_bytes = budget_bytes
+        self.suffix = suffix
+        self.evicted = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._available = False
+        self._entries: Dict[str, Tuple[int, float]] = {}
+        self._total = 0
+
+    def load(self) -> None:
+        """Create the directory and index its entries, once; later calls return at once."""
+        with self._lock:
+            self._load()
+
+    def _load(self) -> None:
+        # Called with the lock held
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            entries = list(os.scandir(self.directory))
+        except OSError as e:
+            logger.warning(f"Cache directory {self.directory} is unavailable: {e}")
+            return
+        for entry in entries:
+            try:
+                if entry.name.endswith(self.suffix):
+                    stat = entry.stat()
+                    self._entries[entry.name[:-len(self.suffix)]] = (stat.st_size, stat.st_mtime)
+                elif entry.name.endswith(TEMP_SUFFIX):
+                    # Left over from an interrupted run
+                    os.unlink(entry.path)
+            except OSError:
+                # Removed or locked by another process while scanning
+                continue
+        self._total = sum(size for size, _ in self._entries.values())
+        self._available = True
+
+    @property
+    def available(self) -> bool:
+        """Whether entries can be stored; loads the index if needed."""
+        with self._lock:
+            self._load()
+            return self._available
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.suffix)
+
+    def temp_path(self, key: str) -> str:
+        """Unique temporary path to write a new entry to before :meth:`commit`."""
+        self.load()
+        return f"{self.path(key)}.{threading.get_ident()}{TEMP_SUFFIX}"
+
+    def touch(self, key: str) -> Optional[int]:
+        """Mark ``key`` as just used and return its size, or ``None`` if it is not stored."""
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            path = self.path(key)
+            try:
+                os.utime(path)
+                self._entries[key] = (entry[0], os.path.getmtime(path))
+            except OSError:
+                # Removed behind our back
+                del self._entries[key]
+                self._total -= entry[0]
+                return None
+            return entry[0]
+
+    def read(self, key: str) -> Optional[bytes]:
+        """Contents of ``key``, or ``None`` if it is not stored."""
+        if self.touch(key) is None:
+            return None
+        try:
+            with open(self.path(key), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def write(self, key: str, data: bytes) -> None:
+        temp_path = self.temp_path(key)
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        self.commit(key, temp_path)
+
+    def commit(self, key: str, temp_path: str) -> int:
+        """Rename a finished ``temp_path`` into place as ``key`` and return its size."""
+        path = self.path(key)
+        os.replace(temp_path, path)
+        size = os.path.getsize(path)
+        with self._lock:
+            self._load()
+            previous = self._entries.get(key)
+            if previous is not None:
+                self._total -= previous[0]
+            self._entries[key] = (size, os.path.getmtime(path))
+            self._total += size
+            self._evict()
+        return size
+
+    def _evict(self) -> None:
+        if self._total <= self.budget_bytes:
+            return
+        for key, (size, _) in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if self._total <= self.budget_bytes:
+                break
+            try:
+                os.unlink(self.path(key))
+            except OSError as e:
+                logger.warning(f"Could not evict cache entry {key}: {e}")
+            del self._entries[key]
+            self._total -= size
+            self.evicted += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._load()
+            for key in list(self._entries):
+                try:
+                    os.unlink(self.path(key))
+                except OSError:
+                    pass
+            self._entries.clear()
+            self._total = 0
@@ -0,0 +1,210 @@
+"""Named thread pools for the different kinds of background work.
+
+Work the user is waiting on (list thumbnails) and batch work (conversions)
+run on separate pools, so a large conversion cannot starve the file list.
+Each pool has its own concurrency limit; batch threads also run at a lower
+OS priority, and every pool keeps live queue-depth and utilization counters.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 'interactive'     # list thumbnails and other work the user is looking at
+BATCH_CPU = 'batch_cpu'         # decoding and encoding pages
+BATCH_IO = 'batch_io'           # copying pages of PDF inputs and moving outputs
+BROWSER = 'browser'             # headless browser renders of HTML inputs
+
+EXECUTOR_NAMES = (INTERACTIVE, BATCH_CPU, BATCH_IO, BROWSER)
+LOW_PRIORITY = (BATCH_CPU, BATCH_IO)
+
+BACKGROUND_NICE = 10
+WINDOWS_THREAD_PRIORITY_BELOW_NORMAL = -1
+WINDOWS_BELOW_NORMAL_PRIORITY_CLASS = 0x4000
+
+
+def default_workers(name: str) -> int:
+    """Worker count used when the configured limit is 0."""
+    cpus = os.cpu_count() or 1
+    if name == INTERACTIVE:
+        return max(1, min(4, cpus))
+    if name == BATCH_CPU:
+        return min(8, cpus)
+    if name == BATCH_IO:
+        return 4
+    return 1
+
+
+def lower_thread_priority() -> None:
+    """Run the calling thread at below-normal OS priority (best effort)."""
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), WINDOWS_THREAD_PRIORITY_BELOW_NORMAL)
+        elif sys.platform.startswith('linux'):
+            # Linux threads have their own nice value
+            tid = threading.get_native_id()
+            os.setpriority(os.PRIO_PROCESS, tid, os.getpriority(os.PRIO_PROCESS, tid) + BACKGROUND_NICE)
+    except (OSError, AttributeError) as e:
+        logger.debug(f"Could not lower thread priority: {e}")
+
+
+def lower_process_priority() -> None:
+    """Run the calling process at below-normal OS priority (for worker processes)."""
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetPriorityClass(kernel32.GetCurrentProcess(), WINDOWS_BELOW_NORMAL_PRIORITY_CLASS)
+        else:
+            os.nice(BACKGROUND_NICE)
+    except (OSError, AttributeError) as e:
+        logger.debug(f"Could not lower process priority: {e}")
+
+
+def cancel_and_wait(futures: Iterable[Future]) -> None:
+    """Cancel tasks that have not started and wait for the running ones.
+
+    The shared executors stay up, so a cancelled job only drops its own tasks.
+    """
+    futures = list(futures)
+    for future in futures:
+        future.cancel()
+    wait(futures)
+
+
+@dataclass
+class ExecutorStats:
+    """A snapshot of one executor's load."""
+
+    name: str
+    workers: int
+    queued: int = 0
+    running: int = 0
+    completed: int = 0
+    failed: int = 0
+    utilization: float = 0.0
+
+    def summary(self) -> str:
+        return (f"{self.name}: {self.running}/{self.workers} busy, {self.queued:,} queued, "
+                f"{self.completed:,} done ({self.failed} failed), {self.utilization:.0%} utilized")
+
+
+class NamedExecutor:
+    """A thread pool that counts its queued, running and finished tasks.
+
+    Utilization is the fraction of worker time spent running tasks since the
+    pool was created or :meth:`reset_stats` was last called.
+    """
+
+    def __init__(self, name: str, max_workers: int, low_priority: bool = False):
+        self.name = name
+        self.max_workers = max_workers
+        self.low_priority = low_priority
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name,
+                                        initializer=lower_thread_priority if low_priority else None)
+        self._lock = threading.Lock()
+        self._running: Dict[int, float] = {}    # task id -> start time
+        self._queued = 0
+        self._task_ids = 0
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._completed = 0
+            self._failed = 0
+            self._busy_seconds = 0.0
+            self._since = time.perf_counter()
+            # Tasks already running count from now on
+            self._running = {task: self._since for task in self._running}
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        with self._lock:
+            self._queued += 1
+            self._task_ids += 1
+            task = self._task_ids
+        future = self._pool.submit(self._run, task, fn, args, kwargs)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _run(self, task, fn, args, kwargs):
+        with self._lock:
+            self._queued -= 1
+            self._running[task] = time.perf_counter()
+        failed = True
+        try:
+            result = fn(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            with self._lock:
+                self._busy_seconds += time.perf_counter() - self._running.pop(task)
+                self._completed += 1
+                self._failed += failed
+
+    def _on_done(self, future: Future) -> None:
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def stats(self) -> ExecutorStats:
+        with self._lock:
+            now = time.perf_counter()
+            busy = self._busy_seconds + sum(now - started for started in self._running.values())
+            elapsed = (now - self._since) * self.max_workers
+            return ExecutorStats(self.name, self.max_workers, self._queued, len(self._running),
+                                 self._completed, self._failed, min(1.0, busy / elapsed) if elapsed else 0.0)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+class Executors:
+    """The application's named executors, created on first use.
+
+    ``workers`` maps executor names to concurrency limits; 0 or a missing
+    name picks a default from the CPU count.
+    """
+
+    def __init__(self, workers: Optional[Dict[str, int]] = None):
+        self.workers = dict(workers or {})
+        self._executors: Dict[str, NamedExecutor] = {}
+        self._lock = threading.Lock()
+
+    def limit(self, name: str) -> int:
+        return self.workers.get(name) or default_workers(name)
+
+    def get(self, name: str) -> NamedExecutor:
+        if name not in EXECUTOR_NAMES:
+            raise ValueError(f"Unknown executor: {name}")
+        with self._lock:
+            executor = self._executors.get(name)
+            if executor is None:
+                executor = NamedExecutor(name, self.limit(name), name in LOW_PRIORITY)
+                self._executors[name] = executor
+            return executor
+
+    def stats(self) -> List[ExecutorStats]:
+        with self._lock:
+            executors = [self._executors[name] for name in EXECUTOR_NAMES if name in self._executors]
+        return [executor.stats() for executor in executors]
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            executors = list(self._executors.values())
+        for executor in executors:
+            executor.reset_stats()
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._lock:
+            executors, self._executors = list(self._executors.values()), {}
+        for executor in executors:
+            executor.shutdown(wait)
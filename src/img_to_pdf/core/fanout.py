@@ -0,0 +1,181 @@
+"""Fan-out encoding: several output profiles from one decode pass.
+
+Each source image is decoded once at the largest resolution any profile
+needs; every profile then resamples and encodes its own copy concurrently
+(Pillow releases the GIL while resizing and encoding) and the results are
+written to one output per profile.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from PIL import Image
+
+from .image_encoder import CodecStats, EncodedImage, encode_image
+from .output_files import unique_output_paths
+from .page_layout import PAGE_FIT, PageLayout
+from .pdf_writer import ImagePdfDocument
+
+logger = logging.getLogger(__name__)
+
+METHOD_ONE_BY_ONE = 0
+METHOD_ALL_IN_ONE = 1
+
+
+@dataclass
+class OutputProfile:
+    """One requested output: encoding settings plus how pages are grouped."""
+
+    name: str
+    quality: int = 95
+    auto_codec: bool = True
+    page_size: str = PAGE_FIT
+    portrait: bool = True
+    margin_mm: float = 0.0
+    max_dpi: int = 0
+    method: int = METHOD_ALL_IN_ONE
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'OutputProfile':
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+    @property
+    def layout(self) -> PageLayout:
+        return PageLayout(self.page_size, portrait=self.portrait,
+                          margin_mm=self.margin_mm, max_dpi=self.max_dpi)
+
+
+def resample_for_layout(img: Image.Image, layout: PageLayout) -> Image.Image:
+    """Downsample only when the image exceeds the layout's max DPI."""
+    target = layout.target_size(*img.size)
+    if target is None or target[0] >= img.size[0]:
+        return img
+    return img.resize(target, Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+
+class ProfileOutput:
+    """Where the pages of one profile go.
+
+    All-in-one profiles stream into ``<out_dir>/<job_name>_<profile>.pdf``;
+    one-by-one profiles write ``<out_dir>/<profile>/<source name>.pdf``, with
+    same-named ``sources`` numbered as in :func:`unique_output_paths`.
+    """
+
+    def __init__(self, profile: OutputProfile, out_dir: str, job_name: str, sources: Iterable[str] = ()):
+        self.profile = profile
+        self.stats = CodecStats()
+        self.paths: List[str] = []
+        self._fp = None
+        self._document: Optional[ImagePdfDocument] = None
+        if profile.method == METHOD_ALL_IN_ONE:
+            self.folder = out_dir
+            path = os.path.join(out_dir, f"{job_name}_{profile.name}.pdf")
+            self._fp = open(path, 'wb')
+            self._document = ImagePdfDocument(self._fp)
+            self.paths.append(path)
+        else:
+            self.folder = os.path.join(out_dir, profile.name)
+            os.makedirs(self.folder, exist_ok=True)
+            self._names = unique_output_paths(sources, self.folder)
+
+    def _single(self, source: str):
+        path = self._names.get(source)
+        if path is None:
+            path = os.path.join(self.folder, f"{os.path.splitext(os.path.basename(source))[0]}.pdf")
+        self.paths.append(path)
+        return open(path, 'wb')
+
+    def add_image(self, source: str, encoded: EncodedImage) -> None:
+        if self._document is not None:
+            self._document.add_image_page(encoded, self.profile.layout)
+            return
+        with self._single(source) as fp:
+            document = ImagePdfDocument(fp)
+            document.add_image_page(encoded, self.profile.layout)
+            document.close()
+
+    def add_pdf(self, source: str, reader, page_indices=None) -> None:
+        if self._document is not None:
+            self._document.add_pdf_pages(reader, page_indices, outline=True)
+            return
+        with self._single(source) as fp:
+            document = ImagePdfDocument(fp)
+            document.add_pdf_pages(reader, page_indices, outline=True)
+            document.close()
+
+    def close(self) -> List[str]:
+        if self._document is not None:
+            self._document.close()
+            self._fp.close()
+            self._document = None
+        return self.paths
+
+    def abort(self) -> None:
+        if self._fp is not None:
+            self._fp.close()
+        for path in self.paths:
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+class FanOutEncoder:
+    """Encodes one decoded image for every profile in parallel."""
+
+    def __init__(self, outputs: List[ProfileOutput]):
+        self.outputs = outputs
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(outputs)),
+                                        thread_name_prefix='fanout')
+
+    @classmethod
+    def for_profiles(cls, profiles: Sequence[OutputProfile], out_dir: str, job_name: str,
+                     sources: Iterable[str] = ()) -> 'FanOutEncoder':
+        """Open an output for every profile; if one cannot be opened, the others are removed again."""
+        sources = list(sources)
+        with ExitStack() as stack:
+            outputs = []
+            for profile in profiles:
+                output = ProfileOutput(profile, out_dir, job_name, sources)
+                stack.callback(output.abort)
+                outputs.append(output)
+            stack.pop_all()
+        return cls(outputs)
+
+    def draft_size(self, size) -> Optional[tuple]:
+        """Smallest decode size that still serves every profile, or ``None`` for full size."""
+        targets = [output.profile.layout.target_size(*size) for output in self.outputs]
+        if not targets or any(t is None for t in targets):
+            return None
+        return max(targets)
+
+    def _encode(self, img: Image.Image, output: ProfileOutput) -> EncodedImage:
+        profile = output.profile
+        return encode_image(resample_for_layout(img, profile.layout), profile.quality,
+                            profile.auto_codec, output.stats)
+
+    def add_image(self, source: str, img: Image.Image) -> None:
+        """Fan ``img`` out to all profiles; pages are written in profile order."""
+        img.load()
+        futures = [self._pool.submit(self._encode, img, output) for output in self.outputs]
+        for output, future in zip(self.outputs, futures):
+            output.add_image(source, future.result())
+
+    def add_pdf(self, source: str, reader, page_indices=None) -> None:
+        for output in self.outputs:
+            output.add_pdf(source, reader, page_indices)
+
+    def close(self) -> List[str]:
+        self._pool.shutdown()
+        paths = []
+        for output in self.outputs:
+            paths.extend(output.close())
+        return paths
+
+    def abort(self) -> None:
+        self._pool.shutdown(cancel_futures=True)
+        for output in self.outputs:
+            output.abort()
@@ -0,0 +1,209 @@
+"""Ordered catalog of the input files queued for conversion.
+
+Entries are slotted objects holding the path, input type, page range and the
+file metadata gathered for sorting, so a 100k-file list stays compact. A
+path -> entry hash makes membership tests O(1), and adding, removing or
+moving any number of entries is a single pass over the order array; moving
+one contiguous block only touches the rows between its old and new place.
+
+Entries also answer ``entry['path']`` and ``entry.get('pages')`` like the
+file dicts the conversion code was written against.
+"""
+
+import logging
+import os
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+HTML_EXTENSIONS = ('.html', '.htm')
+PDF_EXTENSIONS = ('.pdf',)
+ARCHIVE_EXTENSIONS = ('.zip', '.cbz', '.tar', '.cbt', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz')
+
+
+def file_type(path: str) -> str:
+    """Input type of ``path``: 'html', 'pdf', 'archive' or 'image'."""
+    lower = path.lower()
+    if lower.endswith(HTML_EXTENSIONS):
+        return 'html'
+    if lower.endswith(PDF_EXTENSIONS):
+        return 'pdf'
+    if lower.endswith(ARCHIVE_EXTENSIONS):
+        return 'archive'
+    return 'image'
+
+
+class CatalogEntry:
+    """One queued file and its cached metadata (``None`` until gathered).
+
+    ``taken`` is the EXIF capture date, '' for files that have none, and
+    ``probe`` the header information and validation result (a
+    ``file_probe.ProbeInfo``).
+    """
+
+    __slots__ = ('path', 'type', 'pages', 'size', 'mtime', 'ctime', 'taken', 'probe')
+
+    def __init__(self, path: str, type: Optional[str] = None, pages: str = ''):
+        self.path = path
+        self.type = type or file_type(path)
+        self.pages = pages
+        self.size: Optional[int] = None
+        self.mtime: Optional[float] = None
+        self.ctime: Optional[float] = None
+        self.taken: Optional[str] = None
+        self.probe = None
+
+    def update_stat(self, stat: Optional[os.stat_result]) -> None:
+        """Take size and times from ``stat``; ``None`` (the file is gone) clears them."""
+        if stat is None:
+            self.size = self.mtime = self.ctime = None
+            return
+        if self.mtime is not None and (stat.st_mtime != self.mtime or stat.st_size != self.size):
+            # Edited in place; the capture date and header may have changed too
+            self.taken = None
+            self.probe = None
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime
+        self.ctime = stat.st_ctime
+
+    @property
+    def problem(self) -> str:
+        """Why the probe found the file unusable; '' if it did not, or has not run yet."""
+        return self.probe.error if self.probe is not None else ''
+
+    # Mapping-style access to the fields
+
+    def __getitem__(self, field: str):
+        if field not in self.__slots__:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __setitem__(self, field: str, value) -> None:
+        if field not in self.__slots__:
+            raise KeyError(field)
+        setattr(self, field, value)
+
+    def get(self, field: str, default=None):
+        value = getattr(self, field, None) if field in self.__slots__ else None
+        return default if value is None else value
+
+    def __repr__(self) -> str:
+        return f"CatalogEntry({self.path!r}, {self.type!r})"
+
+
+class FileCatalog:
+    """Entries in list order, indexable like a list and searchable by path.
+
+    Reordering methods come in pairs: ``*_order`` computes the permutation
+    (``order[new_row] == old_row``) without changing anything, so a Qt model
+    can announce the layout change first, and :meth:`reorder` applies it.
+    """
+
+    def __init__(self):
+        self._entries: List[CatalogEntry] = []
+        self._by_path: Dict[str, CatalogEntry] = {}
+        self._rows: Optional[Dict[str, int]] = None     # path -> row, built on first use
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[CatalogEntry]:
+        return iter(self._entries)
+
+    def __getitem__(self, row):
+        return self._entries[row]
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._by_path
+
+    def entry(self, path: str) -> Optional[CatalogEntry]:
+        return self._by_path.get(path)
+
+    def row_of(self, path: str) -> int:
+        if path not in self._by_path:
+            return -1
+        if self._rows is None:
+            self._rows = {entry.path: row for row, entry in enumerate(self._entries)}
+        return self._rows[path]
+
+    def new_entries(self, paths: Iterable[str]) -> List[CatalogEntry]:
+        """Entries for the ``paths`` not in the catalog yet (first occurrence only), not added."""
+        seen = set()
+        entries = []
+        for path in paths:
+            if path not in self._by_path and path not in seen:
+                seen.add(path)
+                entries.append(CatalogEntry(path))
+        return entries
+
+    def extend(self, entries: Sequence[CatalogEntry]) -> None:
+        """Append ``entries``, which must not be in the catalog already."""
+        first = len(self._entries)
+        self._entries.extend(entries)
+        for row, entry in enumerate(entries, first):
+            self._by_path[entry.path] = entry
+            if self._rows is not None:
+                self._rows[entry.path] = row
+
+    def clear(self) -> None:
+        self._entries = []
+        self._by_path = {}
+        self._rows = None
+
+    def remove_rows(self, rows: Iterable[int]) -> List[CatalogEntry]:
+        """Remove the entries at ``rows`` in one pass and return them."""
+        doomed = {row for row in rows if 0 <= row < len(self._entries)}
+        if not doomed:
+            return []
+        kept, removed = [], []
+        for row, entry in enumerate(self._entries):
+            (removed if row in doomed else kept).append(entry)
+        self._entries = kept
+        for entry in removed:
+            del self._by_path[entry.path]
+        self._rows = None
+        return removed
+
+    @staticmethod
+    def row_ranges(rows: Iterable[int]) -> List[Tuple[int, int]]:
+        """Contiguous ``(first, last)`` ranges covering ``rows``, bottom range first."""
+        ranges = []
+        for row in sorted(set(rows), reverse=True):
+            if ranges and ranges[-1][0] == row + 1:
+                ranges[-1] = (row, ranges[-1][1])
+            else:
+                ranges.append((row, row))
+        return ranges
+
+    def sorted_order(self, key: Callable[[CatalogEntry], object]) -> List[int]:
+        entries = self._entries
+        return sorted(range(len(entries)), key=lambda row: key(entries[row]))
+
+    def moved_order(self, rows: Iterable[int], destination: int) -> Tuple[List[int], List[int]]:
+        """Permutation moving ``rows`` (kept in order) before ``destination``, and their new rows."""
+        count = len(self._entries)
+        moving = sorted({row for row in rows if 0 <= row < count})
+        if not moving:
+            return list(range(count)), []
+        moving_set = set(moving)
+        rest = [row for row in range(count) if row not in moving_set]
+        position = sum(1 for row in moving if row < destination)
+        position = min(destination, count) - position
+        return rest[:position] + moving + rest[position:], list(range(position, position + len(moving)))
+
+    def move_block(self, first: int, last: int, destination: int) -> int:
+        """Move rows ``first``..``last`` before row ``destination``; return the block's new first row."""
+        entries = self._entries
+        block = entries[first:last + 1]
+        del entries[first:last + 1]
+        new_first = destination - len(block) if destination > last else destination
+        entries[new_first:new_first] = block
+        if self._rows is not None:
+            for row in range(min(first, new_first), max(last, new_first + len(block) - 1) + 1):
+                self._rows[entries[row].path] = row
+        return new_first
+
+    def reorder(self, order: Sequence[int]) -> None:
+        entries = self._entries
+        self._entries = [entries[row] for row in order]
+        self._rows = None
@@ -0,0 +1,132 @@
+"""File metadata for sorting the queued files.
+
+Stat results come from one ``os.scandir`` per folder rather than a path
+lookup per file. Every refresh rescans, since a file edited in place changes
+its own size and times but not its folder's; an entry whose size or
+modification time changed drops its cached capture date and probe result.
+Capture dates are read from the EXIF header of each image, without decoding
+pixels. Sorting itself is then a pure in-memory operation on the cached
+values.
+"""
+
+import logging
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List
+
+from PIL import ExifTags, Image
+
+from .file_catalog import CatalogEntry
+
+logger = logging.getLogger(__name__)
+
+_DIGITS = re.compile(r'(\d+)')
+_EXIF_DATE = re.compile(r'(\d{4}):(\d{2}):(\d{2})[ T](\d{2}):(\d{2}):(\d{2})')
+
+
+def natural_key(name: str) -> list:
+    """Sort key ordering "img2" before "img10" (digit runs compare as numbers)."""
+    parts = _DIGITS.split(name.casefold())
+    # Digit runs land on odd indices, so ints are only ever compared to ints
+    return [(int(part), len(part)) if i % 2 else part for i, part in enumerate(parts)]
+
+
+def exif_taken_date(exif: Image.Exif) -> str:
+    """Capture date in ``exif`` as ``YYYY-MM-DD HH:MM:SS``, or '' if it has none."""
+    value = (exif.get_ifd(ExifTags.IFD.Exif).get(ExifTags.Base.DateTimeOriginal)
+             or exif.get(ExifTags.Base.DateTime))
+    match = _EXIF_DATE.match(str(value or '').strip())
+    if not match:
+        return ''
+    return '{}-{}-{} {}:{}:{}'.format(*match.groups())
+
+
+def read_taken_date(path: str) -> str:
+    """EXIF capture date of an image as ``YYYY-MM-DD HH:MM:SS``, or '' if it has none.
+
+    Only the file header is parsed; pixel data is never decoded (formats
+    that keep EXIF after the pixels, like PNG, are reported as having none).
+    """
+    try:
+        with Image.open(path) as img:
+            if img.format not in ('JPEG', 'MPO', 'TIFF', 'WEBP') and 'exif' not in img.info:
+                return ''
+            return exif_taken_date(img.getexif())
+    except Exception:
+        return ''
+
+
+class MetadataIndex:
+    """Fills and refreshes the stat metadata of catalog entries, folder by folder."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.scans = 0
+
+    def refresh(self, entries: Iterable[CatalogEntry]) -> int:
+        """Bring the size and times of ``entries`` up to date; return how many folders were scanned."""
+        folders: Dict[str, List[CatalogEntry]] = defaultdict(list)
+        for entry in entries:
+            folders[os.path.dirname(os.path.abspath(entry.path))].append(entry)
+        with self._lock:
+            return self._refresh(folders)
+
+    def _refresh(self, folders: Dict[str, List[CatalogEntry]]) -> int:
+        for folder, group in folders.items():
+            stats = self._scan(folder, {os.path.basename(entry.path) for entry in group})
+            for entry in group:
+                entry.update_stat(stats.get(os.path.basename(entry.path)))
+        self.scans += len(folders)
+        return len(folders)
+
+    @staticmethod
+    def _scan(folder: str, names: set) -> Dict[str, os.stat_result]:
+        stats = {}
+        try:
+            with os.scandir(folder) as it:
+                for item in it:
+                    if item.name in names:
+                        try:
+                            stats[item.name] = item.stat()
+                        except OSError:
+                            pass
+        except OSError as e:
+            logger.warning(f"Could not scan {folder}: {e}")
+        return stats
+
+
+def read_taken_dates(entries: Iterable[CatalogEntry], executor, on_done: Callable[[], None]) -> int:
+    """Read the capture dates of the image ``entries`` not read yet, in parallel on ``executor``.
+
+    Does not wait: ``on_done`` is called once the last date is in, on the
+    worker thread that read it, or right away if there was nothing to read.
+    Returns how many dates are being read.
+    """
+    pending = []
+    for entry in entries:
+        if entry.taken is None:
+            if entry.type != 'image':
+                entry.taken = ''
+            else:
+                pending.append(entry)
+    if not pending:
+        on_done()
+        return 0
+    remaining = [len(pending)]
+    lock = threading.Lock()
+
+    def read(entry: CatalogEntry) -> None:
+        try:
+            entry.taken = read_taken_date(entry.path)
+        finally:
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                on_done()
+
+    for entry in pending:
+        executor.submit(read, entry)
+    return len(pending)
@@ -0,0 +1,246 @@
+"""Header-only probing and validation of queued input files.
+
+Each file is opened once, when it is queued, to read what later stages need
+without decoding pixels: dimensions, mode, frame count, EXIF orientation and
+DPI for images, the page count for PDFs and archives. Integrity is checked cheaply from
+the structure the header describes (a JPEG must reach its EOI marker, a PNG
+end with IEND, strips and tiles must lie inside the file, and so on), so
+truncated or corrupt files are flagged in the list before a conversion
+spends time on them. The EXIF capture date is read in the same pass.
+"""
+
+import logging
+import os
+import struct
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from .archive_input import ArchiveReader
+from .file_catalog import CatalogEntry
+from .file_metadata import exif_taken_date
+from .tiled_image import DEFAULT_MAX_PIXELS, ImageTooLargeError, open_image
+
+logger = logging.getLogger(__name__)
+
+PROBE_CHUNK = 64
+_TAIL_BYTES = 4096
+_SCAN_CHUNK = 1 << 20
+_JPEG_SOS = 0xDA
+_JPEG_STANDALONE = frozenset([0x01, 0xD8] + list(range(0xD0, 0xD8)))
+_ORIENTATION = 0x0112
+_STRIP_OFFSETS, _STRIP_BYTE_COUNTS = 273, 279
+_TILE_OFFSETS, _TILE_BYTE_COUNTS = 324, 325
+
+
+class ProbeInfo:
+    """What the probe found out about one file; ``error`` is set when it cannot be converted."""
+
+    __slots__ = ('format', 'width', 'height', 'mode', 'frames', 'orientation', 'dpi', 'pages', 'error')
+
+    def __init__(self, error: str = ''):
+        self.format = ''
+        self.width = self.height = 0
+        self.mode = ''
+        self.frames = 1
+        self.orientation = 1
+        self.dpi: Optional[Tuple[int, int]] = None
+        self.pages = 0
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+    def summary(self) -> str:
+        if self.error:
+            return self.error
+        if self.pages:
+            return f"{self.format}, {self.pages} pages"
+        if not self.width:
+            return self.format
+        text = f"{self.format} {self.width}x{self.height} {self.mode}"
+        if self.dpi:
+            text += f", {self.dpi[0]} dpi"
+        if self.frames > 1:
+            text += f", {self.frames} frames"
+        if self.orientation != 1:
+            text += f", EXIF orientation {self.orientation}"
+        return text
+
+
+def _jpeg_reaches_eoi(path: str) -> bool:
+    """Whether the JPEG's scan data runs up to an end of image marker.
+
+    For files with data after the image (motion photos append a video),
+    where the tail check cannot see the marker. Marker segments up to the
+    first scan are skipped by their lengths, so an EXIF thumbnail's marker
+    does not count; the scan data is then read until EOI, never decoded.
+    """
+    with open(path, 'rb') as fp:
+        if fp.read(2) != b'\xff\xd8':
+            return False
+        while True:
+            marker = fp.read(2)
+            while marker == b'\xff\xff':
+                # Fill bytes before a marker
+                marker = marker[1:] + fp.read(1)
+            if len(marker) < 2 or marker[0] != 0xFF:
+                return False
+            if marker[1] in _JPEG_STANDALONE:
+                continue
+            length = fp.read(2)
+            if len(length) < 2:
+                return False
+            fp.seek(struct.unpack('>H', length)[0] - 2, os.SEEK_CUR)
+            if marker[1] == _JPEG_SOS:
+                break
+        carry = b''
+        while True:
+            chunk = fp.read(_SCAN_CHUNK)
+            if not chunk:
+                return False
+            if b'\xff\xd9' in carry + chunk:
+                return True
+            carry = chunk[-1:]
+
+
+def _check_structure(img: Image.Image, path: str) -> str:
+    """Why the file cannot hold the image its header describes, or '' if it looks complete."""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as fp:
+        fp.seek(max(0, size - _TAIL_BYTES))
+        tail = fp.read()
+    if img.format in ('JPEG', 'MPO') and b'\xff\xd9' not in tail and not _jpeg_reaches_eoi(path):
+        return "truncated JPEG (no end of image marker)"
+    if img.format == 'PNG' and b'IEND' not in tail[-64:]:
+        return "truncated PNG (no IEND chunk)"
+    if img.format == 'GIF' and not tail.rstrip(b'\0').endswith(b';'):
+        return "truncated GIF (no trailer)"
+    if img.format == 'WEBP':
+        with open(path, 'rb') as fp:
+            header = fp.read(12)
+        if len(header) < 12 or struct.unpack('<I', header[4:8])[0] + 8 > size:
+            return "truncated WebP"
+    if img.format == 'TIFF':
+        tags = img.tag_v2
+        for offsets_tag, counts_tag in ((_STRIP_OFFSETS, _STRIP_BYTE_COUNTS), (_TILE_OFFSETS, _TILE_BYTE_COUNTS)):
+            offsets, counts = tags.get(offsets_tag), tags.get(counts_tag)
+            if offsets and counts and max(o + c for o, c in zip(offsets, counts)) > size:
+                return "truncated TIFF (image data past the end of the file)"
+    for tile in img.tile:
+        if tile.offset > size:
+            return f"truncated {img.format} (image data past the end of the file)"
+        if tile.codec_name == 'raw' and len(tile.args) > 1 and tile.args[1]:
+            # Uncompressed rows of a known stride
+            rows = tile.extents[3] - tile.extents[1]
+            if tile.offset + abs(tile.args[1]) * rows > size:
+                return f"truncated {img.format} (image data past the end of the file)"
+    return ''
+
+
+def probe_image(path: str, max_pixels: int = DEFAULT_MAX_PIXELS) -> Tuple[ProbeInfo, str]:
+    """Probe an image; returns its info and EXIF capture date ('' if none)."""
+    try:
+        img = open_image(path, max_pixels)
+    except ImageTooLargeError as e:
+        return ProbeInfo(str(e)), ''
+    except Exception as e:
+        return ProbeInfo(f"unreadable image: {e}"), ''
+    info = ProbeInfo()
+    taken = ''
+    with img:
+        info.format = img.format or ''
+        info.width, info.height = img.size
+        info.mode = img.mode
+        dpi = img.info.get('dpi')
+        if dpi:
+            info.dpi = (round(float(dpi[0])), round(float(dpi[1])))
+        try:
+            info.frames = getattr(img, 'n_frames', 1)
+            img.seek(0)
+            # PNG keeps EXIF after the pixel data; only formats that have it
+            # in the header are asked, so no pixels are decoded
+            if img.format in ('JPEG', 'MPO', 'TIFF', 'WEBP') or 'exif' in img.info:
+                exif = img.getexif()
+                info.orientation = exif.get(_ORIENTATION, 1)
+                taken = exif_taken_date(exif)
+            info.error = _check_structure(img, path)
+        except Exception as e:
+            info.error = f"corrupt {info.format or 'image'}: {e}"
+    return info, taken
+
+
+def probe_pdf(path: str) -> ProbeInfo:
+    from pypdf import PdfReader
+
+    from .pdf_copier import unlock
+
+    try:
+        reader = PdfReader(path)
+        if not unlock(reader):
+            return ProbeInfo("password protected PDF")
+        info = ProbeInfo()
+        info.format = 'PDF'
+        info.pages = len(reader.pages)
+        if not info.pages:
+            info.error = "PDF has no pages"
+        return info
+    except Exception as e:
+        return ProbeInfo(f"unreadable PDF: {e}")
+
+
+def probe_archive(path: str) -> ProbeInfo:
+    """Count the image and PDF members of an archive from its directory, reading none of them."""
+    try:
+        with ArchiveReader(path) as archive:
+            info = ProbeInfo()
+            info.format = archive.format
+            info.pages = len(archive.names())
+    except ValueError:
+        return ProbeInfo("not a readable ZIP or TAR archive")
+    except Exception as e:
+        return ProbeInfo(f"unreadable archive: {e}")
+    if not info.pages:
+        info.error = "archive holds no images or PDFs"
+    return info
+
+
+def probe_entry(entry: CatalogEntry, max_pixels: int = DEFAULT_MAX_PIXELS) -> ProbeInfo:
+    """Probe ``entry`` and store the result (and a capture date not read yet) on it."""
+    if not os.path.isfile(entry.path):
+        info = ProbeInfo("file not found")
+    elif entry.type == 'image':
+        info, taken = probe_image(entry.path, max_pixels)
+        if entry.taken is None:
+            entry.taken = taken
+    elif entry.type == 'pdf':
+        info = probe_pdf(entry.path)
+    elif entry.type == 'archive':
+        info = probe_archive(entry.path)
+    else:
+        info = ProbeInfo()
+        info.format = 'HTML'
+    entry.probe = info
+    return info
+
+
+def probe_entries(entries: Sequence[CatalogEntry], executor, on_chunk: Callable[[List[CatalogEntry]], None],
+                  max_pixels: int = DEFAULT_MAX_PIXELS, chunk_size: int = PROBE_CHUNK) -> List[Future]:
+    """Probe the ``entries`` not probed yet in parallel chunks on ``executor``.
+
+    ``on_chunk`` is called on the worker thread with each chunk once it is
+    done (also if probing failed part way).
+    Returns the chunks' futures without waiting for them.
+    """
+    pending = [entry for entry in entries if entry.probe is None]
+
+    def run(chunk):
+        try:
+            for entry in chunk:
+                probe_entry(entry, max_pixels)
+        finally:
+            on_chunk(chunk)
+
+    return [executor.submit(run, pending[i:i + chunk_size]) for i in range(0, len(pending), chunk_size)]
@@ -0,0 +1,161 @@
+"""Recursive folder ingest for the file list.
+
+Folder trees are walked with ``os.scandir`` (one listing per folder, no stat
+calls for plain files) and the supported files found are handed over in
+batches as the walk goes, so a list can start filling long before a large
+tree has been fully read. Include/exclude globs filter files and prune
+folders, symlinked folders are followed at most once (so a link back up the
+tree cannot loop forever), and the walk can be cancelled at any point.
+"""
+
+import fnmatch
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence
+
+from .file_catalog import ARCHIVE_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
+INPUT_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tiff", ".webp", ".html", ".htm", ".pdf") + ARCHIVE_EXTENSIONS
+DEFAULT_EXCLUDE = ('.*',)       # Hidden files and folders, including our own temporary files
+BATCH_SIZE = 500
+BATCH_SECONDS = 0.1
+
+
+@dataclass
+class IngestStats:
+    """What a folder walk found so far."""
+
+    folders: int = 0
+    files: int = 0
+    skipped: int = 0
+    loops: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    cancelled: bool = False
+
+    def summary(self) -> str:
+        text = f"{self.files:,} files in {self.folders:,} folders in {self.seconds:.1f}s"
+        details = []
+        if self.skipped:
+            details.append(f"{self.skipped:,} skipped")
+        if self.loops:
+            details.append(f"{self.loops} symlink loops")
+        if self.errors:
+            details.append(f"{self.errors} unreadable folders")
+        if self.cancelled:
+            details.append("cancelled")
+        return text + (f" ({', '.join(details)})" if details else "")
+
+
+def compile_globs(patterns: Sequence[str]):
+    """One regex matching any of the globs (case sensitivity as ``fnmatch.fnmatch``), or None."""
+    if not patterns:
+        return None
+    return re.compile('|'.join(fnmatch.translate(os.path.normcase(pattern)) for pattern in patterns))
+
+
+def matches_globs(regex, name: str, relative: str) -> bool:
+    """Whether a file or folder matches ``regex``, by name or by path below the root."""
+    return bool(regex.match(os.path.normcase(name)) or regex.match(os.path.normcase(relative)))
+
+
+class FolderIngest:
+    """Walks folder trees for input files.
+
+    A file is taken if its extension is one of ``extensions``, it matches one
+    of ``include`` (if any are given) and none of ``exclude``; folders
+    matching ``exclude`` are not entered. Patterns are matched against the
+    name and against the path relative to the walked root, with ``/``
+    separators. Setting ``cancel_event`` stops the walk.
+    """
+
+    def __init__(self, include: Sequence[str] = (), exclude: Sequence[str] = DEFAULT_EXCLUDE,
+                 extensions: Sequence[str] = INPUT_EXTENSIONS, follow_symlinks: bool = True,
+                 cancel_event: Optional[threading.Event] = None):
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self._include = compile_globs(self.include)
+        self._exclude = compile_globs(self.exclude)
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.follow_symlinks = follow_symlinks
+        self.cancel_event = cancel_event or threading.Event()
+        self.stats = IngestStats()
+
+    def _cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def walk(self, roots: Iterable[str]) -> Iterator[str]:
+        """Yield matching files under ``roots`` depth first, each folder's entries in name order."""
+        started = time.perf_counter()
+        visited = set()
+        try:
+            for root in roots:
+                yield from self._walk_root(os.path.abspath(root), visited)
+                if self._cancelled():
+                    break
+        finally:
+            self.stats.cancelled = self._cancelled()
+            self.stats.seconds = time.perf_counter() - started
+
+    def _walk_root(self, root: str, visited: set) -> Iterator[str]:
+        stack = [(root, '')]
+        while stack and not self._cancelled():
+            folder, prefix = stack.pop()
+            try:
+                stat = os.stat(folder)
+                identity = (stat.st_dev, stat.st_ino)
+                if identity in visited:
+                    # Reached again through a symlink
+                    self.stats.loops += 1
+                    continue
+                visited.add(identity)
+                with os.scandir(folder) as it:
+                    entries = sorted(it, key=lambda entry: entry.name.casefold())
+            except OSError as e:
+                logger.warning(f"Could not read folder {folder}: {e}")
+                self.stats.errors += 1
+                continue
+            self.stats.folders += 1
+            subfolders = []
+            for entry in entries:
+                relative = prefix + entry.name
+                if self._exclude and matches_globs(self._exclude, entry.name, relative):
+                    self.stats.skipped += 1
+                    continue
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=self.follow_symlinks)
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    subfolders.append((entry.path, relative + '/'))
+                elif entry.name.lower().endswith(self.extensions) \
+                        and (not self._include or matches_globs(self._include, entry.name, relative)):
+                    self.stats.files += 1
+                    yield entry.path
+                else:
+                    self.stats.skipped += 1
+            # Reversed, so the first subfolder is walked next
+            stack.extend(reversed(subfolders))
+
+    def run(self, roots: Iterable[str], on_batch: Callable[[List[str]], None],
+            batch_size: int = BATCH_SIZE, batch_seconds: float = BATCH_SECONDS) -> IngestStats:
+        """Walk ``roots`` and pass the files found to ``on_batch``, at least every ``batch_seconds``."""
+        batch = []
+        last = time.perf_counter()
+        for path in self.walk(roots):
+            batch.append(path)
+            now = time.perf_counter()
+            if len(batch) >= batch_size or now - last >= batch_seconds:
+                on_batch(batch)
+                batch = []
+                last = now
+        if batch and not self._cancelled():
+            on_batch(batch)
+        logger.info(f"Ingested {self.stats.summary()}")
+        return self.stats
@@ -0,0 +1,282 @@
+"""Watching folders for newly arrived input files.
+
+On Linux the kernel reports changes through inotify; elsewhere, or when
+inotify is unavailable (or forced off, e.g. for network shares whose remote
+writes it never sees), folders are rescanned with ``os.scandir`` every
+``poll_seconds``. Either way a file is only handed over once its size and
+modification time have stayed unchanged for ``settle_seconds`` and it can be
+opened, so files still being copied or scanned are not picked up half
+written. Files are reported again if they are later rewritten.
+
+Only files directly inside the watched folders are considered.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from .folder_ingest import DEFAULT_EXCLUDE, INPUT_EXTENSIONS, compile_globs, matches_globs
+
+logger = logging.getLogger(__name__)
+
+SETTLE_SECONDS = 2.0
+POLL_SECONDS = 1.0
+MAX_RETRIES = 3         # Times a forgotten file is reported again before it is given up
+
+# inotify(7) event bits
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_Q_OVERFLOW = 0x4000
+_WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+_EVENT = struct.Struct('iIII')     # wd, mask, cookie, name length
+
+Signature = Tuple[int, int]     # size, st_mtime_ns
+
+
+class _Inotify:
+    """Non-blocking inotify descriptor watching the given folders."""
+
+    def __init__(self, folders: Sequence[str]):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._folders: Dict[int, str] = {}
+        try:
+            for folder in folders:
+                wd = libc.inotify_add_watch(self.fd, os.fsencode(folder), _WATCH_MASK)
+                if wd < 0:
+                    raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {folder}")
+                self._folders[wd] = folder
+        except Exception:
+            os.close(self.fd)
+            raise
+
+    def wait(self, timeout: float) -> Optional[Set[str]]:
+        """Paths changed within ``timeout`` seconds, or ``None`` if events were lost."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b'\0')
+                offset += _EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    return None
+                folder = self._folders.get(wd)
+                if folder is not None and name:
+                    changed.add(os.path.join(folder, os.fsdecode(name)))
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class FolderWatcher:
+    """Reports input files that appear (or change) in ``folders`` on a thread of its own.
+
+    ``on_ready`` is called on the watcher thread with the paths that settled,
+    in name order; the next changes are picked up once it returns. Files
+    present when watching starts are ignored unless ``include_existing``.
+    """
+
+    def __init__(self, folders: Sequence[str], on_ready: Callable[[List[str]], None],
+                 include: Sequence[str] = (), exclude: Sequence[str] = DEFAULT_EXCLUDE,
+                 extensions: Sequence[str] = INPUT_EXTENSIONS, settle_seconds: float = SETTLE_SECONDS,
+                 poll_seconds: float = POLL_SECONDS, use_inotify: bool = True, include_existing: bool = False,
+                 max_retries: int = MAX_RETRIES):
+        self.folders = [os.path.abspath(folder) for folder in folders]
+        self.on_ready = on_ready
+        self._include = compile_globs(tuple(include))
+        self._exclude = compile_globs(tuple(exclude))
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.settle_seconds = settle_seconds
+        self.poll_seconds = poll_seconds
+        self.use_inotify = use_inotify and sys.platform.startswith('linux')
+        self.include_existing = include_existing
+        self.max_retries = max_retries
+        self.backend = 'polling'
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._reported: Dict[str, Signature] = {}
+        self._pending: Dict[str, Tuple[Signature, float]] = {}     # path -> (signature, unchanged since)
+        self._ignored: Set[str] = set()
+        self._retries: Dict[str, Tuple[Signature, int]] = {}       # path -> (signature, retries so far)
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='watch', daemon=True)
+        self._thread.start()
+
+    def stop(self, wait: bool = True) -> None:
+        self._stop.set()
+        if wait and self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    @property
+    def alive(self) -> bool:
+        """Whether the watcher thread still runs (it may be finishing an ``on_ready`` call after :meth:`stop`)."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def ignore(self, path: str) -> None:
+        """Never report ``path`` (e.g. an output written into a watched folder)."""
+        with self._lock:
+            self._ignored.add(os.path.abspath(path))
+
+    def forget(self, paths: Sequence[str]) -> List[str]:
+        """Report ``paths`` again once they settle, e.g. because handling them failed.
+
+        Each retry waits twice as long as the one before. After
+        ``max_retries`` retries of the same file contents a path is given up
+        until the file changes; the given-up paths are returned. Call it
+        from ``on_ready``, on the watcher thread.
+        """
+        now = time.monotonic()
+        given_up = []
+        for path in paths:
+            path = os.path.abspath(path)
+            signature = self._reported.get(path)
+            if signature is None:
+                continue
+            previous, retries = self._retries.get(path, (signature, 0))
+            retries = retries + 1 if previous == signature else 1
+            if retries > self.max_retries:
+                del self._retries[path]
+                given_up.append(path)
+                continue
+            self._retries[path] = (signature, retries)
+            del self._reported[path]
+            self._pending[path] = (signature, now + self.settle_seconds * (2 ** (retries - 1) - 1))
+        return given_up
+
+    def _accepts(self, name: str) -> bool:
+        if not name.lower().endswith(self.extensions):
+            return False
+        if self._exclude and matches_globs(self._exclude, name, name):
+            return False
+        return not self._include or matches_globs(self._include, name, name)
+
+    def _scan(self) -> Dict[str, Signature]:
+        """Signature of every accepted file in the watched folders."""
+        found = {}
+        for folder in self.folders:
+            try:
+                with os.scandir(folder) as it:
+                    for entry in it:
+                        if self._accepts(entry.name):
+                            try:
+                                if entry.is_file():
+                                    stat = entry.stat()
+                                    found[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                            except OSError:
+                                pass
+            except OSError as e:
+                logger.warning(f"Could not scan watched folder {folder}: {e}")
+        return found
+
+    def _note(self, path: str, signature: Optional[Signature], now: float) -> None:
+        """Record the current state of ``path`` as a candidate (``None``: it is gone)."""
+        if signature is None:
+            self._retries.pop(path, None)
+        if signature is None or self._reported.get(path) == signature:
+            self._pending.pop(path, None)
+            return
+        previous = self._pending.get(path)
+        if previous is None or previous[0] != signature:
+            self._pending[path] = (signature, now)
+            self._retries.pop(path, None)
+
+    def _settled(self, now: float) -> List[str]:
+        """Candidates unchanged for the settle time that can be opened; they are marked reported."""
+        ready = []
+        for path, (signature, since) in list(self._pending.items()):
+            if now - since < self.settle_seconds:
+                continue
+            try:
+                stat = os.stat(path)
+                current = (stat.st_size, stat.st_mtime_ns)
+                if current == signature:
+                    # Writers on Windows shares hold the file open exclusively until done
+                    with open(path, 'rb'):
+                        pass
+            except FileNotFoundError:
+                del self._pending[path]
+                continue
+            except OSError:
+                # Still locked by its writer; look again next time
+                continue
+            if current != signature:
+                self._pending[path] = (current, now)
+                continue
+            del self._pending[path]
+            self._reported[path] = signature
+            with self._lock:
+                if path in self._ignored:
+                    continue
+            ready.append(path)
+        return sorted(ready, key=lambda p: os.path.basename(p).casefold())
+
+    def _run(self) -> None:
+        inotify = None
+        if self.use_inotify:
+            try:
+                inotify = _Inotify(self.folders)
+                self.backend = 'inotify'
+            except (OSError, AttributeError) as e:
+                logger.info(f"inotify unavailable, polling instead: {e}")
+        try:
+            existing = self._scan()
+            if not self.include_existing:
+                self._reported.update(existing)
+            now = time.monotonic()
+            for path, signature in existing.items():
+                self._note(path, signature, now)
+            last_scan = now
+            while not self._stop.is_set():
+                # Wake often enough to release settled files on time
+                timeout = min(self.poll_seconds, self.settle_seconds / 2 or self.poll_seconds)
+                if inotify is not None:
+                    changed = inotify.wait(timeout)
+                else:
+                    self._stop.wait(timeout)
+                    changed = None
+                now = time.monotonic()
+                if changed is None and (inotify is not None or now - last_scan >= self.poll_seconds):
+                    for path, signature in self._scan().items():
+                        self._note(path, signature, now)
+                    last_scan = now
+                elif changed:
+                    for path in changed:
+                        if not self._accepts(os.path.basename(path)):
+                            continue
+                        try:
+                            stat = os.stat(path)
+                            self._note(path, (stat.st_size, stat.st_mtime_ns), now)
+                        except OSError:
+                            self._note(path, None, now)
+                ready = self._settled(now)
+                if ready and not self._stop.is_set():
+                    try:
+                        self.on_ready(ready)
+                    except Exception as e:
+                        logger.error(f"Handling watched files failed: {e}")
+        finally:
+            if inotify is not None:
+                inotify.close()
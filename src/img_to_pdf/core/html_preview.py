@@ -0,0 +1,85 @@
+"""Low-resolution previews of HTML inputs for the file list.
+
+Pages are rendered by the same headless browser as conversions, with a
+shorter settle delay, and scaled down to thumbnails. Starting a browser costs
+more than rendering a page, so each rendering thread keeps its browser open
+until :meth:`HtmlPreviewRenderer.close`. If no browser can be started, that is
+remembered, so later rows fail at once instead of retrying the launch. Watch
+mode converts new HTML files through the same warm browsers
+(:meth:`HtmlPreviewRenderer.render_pdf`).
+"""
+
+import io
+import logging
+import threading
+from typing import List, Optional
+
+from PIL import Image
+
+from .html_to_pdf_converter import BrowserUnavailableError, HtmlToPdfConverter
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_SETTLE_SECONDS = 0.5
+
+
+class HtmlPreviewRenderer:
+    """Renders HTML files to PNG thumbnails; safe to call from several threads."""
+
+    def __init__(self, settle_seconds: float = PREVIEW_SETTLE_SECONDS):
+        self.settle_seconds = settle_seconds
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._converters: List[HtmlToPdfConverter] = []
+        self._unavailable: Optional[str] = None
+
+    @property
+    def available(self) -> bool:
+        """False once starting a browser has failed."""
+        return self._unavailable is None
+
+    def _converter(self) -> HtmlToPdfConverter:
+        if self._unavailable is not None:
+            raise BrowserUnavailableError(self._unavailable)
+        converter = getattr(self._local, 'converter', None)
+        if converter is None:
+            converter = HtmlToPdfConverter()
+            self._local.converter = converter
+            with self._lock:
+                self._converters.append(converter)
+        return converter
+
+    def render(self, path: str, size: int) -> bytes:
+        """PNG bytes of ``path`` rendered and scaled to fit in ``size`` x ``size``."""
+        try:
+            screenshot = self._converter().capture_png(path, self.settle_seconds)
+        except BrowserUnavailableError as e:
+            self._remember_unavailable(e)
+            raise
+        with Image.open(io.BytesIO(screenshot)) as img:
+            thumb = img.convert('RGB')
+        thumb.thumbnail((size, size), Image.Resampling.LANCZOS, reducing_gap=2.0)
+        out = io.BytesIO()
+        thumb.save(out, 'PNG')
+        return out.getvalue()
+
+    def render_pdf(self, path: str, pdf_path: str) -> Optional[str]:
+        """Convert ``path`` to ``pdf_path`` at full quality, in this thread's browser."""
+        try:
+            return self._converter().convert_file_sync(path, pdf_path)
+        except BrowserUnavailableError as e:
+            self._remember_unavailable(e)
+            raise
+
+    def _remember_unavailable(self, error: BrowserUnavailableError) -> None:
+        with self._lock:
+            if self._unavailable is None:
+                logger.warning(f"HTML previews disabled: {error}")
+                self._unavailable = str(error)
+
+    def close(self) -> None:
+        """Quit every browser started for previews (a later render starts a new one)."""
+        with self._lock:
+            converters = list(self._converters)
+        for converter in converters:
+            converter.cleanup()
@@ -9,6 +9,10 @@ from PIL import Image
 logger = logging.getLogger(__name__)
 
 
+class BrowserUnavailableError(RuntimeError):
+    """Neither Chrome nor Edge could be started."""
+
+
 class SeleniumHtmlToPdfConverter:
     """Convert HTML files to PDF using Selenium with system browser (no download needed)."""
     
@@ -20,9 +24,12 @@ class SeleniumHtmlToPdfConverter:
         if self.driver is not None:
             return self.driver
             
-        from selenium import webdriver
-        from selenium.webdriver.chrome.options import Options as ChromeOptions
-        from selenium.webdriver.edge.options import Options as EdgeOptions
+        try:
+            from selenium import webdriver
+            from selenium.webdriver.chrome.options import Options as ChromeOptions
+            from selenium.webdriver.edge.options import Options as EdgeOptions
+        except ImportError as e:
+            raise BrowserUnavailableError(f"Selenium is not installed: {e}") from e
         
         # Try Chrome first, then Edge
         for browser_type in ['chrome', 'edge']:
@@ -31,7 +38,6 @@ class SeleniumHtmlToPdfConverter:
                     options = ChromeOptions()
                     options.add_argument('--headless=new')
                     options.add_argument('--disable-gpu')
-                    options.add_argument('--no-sandbox')
                     options.add_argument('--window-size=1920,1080')
                     self.driver = webdriver.Chrome(options=options)
                     logger.info("Using Chrome browser")
@@ -39,7 +45,6 @@ class SeleniumHtmlToPdfConverter:
                     options = EdgeOptions()
                     options.add_argument('--headless=new')
                     options.add_argument('--disable-gpu')
-                    options.add_argument('--no-sandbox')
                     options.add_argument('--window-size=1920,1080')
                     self.driver = webdriver.Edge(options=options)
                     logger.info("Using Edge browser")
@@ -49,7 +54,32 @@ class SeleniumHtmlToPdfConverter:
                 logger.warning(f"Failed to initialize {browser_type}: {e}")
                 continue
         
-        raise RuntimeError("No compatible browser found. Please install Chrome or Edge.")
+        raise BrowserUnavailableError("No compatible browser found. Please install Chrome or Edge.")
+    
+    def capture_png(self, html_path: str, settle_seconds: float = 3) -> bytes:
+        """Load an HTML file in the browser and return a PNG screenshot of the 1920x1080 viewport.
+        
+        Waits for the document to finish loading, then ``settle_seconds`` for
+        fonts, CSS and images.
+        """
+        # Get browser driver
+        driver = self._get_driver()
+        
+        # Navigate to HTML file
+        file_url = f"file:///{os.path.abspath(html_path).replace(os.sep, '/')}"
+        logger.info(f"Loading HTML from: {file_url}")
+        driver.get(file_url)
+        
+        # Wait for page to fully load (including fonts, CSS, images)
+        import time
+        time.sleep(settle_seconds)  # Give time for all resources to load
+        
+        # Get page dimensions
+        driver.set_window_size(1920, 1080)
+        
+        # Take screenshot
+        logger.info("Capturing screenshot...")
+        return driver.get_screenshot_as_png()
     
     def convert_file_sync(self, html_path: str, output_pdf_path: Optional[str] = None) -> Optional[str]:
         """
@@ -73,24 +103,7 @@ class SeleniumHtmlToPdfConverter:
                 temp_name = f"html_to_pdf_{os.path.basename(html_path)}.pdf"
                 output_pdf_path = os.path.join(temp_dir, temp_name)
             
-            # Get browser driver
-            driver = self._get_driver()
-            
-            # Navigate to HTML file
-            file_url = f"file:///{os.path.abspath(html_path).replace(os.sep, '/')}"
-            logger.info(f"Loading HTML from: {file_url}")
-            driver.get(file_url)
-            
-            # Wait for page to fully load (including fonts, CSS, images)
-            import time
-            time.sleep(3)  # Give time for all resources to load
-            
-            # Get page dimensions
-            driver.set_window_size(1920, 1080)
-            
-            # Take screenshot
-            logger.info("Capturing screenshot...")
-            screenshot_bytes = driver.get_screenshot_as_png()
+            screenshot_bytes = self.capture_png(html_path)
             
             # Save screenshot to temp file
             temp_img = tempfile.NamedTemporaryFile(delete=False, suffix='.png')
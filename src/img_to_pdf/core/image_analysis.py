@@ -0,0 +1,167 @@
+"""Vectorized content analysis of page images: codec choice and scan cleanup."""
+
+import logging
+from typing import Any, Dict
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Image classes
+PHOTO = 'photo'
+FLAT = 'flat'
+GRAYSCALE = 'grayscale'
+BILEVEL = 'bilevel'
+
+IMAGE_CLASSES = (PHOTO, FLAT, GRAYSCALE, BILEVEL)
+
+ANALYSIS_SIZE = 256         # Longest edge of the analysed sample
+GRAY_TOLERANCE = 10         # Max channel spread still considered neutral gray
+GRAY_FRACTION = 0.995       # Share of pixels that must be neutral for "gray"
+BILEVEL_FRACTION = 0.97     # Share of pixels that must be near black/white
+BILEVEL_DARK = 64
+BILEVEL_LIGHT = 192
+FLAT_MAX_COLORS = 256       # Few distinct colors in the sample -> synthetic
+FLAT_MAX_GRAY_LEVELS = 32   # Same for gray content, which never exceeds 256
+FLAT_RUN_FRACTION = 0.75    # Share of pixels equal to their right neighbour
+FLAT_MIN_RUN_FRACTION = 0.3 # Few colors but no runs means dithered/posterized photo
+
+# Scanned page cleanup
+# Modes nearest-neighbour resizing handles directly (others are converted first)
+RESIZABLE_MODES = ('1', 'L', 'P', 'RGB', 'RGBA', 'CMYK', 'LA', 'RGBX', 'YCbCr')
+PAGE_SAMPLE_SIZE = 1024     # Larger sample so thin text strokes are not skipped
+PAPER_PERCENTILE = 90       # Luma percentile taken as the paper tone
+PAGE_INK_DELTA = 48         # Luma distance from paper that counts as ink
+PAGE_BLANK_FRACTION = 0.002 # Pages with less ink than this are blank
+BORDER_FRACTION = 0.9       # Edge lines with more ink than this are scanner border
+LINE_INK_FRACTION = 0.005   # Rows/columns with less ink are outside the content box
+TRIM_PADDING = 0.01         # Margin kept around the content box (fraction of size)
+
+
+def sample_pixels(img: Image.Image, size: int = ANALYSIS_SIZE) -> np.ndarray:
+    """Return a small RGB sample of the image as an ``(h, w, 3)`` uint8 array.
+
+    Nearest-neighbour sampling is used on purpose: it keeps the exact colors
+    of the source so flat-color and bilevel content is not blurred away.
+    """
+    width, height = img.size
+    scale = min(1.0, size / float(max(width, height)))
+    sample_size = (max(1, int(width * scale)), max(1, int(height * scale)))
+    if img.mode not in ('RGB', 'L', '1'):
+        img = img.convert('RGB')
+    small = img.resize(sample_size, Image.Resampling.NEAREST)
+    if small.mode != 'RGB':
+        small = small.convert('RGB')
+    return np.asarray(small, dtype=np.uint8)
+
+
+def analyze_pixels(pixels: np.ndarray) -> Dict[str, float]:
+    """Compute the statistics used for classification on an RGB sample."""
+    rgb = pixels.astype(np.int32)
+    total = float(rgb.shape[0] * rgb.shape[1])
+
+    spread = rgb.max(axis=2) - rgb.min(axis=2)
+    gray_fraction = np.count_nonzero(spread <= GRAY_TOLERANCE) / total
+
+    luma = (rgb[..., 0] * 299 + rgb[..., 1] * 587 + rgb[..., 2] * 114) // 1000
+    extreme = (luma <= BILEVEL_DARK) | (luma >= BILEVEL_LIGHT)
+    bilevel_fraction = np.count_nonzero(extreme) / total
+
+    packed = (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+    unique_colors = int(np.unique(packed).size)
+    if packed.shape[1] > 1:
+        run_fraction = np.count_nonzero(packed[:, 1:] == packed[:, :-1]) / float(packed[:, 1:].size)
+    else:
+        run_fraction = 0.0
+
+    return {
+        'gray_fraction': gray_fraction,
+        'bilevel_fraction': bilevel_fraction,
+        'unique_colors': unique_colors,
+        'run_fraction': run_fraction,
+    }
+
+
+def analyze_image(img: Image.Image) -> Dict[str, Any]:
+    """Analyse an image and add its class and gray-ness to the statistics."""
+    if img.mode == '1':
+        return {'image_class': BILEVEL, 'is_gray': True}
+    stats = analyze_pixels(sample_pixels(img))
+    is_gray = img.mode == 'L' or stats['gray_fraction'] >= GRAY_FRACTION
+    if is_gray and stats['bilevel_fraction'] >= BILEVEL_FRACTION:
+        image_class = BILEVEL
+    elif (stats['run_fraction'] >= FLAT_RUN_FRACTION
+          or (stats['unique_colors'] <= (FLAT_MAX_GRAY_LEVELS if is_gray else FLAT_MAX_COLORS)
+              and stats['run_fraction'] >= FLAT_MIN_RUN_FRACTION)):
+        image_class = FLAT
+    elif is_gray:
+        image_class = GRAYSCALE
+    else:
+        image_class = PHOTO
+    stats['image_class'] = image_class
+    stats['is_gray'] = is_gray
+    return stats
+
+
+def classify_image(img: Image.Image) -> str:
+    """Classify an image as photo, flat-color, grayscale or bilevel."""
+    return analyze_image(img)['image_class']
+
+
+def _leading(mask: np.ndarray) -> int:
+    """Number of leading ``True`` values."""
+    stops = np.flatnonzero(~mask)
+    return int(stops[0]) if stops.size else int(mask.size)
+
+
+def analyze_page(img: Image.Image, ink_delta: int = PAGE_INK_DELTA,
+                 blank_fraction: float = PAGE_BLANK_FRACTION,
+                 size: int = PAGE_SAMPLE_SIZE) -> Dict[str, Any]:
+    """Find scanner borders, the content box and whether a scanned page is blank.
+
+    Pixels further than ``ink_delta`` from the paper tone count as ink. Edge
+    rows/columns that are almost entirely ink are scanner borders; the page
+    is blank when less than ``blank_fraction`` of the area inside them is
+    ink. ``bbox`` is the content box in source pixel coordinates.
+    """
+    width, height = img.size
+    scale = min(1.0, size / float(max(width, height)))
+    # Sample first: converting the mode at full resolution would cost more than the whole analysis
+    sample = img if img.mode in RESIZABLE_MODES else img.convert('RGB')
+    sample = sample.resize((max(1, int(width * scale)), max(1, int(height * scale))),
+                           Image.Resampling.NEAREST).convert('L')
+    histogram = np.cumsum(sample.histogram())
+    paper = int(np.searchsorted(histogram, histogram[-1] * PAPER_PERCENTILE / 100.0))
+    ink_table = [1 if abs(level - paper) > ink_delta else 0 for level in range(256)]
+    ink = np.asarray(sample.point(ink_table), dtype=np.uint8)
+
+    rows = ink.sum(axis=1, dtype=np.int32) / float(ink.shape[1])
+    cols = ink.sum(axis=0, dtype=np.int32) / float(ink.shape[0])
+    border = rows > BORDER_FRACTION
+    top, bottom = _leading(border), rows.size - _leading(border[::-1])
+    border = cols > BORDER_FRACTION
+    left, right = _leading(border), cols.size - _leading(border[::-1])
+
+    full = (0, 0, width, height)
+    region = ink[top:bottom, left:right]
+    if region.size == 0:
+        return {'blank': True, 'ink_fraction': 0.0, 'bbox': full}
+    ink_fraction = float(region.sum(dtype=np.int64)) / region.size
+
+    lines = np.flatnonzero(region.sum(axis=1, dtype=np.int32) > LINE_INK_FRACTION * region.shape[1])
+    columns = np.flatnonzero(region.sum(axis=0, dtype=np.int32) > LINE_INK_FRACTION * region.shape[0])
+    if not lines.size or not columns.size:
+        return {'blank': bool(ink_fraction < blank_fraction), 'ink_fraction': ink_fraction, 'bbox': full}
+
+    scale_x = width / float(ink.shape[1])
+    scale_y = height / float(ink.shape[0])
+    pad_x = TRIM_PADDING * width
+    pad_y = TRIM_PADDING * height
+    bbox = (
+        max(0, int((left + columns[0]) * scale_x - pad_x)),
+        max(0, int((top + lines[0]) * scale_y - pad_y)),
+        min(width, int(np.ceil((left + columns[-1] + 1) * scale_x + pad_x))),
+        min(height, int(np.ceil((top + lines[-1] + 1) * scale_y + pad_y))),
+    )
+    return {'blank': bool(ink_fraction < blank_fraction), 'ink_fraction': ink_fraction, 'bbox': bbox}
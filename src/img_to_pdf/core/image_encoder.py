@@ -0,0 +1,210 @@
+"""Encode page images into PDF image streams with a content-aware codec."""
+
+import io
+import logging
+import struct
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from PIL import Image, features
+
+from .image_analysis import BILEVEL, FLAT, GRAYSCALE, IMAGE_CLASSES, PHOTO, analyze_image
+from .pdf_writer import PdfName
+
+logger = logging.getLogger(__name__)
+
+PNG_COMPRESS_LEVEL = 6
+_STRIP_OFFSETS, _STRIP_BYTE_COUNTS = 273, 279
+# Plain JPEG sizes for the savings report are estimated from a sample of about this many pixels
+BASELINE_SAMPLE_PIXELS = 1024 * 1024
+
+
+@dataclass
+class EncodedImage:
+    """An image stream ready to be embedded as a PDF image XObject."""
+
+    width: int
+    height: int
+    color_space: str            # 'DeviceRGB' or 'DeviceGray'
+    bits_per_component: int
+    filter: str                 # 'DCTDecode', 'FlateDecode' or 'CCITTFaxDecode'
+    data: bytes
+    decode_parms: Optional[Dict[str, Any]] = None
+    image_class: str = PHOTO
+    baseline_size: int = 0      # (Estimated) plain JPEG size, when codec stats were collected
+
+    def xobject_dict(self) -> Dict[str, Any]:
+        """Return the image XObject dictionary (without /Length)."""
+        filter_name = PdfName(self.filter)
+        return {
+            'Type': PdfName('XObject'),
+            'Subtype': PdfName('Image'),
+            'Width': self.width,
+            'Height': self.height,
+            'ColorSpace': PdfName(self.color_space),
+            'BitsPerComponent': self.bits_per_component,
+            'Filter': [filter_name] if self.filter == 'CCITTFaxDecode' else filter_name,
+            'DecodeParms': [self.decode_parms] if self.filter == 'CCITTFaxDecode' else self.decode_parms,
+        }
+
+
+@dataclass
+class CodecStats:
+    """Per-class page counts and byte savings against (estimated) plain JPEG encoding."""
+
+    counts: Dict[str, int] = field(default_factory=lambda: {c: 0 for c in IMAGE_CLASSES})
+    encoded_bytes: int = 0
+    baseline_bytes: int = 0
+    # Pages may be encoded on several worker threads
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, encoded: EncodedImage, baseline_size: int) -> None:
+        with self._lock:
+            self.counts[encoded.image_class] = self.counts.get(encoded.image_class, 0) + 1
+            self.encoded_bytes += len(encoded.data)
+            self.baseline_bytes += baseline_size
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.baseline_bytes - self.encoded_bytes
+
+    def summary(self) -> str:
+        counts = ", ".join(f"{name}: {count}" for name, count in self.counts.items())
+        saved_pct = 100.0 * self.saved_bytes / self.baseline_bytes if self.baseline_bytes else 0.0
+        return (f"{counts} | {self.encoded_bytes:,} bytes "
+                f"(JPEG would be about {self.baseline_bytes:,}, saved {saved_pct:.1f}%)")
+
+
+def _flatten_alpha(img: Image.Image) -> Image.Image:
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel('A'))
+        return background
+    if img.mode not in ('RGB', 'L', '1'):
+        return img.convert('RGB')
+    return img
+
+
+def encode_jpeg(img: Image.Image, quality: int) -> EncodedImage:
+    """JPEG (DCTDecode) in RGB or gray."""
+    if img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    buf = io.BytesIO()
+    img.save(buf, 'JPEG', quality=quality)
+    return EncodedImage(
+        width=img.width, height=img.height,
+        color_space='DeviceGray' if img.mode == 'L' else 'DeviceRGB',
+        bits_per_component=8, filter='DCTDecode', data=buf.getvalue(),
+    )
+
+
+def encode_flate(img: Image.Image) -> EncodedImage:
+    """Lossless Flate with PNG predictors.
+
+    PNG's IDAT payload is exactly a zlib stream of predictor-tagged rows, so
+    the PNG encoder output is reused instead of filtering rows in Python.
+    """
+    if img.mode not in ('RGB', 'L', '1'):
+        img = img.convert('RGB')
+    buf = io.BytesIO()
+    img.save(buf, 'PNG', compress_level=PNG_COMPRESS_LEVEL)
+    png = buf.getvalue()
+    idat = bytearray()
+    pos = 8
+    while pos < len(png):
+        length, chunk_type = struct.unpack('>I4s', png[pos:pos + 8])
+        if chunk_type == b'IDAT':
+            idat += png[pos + 8:pos + 8 + length]
+        pos += 12 + length
+    colors = 3 if img.mode == 'RGB' else 1
+    bits = 1 if img.mode == '1' else 8
+    return EncodedImage(
+        width=img.width, height=img.height,
+        color_space='DeviceRGB' if colors == 3 else 'DeviceGray',
+        bits_per_component=bits, filter='FlateDecode', data=bytes(idat),
+        decode_parms={'Predictor': 15, 'Colors': colors, 'BitsPerComponent': bits, 'Columns': img.width},
+    )
+
+
+def encode_bilevel(img: Image.Image) -> EncodedImage:
+    """1-bit image, CCITT Group 4 when libtiff is available, Flate otherwise."""
+    if img.mode != '1':
+        img = img.convert('L').convert('1', dither=Image.Dither.NONE)
+    if not features.check('libtiff'):
+        return encode_flate(img)
+    buf = io.BytesIO()
+    # A single strip holds the whole G4 stream; the IFD and tag data around it are left out
+    img.save(buf, 'TIFF', compression='group4', strip_size=((img.width + 7) // 8) * img.height)
+    buf.seek(0)
+    with Image.open(buf) as tiff:
+        offset = tiff.tag_v2[_STRIP_OFFSETS][0]
+        length = tiff.tag_v2[_STRIP_BYTE_COUNTS][0]
+    return EncodedImage(
+        width=img.width, height=img.height, color_space='DeviceGray',
+        bits_per_component=1, filter='CCITTFaxDecode', data=buf.getvalue()[offset:offset + length],
+        decode_parms={'K': -1, 'BlackIs1': True, 'Columns': img.width, 'Rows': img.height},
+    )
+
+
+def encode_image(img: Image.Image, quality: int, auto_codec: bool = True,
+                 stats: Optional[CodecStats] = None,
+                 analysis: Optional[Dict[str, Any]] = None) -> EncodedImage:
+    """Encode an image for PDF embedding.
+
+    With ``auto_codec`` the image is classified first: photos stay JPEG,
+    grayscale photos become gray JPEG, flat-color content (screenshots, line
+    art) uses lossless Flate and black-and-white scans become 1-bit. A
+    precomputed ``analysis`` (see :func:`analyze_image`) skips classification,
+    so all strips of a tiled image share one codec.
+    """
+    img = _flatten_alpha(img)
+    if not auto_codec:
+        encoded = encode_jpeg(img, quality)
+        if stats is not None:
+            encoded.baseline_size = len(encoded.data)
+            stats.record(encoded, len(encoded.data))
+        return encoded
+
+    if analysis is None:
+        analysis = analyze_image(img)
+    image_class = analysis['image_class']
+    if image_class == BILEVEL:
+        encoded = encode_bilevel(img)
+    elif image_class == FLAT:
+        encoded = encode_flate(img.convert('L') if analysis['is_gray'] else img)
+    elif image_class == GRAYSCALE:
+        encoded = encode_jpeg(img.convert('L'), quality)
+    else:
+        encoded = encode_jpeg(img, quality)
+    encoded.image_class = image_class
+
+    if stats is not None:
+        if image_class == PHOTO:
+            baseline_size = len(encoded.data)
+        else:
+            baseline_size = estimate_jpeg_size(img, quality)
+        encoded.baseline_size = baseline_size
+        stats.record(encoded, baseline_size)
+    return encoded
+
+
+def estimate_jpeg_size(img: Image.Image, quality: int) -> int:
+    """Approximate size of ``img`` as a plain JPEG, from evenly spaced full-width bands.
+
+    Only used for the savings report, so the page is not encoded a second
+    time at full size. Bands keep the native resolution, which downscaling
+    would not (text would look denser than it is).
+    """
+    total = img.width * img.height
+    if total <= 2 * BASELINE_SAMPLE_PIXELS:
+        return len(encode_jpeg(img, quality).data)
+    bands = 8
+    band_height = max(16, BASELINE_SAMPLE_PIXELS // (img.width * bands) // 16 * 16)
+    step = img.height // bands
+    sample = Image.new(img.mode, (img.width, band_height * bands))
+    for i in range(bands):
+        top = i * step + (step - band_height) // 2
+        sample.paste(img.crop((0, top, img.width, top + band_height)), (0, i * band_height))
+    return len(encode_jpeg(sample, quality).data) * total // (sample.width * sample.height)
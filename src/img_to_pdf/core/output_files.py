@@ -0,0 +1,71 @@
+"""Output file naming and atomic placement.
+
+Outputs are written under a temporary name in their destination folder and
+renamed into place once complete, so readers never see a half-written file
+and an interrupted run leaves no truncated PDF behind. Temporary files the
+app rendered itself (e.g. PDFs rendered from HTML) are moved into place;
+the user's own input files are always copied, never moved or linked, so an
+output never shares its data with a source.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+from typing import Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+PARTIAL_SUFFIX = '.part'
+
+
+def unique_output_paths(sources: Iterable[str], folder: str, ext: str = '.pdf') -> Dict[str, str]:
+    """Map each source path to an output path in ``folder`` named after it.
+
+    Sources sharing a base name (e.g. ``a/scan.png`` and ``b/scan.jpg``) get
+    ``scan.pdf``, ``scan (2).pdf``, ... in input order instead of
+    overwriting each other.
+    """
+    taken = set()
+    paths = {}
+    for source in sources:
+        stem = os.path.splitext(os.path.basename(source))[0]
+        name = f"{stem}{ext}"
+        n = 1
+        while name.lower() in taken:
+            n += 1
+            name = f"{stem} ({n}){ext}"
+        taken.add(name.lower())
+        paths[source] = os.path.join(folder, name)
+    return paths
+
+
+def partial_path(final_path: str) -> str:
+    """Create an empty, uniquely named temporary file next to ``final_path``."""
+    folder, name = os.path.split(final_path)
+    fd, path = tempfile.mkstemp(prefix=f".{name}.", suffix=PARTIAL_SUFFIX, dir=folder or '.')
+    os.close(fd)
+    return path
+
+
+def move_into_place(source: str, final_path: str) -> None:
+    """Atomically rename ``source`` to ``final_path``; copy only across filesystems."""
+    try:
+        os.replace(source, final_path)
+    except OSError:
+        shutil.move(source, final_path)
+
+
+def copy_into_place(source: str, final_path: str) -> None:
+    """Give ``final_path`` a copy of ``source``, leaving ``source`` untouched.
+
+    The copy is written under a temporary name and renamed over
+    ``final_path``, so a failed copy never replaces an existing output.
+    """
+    temp_path = partial_path(final_path)
+    try:
+        shutil.copyfile(source, temp_path)
+        os.replace(temp_path, final_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
@@ -0,0 +1,191 @@
+"""Persistent cache of encoded image pages.
+
+Encoded page streams are stored on disk keyed by the source file (path,
+size and mtime, or a content hash) together with every setting that affects
+the encoding. Re-running a job only decodes and encodes inputs that changed;
+cached pages are read back and spliced into the output as they are.
+Entries are evicted least recently used first to stay under a disk budget
+(see :mod:`.disk_cache`).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import struct
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from .disk_cache import DiskCache
+from .image_encoder import CodecStats, EncodedImage
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+ENTRY_SUFFIX = '.page'
+HASH_CHUNK = 1024 * 1024
+
+PAGE_IMAGE = 'image'
+PAGE_STRIPS = 'strips'
+PAGE_BLANK = 'blank'
+
+_RECORD = struct.Struct('>II')    # header length, data length
+
+
+@dataclass
+class EncodedPage:
+    """An encoded page: one image, or horizontal strips streamed in order."""
+
+    size: Tuple[int, int]
+    images: Iterable[EncodedImage]
+    strips: bool = False
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    evicted: int = 0
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        pct = 100.0 * self.hits / total if total else 0.0
+        return (f"{self.hits} of {total} pages from cache ({pct:.0f}%), "
+                f"{self.bytes_read:,} bytes reused, {self.bytes_written:,} bytes stored, "
+                f"{self.evicted} entries evicted")
+
+
+def _write_record(fp, header: Dict[str, Any], data: bytes = b'') -> None:
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    fp.write(_RECORD.pack(len(header_bytes), len(data)) + header_bytes + data)
+
+
+def _read_record(fp) -> Optional[Tuple[Dict[str, Any], bytes]]:
+    prefix = fp.read(_RECORD.size)
+    if len(prefix) < _RECORD.size:
+        return None
+    header_len, data_len = _RECORD.unpack(prefix)
+    header = json.loads(fp.read(header_len).decode('utf-8'))
+    return header, fp.read(data_len)
+
+
+class PageCache:
+    """LRU page cache in ``directory`` limited to ``budget_bytes``.
+
+    ``hash_content`` keys sources by a SHA-256 of their bytes instead of
+    path, size and modification time.
+    """
+
+    def __init__(self, directory: str, budget_bytes: int, hash_content: bool = False):
+        self.hash_content = hash_content
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._store = DiskCache(directory, budget_bytes, ENTRY_SUFFIX)
+
+    def _source_id(self, path: str):
+        if self.hash_content:
+            digest = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+                    digest.update(chunk)
+            return digest.hexdigest()
+        stat = os.stat(path)
+        return [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+
+    def key(self, path: str, settings: Dict[str, Any]) -> str:
+        """Cache key for ``path`` encoded with ``settings``."""
+        material = json.dumps([CACHE_VERSION, self._source_id(path), settings], sort_keys=True)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def lookup(self, key: str, codec_stats: Optional[CodecStats] = None) -> Tuple[bool, Optional[EncodedPage]]:
+        """Return ``(found, page)``; ``page`` is ``None`` for a cached blank page.
+
+        Images read from the cache are counted in ``codec_stats`` as if they
+        had just been encoded.
+        """
+        size = self._store.touch(key)
+        fp = None
+        if size is not None:
+            try:
+                # Held open while the page is read, so an eviction by another
+                # worker cannot pull the file away half way through
+                fp = open(self._store.path(key), 'rb')
+                header, _ = _read_record(fp)
+            except (OSError, ValueError, TypeError):
+                if fp is not None:
+                    fp.close()
+                fp = None
+        with self._lock:
+            if fp is None:
+                self.stats.misses += 1
+                return False, None
+            self.stats.hits += 1
+            self.stats.bytes_read += size
+        if header['kind'] == PAGE_BLANK:
+            fp.close()
+            return True, None
+        strips = header['kind'] == PAGE_STRIPS
+        images = self._read_images(fp, codec_stats)
+        return True, EncodedPage(tuple(header['size']), images if strips else list(images), strips)
+
+    def _read_images(self, fp, codec_stats: Optional[CodecStats]) -> Iterator[EncodedImage]:
+        with fp:
+            while True:
+                record = _read_record(fp)
+                if record is None:
+                    return
+                header, data = record
+                image = EncodedImage(data=data, **header)
+                if codec_stats is not None:
+                    codec_stats.record(image, image.baseline_size or len(data))
+                yield image
+
+    def store_blank(self, key: str) -> None:
+        if not self._store.available:
+            return
+        for _ in self._store_page(key, PAGE_BLANK, (0, 0), ()):
+            pass
+
+    def store(self, key: str, page: EncodedPage) -> EncodedPage:
+        """Cache ``page`` and return it for writing.
+
+        Strip pages are written to the cache as their strips are consumed, so
+        tiled images stay streamed; the entry only becomes visible once every
+        strip has passed through, so an interrupted page is never cached
+        half-written. Single images are stored right away. Pages pass
+        through uncached if the cache directory is unavailable.
+        """
+        if not self._store.available:
+            return page
+        if not page.strips:
+            return EncodedPage(page.size, list(self._store_page(key, PAGE_IMAGE, page.size, page.images)))
+        return EncodedPage(page.size, self._store_page(key, PAGE_STRIPS, page.size, page.images), True)
+
+    def _store_page(self, key: str, kind: str, size, images: Iterable[EncodedImage]) -> Iterator[EncodedImage]:
+        temp_path = self._store.temp_path(key)
+        try:
+            with open(temp_path, 'wb') as fp:
+                _write_record(fp, {'kind': kind, 'size': list(size)})
+                for image in images:
+                    header = {
+                        'width': image.width, 'height': image.height,
+                        'color_space': image.color_space,
+                        'bits_per_component': image.bits_per_component,
+                        'filter': image.filter, 'decode_parms': image.decode_parms,
+                        'image_class': image.image_class, 'baseline_size': image.baseline_size,
+                    }
+                    _write_record(fp, header, image.data)
+                    yield image
+            written = self._store.commit(key, temp_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+        with self._lock:
+            self.stats.bytes_written += written
+            self.stats.evicted = self._store.evicted
+
+    def clear(self) -> None:
+        self._store.clear()
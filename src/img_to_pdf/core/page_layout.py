@@ -0,0 +1,74 @@
+"""Page layout: physical page size and image placement for image pages.
+
+The page size is set through the image placement matrix, so images keep their
+native pixels and are only resampled when they exceed ``max_dpi`` on the page.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+POINTS_PER_INCH = 72.0
+POINTS_PER_MM = POINTS_PER_INCH / 25.4
+
+# Portrait (width, height) in points
+PAGE_SIZES = {
+    'a4': (595.28, 841.89),
+    'letter': (612.0, 792.0),
+}
+PAGE_FIT = 'fit'
+
+
+@dataclass
+class PageLayout:
+    """How an image is placed on its page.
+
+    ``page_size`` is a key of :data:`PAGE_SIZES` or ``'fit'`` (page matches the
+    image, one pixel per point). ``max_dpi`` of 0 disables downsampling.
+    """
+
+    page_size: str = PAGE_FIT
+    portrait: bool = True
+    margin_mm: float = 0.0
+    max_dpi: int = 0
+
+    def page_dimensions(self, width: int, height: int) -> Tuple[float, float]:
+        """Page size in points for an image of ``width`` x ``height`` pixels."""
+        if self.page_size not in PAGE_SIZES:
+            margin = self.margin_mm * POINTS_PER_MM
+            return width + 2 * margin, height + 2 * margin
+        short, long = PAGE_SIZES[self.page_size]
+        return (short, long) if self.portrait else (long, short)
+
+    def placement(self, width: int, height: int) -> Tuple[float, float, Tuple[float, ...]]:
+        """Return ``(page_width, page_height, matrix)`` for an image.
+
+        ``matrix`` is the ``cm`` operand that maps the unit image square to
+        its box on the page, scaled to fit inside the margins and centered.
+        """
+        page_w, page_h = self.page_dimensions(width, height)
+        margin = self.margin_mm * POINTS_PER_MM
+        box_w = max(1.0, page_w - 2 * margin)
+        box_h = max(1.0, page_h - 2 * margin)
+        scale = min(box_w / width, box_h / height)
+        draw_w, draw_h = width * scale, height * scale
+        x = (page_w - draw_w) / 2.0
+        y = (page_h - draw_h) / 2.0
+        return page_w, page_h, (draw_w, 0, 0, draw_h, x, y)
+
+    def effective_dpi(self, width: int, height: int) -> float:
+        """Resolution the image will have once placed on the page."""
+        _, _, matrix = self.placement(width, height)
+        return width / (matrix[0] / POINTS_PER_INCH)
+
+    def target_size(self, width: int, height: int) -> Optional[Tuple[int, int]]:
+        """Downsampled pixel size, or ``None`` when no resampling is needed."""
+        if not self.max_dpi or self.page_size not in PAGE_SIZES:
+            return None
+        dpi = self.effective_dpi(width, height)
+        if dpi <= self.max_dpi:
+            return None
+        factor = self.max_dpi / dpi
+        return max(1, round(width * factor)), max(1, round(height * factor))
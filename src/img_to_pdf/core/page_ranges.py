@@ -0,0 +1,33 @@
+"""Page range selection for PDF inputs, e.g. ``"1-3, 7, 10-"``."""
+
+import logging
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def parse_page_range(spec: Optional[str], page_count: int) -> List[int]:
+    """Return the 0-based page indices selected by ``spec``.
+
+    ``spec`` is a comma-separated list of 1-based pages and inclusive ranges;
+    a range without a start or end runs from the first or to the last page.
+    Pages past the end of the document are ignored. An empty spec selects
+    every page. Raises ``ValueError`` for malformed input.
+    """
+    if spec is None or not spec.strip():
+        return list(range(page_count))
+    indices = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start_text, end_text = (p.strip() for p in part.split('-', 1))
+            start = int(start_text) if start_text else 1
+            end = int(end_text) if end_text else page_count
+        else:
+            start = end = int(part)
+        if start < 1 or end < start:
+            raise ValueError(f"Invalid page range: {part}")
+        indices.extend(range(start - 1, min(end, page_count)))
+    return indices
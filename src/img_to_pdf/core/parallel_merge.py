@@ -0,0 +1,200 @@
+"""Hierarchical parallel merge of many PDFs into one file.
+
+The ordered inputs are split into chunks and each chunk is copied by a worker
+process into a body fragment: its objects and an intermediate page tree
+node, but no cross-reference table. The fragments are stitched into the
+final file in input order; only their object and dictionary lines are
+renumbered, stream data is copied as is, so nothing is parsed a second time.
+The stitcher then writes the root page tree node, the bookmarks collected
+from every chunk and the catalog.
+"""
+
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from pypdf import PdfReader
+
+from .executors import lower_process_priority
+from .pdf_writer import ImagePdfDocument, PdfName, PdfObjectWriter, PdfRef, write_outline
+
+logger = logging.getLogger(__name__)
+
+ROOT_PAGES_NUM = 1              # Same number in every fragment and in the final file
+FIRST_FRAGMENT_NUM = 2
+CANCEL_POLL_SECONDS = 0.2
+
+
+class MergeCancelled(Exception):
+    """The merge was cancelled; no output was written."""
+
+
+@dataclass
+class MergeInput:
+    """One PDF to merge: its path and the 0-based pages to take (all if ``None``)."""
+
+    path: str
+    pages: Optional[List[int]] = None
+
+
+@dataclass
+class ChunkResult:
+    """What the stitcher needs from a chunk fragment."""
+
+    index: int
+    path: str
+    pages: int
+    pages_ref: PdfRef
+    offsets: Dict[int, Tuple[int, int]]
+    next_num: int
+    outline: list = field(default_factory=list)
+
+
+@dataclass
+class MergeReport:
+    """Pages merged, how they were chunked and the resulting throughput."""
+
+    inputs: int = 0
+    pages: int = 0
+    chunks: int = 0
+    chunk_size: int = 0
+    workers: int = 0
+    output_bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        mb_per_second = self.output_bytes / 1048576.0 / self.seconds if self.seconds else 0.0
+        return (f"{self.pages:,} pages from {self.inputs:,} files in {self.chunks} chunk(s) "
+                f"on {self.workers} process(es): {self.seconds:.2f}s "
+                f"({self.pages_per_second:,.0f} pages/s, {mb_per_second:.1f} MB/s)")
+
+
+def _shift_outline(items: list, delta: int) -> list:
+    """Renumber the page references in outline destinations by ``delta``."""
+    return [(title,
+             None if dest is None else [PdfRef(dest[0].num + delta)] + dest[1:],
+             _shift_outline(children, delta))
+            for title, dest, children in items]
+
+
+def _merge_chunk(index: int, inputs: List[MergeInput], path: str) -> ChunkResult:
+    """Copy the pages of ``inputs`` into a fragment at ``path`` (runs in a worker process)."""
+    with open(path, 'wb') as fp:
+        writer = PdfObjectWriter.for_fragment(fp, FIRST_FRAGMENT_NUM)
+        document = ImagePdfDocument(writer=writer)
+        for item in inputs:
+            document.add_pdf_pages(PdfReader(item.path), item.pages, outline=True)
+        writer.write_object(document.pages_ref, {
+            'Type': PdfName('Pages'),
+            'Parent': PdfRef(ROOT_PAGES_NUM),
+            'Kids': document.page_refs,
+            'Count': len(document.page_refs),
+        })
+    return ChunkResult(index, path, len(document.page_refs), document.pages_ref,
+                       writer.offsets, writer.next_num, document.outline)
+
+
+class ParallelMerger:
+    """Merges PDFs in chunks of ``chunk_size`` inputs on ``workers`` processes.
+
+    ``workers`` of 0 uses one process per CPU core. With a single chunk, or a
+    single worker, the inputs are copied serially in this process instead.
+    Setting ``cancel_event`` stops the merge between chunks. Worker processes
+    run at below-normal OS priority unless ``low_priority`` is false.
+    """
+
+    def __init__(self, chunk_size: int = 200, workers: int = 0,
+                 cancel_event: Optional[threading.Event] = None, low_priority: bool = True):
+        self.chunk_size = max(1, chunk_size)
+        self.workers = workers or os.cpu_count() or 1
+        self.cancel_event = cancel_event
+        self.low_priority = low_priority
+
+    def _cancelled(self) -> bool:
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+    def merge(self, inputs: List[MergeInput], output_path: str) -> MergeReport:
+        """Merge ``inputs`` in order into ``output_path`` and report throughput."""
+        started = time.perf_counter()
+        chunks = [inputs[i:i + self.chunk_size] for i in range(0, len(inputs), self.chunk_size)]
+        report = MergeReport(inputs=len(inputs), chunks=len(chunks), chunk_size=self.chunk_size)
+        if len(chunks) <= 1 or self.workers <= 1:
+            report.chunks, report.workers = 1, 1
+            report.pages = self._merge_serial(inputs, output_path)
+        else:
+            report.workers = min(self.workers, len(chunks))
+            report.pages = self._merge_chunks(chunks, output_path, report.workers)
+        report.output_bytes = os.path.getsize(output_path)
+        report.seconds = time.perf_counter() - started
+        logger.info(f"Merged {report.summary()}")
+        return report
+
+    def _merge_serial(self, inputs: List[MergeInput], output_path: str) -> int:
+        with open(output_path, 'wb') as fp:
+            document = ImagePdfDocument(fp)
+            for item in inputs:
+                if self._cancelled():
+                    raise MergeCancelled()
+                document.add_pdf_pages(PdfReader(item.path), item.pages, outline=True)
+            document.close()
+        return len(document.page_refs)
+
+    def _merge_chunks(self, chunks: List[List[MergeInput]], output_path: str, workers: int) -> int:
+        workdir = tempfile.mkdtemp(prefix='merge_', dir=os.path.dirname(os.path.abspath(output_path)))
+        results: Dict[int, ChunkResult] = {}
+        try:
+            initializer = lower_process_priority if self.low_priority else None
+            with ProcessPoolExecutor(max_workers=workers, initializer=initializer) as pool:
+                pending = set()
+                for index, chunk in enumerate(chunks):
+                    pending.add(pool.submit(_merge_chunk, index, chunk,
+                                            os.path.join(workdir, f"chunk_{index:05d}.part")))
+                while pending:
+                    if self._cancelled():
+                        for future in pending:
+                            future.cancel()
+                        raise MergeCancelled()
+                    done, pending = wait(pending, timeout=CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        result = future.result()
+                        results[result.index] = result
+            return self._stitch([results[i] for i in range(len(chunks))], output_path)
+        finally:
+            for name in os.listdir(workdir):
+                os.unlink(os.path.join(workdir, name))
+            os.rmdir(workdir)
+
+    def _stitch(self, results: List[ChunkResult], output_path: str) -> int:
+        """Concatenate chunk fragments in order and write the document tail."""
+        with open(output_path, 'wb') as fp:
+            writer = PdfObjectWriter(fp)
+            root_ref = writer.alloc()
+            if root_ref.num != ROOT_PAGES_NUM:
+                raise RuntimeError(f"stitched page tree must be object {ROOT_PAGES_NUM}, got {root_ref.num}")
+            kids = []
+            outline = []
+            for result in results:
+                with open(result.path, 'rb') as fragment:
+                    delta = writer.splice(fragment, result.offsets, FIRST_FRAGMENT_NUM, result.next_num)
+                kids.append(PdfRef(result.pages_ref.num + delta))
+                outline.extend(_shift_outline(result.outline, delta))
+            pages = sum(result.pages for result in results)
+            writer.write_object(root_ref, {
+                'Type': PdfName('Pages'),
+                'Kids': kids,
+                'Count': pages,
+            })
+            catalog = {'Type': PdfName('Catalog'), 'Pages': root_ref}
+            if outline:
+                catalog['Outlines'] = write_outline(writer, outline, writer.alloc())
+            writer.close(writer.write_object(writer.alloc(), catalog))
+        return pages
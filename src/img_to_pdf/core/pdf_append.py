@@ -0,0 +1,115 @@
+"""Append pages to an existing PDF through an incremental update.
+
+New objects, a new cross-reference section and an updated page tree root are
+written after the end of the file; existing bytes are never rewritten, so the
+cost is proportional to the pages added, not to the size of the file.
+"""
+
+import logging
+import os
+import re
+from typing import Tuple
+
+from pypdf import PdfReader
+
+from .pdf_copier import same_ref, to_writer_value
+from .pdf_writer import ImagePdfDocument, PdfName, PdfObjectWriter, PdfRef
+
+logger = logging.getLogger(__name__)
+
+_STARTXREF = re.compile(rb'startxref\s+(\d+)')
+
+
+def _last_xref(fp, file_size: int) -> Tuple[int, bool]:
+    """Return the offset of the last cross-reference section and whether it is a stream."""
+    fp.seek(max(0, file_size - 2048))
+    matches = _STARTXREF.findall(fp.read())
+    if not matches:
+        raise ValueError("startxref not found; the PDF is damaged")
+    offset = int(matches[-1])
+    fp.seek(offset)
+    return offset, not fp.read(4).startswith(b'xref')
+
+
+class PdfAppender:
+    """Adds pages to the end of an existing PDF.
+
+    Pages are added through :attr:`document` (an :class:`ImagePdfDocument`)
+    and grouped under a new page tree node that is attached to the existing
+    root on :meth:`close`.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._source = open(path, 'rb')
+        try:
+            self.reader = PdfReader(self._source)
+            if self.reader.is_encrypted:
+                raise ValueError(f"{path} is encrypted and cannot be appended to")
+            self.original_size = os.path.getsize(path)
+            prev_xref, xref_stream = _last_xref(self._source, self.original_size)
+            self._source.seek(self.original_size - 1)
+            needs_newline = self._source.read(1) not in (b'\n', b'\r')
+        except Exception:
+            self._source.close()
+            raise
+        self._fp = open(path, 'ab')
+        size = self.original_size
+        if needs_newline:
+            self._fp.write(b'\n')
+            size += 1
+        writer = PdfObjectWriter.for_update(self._fp, size, int(self.reader.trailer['/Size']),
+                                            prev_xref, xref_stream)
+        self.document = ImagePdfDocument(writer=writer)
+
+    @property
+    def pages_added(self) -> int:
+        return len(self.document.page_refs)
+
+    def close(self) -> None:
+        """Attach the new pages to the page tree and write the update's xref."""
+        try:
+            if not self.pages_added:
+                self.abort()
+                return
+            trailer = self.reader.trailer
+            root_ref = trailer.raw_get('/Root')
+            catalog = root_ref.get_object()
+            pages_ref = catalog.raw_get('/Pages')
+            pages = to_writer_value(pages_ref.get_object(), same_ref)
+            tree_root = PdfRef(pages_ref.idnum, pages_ref.generation)
+
+            writer = self.document.writer
+            writer.write_object(self.document.pages_ref, {
+                'Type': PdfName('Pages'),
+                'Parent': tree_root,
+                'Kids': self.document.page_refs,
+                'Count': self.pages_added,
+            })
+            pages['Kids'] = list(pages.get('Kids', [])) + [self.document.pages_ref]
+            pages['Count'] = pages.get('Count', 0) + self.pages_added
+            writer.write_object(tree_root, pages)
+
+            info = trailer.raw_get('/Info') if '/Info' in trailer else None
+            extra = {'ID': to_writer_value(trailer['/ID'], same_ref)} if '/ID' in trailer else None
+            writer.close(PdfRef(root_ref.idnum, root_ref.generation),
+                         same_ref(info) if info is not None else None, extra)
+        except Exception:
+            self.abort()
+            raise
+        finally:
+            self._close_files()
+        logger.info(f"Appended {self.pages_added} pages to {self.path}")
+
+    def abort(self) -> None:
+        """Drop everything written so far, leaving the original file as it was."""
+        if not self._fp.closed:
+            self._fp.flush()
+            self._fp.truncate(self.original_size)
+        self._close_files()
+
+    def _close_files(self) -> None:
+        if not self._fp.closed:
+            self._fp.close()
+        if not self._source.closed:
+            self._source.close()
@@ -0,0 +1,292 @@
+"""Copy objects from an existing PDF into a :class:`PdfObjectWriter`.
+
+Objects are read lazily through pypdf and written out as soon as they have
+been converted, so copying does not hold the source document in memory.
+Stream data is copied in its encoded form unless recompression is requested.
+"""
+
+import hashlib
+import logging
+import re
+import zlib
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Set, Tuple
+
+from pypdf import PdfReader
+from pypdf.generic import (
+    ArrayObject, BooleanObject, ByteStringObject, DictionaryObject, FloatObject,
+    IndirectObject, NameObject, NullObject, NumberObject, StreamObject, TextStringObject,
+)
+
+from .pdf_writer import PdfName, PdfObjectWriter, PdfRef, serialize
+
+logger = logging.getLogger(__name__)
+
+# Keys that point "sideways" or "up" in the object graph. Their targets are
+# copied later from a queue, which keeps recursion shallow on long outline
+# chains and breaks the Page <-> Parent cycles.
+LINK_KEYS = {'/Parent', '/P', '/Prev', '/Next', '/First', '/Last', '/Dest', '/D', '/Popup', '/IRT'}
+
+# Page keys dropped when a page is moved into another document's page tree
+DETACHED_PAGE_KEYS = {'/Parent', '/StructParents', '/B'}
+
+RESOURCE_CATEGORIES = ('/XObject', '/Font', '/ExtGState', '/Pattern', '/Shading', '/ColorSpace', '/Properties')
+
+CACHE_RELEASE_INTERVAL = 256   # Objects copied between clearing pypdf's cache
+
+_NAME_TOKEN = re.compile(rb'/([^\s/\[\]<>(){}%]+)')
+
+
+def raw_stream_data(stream: StreamObject) -> bytes:
+    """The stream's data as stored in the file, still encoded.
+
+    pypdf only exposes decoded data publicly, so this reads its internal
+    attribute; the pypdf versions it is known to work with are pinned in
+    requirements.txt.
+    """
+    try:
+        return stream._data
+    except AttributeError:
+        raise RuntimeError("this pypdf version does not expose encoded stream data") from None
+
+
+def release_object_cache(reader: PdfReader) -> None:
+    """Let pypdf forget objects it has parsed (pypdf internals, see :func:`raw_stream_data`)."""
+    cache = getattr(reader, 'resolved_objects', None)
+    if cache is not None:
+        cache.clear()
+
+
+def unlock(reader: PdfReader) -> bool:
+    """Open an encrypted ``reader`` with the empty user password; ``False`` if it needs a real one.
+
+    PDFs that only have an owner password (printing or copying restrictions)
+    open this way. Objects are decrypted as pypdf reads them, so pages copied
+    from an unlocked reader are written out unencrypted.
+    """
+    if not reader.is_encrypted:
+        return True
+    from pypdf import PasswordType
+
+    return reader.decrypt('') != PasswordType.NOT_DECRYPTED
+
+
+def to_writer_value(obj: Any, map_ref: Callable[[IndirectObject, Optional[str]], PdfRef],
+                    key: Optional[str] = None) -> Any:
+    """Convert a pypdf value to the writer's representation.
+
+    ``map_ref`` turns each indirect reference into a :class:`PdfRef`; it gets
+    the dictionary key the reference was found under.
+    """
+    if isinstance(obj, IndirectObject):
+        return map_ref(obj, key)
+    if isinstance(obj, DictionaryObject):
+        if isinstance(obj, StreamObject):
+            raise ValueError("Direct stream objects are not allowed")
+        return {str(k)[1:]: to_writer_value(v, map_ref, str(k)) for k, v in obj.items()}
+    if isinstance(obj, ArrayObject):
+        return [to_writer_value(v, map_ref, key) for v in obj]
+    if isinstance(obj, NameObject):
+        return PdfName(str(obj)[1:])
+    if isinstance(obj, BooleanObject):
+        return bool(obj)
+    if isinstance(obj, NullObject):
+        return None
+    if isinstance(obj, NumberObject):
+        return int(obj)
+    if isinstance(obj, FloatObject):
+        return float(obj)
+    if isinstance(obj, TextStringObject):
+        return obj.get_original_bytes()
+    if isinstance(obj, ByteStringObject):
+        return bytes(obj)
+    if isinstance(obj, (int, float, str, bytes)):
+        return obj
+    raise TypeError(f"Unsupported PDF object {type(obj).__name__}")
+
+
+def same_ref(obj: IndirectObject, key: Optional[str] = None) -> PdfRef:
+    """``map_ref`` for values rewritten inside their own file."""
+    return PdfRef(obj.idnum, obj.generation)
+
+
+class PdfObjectCopier:
+    """Copies objects reachable from a pypdf reader into a writer.
+
+    ``dedupe`` writes identical objects only once, ``recompress`` re-deflates
+    uncompressed and plain Flate streams at the highest level, and
+    ``prune_resources`` drops page resources the content never uses.
+    """
+
+    def __init__(self, reader: PdfReader, writer: PdfObjectWriter, dedupe: bool = False,
+                 recompress: bool = False, prune_resources: bool = False,
+                 digests: Optional[Dict[bytes, PdfRef]] = None):
+        self.reader = reader
+        self.writer = writer
+        self.dedupe = dedupe
+        self.recompress = recompress
+        self.prune_resources = prune_resources
+        self.refs: Dict[Tuple[int, int], PdfRef] = {}
+        self.done: Set[Tuple[int, int]] = set()
+        self.fixed: Set[Tuple[int, int]] = set()
+        self.in_progress: Set[Tuple[int, int]] = set()
+        self.queue: Deque[Tuple[Tuple[int, int], IndirectObject]] = deque()
+        # Digest table can be shared between copiers writing into one file
+        self.digests: Dict[bytes, PdfRef] = digests if digests is not None else {}
+        self.objects_deduplicated = 0
+        self.objects_copied = 0
+
+    def copy_ref(self, indirect: IndirectObject, link: bool = False) -> PdfRef:
+        """Copy the object behind ``indirect`` and return its new reference."""
+        key = (indirect.idnum, indirect.generation)
+        if key in self.done or key in self.in_progress:
+            if key not in self.done:
+                self.fixed.add(key)
+            return self.refs[key]
+        if key in self.refs:
+            # Queued through a link key; it will be written under this number
+            return self.refs[key]
+        if link:
+            ref = self.refs[key] = self.writer.alloc()
+            self.fixed.add(key)
+            self.queue.append((key, indirect))
+            return ref
+        return self._copy(key, indirect)
+
+    def copy_page(self, page: DictionaryObject, parent: PdfRef) -> PdfRef:
+        """Copy a page object so that it hangs below ``parent``.
+
+        Inherited attributes have already been pushed down to the page by
+        pypdf, so the source page tree itself is never copied.
+        """
+        indirect = page.indirect_reference
+        key = (indirect.idnum, indirect.generation)
+        ref = self.writer.alloc()
+        if key not in self.refs:
+            # Annotations pointing back at the page (/P) resolve to the copy
+            self.refs[key] = ref
+            self.in_progress.add(key)
+        try:
+            if self.prune_resources:
+                page = self._pruned_page(page)
+            value = {str(k)[1:]: self.convert(v, str(k)) for k, v in page.items()
+                     if k not in DETACHED_PAGE_KEYS}
+        finally:
+            self.in_progress.discard(key)
+        value['Parent'] = parent
+        self.writer.write_object(ref, value)
+        self.done.add(key)
+        return ref
+
+    def drain(self) -> None:
+        """Copy every object queued through a link key."""
+        while self.queue:
+            key, indirect = self.queue.popleft()
+            if key not in self.done and key not in self.in_progress:
+                self._copy(key, indirect)
+
+    def _copy(self, key: Tuple[int, int], indirect: IndirectObject) -> PdfRef:
+        ref = self.refs.get(key)
+        if ref is None:
+            ref = self.refs[key] = self.writer.alloc()
+        self.in_progress.add(key)
+        is_page = False
+        try:
+            obj = indirect.get_object()
+            if isinstance(obj, StreamObject):
+                dictionary, data = self._convert_stream(obj)
+                body = None
+            else:
+                is_page = isinstance(obj, DictionaryObject) and obj.get('/Type') == '/Page'
+                if self.prune_resources and is_page:
+                    obj = self._pruned_page(obj)
+                body = serialize(self.convert(obj))
+        finally:
+            self.in_progress.discard(key)
+
+        # A page may appear only once in the page tree, even if identical to another
+        if self.dedupe and key not in self.fixed and not is_page:
+            if body is None:
+                digest = hashlib.sha256(b'S' + serialize(dictionary) + b'\0' + data).digest()
+            else:
+                digest = hashlib.sha256(b'O' + body).digest()
+            existing = self.digests.get(digest)
+            if existing is not None:
+                self.refs[key] = existing
+                self.done.add(key)
+                self.objects_deduplicated += 1
+                return existing
+            self.digests[digest] = ref
+
+        if body is None:
+            self.writer.write_stream(ref, dictionary, data)
+        else:
+            self.writer.write_raw_object(ref, body)
+        self.done.add(key)
+        self.objects_copied += 1
+        if self.objects_copied % CACHE_RELEASE_INTERVAL == 0:
+            # Copied objects are not needed again; let pypdf forget them
+            release_object_cache(self.reader)
+        return ref
+
+    def convert(self, obj: Any, key: Optional[str] = None) -> Any:
+        """Convert a pypdf value, copying the objects it references."""
+        return to_writer_value(obj, lambda ref, k: self.copy_ref(ref, link=k in LINK_KEYS), key)
+
+    def _convert_stream(self, stream: StreamObject) -> Tuple[Dict[str, Any], bytes]:
+        dictionary = {str(k)[1:]: self.convert(v, str(k)) for k, v in stream.items() if k != '/Length'}
+        data = raw_stream_data(stream)
+        if self.recompress:
+            data = self._recompress(dictionary, stream, data)
+        return dictionary, data
+
+    def _recompress(self, dictionary: Dict[str, Any], stream: StreamObject, data: bytes) -> bytes:
+        filters = stream.get('/Filter')
+        if filters is None:
+            if len(data) < 64:
+                return data
+            packed = zlib.compress(data, 9)
+            if len(packed) < len(data):
+                dictionary['Filter'] = PdfName('FlateDecode')
+                return packed
+            return data
+        if isinstance(filters, ArrayObject):
+            if len(filters) != 1:
+                return data
+            filters = filters[0]
+        if filters != '/FlateDecode' or stream.get('/DecodeParms') is not None:
+            return data
+        try:
+            packed = zlib.compress(zlib.decompress(data), 9)
+        except zlib.error:
+            return data
+        return packed if len(packed) < len(data) else data
+
+    def _pruned_page(self, page: DictionaryObject) -> DictionaryObject:
+        """Return the page with resources limited to names its content uses."""
+        resources = page.get('/Resources')
+        contents = page.get('/Contents')
+        if resources is None or contents is None:
+            return page
+        try:
+            contents = contents.get_object()
+            parts = contents if isinstance(contents, ArrayObject) else [contents]
+            used = set()
+            for part in parts:
+                used.update(_NAME_TOKEN.findall(part.get_object().get_data()))
+        except Exception as e:
+            logger.warning(f"Could not parse page content, keeping resources: {e}")
+            return page
+        used_names = {'/' + name.decode('latin-1') for name in used}
+        pruned = DictionaryObject()
+        for category, entries in resources.get_object().items():
+            entries_obj = entries.get_object()
+            if category in RESOURCE_CATEGORIES and isinstance(entries_obj, DictionaryObject):
+                pruned[category] = DictionaryObject(
+                    {k: v for k, v in entries_obj.items() if k in used_names}
+                )
+            else:
+                pruned[category] = entries
+        page = DictionaryObject(page)
+        page[NameObject('/Resources')] = pruned
+        return page
@@ -0,0 +1,518 @@
+"""Linearized ("fast web view") PDF output.
+
+A linearized file starts with everything needed to show the first page: the
+linearization dictionary, a cross-reference table for the first-page
+objects, the catalog with the objects needed to open the document, the hint
+stream and the first page with all of its resources (and the outline when
+the document opens with it shown). A browser can display page 1 after downloading only that prefix
+instead of the whole file.
+
+The source is read twice through pypdf: once to plan which objects belong to
+which page, and once to copy them. Page bodies are staged in temporary files
+next to the output, so the document is never held in memory.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import shutil
+import tempfile
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from pypdf import PdfReader
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+
+from .pdf_copier import CACHE_RELEASE_INTERVAL, raw_stream_data, release_object_cache, to_writer_value
+from .pdf_writer import PdfName, PdfObjectWriter, PdfRef, serialize
+
+logger = logging.getLogger(__name__)
+
+PDF_HEADER = b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n'
+LIN_DICT_LENGTH = 160       # The linearization dictionary is padded to this size
+OFFSET_WIDTH = 10           # Padding of /Prev in the first-page trailer
+# Catalog entries a viewer reads when opening the document; their objects go with the catalog
+OPEN_DOCUMENT_KEYS = ('/ViewerPreferences', '/PageMode', '/Threads', '/OpenAction', '/AcroForm')
+
+
+@dataclass
+class LinearizeReport:
+    """Outcome of one linearization run."""
+
+    pages: int
+    file_bytes: int
+    first_page_bytes: int     # Bytes a viewer needs before it can show page 1
+    seconds: float
+
+    def summary(self) -> str:
+        pct = 100.0 * self.first_page_bytes / self.file_bytes if self.file_bytes else 0.0
+        return (f"{self.pages} pages, first page in {self.first_page_bytes:,} of "
+                f"{self.file_bytes:,} bytes ({pct:.1f}%) in {self.seconds:.2f}s")
+
+
+class _BitWriter:
+    """Packs unsigned integers MSB first, as hint tables require."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self._acc = 0
+        self._bits = 0
+
+    def write(self, value: int, bits: int) -> None:
+        if not bits:
+            return
+        self._acc = (self._acc << bits) | value
+        self._bits += bits
+        while self._bits >= 8:
+            self._bits -= 8
+            self.data.append((self._acc >> self._bits) & 0xFF)
+        self._acc &= (1 << self._bits) - 1
+
+    def flush(self) -> None:
+        """Pad to the next byte boundary."""
+        if self._bits:
+            self.write(0, 8 - self._bits)
+
+
+def _child_refs(obj) -> List[IndirectObject]:
+    found = []
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, IndirectObject):
+            found.append(value)
+        elif isinstance(value, DictionaryObject):
+            stack.extend(reversed(list(value.values())))
+        elif isinstance(value, ArrayObject):
+            stack.extend(reversed(value))
+    return found
+
+
+def _bits_for(value: int) -> int:
+    return max(0, value).bit_length()
+
+
+class PdfLinearizer:
+    """Rewrites a document in linearized layout.
+
+    Object numbering follows the hint-table rules: pages 2..N take numbers
+    from 1 upwards (page object first, then its private objects), followed
+    by objects shared between pages and document-level objects; the
+    objects needed to open the document and the first-page section are
+    numbered after all of them.
+    """
+
+    def __init__(self, reader: PdfReader):
+        if reader.is_encrypted:
+            raise ValueError("Encrypted PDFs cannot be linearized")
+        self.reader = reader
+        self.pages = list(reader.pages)
+        if not self.pages:
+            raise ValueError("The document has no pages")
+        self.page_objects = {page.indirect_reference.idnum: page for page in self.pages}
+        self.indirect: Dict[int, IndirectObject] = {}
+        self.children: Dict[int, List[int]] = {}
+        self._resolved = 0
+
+        root = reader.trailer.raw_get('/Root')
+        self.catalog_num = root.idnum
+        self.tree_nums = self._page_tree_nums()
+        self.excluded = set(self.page_objects) | self.tree_nums | {self.catalog_num}
+
+    def _page_tree_nums(self) -> Set[int]:
+        nums = set()
+        stack = [self.reader.trailer['/Root'].raw_get('/Pages')]
+        while stack:
+            ref = stack.pop()
+            if not isinstance(ref, IndirectObject) or ref.idnum in nums:
+                continue
+            node = ref.get_object()
+            if node.get('/Type') != '/Pages':
+                continue
+            nums.add(ref.idnum)
+            stack.extend(node.get('/Kids', []))
+        return nums
+
+    def _resolve(self, num: int):
+        page = self.page_objects.get(num)
+        if page is not None:
+            return page
+        self._resolved += 1
+        if self._resolved % CACHE_RELEASE_INTERVAL == 0:
+            release_object_cache(self.reader)
+        return self.indirect[num].get_object()
+
+    def _children(self, num: int) -> List[int]:
+        kids = self.children.get(num)
+        if kids is None:
+            kids = []
+            for ref in _child_refs(self._resolve(num)):
+                self.indirect.setdefault(ref.idnum, ref)
+                if ref.idnum not in self.excluded and ref.idnum != num:
+                    kids.append(ref.idnum)
+            self.children[num] = kids
+        return kids
+
+    def _closure(self, roots: List[int], stop: Optional[Set[int]] = None) -> List[int]:
+        """Objects reachable from ``roots`` in depth-first order."""
+        order = []
+        seen = set(roots)
+        stack = list(reversed(roots))
+        while stack:
+            num = stack.pop()
+            order.append(num)
+            if stop is not None and num in stop:
+                continue
+            for kid in reversed(self._children(num)):
+                if kid not in seen:
+                    seen.add(kid)
+                    stack.append(kid)
+        return order
+
+    def plan(self) -> None:
+        """Assign every object to a section and give it its new number."""
+        page_nums = [page.indirect_reference.idnum for page in self.pages]
+        trailer = self.reader.trailer
+        catalog = trailer['/Root']
+        for ref in _child_refs(catalog):
+            self.indirect.setdefault(ref.idnum, ref)
+
+        # Open-document objects belong to no page, even when a page uses them too
+        open_roots = [ref.idnum for key in OPEN_DOCUMENT_KEYS if key in catalog
+                      for ref in _child_refs(catalog.raw_get(key)) if ref.idnum not in self.excluded]
+        self.open_objects = self._closure(list(dict.fromkeys(open_roots)))
+        self.excluded.update(self.open_objects)
+
+        owner: Dict[int, int] = {}
+        shared: Set[int] = set()
+        for index, num in enumerate(page_nums):
+            for obj in self._closure([num]):
+                first = owner.setdefault(obj, index)
+                if first != index:
+                    shared.add(obj)
+
+        self.first_section = self._closure([page_nums[0]])
+        first_set = set(self.first_section)
+        self.private: List[List[int]] = [self.first_section]
+        self.page_shared: List[List[int]] = [[]]
+        self.shared_section: List[int] = []
+        placed = set(first_set)
+        for num in page_nums[1:]:
+            closure = self._closure([num])
+            self.private.append([obj for obj in closure if obj not in shared])
+            refs = [obj for obj in closure if obj in shared]
+            self.page_shared.append(refs)
+            for obj in refs:
+                if obj not in placed:
+                    placed.add(obj)
+                    self.shared_section.append(obj)
+        placed.update(owner)
+
+        roots = [ref.idnum for key, value in catalog.items() if key != '/Pages'
+                 for ref in _child_refs(value) if ref.idnum not in self.excluded]
+        info = trailer.raw_get('/Info') if '/Info' in trailer else None
+        if isinstance(info, IndirectObject):
+            roots.append(info.idnum)
+        if isinstance(info, IndirectObject):
+            self.indirect.setdefault(info.idnum, info)
+        # Outline objects stay together: they get their own hint table. A
+        # document that opens with the outline shown needs it with page 1
+        outlines = catalog.raw_get('/Outlines') if '/Outlines' in catalog else None
+        self.outline_objects: List[int] = []
+        if isinstance(outlines, IndirectObject) and outlines.idnum not in placed:
+            self.outline_objects = [num for num in self._closure([outlines.idnum], stop=placed)
+                                    if num not in placed]
+            placed.update(self.outline_objects)
+        self.outlines_first = bool(self.outline_objects) and catalog.get('/PageMode') == '/UseOutlines'
+        if self.outlines_first:
+            self.first_section.extend(self.outline_objects)
+        roots = list(dict.fromkeys(num for num in roots if num not in placed))
+        self.document_objects = ([] if self.outlines_first else self.outline_objects) + [
+            num for num in self._closure(roots, stop=placed) if num not in placed
+        ]
+
+        new: Dict[int, int] = {}
+        number = 1
+        for objects in self.private[1:]:
+            for obj in objects:
+                new[obj] = number
+                number += 1
+        for obj in self.shared_section + self.document_objects:
+            new[obj] = number
+            number += 1
+        self.pages_num = number
+        self.main_size = number + 1
+        self.lin_num = self.main_size
+        self.new_catalog_num = self.lin_num + 1
+        self.hint_num = self.lin_num + 2
+        number = self.hint_num + 1
+        for obj in self.open_objects + self.first_section:
+            new[obj] = number
+            number += 1
+        self.size = number
+        for num in self.tree_nums:
+            new[num] = self.pages_num
+        new[self.catalog_num] = self.new_catalog_num
+        self.new = new
+        self.page_nums = page_nums
+
+    def _map_ref(self, ref: IndirectObject, key: Optional[str] = None) -> Optional[PdfRef]:
+        num = self.new.get(ref.idnum)
+        # Dangling references read as null
+        return PdfRef(num) if num is not None else None
+
+    def _write_object(self, writer: PdfObjectWriter, num: int) -> int:
+        """Write the object copied from ``num``; returns its length in bytes."""
+        start = writer.position
+        ref = PdfRef(self.new[num])
+        obj = self._resolve(num)
+        if num in self.page_objects:
+            value = {str(k)[1:]: to_writer_value(v, self._map_ref, str(k))
+                     for k, v in obj.items() if k != '/Parent'}
+            value['Parent'] = PdfRef(self.pages_num)
+            writer.write_object(ref, value)
+        elif isinstance(obj, StreamObject):
+            dictionary = {str(k)[1:]: to_writer_value(v, self._map_ref, str(k))
+                          for k, v in obj.items() if k != '/Length'}
+            writer.write_stream(ref, dictionary, raw_stream_data(obj))
+        else:
+            writer.write_object(ref, to_writer_value(obj, self._map_ref))
+        return writer.position - start
+
+    def _hint_stream(self, first_page_offset: int, shared_offset: int,
+                     page_lengths: List[int], first_lengths: List[int],
+                     shared_lengths: List[int], outline_offset: int, outline_length: int) -> bytes:
+        """Build the page offset and shared object hint tables.
+
+        Offsets are given as if the hint stream were not in the file.
+        """
+        n_first = len(self.first_section)
+        ident = {obj: i for i, obj in enumerate(self.first_section)}
+        ident.update({obj: n_first + i for i, obj in enumerate(self.shared_section)})
+        nobjects = [len(objects) for objects in self.private]
+        shared_ids = [[ident[obj] for obj in refs] for refs in self.page_shared]
+
+        least_objects = min(nobjects)
+        least_length = min(page_lengths)
+        bits_objects = _bits_for(max(nobjects) - least_objects)
+        bits_length = _bits_for(max(page_lengths) - least_length)
+        bits_nshared = _bits_for(max(len(ids) for ids in shared_ids))
+        bits_ident = _bits_for(max((i for ids in shared_ids for i in ids), default=0))
+
+        bits = _BitWriter()
+        for value, width in (
+            (least_objects, 32), (first_page_offset, 32), (bits_objects, 16),
+            (least_length, 32), (bits_length, 16),
+            (0, 32), (0, 16),                       # Content stream offsets (unused)
+            (least_length, 32), (bits_length, 16),  # Content length: whole page
+            (bits_nshared, 16), (bits_ident, 16), (0, 16), (1, 16),
+        ):
+            bits.write(value, width)
+        for value in nobjects:
+            bits.write(value - least_objects, bits_objects)
+        bits.flush()
+        for value in page_lengths:
+            bits.write(value - least_length, bits_length)
+        bits.flush()
+        for ids in shared_ids:
+            bits.write(len(ids), bits_nshared)
+        bits.flush()
+        for ids in shared_ids:
+            for value in ids:
+                bits.write(value, bits_ident)
+        bits.flush()
+        # Fractional positions and content offsets take zero bits
+        bits.flush()
+        bits.flush()
+        for value in page_lengths:
+            bits.write(value - least_length, bits_length)
+        bits.flush()
+        shared_table = len(bits.data)
+
+        group_lengths = first_lengths + shared_lengths
+        least_group = min(group_lengths)
+        bits_group = _bits_for(max(group_lengths) - least_group)
+        first_shared_num = self.new[self.shared_section[0]] if self.shared_section else 0
+        for value, width in (
+            (first_shared_num, 32), (shared_offset if self.shared_section else 0, 32),
+            (n_first, 32), (len(group_lengths), 32), (0, 16),
+            (least_group, 32), (bits_group, 16),
+        ):
+            bits.write(value, width)
+        for value in group_lengths:
+            bits.write(value - least_group, bits_group)
+        bits.flush()
+        for _ in group_lengths:
+            bits.write(0, 1)                        # No MD5 signatures
+        bits.flush()
+
+        outline_table = None
+        if self.outline_objects:
+            outline_table = len(bits.data)
+            for value in (self.new[self.outline_objects[0]], outline_offset,
+                          len(self.outline_objects), outline_length):
+                bits.write(value, 32)
+
+        data = zlib.compress(bytes(bits.data), 9)
+        return _object_bytes(lambda w: w.write_stream(PdfRef(self.hint_num), {
+            'S': shared_table,
+            'O': outline_table,
+            'Filter': PdfName('FlateDecode'),
+        }, data))
+
+    def write(self, fp, workdir: Optional[str] = None) -> int:
+        """Write the linearized file to ``fp``; returns the first-page byte count."""
+        with tempfile.TemporaryFile(dir=workdir) as first_fp, tempfile.TemporaryFile(dir=workdir) as main_fp:
+            open_fp = io.BytesIO()
+            open_writer = PdfObjectWriter(open_fp, version=None)
+            for num in self.open_objects:
+                self._write_object(open_writer, num)
+            first_writer = PdfObjectWriter(first_fp, version=None)
+            first_lengths = [self._write_object(first_writer, num) for num in self.first_section]
+
+            main_writer = PdfObjectWriter(main_fp, version=None)
+            page_lengths = [sum(first_lengths)]
+            for objects in self.private[1:]:
+                page_lengths.append(sum(self._write_object(main_writer, num) for num in objects))
+            shared_start = main_writer.position
+            shared_lengths = [self._write_object(main_writer, num) for num in self.shared_section]
+            outline_start = main_writer.position
+            outline_length = 0
+            for num in self.document_objects:
+                self._write_object(main_writer, num)
+                if num == (self.outline_objects or [None])[-1]:
+                    outline_length = main_writer.position - outline_start
+            main_writer.write_object(PdfRef(self.pages_num), {
+                'Type': PdfName('Pages'),
+                'Kids': [PdfRef(self.new[num]) for num in self.page_nums],
+                'Count': len(self.page_nums),
+            })
+
+            trailer = self.reader.trailer
+            catalog = {str(k)[1:]: to_writer_value(v, self._map_ref, str(k))
+                       for k, v in trailer['/Root'].items() if k != '/Pages'}
+            catalog['Pages'] = PdfRef(self.pages_num)
+            catalog_bytes = _object_bytes(lambda w: w.write_object(PdfRef(self.new_catalog_num), catalog))
+
+            info = trailer.raw_get('/Info') if '/Info' in trailer else None
+            if '/ID' in trailer:
+                file_id = to_writer_value(trailer['/ID'], self._map_ref)
+            else:
+                digest = hashlib.md5(f"{time.time()}{self.size}{main_writer.position}".encode()).digest()
+                file_id = [digest, digest]
+            first_trailer = serialize({
+                'Size': self.size,
+                'Root': PdfRef(self.new_catalog_num),
+                'Info': self._map_ref(info) if isinstance(info, IndirectObject) else None,
+                'ID': file_id,
+            })
+
+            # Layout: header, linearization dict, first-page xref, catalog,
+            # open-document objects, hint stream, first page, remaining
+            # pages, main xref
+            first_xref_offset = len(PDF_HEADER) + len(_lin_object(self.lin_num, {}))
+            first_count = self.size - self.lin_num
+            first_xref_length = (len(f"xref\n{self.lin_num} {first_count}\n") + 20 * first_count
+                                 + len(b'trailer\n') + len(first_trailer) + len(f" /Prev {0:>{OFFSET_WIDTH}}")
+                                 + len(b'\nstartxref\n0\n%%EOF\n'))
+            catalog_offset = first_xref_offset + first_xref_length
+            open_offset = catalog_offset + len(catalog_bytes)
+            hint_offset = open_offset + open_writer.position
+            first_len = first_writer.position
+            if self.outlines_first:
+                outline_offset = hint_offset + first_writer.offsets[self.new[self.outline_objects[0]]][0]
+                outline_length = sum(first_lengths[len(first_lengths) - len(self.outline_objects):])
+            else:
+                outline_offset = hint_offset + first_len + outline_start
+
+            hint = self._hint_stream(hint_offset, hint_offset + first_len + shared_start,
+                                     page_lengths, first_lengths, shared_lengths,
+                                     outline_offset, outline_length)
+            first_offset = hint_offset + len(hint)
+            main_offset = first_offset + first_len
+            end_of_first_page = main_offset
+            main_xref_offset = main_offset + main_writer.position
+
+            main_xref = [f"xref\n0 {self.main_size}\n".encode('ascii'), b'0000000000 65535 f \n']
+            for num in range(1, self.main_size):
+                offset = main_writer.offsets[num][0] + main_offset
+                main_xref.append(f"{offset:010d} 00000 n \n".encode('ascii'))
+            main_xref.append(f"trailer\n<< /Size {self.main_size} >>\n"
+                             f"startxref\n{first_xref_offset}\n%%EOF\n".encode('ascii'))
+            main_xref = b''.join(main_xref)
+            file_length = main_xref_offset + len(main_xref)
+
+            lin_object = _lin_object(self.lin_num, {
+                'L': file_length,
+                'H': [hint_offset, len(hint)],
+                'O': self.new[self.page_nums[0]],
+                'E': end_of_first_page,
+                'N': len(self.page_nums),
+                'T': main_xref_offset + len(f"xref\n0 {self.main_size}\n") - 1,
+            })
+
+            first_xref = [f"xref\n{self.lin_num} {first_count}\n".encode('ascii')]
+            offsets = {self.lin_num: len(PDF_HEADER), self.new_catalog_num: catalog_offset,
+                       self.hint_num: hint_offset}
+            offsets.update((self.new[num], open_writer.offsets[self.new[num]][0] + open_offset)
+                           for num in self.open_objects)
+            for num in range(self.lin_num, self.size):
+                offset = offsets.get(num)
+                if offset is None:
+                    offset = first_writer.offsets[num][0] + first_offset
+                first_xref.append(f"{offset:010d} 00000 n \n".encode('ascii'))
+            first_xref.append(b'trailer\n' + first_trailer[:-2]
+                              + f" /Prev {main_xref_offset:>{OFFSET_WIDTH}}>>".encode('ascii')
+                              + b'\nstartxref\n0\n%%EOF\n')
+            first_xref = b''.join(first_xref)
+            if len(first_xref) != first_xref_length:
+                raise RuntimeError(f"first-page xref is {len(first_xref)} bytes, {first_xref_length} were reserved")
+
+            fp.write(PDF_HEADER + lin_object + first_xref + catalog_bytes + open_fp.getvalue() + hint)
+            for staged in (first_fp, main_fp):
+                staged.seek(0)
+                shutil.copyfileobj(staged, fp, 1024 * 1024)
+            fp.write(main_xref)
+            return end_of_first_page
+
+
+def _object_bytes(write) -> bytes:
+    """Serialize one object through a writer into memory."""
+    buf = io.BytesIO()
+    write(PdfObjectWriter(buf, version=None))
+    return buf.getvalue()
+
+
+def _lin_object(num: int, values: Dict[str, object]) -> bytes:
+    """The linearization dictionary, padded to a fixed size."""
+    body = serialize(dict({'Linearized': 1}, **values))
+    body = body[:-2] + b' ' * (LIN_DICT_LENGTH - len(body)) + b'>>'
+    return f"{num} 0 obj\n".encode('ascii') + body + b'\nendobj\n'
+
+
+def linearize_pdf(path: str, output_path: str = None) -> LinearizeReport:
+    """Linearize ``path`` in place (or into ``output_path``).
+
+    The original file is only replaced once the linearized copy has been
+    completely written.
+    """
+    started = time.perf_counter()
+    target = output_path or path
+    temp_path = target + '.linearizing'
+    try:
+        with open(path, 'rb') as source, open(temp_path, 'wb') as fp:
+            linearizer = PdfLinearizer(PdfReader(source))
+            linearizer.plan()
+            first_page_bytes = linearizer.write(fp, os.path.dirname(os.path.abspath(target)))
+        os.replace(temp_path, target)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    report = LinearizeReport(len(linearizer.pages), os.path.getsize(target), first_page_bytes,
+                             time.perf_counter() - started)
+    logger.info(f"Linearized {target}: {report.summary()}")
+    return report
@@ -0,0 +1,76 @@
+"""Post-merge PDF optimizer.
+
+Rewrites a PDF object by object: identical objects are written once, streams
+are recompressed, unused page resources and unreachable objects are dropped,
+and non-stream objects are packed into compressed object streams.
+
+Linearized files are written with a plain cross-reference table, so object
+streams are left out when the result is going to be linearized; the other
+savings carry over.
+"""
+
+import logging
+import os
+import time
+from dataclasses import dataclass
+
+from pypdf import PdfReader
+
+from .pdf_copier import PdfObjectCopier
+from .pdf_writer import PdfObjectWriter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OptimizeReport:
+    """Outcome of one optimizer run."""
+
+    bytes_before: int
+    bytes_after: int
+    seconds: float
+    objects_deduplicated: int
+
+    def summary(self) -> str:
+        saved = self.bytes_before - self.bytes_after
+        pct = 100.0 * saved / self.bytes_before if self.bytes_before else 0.0
+        return (f"{self.bytes_before:,} -> {self.bytes_after:,} bytes ({pct:.1f}% smaller, "
+                f"{self.objects_deduplicated} duplicate objects) in {self.seconds:.2f}s")
+
+
+def optimize_pdf(path: str, output_path: str = None, object_streams: bool = True) -> OptimizeReport:
+    """Optimize ``path`` in place (or into ``output_path``).
+
+    The source is read lazily and the result written as a stream, so the
+    whole document is never held in memory. The original file is only
+    replaced once the optimized copy has been completely written, and kept
+    if optimizing did not make it smaller.
+    """
+    started = time.perf_counter()
+    bytes_before = os.path.getsize(path)
+    target = output_path or path
+    temp_path = target + '.optimizing'
+    try:
+        with open(path, 'rb') as source, open(temp_path, 'wb') as fp:
+            reader = PdfReader(source)
+            writer = PdfObjectWriter(fp, version='1.5', object_streams=object_streams)
+            copier = PdfObjectCopier(reader, writer, dedupe=True, recompress=True, prune_resources=True)
+            root = copier.copy_ref(reader.trailer.raw_get('/Root'))
+            info_ref = reader.trailer.raw_get('/Info') if '/Info' in reader.trailer else None
+            info = copier.copy_ref(info_ref) if info_ref is not None else None
+            copier.drain()
+            writer.close(root, info)
+        bytes_after = os.path.getsize(temp_path)
+        if bytes_after < bytes_before or output_path:
+            os.replace(temp_path, target)
+        else:
+            os.unlink(temp_path)
+            bytes_after = bytes_before
+    except Exception:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    report = OptimizeReport(bytes_before, bytes_after, time.perf_counter() - started,
+                            copier.objects_deduplicated)
+    logger.info(f"Optimized {path}: {report.summary()}")
+    return report
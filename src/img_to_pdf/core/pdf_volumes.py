@@ -0,0 +1,199 @@
+"""Split a merged output into size-capped volume files.
+
+Pages are streamed into ``name_part001.pdf``, ``name_part002.pdf``, ... and a
+volume is closed for good as soon as its page or byte budget is reached, so
+no volume is held in memory. A page that would take a volume past its byte
+budget is moved to the next volume: the page's objects are cut off the end
+of the file and spliced into the new one (pages copied from a PDF are
+copied again instead, as they may share resources written earlier). An
+index listing the source files of each volume is written next to the
+volumes.
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from .pdf_writer import ImagePdfDocument, OutputError, PdfRef
+
+logger = logging.getLogger(__name__)
+
+XREF_ENTRY_BYTES = 20
+CLOSING_OVERHEAD = 256
+
+
+@dataclass
+class Volume:
+    """One finished (or in-progress) volume file."""
+
+    path: str
+    pages: int = 0
+    bytes: int = 0
+    sources: List[str] = field(default_factory=list)
+
+
+class VolumeWriter:
+    """Streams pages into a series of volume PDFs.
+
+    ``max_bytes`` and ``max_pages`` of 0 disable the respective budget. Each
+    page is written first and checked against the byte budget afterwards,
+    so volumes stay under it unless a single page is larger than the budget.
+    """
+
+    def __init__(self, base_path: str, max_bytes: int = 0, max_pages: int = 0):
+        self.stem = os.path.splitext(base_path)[0]
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.volumes: List[Volume] = []
+        self._fp = None
+        self._document: Optional[ImagePdfDocument] = None
+        self._copier = None
+        self._copier_reader = None
+
+    @property
+    def index_path(self) -> str:
+        return f"{self.stem}_index.json"
+
+    def volume_path(self, number: int) -> str:
+        return f"{self.stem}_part{number:03d}.pdf"
+
+    def _overflows(self) -> bool:
+        """Whether the volume, with the page just written, went past the byte budget."""
+        volume = self.volumes[-1]
+        if not self.max_bytes or not volume.pages:
+            return False
+        writer = self._document.writer
+        # The xref table and page tree still have to be written on close
+        closing = XREF_ENTRY_BYTES * (len(writer.offsets) + 2) + 20 * (volume.pages + 1) + CLOSING_OVERHEAD
+        return writer.position + closing > self.max_bytes
+
+    def _open_document(self) -> ImagePdfDocument:
+        if self._document is not None and self.max_pages and self.volumes[-1].pages >= self.max_pages:
+            self._close_volume()
+        if self._document is None:
+            path = self.volume_path(len(self.volumes) + 1)
+            self._fp = open(path, 'w+b')
+            self._document = ImagePdfDocument(self._fp)
+            self.volumes.append(Volume(path))
+        return self._document
+
+    def _take_back(self, mark: Tuple[int, int, int]):
+        """Remove what was written since ``mark`` from the open volume.
+
+        Returns the removed objects as a fragment file with their offsets in
+        it, the page references that were added and the next object number
+        the fragment had reached.
+        """
+        position, first_num, page_count = mark
+        document = self._document
+        next_num = document.writer.next_num
+        offsets = document.writer.rewind(position, first_num)
+        page_refs = document.page_refs[page_count:]
+        del document.page_refs[page_count:]
+        fragment = tempfile.TemporaryFile()
+        self._fp.flush()
+        self._fp.seek(position)
+        shutil.copyfileobj(self._fp, fragment)
+        self._fp.seek(position)
+        self._fp.truncate()
+        offsets = {num: (offset - position, gen) for num, (offset, gen) in offsets.items()}
+        return fragment, offsets, page_refs, next_num
+
+    def _add_page(self, source: str, write: Callable[[ImagePdfDocument], object], repeatable: bool = False) -> None:
+        """Write one page with ``write`` and move it to a new volume if it does not fit.
+
+        A ``repeatable`` page is written again into the new volume; any other
+        is moved over as written, so it must only refer to its own objects
+        and the page tree.
+        """
+        document = self._open_document()
+        writer = document.writer
+        mark = (writer.position, writer.next_num, len(document.page_refs))
+        try:
+            write(document)
+        except OutputError:
+            raise
+        except Exception:
+            # Leave no half-written page behind; the copier may know objects that are gone now
+            self._take_back(mark)[0].close()
+            self._copier = None
+            self._copier_reader = None
+            raise
+        if self._overflows():
+            fragment, offsets, page_refs, next_num = self._take_back(mark)
+            with fragment:
+                self._close_volume()
+                document = self._open_document()
+                if repeatable:
+                    write(document)
+                else:
+                    # Both volumes' page trees are object 1, the first one allocated
+                    delta = document.writer.splice(fragment, offsets, mark[1], next_num)
+                    document.page_refs.extend(PdfRef(ref.num + delta) for ref in page_refs)
+        volume = self.volumes[-1]
+        volume.pages += 1
+        if not volume.sources or volume.sources[-1] != source:
+            volume.sources.append(source)
+
+    def add_image_page(self, image, layout, source: str) -> None:
+        self._add_page(source, lambda document: document.add_image_page(image, layout))
+
+    def add_strip_page(self, strips, width: int, height: int, layout, source: str) -> None:
+        self._add_page(source, lambda document: document.add_strip_page(strips, width, height, layout))
+
+    def add_pdf_pages(self, reader, source: str, page_indices: Optional[Iterable[int]] = None) -> None:
+        """Copy pages of ``reader`` (all by default); a source may span several volumes."""
+        if page_indices is None:
+            page_indices = range(len(reader.pages))
+        for index in page_indices:
+            self._add_page(source, lambda document: document.add_pdf_pages(
+                reader, [index], copier=self._copier_for(reader, document)), repeatable=True)
+
+    def _copier_for(self, reader, document: ImagePdfDocument):
+        from .pdf_copier import PdfObjectCopier
+
+        if self._copier is None or self._copier_reader is not reader:
+            # Shared resources are written once per volume
+            self._copier = PdfObjectCopier(reader, document.writer)
+            self._copier_reader = reader
+        return self._copier
+
+    def _close_volume(self) -> None:
+        self._document.close()
+        self._fp.close()
+        volume = self.volumes[-1]
+        volume.bytes = os.path.getsize(volume.path)
+        logger.info(f"Closed volume {volume.path}: {volume.pages} pages, {volume.bytes:,} bytes")
+        self._document = None
+        self._fp = None
+        self._copier = None
+        self._copier_reader = None
+
+    def close(self) -> List[Volume]:
+        """Close the last volume and write the index."""
+        if self._document is not None:
+            self._close_volume()
+        index = {'volumes': [
+            {'file': os.path.basename(v.path), 'pages': v.pages, 'bytes': v.bytes, 'sources': v.sources}
+            for v in self.volumes
+        ]}
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2, ensure_ascii=False)
+        return self.volumes
+
+    def abort(self) -> None:
+        """Remove every volume written so far."""
+        if self._fp is not None:
+            self._fp.close()
+        self._document = None
+        self._fp = None
+        for volume in self.volumes:
+            try:
+                os.unlink(volume.path)
+            except OSError as e:
+                logger.warning(f"Could not remove {volume.path}: {e}")
+        self.volumes = []
@@ -0,0 +1,559 @@
+"""Minimal streaming PDF writer.
+
+Objects are written to the output as soon as they are produced, so memory use
+does not grow with the number of pages. Only the cross-reference offsets are
+kept until the document is closed.
+"""
+
+import logging
+import re
+import zlib
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+OBJECT_STREAM_SIZE = 100    # Objects packed into one compressed object stream
+SPLICE_CHUNK = 1024 * 1024
+_REF_PATTERN = re.compile(rb'(?<![\w.])(\d+) (\d+) R\b')
+
+
+class OutputError(Exception):
+    """Writing the PDF failed (disk full, closed pipe, ...), as opposed to reading an input."""
+
+
+class PdfName(str):
+    """PDF name object (written as ``/Name``)."""
+
+
+class PdfRef:
+    """Indirect reference to an object in the document being written."""
+
+    __slots__ = ('num', 'gen')
+
+    def __init__(self, num: int, gen: int = 0):
+        self.num = num
+        self.gen = gen
+
+    def __repr__(self) -> str:
+        return f"PdfRef({self.num}, {self.gen})"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PdfRef) and other.num == self.num and other.gen == self.gen
+
+    def __hash__(self) -> int:
+        return hash(('PdfRef', self.num, self.gen))
+
+
+_NAME_DELIMITERS = set(b'()<>[]{}/%#')
+
+
+def _serialize_name(name: str) -> bytes:
+    out = bytearray(b'/')
+    for byte in name.encode('utf-8'):
+        if byte < 0x21 or byte > 0x7e or byte in _NAME_DELIMITERS:
+            out += b'#%02X' % byte
+        else:
+            out.append(byte)
+    return bytes(out)
+
+
+def _serialize_number(value: float) -> bytes:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value)).encode('ascii')
+    text = f"{value:.6f}".rstrip('0').rstrip('.')
+    return (text if text not in ('', '-0') else '0').encode('ascii')
+
+
+def serialize(value: Any) -> bytes:
+    """Serialize a Python value to PDF syntax."""
+    if value is None:
+        return b'null'
+    if value is True:
+        return b'true'
+    if value is False:
+        return b'false'
+    if isinstance(value, PdfRef):
+        return f"{value.num} {value.gen} R".encode('ascii')
+    if isinstance(value, PdfName):
+        return _serialize_name(value)
+    if isinstance(value, (int, float)):
+        return _serialize_number(value)
+    if isinstance(value, str):
+        value = value.encode('ascii') if value.isascii() else b'\xfe\xff' + value.encode('utf-16-be')
+    if isinstance(value, (bytes, bytearray)):
+        return b'<' + bytes(value).hex().encode('ascii') + b'>'
+    if isinstance(value, (list, tuple)):
+        return b'[' + b' '.join(serialize(v) for v in value) + b']'
+    if isinstance(value, dict):
+        parts = [b'<<']
+        for key, val in value.items():
+            if val is None:
+                continue
+            parts.append(_serialize_name(key) + b' ' + serialize(val))
+        parts.append(b'>>')
+        return b' '.join(parts)
+    raise TypeError(f"Cannot serialize {type(value).__name__} to PDF")
+
+
+class PdfObjectWriter:
+    """Writes numbered PDF objects sequentially to a binary file object.
+
+    The target does not need to be seekable: byte offsets are tracked by the
+    writer itself, so pipes and sockets work as well as regular files.
+
+    With ``object_streams`` non-stream objects are packed into compressed
+    object streams and a cross-reference stream replaces the xref table.
+    """
+
+    def __init__(self, fp: BinaryIO, version: str = '1.4', object_streams: bool = False):
+        self.fp = fp
+        self.position = 0
+        self.offsets: Dict[int, Tuple[int, int]] = {}
+        self.compressed: Dict[int, Tuple[int, int]] = {}
+        self.object_streams = object_streams
+        self._pending: List[Tuple[int, bytes]] = []
+        self._next_num = 1
+        self._prev_xref: Optional[int] = None
+        if version is None:
+            return
+        if object_streams and version < '1.5':
+            version = '1.5'
+        self._write(f"%PDF-{version}\n".encode('ascii') + b'%\xe2\xe3\xcf\xd3\n')
+
+    @classmethod
+    def for_update(cls, fp: BinaryIO, file_size: int, next_num: int, prev_xref: int,
+                   xref_stream: bool = False) -> 'PdfObjectWriter':
+        """Writer for an incremental update appended to an existing file.
+
+        ``fp`` must be positioned at the end of the file (opened for
+        appending); existing bytes are never touched. New objects are numbered
+        from ``next_num`` (the old trailer's /Size) and the new cross-reference
+        section links back to ``prev_xref``.
+        """
+        writer = cls(fp, version=None, object_streams=xref_stream)
+        writer.position = file_size
+        writer._next_num = next_num
+        writer._prev_xref = prev_xref
+        return writer
+
+    @classmethod
+    def for_fragment(cls, fp: BinaryIO, first_num: int = 1) -> 'PdfObjectWriter':
+        """Writer for a run of objects to be spliced into another file later.
+
+        No header, cross-reference section or trailer is written. Numbers
+        below ``first_num`` may be referenced but are never written: they
+        stand for objects of the file the fragment is spliced into.
+        """
+        writer = cls(fp, version=None)
+        writer._next_num = first_num
+        return writer
+
+    @property
+    def next_num(self) -> int:
+        """Number the next allocated object will get."""
+        return self._next_num
+
+    def splice(self, fragment: BinaryIO, offsets: Dict[int, Tuple[int, int]],
+               first_num: int, next_num: int) -> int:
+        """Copy a fragment written by a :meth:`for_fragment` writer into this file.
+
+        ``offsets``, ``first_num`` and ``next_num`` are the fragment writer's.
+        The fragment's objects are renumbered to follow this file's: only
+        the object and dictionary lines are rewritten, stream data is copied
+        as is. Returns the amount added to the fragment's object numbers.
+        """
+        delta = self._next_num - first_num
+
+        def renumber(match):
+            num = int(match.group(1))
+            return b'%d %s R' % (num + delta if num >= first_num else num, match.group(2))
+
+        fragment.seek(0, 2)
+        ordered = sorted(offsets.items(), key=lambda item: item[1][0])
+        ends = [offset for _, (offset, _) in ordered[1:]] + [fragment.tell()]
+        for (num, (offset, gen)), end in zip(ordered, ends):
+            fragment.seek(offset)
+            fragment.readline()
+            # Serialized values never contain a newline, so this is the whole value
+            value = _REF_PATTERN.sub(renumber, fragment.readline())
+            self.offsets[num + delta] = (self.position, gen)
+            self._write(f"{num + delta} {gen} obj\n".encode('ascii') + value)
+            remaining = end - fragment.tell()
+            while remaining > 0:
+                chunk = fragment.read(min(SPLICE_CHUNK, remaining))
+                self._write(chunk)
+                remaining -= len(chunk)
+        self._next_num += next_num - first_num
+        return delta
+
+    def rewind(self, position: int, next_num: int) -> Dict[int, Tuple[int, int]]:
+        """Forget the objects numbered from ``next_num`` on, written from byte ``position``.
+
+        The caller truncates the output to ``position``. Returns the offsets
+        the forgotten objects had.
+        """
+        dropped = {num: entry for num, entry in self.offsets.items() if num >= next_num}
+        for num in dropped:
+            del self.offsets[num]
+        self.position = position
+        self._next_num = next_num
+        return dropped
+
+    def _write(self, data: bytes) -> None:
+        try:
+            self.fp.write(data)
+        except OSError as e:
+            raise OutputError(e) from e
+        self.position += len(data)
+
+    def _flush(self) -> None:
+        try:
+            self.fp.flush()
+        except OSError as e:
+            raise OutputError(e) from e
+
+    def alloc(self) -> PdfRef:
+        """Reserve an object number to be written later."""
+        ref = PdfRef(self._next_num)
+        self._next_num += 1
+        return ref
+
+    def write_object(self, ref: PdfRef, value: Any, compressible: bool = True) -> PdfRef:
+        """Write a non-stream object."""
+        return self.write_raw_object(ref, serialize(value), compressible)
+
+    def write_raw_object(self, ref: PdfRef, data: bytes, compressible: bool = True) -> PdfRef:
+        """Write a non-stream object that is already serialized."""
+        if self.object_streams and compressible and ref.gen == 0:
+            self._pending.append((ref.num, data))
+            if len(self._pending) >= OBJECT_STREAM_SIZE:
+                self._flush_object_stream()
+            return ref
+        self._begin_object(ref)
+        self._write(data + b'\nendobj\n')
+        return ref
+
+    def _begin_object(self, ref: PdfRef) -> None:
+        self.offsets[ref.num] = (self.position, ref.gen)
+        self._write(f"{ref.num} {ref.gen} obj\n".encode('ascii'))
+
+    def _flush_object_stream(self) -> None:
+        if not self._pending:
+            return
+        header = []
+        body = []
+        offset = 0
+        for num, data in self._pending:
+            header.append(f"{num} {offset}")
+            body.append(data)
+            offset += len(data) + 1
+        header_bytes = ' '.join(header).encode('ascii') + b'\n'
+        stream_ref = self.alloc()
+        for index, (num, _) in enumerate(self._pending):
+            self.compressed[num] = (stream_ref.num, index)
+        self._pending = []
+        data = zlib.compress(header_bytes + b'\n'.join(body) + b'\n', 9)
+        self.write_stream(stream_ref, {
+            'Type': PdfName('ObjStm'),
+            'N': len(header),
+            'First': len(header_bytes),
+            'Filter': PdfName('FlateDecode'),
+        }, data)
+
+    def write_stream(self, ref: PdfRef, dictionary: Dict[str, Any], data: bytes) -> PdfRef:
+        """Write a stream object whose (already encoded) data is in memory."""
+        dictionary = dict(dictionary, Length=len(data))
+        self._begin_object(ref)
+        self._write(serialize(dictionary) + b'\nstream\n')
+        self._write(data)
+        self._write(b'\nendstream\nendobj\n')
+        return ref
+
+    def write_stream_chunks(self, ref: PdfRef, dictionary: Dict[str, Any],
+                            chunks: Iterable[bytes]) -> PdfRef:
+        """Write a stream object from encoded chunks without buffering them.
+
+        The length is written as a separate indirect object once all chunks
+        have been written.
+        """
+        length_ref = self.alloc()
+        dictionary = dict(dictionary, Length=length_ref)
+        self._begin_object(ref)
+        self._write(serialize(dictionary) + b'\nstream\n')
+        length = 0
+        for chunk in chunks:
+            if chunk:
+                self._write(chunk)
+                length += len(chunk)
+        self._write(b'\nendstream\nendobj\n')
+        self.write_object(length_ref, length, compressible=False)
+        return ref
+
+    def _xref_sections(self, numbers: List[int]) -> List[Tuple[int, int]]:
+        """Group sorted object numbers into (first, count) subsections."""
+        sections: List[List[int]] = []
+        for num in numbers:
+            if sections and sections[-1][0] + sections[-1][1] == num:
+                sections[-1][1] += 1
+            else:
+                sections.append([num, 1])
+        return [(first, count) for first, count in sections]
+
+    def _xref_numbers(self) -> List[int]:
+        """Object numbers listed in this cross-reference section.
+
+        A complete file lists every number so unused ones are marked free; an
+        update lists only the objects it wrote.
+        """
+        if self._prev_xref is None:
+            return list(range(self._next_num))
+        return sorted(set(self.offsets) | set(self.compressed))
+
+    def close(self, root: PdfRef, info: Optional[PdfRef] = None,
+              extra_trailer: Optional[Dict[str, Any]] = None) -> None:
+        """Write the cross-reference section and trailer."""
+        trailer = dict(extra_trailer or {})
+        trailer.update({'Root': root, 'Info': info, 'Prev': self._prev_xref})
+        if self.object_streams:
+            self._close_xref_stream(trailer)
+            return
+        size = self._next_num
+        xref_offset = self.position
+        numbers = self._xref_numbers()
+        lines: List[bytes] = [b'xref\n']
+        index = 0
+        for first, count in self._xref_sections(numbers):
+            lines.append(f"{first} {count}\n".encode('ascii'))
+            for num in numbers[index:index + count]:
+                entry = self.offsets.get(num)
+                if entry is None:
+                    lines.append(b'0000000000 65535 f \n')
+                else:
+                    lines.append(f"{entry[0]:010d} {entry[1]:05d} n \n".encode('ascii'))
+            index += count
+        self._write(b''.join(lines))
+        trailer = dict({'Size': size}, **trailer)
+        self._write(b'trailer\n' + serialize(trailer) + f"\nstartxref\n{xref_offset}\n%%EOF\n".encode('ascii'))
+        self._flush()
+
+    def _close_xref_stream(self, trailer: Dict[str, Any]) -> None:
+        self._flush_object_stream()
+        xref_ref = self.alloc()
+        size = self._next_num
+        xref_offset = self.position
+        self.offsets[xref_ref.num] = (xref_offset, 0)
+        offset_width = max(4, (xref_offset.bit_length() + 7) // 8)
+        numbers = self._xref_numbers()
+        rows = []
+        for num in numbers:
+            if num in self.offsets:
+                offset, gen = self.offsets[num]
+                rows.append(b'\x01' + offset.to_bytes(offset_width, 'big') + gen.to_bytes(2, 'big'))
+            elif num in self.compressed:
+                stream_num, index = self.compressed[num]
+                rows.append(b'\x02' + stream_num.to_bytes(offset_width, 'big') + index.to_bytes(2, 'big'))
+            else:
+                rows.append(b'\x00' + (0).to_bytes(offset_width, 'big') + b'\xff\xff')
+        data = zlib.compress(b''.join(rows), 9)
+        index = [v for section in self._xref_sections(numbers) for v in section]
+        dictionary = dict({
+            'Type': PdfName('XRef'),
+            'Size': size,
+            'Index': index,
+            'W': [1, offset_width, 2],
+            'Filter': PdfName('FlateDecode'),
+            'Length': len(data),
+        }, **trailer)
+        self._write(f"{xref_ref.num} 0 obj\n".encode('ascii') + serialize(dictionary) + b'\nstream\n')
+        self._write(data)
+        self._write(f"\nendstream\nendobj\nstartxref\n{xref_offset}\n%%EOF\n".encode('ascii'))
+        self._flush()
+
+
+class ImagePdfDocument:
+    """Builds a PDF from image pages and pages copied from other PDFs.
+
+    Pages are streamed to the output as they are added; only the page
+    references are kept in memory for the page tree written on close. An
+    existing ``writer`` can be passed to add pages to another document
+    (e.g. an incremental update) instead of starting a new file.
+    """
+
+    def __init__(self, fp: Optional[BinaryIO] = None, writer: Optional[PdfObjectWriter] = None):
+        self.writer = writer or PdfObjectWriter(fp)
+        self.pages_ref = self.writer.alloc()
+        self.page_refs: List[PdfRef] = []
+        # Bookmarks as (title, destination or None, children)
+        self.outline: List[Tuple[Any, Optional[list], list]] = []
+
+    def add_image_page(self, image, layout=None) -> PdfRef:
+        """Add a page showing ``image`` placed according to ``layout``.
+
+        Without a layout the page is sized to the image at 72 dpi.
+        """
+        writer = self.writer
+        image_ref = writer.write_stream(writer.alloc(), image.xobject_dict(), image.data)
+        if layout is None:
+            width, height, matrix = image.width, image.height, (image.width, 0, 0, image.height, 0, 0)
+        else:
+            width, height, matrix = layout.placement(image.width, image.height)
+        content = b'q ' + b' '.join(serialize(v) for v in matrix) + b' cm /Im0 Do Q'
+        content_ref = writer.write_stream(writer.alloc(), {}, content)
+        page_ref = writer.write_object(writer.alloc(), {
+            'Type': PdfName('Page'),
+            'Parent': self.pages_ref,
+            'MediaBox': [0, 0, width, height],
+            'Resources': {'XObject': {'Im0': image_ref}},
+            'Contents': content_ref,
+        })
+        self.page_refs.append(page_ref)
+        return page_ref
+
+    def add_strip_page(self, strips: Iterable, width: int, height: int, layout=None) -> PdfRef:
+        """Add a page showing a ``width`` x ``height`` image made of horizontal strips.
+
+        Strips are written as they arrive from the iterable, top to bottom,
+        so only one encoded strip is held in memory at a time.
+        """
+        writer = self.writer
+        if layout is None:
+            page_w, page_h, matrix = width, height, (width, 0, 0, height, 0, 0)
+        else:
+            page_w, page_h, matrix = layout.placement(width, height)
+        draw_w, _, _, draw_h, x, y = matrix
+        xobjects = {}
+        content = [b'q']
+        top = 0
+        for index, strip in enumerate(strips):
+            name = f"Im{index}"
+            xobjects[name] = writer.write_stream(writer.alloc(), strip.xobject_dict(), strip.data)
+            strip_h = draw_h * strip.height / height
+            strip_y = y + draw_h * (height - top - strip.height) / height
+            content.append(b'q ' + b' '.join(serialize(v) for v in (draw_w, 0, 0, strip_h, x, strip_y))
+                           + f" cm /{name} Do Q".encode('ascii'))
+            top += strip.height
+        content.append(b'Q')
+        content_ref = writer.write_stream(writer.alloc(), {}, b'\n'.join(content))
+        page_ref = writer.write_object(writer.alloc(), {
+            'Type': PdfName('Page'),
+            'Parent': self.pages_ref,
+            'MediaBox': [0, 0, page_w, page_h],
+            'Resources': {'XObject': xobjects},
+            'Contents': content_ref,
+        })
+        self.page_refs.append(page_ref)
+        return page_ref
+
+    def add_pdf_pages(self, reader, page_indices: Optional[Iterable[int]] = None,
+                      copier=None, outline: bool = False) -> List[PdfRef]:
+        """Copy pages of a pypdf ``reader`` into this document.
+
+        Page objects and the resources they reach are copied one page at a
+        time with their stream data left encoded. Passing the same ``copier``
+        across calls writes resources shared between those pages only once.
+        With ``outline`` the reader's bookmarks that point at copied pages
+        are carried over.
+        """
+        from .pdf_copier import PdfObjectCopier
+
+        if copier is None:
+            copier = PdfObjectCopier(reader, self.writer)
+        if page_indices is None:
+            page_indices = range(len(reader.pages))
+        added = {}
+        for index in page_indices:
+            page_ref = copier.copy_page(reader.pages[index], self.pages_ref)
+            copier.drain()
+            self.page_refs.append(page_ref)
+            added.setdefault(index, page_ref)
+        if outline:
+            try:
+                self.outline.extend(_import_outline(reader, reader.outline, added))
+            except Exception as e:
+                logger.warning(f"Could not copy bookmarks: {e}")
+        return list(added.values())
+
+    def close(self) -> None:
+        writer = self.writer
+        writer.write_object(self.pages_ref, {
+            'Type': PdfName('Pages'),
+            'Kids': self.page_refs,
+            'Count': len(self.page_refs),
+        })
+        catalog = {
+            'Type': PdfName('Catalog'),
+            'Pages': self.pages_ref,
+        }
+        if self.outline:
+            catalog['Outlines'] = write_outline(writer, self.outline, writer.alloc())
+        writer.close(writer.write_object(writer.alloc(), catalog))
+
+
+def _import_outline(reader, entries, page_map: Dict[int, PdfRef]) -> list:
+    """Convert pypdf outline entries to ``(title, destination, children)`` items.
+
+    Entries pointing at pages that were not copied lose their destination
+    and are dropped unless they still have children.
+    """
+    from .pdf_copier import to_writer_value
+
+    items = []
+    for entry in entries:
+        if isinstance(entry, list):
+            # Children follow their parent entry
+            if items:
+                items[-1][2].extend(_import_outline(reader, entry, page_map))
+            continue
+        page_ref = page_map.get(reader.get_destination_page_number(entry))
+        dest = None
+        if page_ref is not None:
+            dest = [page_ref] + [to_writer_value(v, lambda ref, key: None) for v in entry.dest_array[1:]]
+        items.append((str(entry.title), dest, []))
+    return [item for item in items if item[1] is not None or item[2]]
+
+
+def write_outline(writer: PdfObjectWriter, items: list, ref: PdfRef) -> PdfRef:
+    """Write the outline root ``ref`` and its ``(title, destination, children)`` items."""
+    first, last, count = _write_outline_items(writer, items, ref)
+    return writer.write_object(ref, {
+        'Type': PdfName('Outlines'), 'First': first, 'Last': last, 'Count': count,
+    })
+
+
+def _write_outline_items(writer: PdfObjectWriter, items: list, parent: PdfRef) -> Tuple[PdfRef, PdfRef, int]:
+    """Write sibling outline items; return first, last and the visible count."""
+    refs = [writer.alloc() for _ in items]
+    count = len(items)
+    for i, (title, dest, children) in enumerate(items):
+        entry = {
+            'Title': title,
+            'Parent': parent,
+            'Prev': refs[i - 1] if i > 0 else None,
+            'Next': refs[i + 1] if i + 1 < len(refs) else None,
+            'Dest': dest,
+        }
+        if children:
+            entry['First'], entry['Last'], child_count = _write_outline_items(writer, children, refs[i])
+            entry['Count'] = child_count
+            count += child_count
+        writer.write_object(refs[i], entry)
+    return refs[0], refs[-1], count
+
+
+def write_image_pdf(path: str, images: Iterable, layout=None) -> str:
+    """Write encoded images to ``path``, one image per page."""
+    with open(path, 'wb') as fp:
+        document = ImagePdfDocument(fp)
+        for image in images:
+            document.add_image_page(image, layout)
+        document.close()
+    return path
+
+
+def write_strip_pdf(path: str, strips: Iterable, size, layout=None) -> str:
+    """Write a single page made of encoded horizontal strips to ``path``."""
+    with open(path, 'wb') as fp:
+        document = ImagePdfDocument(fp)
+        document.add_strip_page(strips, size[0], size[1], layout)
+        document.close()
+    return path
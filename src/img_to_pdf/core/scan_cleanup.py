@@ -0,0 +1,65 @@
+"""Drop blank scanned pages and trim scanner borders before encoding."""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from PIL import Image
+
+from .image_analysis import PAGE_BLANK_FRACTION, PAGE_INK_DELTA, analyze_page
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CleanupStats:
+    """Pages dropped, area trimmed and time spent on analysis."""
+
+    pages: int = 0
+    dropped: int = 0
+    area_before: int = 0
+    area_after: int = 0
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        trimmed = 100.0 * (self.area_before - self.area_after) / self.area_before if self.area_before else 0.0
+        per_page = 1000.0 * self.seconds / self.pages if self.pages else 0.0
+        return (f"{self.dropped} of {self.pages} pages blank and dropped, "
+                f"{trimmed:.1f}% of the remaining area trimmed ({per_page:.1f} ms/page)")
+
+
+class ScanCleanup:
+    """Applies blank-page removal and border trimming to page images.
+
+    Safe to share between worker threads; statistics are updated under a lock.
+    """
+
+    def __init__(self, drop_blank: bool = True, trim_borders: bool = True,
+                 ink_delta: int = PAGE_INK_DELTA, blank_fraction: float = PAGE_BLANK_FRACTION):
+        self.drop_blank = drop_blank
+        self.trim_borders = trim_borders
+        self.ink_delta = ink_delta
+        self.blank_fraction = blank_fraction
+        self.stats = CleanupStats()
+        self._lock = threading.Lock()
+
+    def apply(self, img: Image.Image) -> Optional[Image.Image]:
+        """Return the trimmed image, or ``None`` if the page is blank and dropped."""
+        started = time.perf_counter()
+        result = analyze_page(img, self.ink_delta, self.blank_fraction)
+        elapsed = time.perf_counter() - started
+        width, height = img.size
+        dropped = self.drop_blank and result['blank']
+        if not dropped and self.trim_borders and result['bbox'] != (0, 0, width, height):
+            img = img.crop(result['bbox'])
+        with self._lock:
+            self.stats.pages += 1
+            self.stats.seconds += elapsed
+            if dropped:
+                self.stats.dropped += 1
+            else:
+                self.stats.area_before += width * height
+                self.stats.area_after += img.size[0] * img.size[1]
+        return None if dropped else img
@@ -0,0 +1,180 @@
+"""Converting inputs straight into a PDF stream.
+
+Each input is encoded and written as soon as it is read, and the writer
+never seeks, so the PDF can go to stdout, a pipe or a socket as well as a
+file. Memory holds one input at a time: archive members are read one by one,
+PDF inputs are copied page by page with their streams left encoded, and
+images too large to decode at once are processed in bands (an archive member
+is spilled to a temporary file for that, as band decoding reads the file).
+"""
+
+import io
+import logging
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+from .archive_input import ORDER_NATURAL, ArchiveReader, is_archive
+from .fanout import resample_for_layout
+from .image_encoder import CodecStats, encode_image
+from .page_layout import PageLayout
+from .pdf_writer import ImagePdfDocument, OutputError
+from .tiled_image import DEFAULT_MAX_PIXELS, MB, ImageTooLargeError, TiledImage, needs_tiling, open_image
+
+logger = logging.getLogger(__name__)
+
+Source = Union[str, BinaryIO]
+
+
+@dataclass
+class StreamStats:
+    """Inputs written to the stream and the ones left out."""
+
+    inputs: int = 0
+    pages: int = 0
+    dropped: int = 0
+    skipped: List[Tuple[str, str]] = field(default_factory=list)   # (input, reason)
+
+    def summary(self) -> str:
+        text = f"{self.pages} pages from {self.inputs} inputs"
+        if self.dropped:
+            text += f", {self.dropped} blank pages dropped"
+        if self.skipped:
+            text += f", {len(self.skipped)} skipped"
+        return text
+
+
+class StreamConverter:
+    """Writes pages for images, PDFs and archives to ``out`` in the order they are added.
+
+    ``cleanup`` is an optional :class:`ScanCleanup` applied to every image
+    page. Inputs that cannot be read are skipped and listed in :attr:`stats`;
+    failing to write the output raises :class:`OutputError`. Call
+    :meth:`close` once to finish the PDF.
+    """
+
+    def __init__(self, out: BinaryIO, layout: Optional[PageLayout] = None, quality: int = 95,
+                 auto_codec: bool = True, order: str = ORDER_NATURAL, cleanup=None,
+                 max_pixels: int = DEFAULT_MAX_PIXELS, memory_limit: int = 512 * MB,
+                 codec_stats: Optional[CodecStats] = None):
+        self.document = ImagePdfDocument(out)
+        self.layout = layout or PageLayout()
+        self.quality = quality
+        self.auto_codec = auto_codec
+        self.order = order
+        self.cleanup = cleanup
+        self.max_pixels = max_pixels
+        self.memory_limit = memory_limit
+        self.codec_stats = codec_stats or CodecStats()
+        self.stats = StreamStats()
+
+    def add(self, path: str) -> None:
+        """Add an image, PDF or archive file, chosen by its extension."""
+        try:
+            if is_archive(path):
+                self.add_archive(path)
+            elif path.lower().endswith('.pdf'):
+                with open(path, 'rb') as fp:
+                    self.add_pdf(fp, path)
+            else:
+                self.add_image(path, path)
+        except (OSError, ValueError) as e:
+            # Missing or unreadable input files (output failures are OutputError)
+            self._skip(path, str(e))
+
+    def add_archive(self, source: Source) -> None:
+        """Add the image and PDF members of a ZIP/CBZ or TAR archive (a path or a stream).
+
+        Damaged members are skipped and the rest of the archive still added.
+        """
+        with ArchiveReader(source, self.order) as archive:
+            try:
+                for name, data in archive:
+                    label = f"{archive.name}:{name}"
+                    if name.lower().endswith('.pdf'):
+                        self.add_pdf(io.BytesIO(data), label)
+                    else:
+                        self.add_image(io.BytesIO(data), label)
+            finally:
+                for name, reason in archive.skipped:
+                    self._skip(f"{archive.name}:{name}" if name else archive.name, reason)
+
+    def add_pdf(self, source: BinaryIO, label: str) -> None:
+        from pypdf import PdfReader
+
+        from .pdf_copier import unlock
+
+        try:
+            reader = PdfReader(source)
+            if not unlock(reader):
+                raise ValueError("password protected")
+            self.stats.pages += len(self.document.add_pdf_pages(reader, outline=True))
+            self.stats.inputs += 1
+        except OutputError:
+            raise
+        except Exception as e:
+            self._skip(label, f"unreadable PDF: {e}")
+
+    def add_image(self, source: Source, label: str) -> None:
+        """Add one page for an image given as a path or an in-memory file."""
+        spilled = None
+        try:
+            img = open_image(source, self.max_pixels)
+            target = self.layout.target_size(*img.size)
+            if needs_tiling(img, self.memory_limit):
+                if not isinstance(source, str):
+                    spilled = _spill(source)
+                    img = open_image(spilled, self.max_pixels)
+                tiled = TiledImage(spilled or source, img, target, self.memory_limit)
+                if not tiled.fits_in_memory():
+                    self.document.add_strip_page(
+                        tiled.iter_encoded_strips(self.quality, self.auto_codec, self.codec_stats),
+                        tiled.size[0], tiled.size[1], self.layout)
+                    self._added()
+                    return
+                img = tiled.assemble()
+            elif target is not None and img.format == "JPEG":
+                # Let libjpeg decode at a reduced DCT scale instead of full size
+                img.draft("RGB", target)
+            if self.cleanup is not None:
+                img = self.cleanup.apply(img)
+                if img is None:
+                    self.stats.dropped += 1
+                    self.stats.inputs += 1
+                    return
+            img = resample_for_layout(img, self.layout)
+            self.document.add_image_page(encode_image(img, self.quality, self.auto_codec, self.codec_stats),
+                                         self.layout)
+            self._added()
+        except OutputError:
+            raise
+        except ImageTooLargeError as e:
+            self._skip(label, str(e))
+        except Exception as e:
+            self._skip(label, f"unreadable image: {e}")
+        finally:
+            if spilled is not None:
+                os.unlink(spilled)
+
+    def _added(self) -> None:
+        self.stats.inputs += 1
+        self.stats.pages += 1
+
+    def _skip(self, label: str, reason: str) -> None:
+        logger.warning(f"Skipped {label}: {reason}")
+        self.stats.skipped.append((label, reason))
+
+    def close(self) -> StreamStats:
+        """Write the page tree and trailer; the output is a complete PDF afterwards."""
+        self.document.close()
+        return self.stats
+
+
+def _spill(data: BinaryIO) -> str:
+    """Copy an in-memory file to a temporary file and return its path."""
+    fd, path = tempfile.mkstemp(suffix='.img')
+    with os.fdopen(fd, 'wb') as fp:
+        data.seek(0)
+        fp.write(data.read())
+    return path
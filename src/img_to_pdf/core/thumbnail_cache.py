@@ -0,0 +1,98 @@
+"""Two-level thumbnail cache: an in-memory LRU in front of an on-disk store.
+
+Thumbnails are kept as small encoded images (PNG bytes), keyed by the source
+path, size and modification time plus the thumbnail size, so an edited file
+gets a new thumbnail and a re-sort or restart never decodes a source again.
+Previews that are expensive to render (HTML) are keyed by content instead, so
+they survive copies and touched files.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from .disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SUFFIX = '.thumb'
+MEMORY_ITEMS = 4096
+
+
+class ThumbnailCache:
+    """Encoded thumbnails, ``memory_items`` in memory and up to ``budget_bytes`` on disk."""
+
+    def __init__(self, directory: str, budget_bytes: int, memory_items: int = MEMORY_ITEMS):
+        self.memory_items = memory_items
+        self.hits = 0
+        self.misses = 0
+        self._memory: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._store = DiskCache(directory, budget_bytes, THUMBNAIL_SUFFIX)
+
+    @staticmethod
+    def key(path: str, size: int) -> Optional[str]:
+        """Cache key for a ``size`` pixel thumbnail of ``path``, or ``None`` if it is unreadable."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        material = f"{os.path.abspath(path)}\0{stat.st_size}\0{stat.st_mtime_ns}\0{size}"
+        return hashlib.sha1(material.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def content_key(path: str, size: int) -> Optional[str]:
+        """Cache key from the contents of ``path``, or ``None`` if it is unreadable."""
+        digest = hashlib.sha1()
+        try:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+        except OSError:
+            return None
+        digest.update(f"\0{size}".encode('ascii'))
+        return digest.hexdigest()
+
+    def load(self) -> None:
+        """Index the on-disk store now rather than on the first lookup."""
+        self._store.load()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return data
+        data = self._store.read(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        with self._lock:
+            self._remember(key, data)
+        if not self._store.available:
+            return
+        try:
+            self._store.write(key, data)
+        except OSError as e:
+            logger.warning(f"Could not store thumbnail {key}: {e}")
+
+    def _remember(self, key: str, data: bytes) -> None:
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        self._store.clear()
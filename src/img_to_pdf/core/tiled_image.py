@@ -0,0 +1,263 @@
+"""Memory-bounded processing of very large images.
+
+Large-format scans are never converted or resampled as a whole. Pixels are
+obtained band by band (decoding only the rows of each band where the file
+layout allows it), converted and downsampled per band, and then either
+assembled into a small page image or encoded as separate horizontal strips.
+"""
+
+import logging
+import math
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+
+from PIL import Image
+
+from .image_analysis import ANALYSIS_SIZE, analyze_image
+from .image_encoder import CodecStats, EncodedImage, encode_image
+
+logger = logging.getLogger(__name__)
+
+# The pixel limit is checked per call by open_image; Pillow's own check reads
+# a process-wide setting that concurrent callers with other limits would race on
+Image.MAX_IMAGE_PIXELS = None
+
+MB = 1024 * 1024
+DEFAULT_MAX_PIXELS = 1_500_000_000      # Hard limit, larger inputs are rejected
+DEFAULT_MEMORY_LIMIT_MB = 512           # Peak pixel memory for one image
+# Largest image decoded in one piece when its layout cannot be read by rows
+# (compressed TIFF, PNG, JPEG at full size): Pillow's own default limit
+FULL_DECODE_MAX_PIXELS = 2 * 89_478_485
+
+STRIP_ALIGN = 16                        # Keeps JPEG MCU rows whole per strip
+ANALYSIS_BANDS = 8                      # Bands sampled over the height to pick the strip codec
+
+# Bits per pixel of uncompressed raster layouts that can be read by rows
+_RAW_BITS = {
+    '1': 1, 'L': 8, 'P': 8, 'RGB': 24, 'BGR': 24, 'RGBX': 32, 'BGRX': 32,
+    'RGBA': 32, 'BGRA': 32, 'CMYK': 32, 'I;16': 16, 'I;16B': 16,
+}
+
+_MODE_BITS = {'1': 1, 'L': 8, 'P': 8, 'LA': 16, 'RGB': 24, 'RGBA': 32, 'CMYK': 32, 'I;16': 16}
+
+
+class ImageTooLargeError(ValueError):
+    """The image exceeds the pixel limit or cannot be processed within memory bounds."""
+
+
+def image_bytes(size: Tuple[int, int], mode: str) -> int:
+    """Approximate memory needed to hold an image of ``size`` in ``mode``."""
+    width, height = size
+    return (width * _MODE_BITS.get(mode, 32) + 7) // 8 * height
+
+
+def open_image(path: Union[str, BinaryIO], max_pixels: int = DEFAULT_MAX_PIXELS) -> Image.Image:
+    """Open an image lazily with the pixel limit as decompression-bomb guard.
+
+    Only the header is read here; decoding happens later, band by band if
+    needed. Inputs above ``max_pixels`` raise :class:`ImageTooLargeError`.
+    """
+    img = Image.open(path)
+    width, height = img.size
+    if width * height > max_pixels:
+        img.close()
+        raise ImageTooLargeError(f"{path}: {width}x{height} exceeds the {max_pixels:,} pixel limit")
+    return img
+
+
+def needs_tiling(img: Image.Image, memory_limit: int) -> bool:
+    """Whether converting ``img`` to RGB in one piece would exceed the bound."""
+    return image_bytes(img.size, 'RGB') > memory_limit
+
+
+def _raw_row_stride(tile) -> Optional[int]:
+    """Row stride in bytes of a single uncompressed tile, if it is known."""
+    args = tile.args if isinstance(tile.args, tuple) else (tile.args,)
+    rawmode = args[0]
+    stride = args[1] if len(args) > 1 else 0
+    if stride:
+        return stride
+    bits = _RAW_BITS.get(rawmode) or _RAW_BITS.get(rawmode.split(';')[0])
+    if bits is None:
+        return None
+    width = tile.extents[2] - tile.extents[0]
+    return (width * bits + 7) // 8
+
+
+def _can_decode_bands(img: Image.Image) -> bool:
+    tiles = getattr(img, 'tile', None) or []
+    if not tiles or any(t.codec_name != 'raw' for t in tiles):
+        return False
+    if len(tiles) == 1:
+        return _raw_row_stride(tiles[0]) is not None
+    return True
+
+
+class TiledImage:
+    """A large image processed band by band under a memory bound.
+
+    ``factor`` is the integer downsampling applied per band (box filter), so
+    band edges line up exactly and no seams appear between bands.
+    """
+
+    def __init__(self, path: str, img: Image.Image, target_size: Optional[Tuple[int, int]],
+                 memory_limit: int):
+        self.path = path
+        self.memory_limit = memory_limit
+        self.img = img
+        if target_size is not None and img.format == 'JPEG':
+            # Decode at a reduced DCT scale; this alone often makes it fit
+            img.draft(img.mode, target_size)
+        self.source_size = img.size
+        if target_size is None:
+            self.factor = 1
+        else:
+            self.factor = max(1, math.floor(img.size[0] / float(target_size[0])))
+        width, height = img.size
+        self.size = (math.ceil(width / self.factor), math.ceil(height / self.factor))
+
+        self.band_decoding = _can_decode_bands(img)
+        if not self.band_decoding and image_bytes(img.size, img.mode) > memory_limit // 2:
+            # Only uncompressed layouts can be read by rows; others are decoded
+            # whole (past the bound) up to the size Pillow itself would accept
+            if width * height > FULL_DECODE_MAX_PIXELS:
+                raise ImageTooLargeError(
+                    f"{path}: {width}x{height} {img.format or ''} cannot be decoded within "
+                    f"{memory_limit // MB} MB; save it as an uncompressed TIFF or a JPEG"
+                )
+            logger.info(f"{path}: {width}x{height} {img.format or ''} is decoded whole, "
+                        f"above the {memory_limit // MB} MB bound")
+
+    @property
+    def band_rows(self) -> int:
+        """Source rows per band: a band and its converted copies fit in a quarter of the bound."""
+        row_bytes = image_bytes((self.source_size[0], 1), 'RGB') * 2
+        rows = max(1, (self.memory_limit // 4) // max(1, row_bytes))
+        unit = self.factor * STRIP_ALIGN
+        return max(unit, rows // unit * unit)
+
+    def fits_in_memory(self) -> bool:
+        """Whether the downsampled result can be assembled as one image."""
+        return image_bytes(self.size, 'RGB') <= self.memory_limit // 4
+
+    def _decode_rows(self, y0: int, y1: int) -> Image.Image:
+        """Read and decode source rows ``[y0, y1)`` without touching the others."""
+        img = self.img
+        width, height = img.size
+        tiles = img.tile
+        with open(self.path, 'rb') as fp:
+            if len(tiles) == 1:
+                tile = tiles[0]
+                stride = _raw_row_stride(tile)
+                args = tile.args if isinstance(tile.args, tuple) else (tile.args,)
+                bottom_up = len(args) > 2 and args[2] < 0
+                fp.seek(tile.offset + (height - y1 if bottom_up else y0) * stride)
+                data = fp.read(stride * (y1 - y0))
+                return Image.frombytes(img.mode, (width, y1 - y0), data, 'raw', args[0], stride,
+                                       -1 if bottom_up else 1)
+            band = Image.new(img.mode, (width, y1 - y0))
+            for tile in tiles:
+                x0, ty0, x1, ty1 = tile.extents
+                if ty0 < y0 or ty1 > y1:
+                    continue
+                args = tile.args if isinstance(tile.args, tuple) else (tile.args,)
+                tile_w = x1 - x0
+                stride = args[1] if len(args) > 1 and args[1] else _raw_row_stride(tile)
+                fp.seek(tile.offset)
+                data = fp.read(stride * (ty1 - ty0))
+                part = Image.frombytes(img.mode, (tile_w, ty1 - ty0), data, 'raw', args[0], stride)
+                band.paste(part.crop((0, 0, min(tile_w, width - x0), ty1 - ty0)), (x0, ty0 - y0))
+            return band
+
+    def _band_bounds(self) -> Iterator[Tuple[int, int]]:
+        height = self.source_size[1]
+        step = self.band_rows
+        if self.band_decoding and len(self.img.tile) > 1:
+            # Bands must follow the file's strip/tile rows and stay aligned
+            # to the downsampling factor
+            edges = sorted({t.extents[1] for t in self.img.tile} | {height})
+            start = 0
+            for edge in edges[1:]:
+                if (edge - start >= step and edge % self.factor == 0) or edge == height:
+                    yield start, edge
+                    start = edge
+            return
+        for y0 in range(0, height, step):
+            yield y0, min(height, y0 + step)
+
+    def _source(self) -> Optional[Image.Image]:
+        """The decoded image when bands cannot be read by rows, else None."""
+        if self.band_decoding:
+            return None
+        self.img.load()
+        return self.img
+
+    def _read_band(self, y0: int, y1: int, source: Optional[Image.Image]) -> Image.Image:
+        if source is None:
+            band = self._decode_rows(y0, y1)
+        else:
+            band = source.crop((0, y0, source.size[0], y1))
+        if band.mode not in ('1', 'L', 'RGB'):
+            band = _flatten(band)
+        if self.factor > 1:
+            band = band.convert('L' if band.mode == '1' else band.mode).reduce(self.factor)
+        return band
+
+    def iter_bands(self) -> Iterator[Image.Image]:
+        """Yield converted, downsampled bands from top to bottom."""
+        source = self._source()
+        for y0, y1 in self._band_bounds():
+            yield self._read_band(y0, y1, source)
+
+    def analysis_sample(self, bands: int = ANALYSIS_BANDS) -> Image.Image:
+        """A small image made of bands spread over the full height.
+
+        Each picked band is reduced by nearest-neighbour sampling to a slice
+        of an ``ANALYSIS_SIZE`` square, so classifying the sample weighs the
+        top, middle and bottom of the image alike.
+        """
+        bounds = list(self._band_bounds())
+        count = min(bands, len(bounds))
+        picks = sorted({round(i * (len(bounds) - 1) / max(1, count - 1)) for i in range(count)})
+        source = self._source()
+        width = min(self.size[0], ANALYSIS_SIZE)
+        slice_height = max(1, ANALYSIS_SIZE // len(picks))
+        sample = None
+        for n, index in enumerate(picks):
+            band = self._read_band(*bounds[index], source)
+            part = band.resize((width, slice_height), Image.Resampling.NEAREST)
+            if sample is None:
+                sample = Image.new(part.mode, (width, slice_height * len(picks)))
+            sample.paste(part, (0, n * slice_height))
+        return sample
+
+    def assemble(self) -> Image.Image:
+        """Build the downsampled image from its bands."""
+        result = None
+        y = 0
+        for band in self.iter_bands():
+            if result is None:
+                result = Image.new(band.mode if band.mode != '1' else 'L', self.size, 'white')
+            result.paste(band, (0, y))
+            y += band.size[1]
+        return result
+
+    def iter_encoded_strips(self, quality: int, auto_codec: bool = True,
+                            stats: Optional[CodecStats] = None) -> Iterator[EncodedImage]:
+        """Encode each band as its own strip image.
+
+        The codec is chosen once from :meth:`analysis_sample` and reused for
+        all strips, so they do not visibly differ from each other and the
+        choice reflects the whole image rather than whatever its top holds.
+        """
+        analysis = analyze_image(self.analysis_sample()) if auto_codec else None
+        for band in self.iter_bands():
+            yield encode_image(band, quality, auto_codec, stats, analysis)
+
+
+def _flatten(img: Image.Image) -> Image.Image:
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel('A'))
+        return background
+    return img.convert('RGB')
@@ -0,0 +1,74 @@
+import os
+
+from PyQt6.QtWidgets import QAbstractItemView, QListView
+from PyQt6.QtCore import Qt
+from qfluentwidgets import ListView
+
+from ..core.folder_ingest import INPUT_EXTENSIONS
+from .file_list_model import ROWS_MIME_TYPE
+
+class DropListView(ListView):
+    def __init__(self, onFilesDropped, onRowsMoved=None, *args, onFoldersDropped=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.onFilesDropped = onFilesDropped
+        self.onRowsMoved = onRowsMoved  # Callback(rows, destination) when items reordered by drag
+        self.onFoldersDropped = onFoldersDropped  # Callback(folders) when folders are dropped
+        self.setAcceptDrops(True)
+        self.setDropIndicatorShown(True)
+        # Allow both external file drops AND internal reordering
+        self.setDragDropMode(QAbstractItemView.DragDropMode.DragDrop)
+        self.setDefaultDropAction(Qt.DropAction.MoveAction)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        # Rows all have the same height and are laid out in batches, so
+        # large lists do not measure every row up front
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(200)
+
+    def dragEnterEvent(self, event):
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+        else:
+            # Allow internal drag for reordering
+            super().dragEnterEvent(event)
+
+    def dragMoveEvent(self, event):
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+        else:
+            # Allow internal drag for reordering
+            super().dragMoveEvent(event)
+
+    def dropEvent(self, event):
+        if event.mimeData().hasUrls():
+            # External file drop; folders are walked for files by the owner
+            files = []
+            folders = []
+            for url in event.mimeData().urls():
+                p = url.toLocalFile()
+                if self.onFoldersDropped and os.path.isdir(p):
+                    folders.append(p)
+                elif p.lower().endswith(INPUT_EXTENSIONS):
+                    files.append(p)
+            if files:
+                self.onFilesDropped(files)
+            if folders:
+                self.onFoldersDropped(folders)
+            event.acceptProposedAction()
+        elif event.source() is self and event.mimeData().hasFormat(ROWS_MIME_TYPE):
+            # Internal reorder: the model moves the rows as one layout change
+            rows = [int(r) for r in bytes(event.mimeData().data(ROWS_MIME_TYPE)).decode('ascii').split(',') if r]
+            index = self.indexAt(event.position().toPoint())
+            if not index.isValid():
+                destination = self.model().rowCount()
+            elif self.dropIndicatorPosition() == QAbstractItemView.DropIndicatorPosition.BelowItem:
+                destination = index.row() + 1
+            else:
+                destination = index.row()
+            if self.onRowsMoved:
+                self.onRowsMoved(rows, destination)
+            # Copy, so the view does not also remove the dragged rows
+            event.setDropAction(Qt.DropAction.CopyAction)
+            event.accept()
+        else:
+            super().dropEvent(event)
@@ -0,0 +1,206 @@
+"""List model for the files queued on the home page.
+
+The model presents a :class:`FileCatalog` of queued entries; the view only
+asks for the rows it paints, so adding, sorting or reordering thousands of
+files never rebuilds per-row widgets. Sorts and moves are reported as layout
+changes, and a thumbnail is requested the first time an image or HTML row's
+icon is painted. Files the probe stage flagged as unusable show an error
+icon and the reason in their tooltip.
+"""
+
+import os
+from typing import Callable, Dict, Iterable, List
+
+from PyQt6.QtCore import QAbstractListModel, QMimeData, QModelIndex, Qt, pyqtSignal
+from PyQt6.QtGui import QIcon
+
+from ..core.file_catalog import CatalogEntry, FileCatalog
+
+ROWS_MIME_TYPE = 'application/x-img-to-pdf-rows'
+RESET_RANGES = 32       # Removing more separate ranges than this resets the view instead
+
+
+def item_text(entry: CatalogEntry) -> str:
+    """List label: the file name, plus the page range of PDF inputs."""
+    name = os.path.basename(entry.path)
+    return f"{name} [{entry.pages}]" if entry.pages else name
+
+
+class FileListModel(QAbstractListModel):
+    """The queued entries shown by the file list view.
+
+    ``thumbnail_requested`` is emitted with the path of an image or HTML row
+    the first time the view asks for its icon; answer it with
+    :meth:`set_thumbnail`.
+    """
+
+    thumbnail_requested = pyqtSignal(str)
+
+    def __init__(self, photo_icon: QIcon, document_icon: QIcon, error_icon: QIcon, parent=None):
+        super().__init__(parent)
+        self.photo_icon = photo_icon
+        self.document_icon = document_icon
+        self.error_icon = error_icon
+        self.catalog = FileCatalog()
+        self._thumbnails: Dict[str, QIcon] = {}
+        self._requested = set()
+
+    @property
+    def files(self) -> FileCatalog:
+        return self.catalog
+
+    def contains(self, path: str) -> bool:
+        return path in self.catalog
+
+    def row_of(self, path: str) -> int:
+        return self.catalog.row_of(path)
+
+    # Qt model interface
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.catalog)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.catalog):
+            return None
+        entry = self.catalog[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return item_text(entry)
+        if role == Qt.ItemDataRole.DecorationRole:
+            if entry.problem:
+                return self.error_icon
+            if entry.type in ('pdf', 'archive'):
+                return self.document_icon
+            icon = self._thumbnails.get(entry.path)
+            if icon is not None:
+                return icon
+            if entry.path not in self._requested:
+                # Only rows the view paints get here, so off-screen rows are never decoded
+                self._requested.add(entry.path)
+                self.thumbnail_requested.emit(entry.path)
+            return self.document_icon if entry.type == 'html' else self.photo_icon
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"{entry.path}\n{entry.probe.summary()}" if entry.probe is not None else entry.path
+        if role == Qt.ItemDataRole.UserRole:
+            return entry
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid():
+            return flags | Qt.ItemFlag.ItemIsDragEnabled
+        return flags | Qt.ItemFlag.ItemIsDropEnabled
+
+    def supportedDropActions(self):
+        return Qt.DropAction.MoveAction | Qt.DropAction.CopyAction
+
+    def mimeTypes(self):
+        return [ROWS_MIME_TYPE]
+
+    def mimeData(self, indexes):
+        mime = QMimeData()
+        rows = sorted({index.row() for index in indexes})
+        mime.setData(ROWS_MIME_TYPE, ','.join(map(str, rows)).encode('ascii'))
+        return mime
+
+    # Edits
+
+    def add_paths(self, paths: Iterable[str]) -> List[CatalogEntry]:
+        """Append the ``paths`` not queued yet and return their new entries."""
+        entries = self.catalog.new_entries(paths)
+        if entries:
+            first = len(self.catalog)
+            self.beginInsertRows(QModelIndex(), first, first + len(entries) - 1)
+            self.catalog.extend(entries)
+            self.endInsertRows()
+        return entries
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self.catalog.clear()
+        self._thumbnails.clear()
+        self._requested.clear()
+        self.endResetModel()
+
+    def remove_rows(self, rows: Iterable[int]) -> None:
+        """Remove ``rows``: one contiguous range at a time from the bottom up, or in one pass."""
+        ranges = self.catalog.row_ranges(row for row in rows if 0 <= row < len(self.catalog))
+        if len(ranges) > RESET_RANGES:
+            self.beginResetModel()
+            removed = self.catalog.remove_rows(row for first, last in ranges for row in range(first, last + 1))
+            self._forget(removed)
+            self.endResetModel()
+            return
+        for first, last in ranges:
+            self.beginRemoveRows(QModelIndex(), first, last)
+            self._forget(self.catalog.remove_rows(range(first, last + 1)))
+            self.endRemoveRows()
+
+    def removeRows(self, row: int, count: int, parent: QModelIndex = QModelIndex()) -> bool:
+        """Qt's removal entry point; drops the rows' thumbnails with them."""
+        if parent.isValid() or count <= 0 or row < 0 or row + count > len(self.catalog):
+            return False
+        self.remove_rows(range(row, row + count))
+        return True
+
+    def _forget(self, entries: Iterable[CatalogEntry]) -> None:
+        for entry in entries:
+            self._thumbnails.pop(entry.path, None)
+            self._requested.discard(entry.path)
+
+    def sort_files(self, key: Callable[[CatalogEntry], object]) -> None:
+        self._reorder(self.catalog.sorted_order(key))
+
+    def move_rows(self, rows: Iterable[int], destination: int) -> List[int]:
+        """Move ``rows`` (in their current order) before ``destination``; return their new rows.
+
+        A contiguous block is moved as such; scattered rows are gathered in a
+        layout change.
+        """
+        rows = [row for row in rows if 0 <= row < len(self.catalog)]
+        destination = max(0, min(destination, len(self.catalog)))
+        ranges = self.catalog.row_ranges(rows)
+        if len(ranges) == 1:
+            first, last = ranges[0]
+            if first <= destination <= last + 1:
+                return list(range(first, last + 1))
+            self.beginMoveRows(QModelIndex(), first, last, QModelIndex(), destination)
+            new_first = self.catalog.move_block(first, last, destination)
+            self.endMoveRows()
+            return list(range(new_first, new_first + last - first + 1))
+        order, new_rows = self.catalog.moved_order(rows, destination)
+        if new_rows:
+            self._reorder(order)
+        return new_rows
+
+    def _reorder(self, order: List[int]) -> None:
+        """Apply a permutation (``order[new_row] == old_row``) as a layout change."""
+        self.layoutAboutToBeChanged.emit()
+        new_rows = [0] * len(order)
+        for new_row, old_row in enumerate(order):
+            new_rows[old_row] = new_row
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(
+            persistent, [self.index(new_rows[index.row()]) for index in persistent])
+        self.catalog.reorder(order)
+        self.layoutChanged.emit()
+
+    def update_row(self, row: int) -> None:
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+    def update_entries(self, entries: Iterable[CatalogEntry]) -> None:
+        """Repaint the rows of ``entries`` (one change covering all of them)."""
+        rows = [row for row in (self.row_of(entry.path) for entry in entries) if row >= 0]
+        if rows:
+            self.dataChanged.emit(self.index(min(rows)), self.index(max(rows)))
+
+    def set_thumbnail(self, path: str, icon: QIcon) -> None:
+        if path not in self._requested:
+            # Removed from the list while the thumbnail was loading
+            return
+        self._thumbnails[path] = icon
+        row = self.row_of(path)
+        if row >= 0:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
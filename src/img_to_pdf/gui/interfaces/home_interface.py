@@ -1,72 +1,67 @@
+import logging
 import os
 import threading
+import time
 import tempfile
+from functools import partial
 from PIL import Image
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QFileDialog, QListWidgetItem, QApplication
-from PyQt6.QtCore import Qt, pyqtSignal, QThreadPool, QRunnable, QObject
-from PyQt6.QtGui import QIcon, QPixmap, QImage, QImageReader
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QFileDialog, QInputDialog, QApplication
+from PyQt6.QtCore import Qt, pyqtSignal, QObject
+from PyQt6.QtGui import QIcon, QPixmap
 
 from qfluentwidgets import (
     PrimaryPushButton, PushButton, ComboBox, CheckBox, LineEdit,
     InfoBar, InfoBarPosition, SubtitleLabel, BodyLabel, isDarkTheme,
-    HyperlinkButton, FluentIcon, TextEdit
+    HyperlinkButton, FluentIcon, InfoBarIcon, TextEdit
 )
 
-from ...utils.drop_list_widget import DropListWidget
+from ..drop_list_view import DropListView
 from ...core.config_manager import ConfigManager
 from ...core.language_manager import LanguageManager
 from ...core.theme_manager import ThemeManager
+from ...core.html_preview import HtmlPreviewRenderer
 from ...core.html_to_pdf_converter import HtmlToPdfConverter
+from ...core.executors import BATCH_CPU, BATCH_IO, BROWSER, INTERACTIVE, Executors, cancel_and_wait, lower_thread_priority
+from ...core.file_catalog import CatalogEntry
+from ...core.folder_ingest import FolderIngest
+from ...core.folder_watcher import FolderWatcher
+from ...core.file_probe import probe_entries, probe_entry
+from ...core.file_metadata import MetadataIndex, natural_key, read_taken_dates
+from ...core.fanout import FanOutEncoder, OutputProfile, resample_for_layout
+from ...core.image_encoder import CodecStats, encode_image
+from ...core.output_files import copy_into_place, move_into_place, partial_path, unique_output_paths
+from ...core.page_cache import EncodedPage, PageCache
+from ...core.page_layout import PAGE_FIT, PageLayout
+from ...core.page_ranges import parse_page_range
+from ...core.pdf_append import PdfAppender
+from ...core.pdf_linearizer import linearize_pdf
+from ...core.parallel_merge import MergeCancelled, MergeInput, ParallelMerger
+from ...core.pdf_optimizer import optimize_pdf
+from ...core.pdf_volumes import VolumeWriter
+from ...core.scan_cleanup import ScanCleanup
+from ...core.stream_convert import StreamConverter
+from ...core.thumbnail_cache import ThumbnailCache
+from ...core.pdf_writer import ImagePdfDocument, OutputError
+from ...core.tiled_image import MB, ImageTooLargeError, TiledImage, needs_tiling, open_image
+from ..file_list_model import FileListModel
 from ..icons import Icons
+from ..thumbnail_scheduler import HtmlPreviewJob, ThumbnailScheduler
 
-class ThumbnailSignals(QObject):
-    loaded = pyqtSignal(object, QImage)
+# Sort combo entries; new keys are appended so the indices stay stable
+SORT_NAME, SORT_MTIME, SORT_CTIME, SORT_SIZE, SORT_NATURAL, SORT_TAKEN = range(6)
 
-class ThumbnailRunnable(QRunnable):
-    def __init__(self, path, item):
-        super().__init__()
-        self.path = path
-        self.item = item
-        self.signals = ThumbnailSignals()
-
-    def run(self):
-        try:
-            reader = QImageReader(self.path)
-            reader.setAutoTransform(True)
-            # Read image
-            img = reader.read()
-            if not img.isNull():
-                # Scale in thread to save main thread time
-                img = img.scaled(64, 64, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                self.signals.loaded.emit(self.item, img)
-        except Exception:
-            pass
+logger = logging.getLogger(__name__)
 
 class SortSignals(QObject):
-    finished = pyqtSignal(list)
+    metadata_loaded = pyqtSignal(int)  # sort generation
 
-class SortRunnable(QRunnable):
-    def __init__(self, files, sort_index):
-        super().__init__()
-        self.files = files[:] # Copy list
-        self.sort_index = sort_index
-        self.signals = SortSignals()
+class ProbeSignals(QObject):
+    probed = pyqtSignal(list)  # Catalog entries whose probe finished
 
-    def run(self):
-        try:
-            # 0: Name, 1: MTime, 2: CTime, 3: Size
-            if self.sort_index == 0:
-                self.files.sort(key=lambda x: os.path.basename(x).lower())
-            elif self.sort_index == 1:
-                self.files.sort(key=lambda x: os.path.getmtime(x))
-            elif self.sort_index == 2:
-                self.files.sort(key=lambda x: os.path.getctime(x))
-            elif self.sort_index == 3:
-                self.files.sort(key=lambda x: os.path.getsize(x))
-            
-            self.signals.finished.emit(self.files)
-        except Exception:
-            self.signals.finished.emit(self.files)
+class IngestSignals(QObject):
+    batch = pyqtSignal(list)  # Paths found by a folder walk
+    finished = pyqtSignal(object)  # IngestStats
+    failed = pyqtSignal(str)  # Why the walk stopped early
 
 class ConversionSignals(QObject):
     finished = pyqtSignal(str)
@@ -81,12 +76,60 @@ class HomeInterface(QWidget):
         self.config = config
         self.lang = lang
         self.setObjectName("HomeInterface")
-        self.image_files = []  # List of dicts: {'path': str, 'type': 'image'|'html'}
+        # Queued files, in list order; see image_files
+        self.file_model = FileListModel(Icons.photo().icon(), FluentIcon.DOCUMENT.icon(), InfoBarIcon.ERROR.icon(), self)
         self.output_path = "C:/KavPDF/"
-        self.thread_pool = QThreadPool.globalInstance()
+        self.executors = Executors(config.get_executor_workers())
+        self.thumbnail_cache = ThumbnailCache(str(config.config_dir / 'thumbnails'),
+                                              config.get_thumbnail_cache_mb() * MB)
+        # Index the on-disk thumbnails off the UI thread
+        self.executors.get(BATCH_IO).submit(self.thumbnail_cache.load)
+        self.thumbnails = ThumbnailScheduler(self.executors.get(INTERACTIVE), self.thumbnail_cache, parent=self)
+        self.thumbnails.loaded.connect(self.on_thumbnail_loaded)
+        # HTML previews need a headless browser, so they run on the browser executor
+        self.html_previews = HtmlPreviewRenderer()
+        self.html_thumbnails = ThumbnailScheduler(self.executors.get(BROWSER), self.thumbnail_cache,
+                                                  job_factory=partial(HtmlPreviewJob, renderer=self.html_previews),
+                                                  parent=self)
+        self.html_thumbnails.loaded.connect(self.on_thumbnail_loaded)
         self.is_converting = False
         self.cancel_event = threading.Event()
         self.temp_pdf_files = []  # Track temporary PDF files from HTML conversion
+        # Created per conversion from the settings; None when switched off
+        self.scan_cleanup = None
+        self.page_cache = None
+        
+        self.file_model.thumbnail_requested.connect(self.request_thumbnail)
+        self.file_model.rowsInserted.connect(self.update_empty_hint)
+        self.file_model.rowsRemoved.connect(self.update_empty_hint)
+        self.file_model.modelReset.connect(self.update_empty_hint)
+        self.file_model.layoutChanged.connect(self.prioritize_visible_thumbnails)
+        
+        self.metadata_index = MetadataIndex()
+        self.sort_generation = 0
+        self.sort_signals = SortSignals()
+        self.sort_signals.metadata_loaded.connect(self.on_sort_metadata_loaded)
+        
+        # Header probe of newly added files: chunks still running and files flagged so far
+        self.probe_pending = 0
+        self.probe_flagged = 0
+        self.probe_signals = ProbeSignals()
+        self.probe_signals.probed.connect(self.on_probed)
+        
+        # Folder walk in progress, if any, and folders dropped while it runs
+        self.ingest = None
+        self.ingest_added = 0
+        self.queued_folders = []
+        self.ingest_signals = IngestSignals()
+        self.ingest_signals.batch.connect(self.on_ingest_batch)
+        self.ingest_signals.finished.connect(self.on_ingest_finished)
+        self.ingest_signals.failed.connect(self.on_ingest_failed)
+        
+        # Watch mode: the folder watcher and the settings captured when it started
+        self.watcher = None
+        self.watch_settings = None
+        self.watch_out_dir = None
+        self.watch_target = None  # Rolling PDF, or None for one PDF per file
         
         self.conversion_signals = ConversionSignals()
         self.conversion_signals.finished.connect(self.on_conversion_complete)
@@ -96,6 +139,11 @@ class HomeInterface(QWidget):
         self.setup_ui()
         self.update_texts()
 
+    @property
+    def image_files(self):
+        """Queued files in list order: a FileCatalog of entries with a path, type and optional page range."""
+        return self.file_model.files
+
     # ... (skipping unchanged methods) ...
 
 
@@ -103,16 +151,39 @@ class HomeInterface(QWidget):
     # ... (skipping unchanged methods) ...
 
     def perform_conversion(self, target_path, method, files, html_to_pdf_map):
+        # Batch work yields to the UI and to the rest of the system
+        lower_thread_priority()
         try:
             quality = self.get_quality_setting()
+            auto_codec = self.config.get_auto_codec()
+            codec_stats = CodecStats()
+            self.scan_cleanup = self.create_scan_cleanup()
+            self.page_cache = self.create_page_cache()
+            layout = self.get_page_layout()
+            
+            # Files the probe flagged would only fail later on
+            for file_obj in files:
+                if file_obj.problem:
+                    self.conversion_signals.progress.emit(self.lang.t(
+                        "log_skipped_invalid", file=os.path.basename(file_obj.path), reason=file_obj.problem))
+            files = [file_obj for file_obj in files if not file_obj.problem]
+            
+            # Archives are converted member by member into temp PDFs, which
+            # every method then handles like rendered HTML
+            render_dir = target_path if method == 0 and not self.config.get_fanout_enabled() else None
+            for file_obj in files:
+                if file_obj['type'] == 'archive' and not self.cancel_event.is_set():
+                    pdf_path = self.render_archive(file_obj['path'], render_dir, layout, quality, auto_codec, codec_stats)
+                    if pdf_path:
+                        html_to_pdf_map[file_obj['path']] = pdf_path
             
-            # Build list of files to process (replacing HTML with their temp PDFs)
+            # Build list of files to process (replacing HTML and archives with their temp PDFs)
             files_to_process = []
             for file_obj in files:
                 path = file_obj['path']
                 file_type = file_obj['type']
                 
-                if file_type == 'html':
+                if file_type in ('html', 'archive'):
                     # Use pre-converted PDF if available
                     if path in html_to_pdf_map:
                         files_to_process.append({'path': html_to_pdf_map[path], 'type': 'pdf'})
@@ -125,108 +196,472 @@ class HomeInterface(QWidget):
                 return
             
             # Step 2: Process based on method
-            if method == 1:  # All in one
-                # Process files in original order to maintain sequence
-                all_pdfs_in_order = []
-                
-                for file_obj in files_to_process:
-                    if self.cancel_event.is_set():
-                        self._cleanup_temp_files()
-                        self.conversion_signals.failed.emit("Conversion cancelled")
-                        return
-                    
-                    path = file_obj['path']
-                    file_type = file_obj['type']
-                    
-                    # If it's already a PDF (HTML converted), use directly
-                    if file_type == 'pdf' or path.lower().endswith('.pdf'):
-                        all_pdfs_in_order.append(path)
-                    else:
-                        # Convert image to temporary PDF
-                        try:
-                            img = self.process_image(path)
-                            temp_pdf = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-                            temp_pdf.close()
-                            temp_pdf_path = temp_pdf.name
-                            self.temp_pdf_files.append(temp_pdf_path)
-                            
-                            img.save(temp_pdf_path, "PDF", quality=quality)
-                            all_pdfs_in_order.append(temp_pdf_path)
-                        except Exception as e:
-                            print(f"Failed to convert image {path}: {e}")
-                
+            if self.config.get_fanout_enabled() and method != 2:
+                self.convert_profiles(target_path, files, html_to_pdf_map)
+            elif method == 1 and (self.config.get_volume_size_mb() or self.config.get_volume_max_pages()):
+                self.merge_into_volumes(target_path, files_to_process, layout, quality, auto_codec, codec_stats)
+            elif method == 1 and self.use_chunked_merge(files_to_process):
+                self.merge_in_chunks(target_path, files_to_process, layout, quality, auto_codec, codec_stats)
+            elif method == 1:  # All in one
+                self.merge_all_in_one(target_path, files_to_process, layout, quality, auto_codec, codec_stats)
+            elif method == 2:  # Append to an existing PDF
+                self.append_to_pdf(target_path, files_to_process, layout, quality, auto_codec, codec_stats)
+            else:  # One by one
+                self.convert_one_by_one(target_path, files, html_to_pdf_map, layout, quality, auto_codec, codec_stats)
+        
+        except Exception as e:
+            self._cleanup_temp_files()
+            self.conversion_signals.failed.emit(str(e))
+    
+    def convert_profiles(self, out_dir, files, html_to_pdf_map):
+        """Produce every configured output profile, decoding each image once."""
+        from pypdf import PdfReader
+
+        profiles = [OutputProfile.from_dict(p) for p in self.config.get_output_profiles()]
+        job_name = os.path.splitext(os.path.basename(files[0]['path']))[0] if files else "output"
+        memory_limit = self.tile_memory_limit()
+        encoder = None
+        try:
+            encoder = FanOutEncoder.for_profiles(profiles, out_dir, job_name, [f['path'] for f in files])
+            for file_obj in files:
                 if self.cancel_event.is_set():
+                    encoder.abort()
                     self._cleanup_temp_files()
                     self.conversion_signals.failed.emit("Conversion cancelled")
                     return
-                
-                # Merge all PDFs in order using pypdf
-                if all_pdfs_in_order:
-                    try:
-                        from pypdf import PdfWriter
-                        
-                        merger = PdfWriter()
-                        for pdf_path in all_pdfs_in_order:
-                            if self.cancel_event.is_set():
-                                self._cleanup_temp_files()
-                                self.conversion_signals.failed.emit("Conversion cancelled")
-                                return
-                            
-                            try:
-                                merger.append(pdf_path)
-                            except Exception as e:
-                                print(f"Failed to merge {pdf_path}: {e}")
-                        
-                        # Write merged PDF
-                        merger.write(target_path)
-                        merger.close()
-                        
-                        self._cleanup_temp_files()
-                        self.conversion_signals.finished.emit(target_path)
-                    except Exception as e:
-                        self._cleanup_temp_files()
-                        self.conversion_signals.failed.emit(f"Merge failed: {str(e)}")
-                else:
+
+                path = file_obj['path']
+                try:
+                    if file_obj['type'] in ('html', 'archive'):
+                        if path in html_to_pdf_map:
+                            encoder.add_pdf(path, PdfReader(html_to_pdf_map[path]))
+                        continue
+                    if file_obj['type'] == 'pdf' or path.lower().endswith('.pdf'):
+                        reader = PdfReader(path)
+                        encoder.add_pdf(path, reader, self.selected_pages(file_obj, reader))
+                        continue
+                    img = open_image(path, self.config.get_max_image_pixels())
+                    draft = encoder.draft_size(img.size)
+                    if needs_tiling(img, memory_limit):
+                        tiled = TiledImage(path, img, draft, memory_limit)
+                        if not tiled.fits_in_memory():
+                            raise ImageTooLargeError(f"{path}: too large to share between output profiles")
+                        img = tiled.assemble()
+                    elif draft is not None and img.format == "JPEG":
+                        img.draft("RGB", draft)
+                    if self.scan_cleanup is not None:
+                        img = self.scan_cleanup.apply(img)
+                        if img is None:
+                            continue
+                    encoder.add_image(path, img)
+                except OutputError:
+                    raise
+                except Exception as e:
+                    self.report_skipped(path, e)
+            paths = encoder.close()
+        except Exception as e:
+            if encoder is not None:
+                encoder.abort()
+            self._cleanup_temp_files()
+            self.conversion_signals.failed.emit(f"Conversion failed: {str(e)}")
+            return
+
+        self._cleanup_temp_files()
+        for path in paths:
+            self.linearize_output(path)
+        self._report_cleanup_stats()
+        for output in encoder.outputs:
+            self.conversion_signals.progress.emit(self.lang.t(
+                "log_profile_done", profile=output.profile.name, count=len(output.paths),
+                stats=output.stats.summary()))
+        if paths:
+            self.conversion_signals.finished.emit(out_dir)
+        else:
+            self.conversion_signals.failed.emit("No valid files to convert")
+
+    def convert_one_by_one(self, out_dir, files, html_to_pdf_map, layout, quality, auto_codec, codec_stats):
+        """Convert each input to its own PDF on a bounded worker pool.
+
+        Same-named inputs get distinct output names, and every output is
+        written under a temporary name and renamed into place when done.
+        Images are encoded on the batch CPU executor; PDF and rendered HTML
+        inputs only need copying or renaming and go to the batch I/O one.
+        The tile memory budget is split between the image workers.
+        """
+        save_paths = unique_output_paths([f['path'] for f in files], out_dir)
+        memory_limit = self.tile_memory_limit(self.executors.get(BATCH_CPU))
+        futures = [
+            (file_obj['path'], self.executors.get(BATCH_CPU if file_obj['type'] == 'image' else BATCH_IO).submit(
+                self.convert_one, file_obj, save_paths[file_obj['path']],
+                html_to_pdf_map, layout, quality, auto_codec, codec_stats, memory_limit))
+            for file_obj in files
+        ]
+        count = 0
+        for path, future in futures:
+            if self.cancel_event.is_set():
+                cancel_and_wait(future for _, future in futures)
+                self._cleanup_temp_files()
+                self.conversion_signals.failed.emit("Conversion cancelled")
+                return
+            try:
+                if future.result():
+                    count += 1
+            except Exception as e:
+                self.report_skipped(path, e)
+
+        self._cleanup_temp_files()
+        if count > 0:
+            self._report_codec_stats(codec_stats)
+            self._report_cleanup_stats()
+            self._report_cache_stats()
+            self._report_executor_stats()
+            self.conversion_signals.finished.emit(out_dir)
+        else:
+            self.conversion_signals.failed.emit("No valid files to convert")
+
+    def convert_one(self, file_obj, save_path, html_to_pdf_map, layout, quality, auto_codec, codec_stats,
+                    memory_limit=None):
+        """Write one input to ``save_path``; runs on a worker thread."""
+        if self.cancel_event.is_set():
+            return False
+        path = file_obj['path']
+        file_type = file_obj['type']
+        if file_type in ('html', 'archive'):
+            if path not in html_to_pdf_map:
+                return False
+            # Rendered next to the output, so this is a rename rather than a copy
+            move_into_place(html_to_pdf_map[path], save_path)
+        elif file_type == 'pdf':
+            self.save_pdf_pages(file_obj, save_path)
+        else:
+            page = self.encode_page(path, layout, quality, auto_codec, codec_stats, memory_limit)
+            if page is None:
+                return False
+            self.save_page_pdf(page, save_path, layout)
+        self.linearize_output(save_path)
+        return True
+
+    def merge_all_in_one(self, target_path, files_to_process, layout, quality, auto_codec, codec_stats):
+        """Stream every page into ``target_path``.
+
+        Image pages are encoded straight into the output and pages of PDF
+        inputs are copied one at a time with their streams left encoded, so
+        memory does not grow with the page count. The file is written under
+        a temporary name and only replaces ``target_path`` when complete.
+        """
+        from pypdf import PdfReader
+
+        partial_path = target_path + '.part'
+        fp = open(partial_path, 'wb')
+        try:
+            document = ImagePdfDocument(fp)
+            for file_obj in files_to_process:
+                if self.cancel_event.is_set():
+                    fp.close()
+                    os.unlink(partial_path)
                     self._cleanup_temp_files()
-                    self.conversion_signals.failed.emit("No valid files to convert")
-            else:  # One by one
-                count = 0
-                for i, file_obj in enumerate(files):
-                    if self.cancel_event.is_set():
-                        self._cleanup_temp_files()
-                        self.conversion_signals.failed.emit("Conversion cancelled")
-                        return
-                    
-                    path = file_obj['path']
-                    file_type = file_obj['type']
-                    name = os.path.splitext(os.path.basename(path))[0]
-                    save_path = os.path.join(target_path, f"{name}.pdf")
-                    
-                    try:
-                        if file_type == 'html':
-                            # HTML already converted to PDF, copy it
-                            import shutil
-                            if path in html_to_pdf_map:
-                                shutil.copy(html_to_pdf_map[path], save_path)
-                                count += 1
-                        else:
-                            # Convert image to PDF
-                            img = self.process_image(path)
-                            img.save(save_path, "PDF", quality=quality)
-                            count += 1
-                    except Exception as e:
-                        print(f"Failed to convert {path}: {e}")
-                
+                    self.conversion_signals.failed.emit("Conversion cancelled")
+                    return
+
+                path = file_obj['path']
+                try:
+                    if file_obj['type'] == 'pdf' or path.lower().endswith('.pdf'):
+                        reader = PdfReader(path)
+                        document.add_pdf_pages(reader, self.selected_pages(file_obj, reader), outline=True)
+                    else:
+                        page = self.encode_page(path, layout, quality, auto_codec, codec_stats)
+                        if page is None:
+                            continue
+                        self.add_encoded_page(document, page, layout)
+                except OutputError:
+                    raise
+                except Exception as e:
+                    self.report_skipped(path, e)
+            pages = len(document.page_refs)
+            if pages:
+                document.close()
+            fp.close()
+            if not pages:
+                os.unlink(partial_path)
                 self._cleanup_temp_files()
-                if count > 0:
-                    self.conversion_signals.finished.emit(target_path)
-                else:
-                    self.conversion_signals.failed.emit("No valid files to convert")
-        
+                self.conversion_signals.failed.emit("No valid files to convert")
+                return
+            os.replace(partial_path, target_path)
+
+            self.optimize_output(target_path)
+            self.linearize_output(target_path)
         except Exception as e:
+            fp.close()
+            if os.path.exists(partial_path):
+                os.unlink(partial_path)
             self._cleanup_temp_files()
-            self.conversion_signals.failed.emit(str(e))
-    
+            self.conversion_signals.failed.emit(f"Merge failed: {str(e)}")
+            return
+
+        self._cleanup_temp_files()
+        self._report_codec_stats(codec_stats)
+        self._report_cleanup_stats()
+        self._report_cache_stats()
+        self._report_executor_stats()
+        self.conversion_signals.finished.emit(target_path)
+
+    def merge_in_chunks(self, target_path, files_to_process, layout, quality, auto_codec, codec_stats):
+        """Merge a large job with the hierarchical parallel merger.
+
+        Images are first encoded into one-page PDFs on the batch CPU
+        executor, then all inputs are merged chunk by chunk in worker
+        processes and the chunks are stitched into ``target_path`` in order.
+        """
+        import shutil
+
+        workdir = tempfile.mkdtemp(prefix='img_to_pdf_')
+        partial_path = target_path + '.part'
+        pool = self.executors.get(BATCH_CPU)
+        memory_limit = self.tile_memory_limit(pool)
+        futures = []
+        try:
+            futures = [
+                (file_obj['path'], pool.submit(self.prepare_merge_input, file_obj, os.path.join(workdir, f"{i:06d}.pdf"),
+                                               layout, quality, auto_codec, codec_stats, memory_limit))
+                for i, file_obj in enumerate(files_to_process)
+            ]
+            inputs = []
+            for path, future in futures:
+                if self.cancel_event.is_set():
+                    raise MergeCancelled()
+                try:
+                    merge_input = future.result()
+                except OutputError:
+                    raise
+                except Exception as e:
+                    self.report_skipped(path, e)
+                    continue
+                if merge_input is not None:
+                    inputs.append(merge_input)
+            if not inputs:
+                self._cleanup_temp_files()
+                self.conversion_signals.failed.emit("No valid files to convert")
+                return
+
+            merger = ParallelMerger(self.config.get_merge_chunk_size(), self.config.get_merge_workers(),
+                                    self.cancel_event)
+            report = merger.merge(inputs, partial_path)
+            os.replace(partial_path, target_path)
+            self.conversion_signals.progress.emit(self.lang.t("log_merge_stats", stats=report.summary()))
+
+            self.optimize_output(target_path)
+            self.linearize_output(target_path)
+        except MergeCancelled:
+            self._cleanup_temp_files()
+            self.conversion_signals.failed.emit("Conversion cancelled")
+            return
+        except Exception as e:
+            self._cleanup_temp_files()
+            self.conversion_signals.failed.emit(f"Merge failed: {str(e)}")
+            return
+        finally:
+            cancel_and_wait(future for _, future in futures)
+            shutil.rmtree(workdir, ignore_errors=True)
+            if os.path.exists(partial_path):
+                os.unlink(partial_path)
+
+        self._cleanup_temp_files()
+        self._report_codec_stats(codec_stats)
+        self._report_cleanup_stats()
+        self._report_cache_stats()
+        self._report_executor_stats()
+        self.conversion_signals.finished.emit(target_path)
+
+    def use_chunked_merge(self, files_to_process):
+        """Whether a job is large enough, and the machine has the cores, for a chunked merge."""
+        chunk_size = self.config.get_merge_chunk_size()
+        workers = self.config.get_merge_workers() or os.cpu_count() or 1
+        return 0 < chunk_size < len(files_to_process) and workers > 1
+
+    def prepare_merge_input(self, file_obj, page_path, layout, quality, auto_codec, codec_stats, memory_limit=None):
+        """Merge input for one file, encoding images to ``page_path``; runs on a worker thread."""
+        if self.cancel_event.is_set():
+            return None
+        path = file_obj['path']
+        if file_obj['type'] == 'pdf' or path.lower().endswith('.pdf'):
+            from pypdf import PdfReader
+            # Opened here so a broken PDF is skipped rather than failing its whole chunk
+            reader = PdfReader(path)
+            if not reader.pages:
+                return None
+            return MergeInput(path, self.selected_pages(file_obj, reader) if file_obj.get('pages') else None)
+        page = self.encode_page(path, layout, quality, auto_codec, codec_stats, memory_limit)
+        if page is None:
+            return None
+        self.save_page_pdf(page, page_path, layout)
+        return MergeInput(page_path)
+
+    def merge_into_volumes(self, target_path, files_to_process, layout, quality, auto_codec, codec_stats):
+        """Stream all pages into size-capped volume files next to ``target_path``."""
+        from pypdf import PdfReader
+
+        volumes = VolumeWriter(target_path, self.config.get_volume_size_mb() * MB,
+                               self.config.get_volume_max_pages())
+        try:
+            for file_obj in files_to_process:
+                if self.cancel_event.is_set():
+                    volumes.abort()
+                    self._cleanup_temp_files()
+                    self.conversion_signals.failed.emit("Conversion cancelled")
+                    return
+
+                path = file_obj['path']
+                source = os.path.basename(path)
+                try:
+                    if file_obj['type'] == 'pdf' or path.lower().endswith('.pdf'):
+                        reader = PdfReader(path)
+                        volumes.add_pdf_pages(reader, source, self.selected_pages(file_obj, reader))
+                    else:
+                        page = self.encode_page(path, layout, quality, auto_codec, codec_stats)
+                        if page is None:
+                            continue
+                        if page.strips:
+                            volumes.add_strip_page(page.images, page.size[0], page.size[1], layout, source)
+                        else:
+                            volumes.add_image_page(next(iter(page.images)), layout, source)
+                except OutputError:
+                    raise
+                except Exception as e:
+                    self.report_skipped(path, e)
+            written = volumes.close()
+        except Exception as e:
+            volumes.abort()
+            self._cleanup_temp_files()
+            self.conversion_signals.failed.emit(f"Merge failed: {str(e)}")
+            return
+
+        self._cleanup_temp_files()
+        if not any(v.pages for v in written):
+            self.conversion_signals.failed.emit("No valid files to convert")
+            return
+        if self.config.get_linearize_output():
+            # Linearizing adds hint data and could take a volume past its size cap
+            self.conversion_signals.progress.emit(self.lang.t("log_volumes_not_linearized"))
+        for volume in written:
+            if self.config.get_optimize_output():
+                # Only replaces the volume if it got smaller, so the cap still holds
+                optimize_pdf(volume.path)
+            self.conversion_signals.progress.emit(self.lang.t(
+                "log_volume", file=os.path.basename(volume.path), pages=volume.pages,
+                size=f"{os.path.getsize(volume.path) / MB:.1f}"))
+        self._report_codec_stats(codec_stats)
+        self._report_cleanup_stats()
+        self._report_cache_stats()
+        self._report_executor_stats()
+        self.conversion_signals.finished.emit(volumes.index_path)
+
+    def append_to_pdf(self, target_path, files_to_process, layout, quality, auto_codec, codec_stats):
+        """Add pages to the end of ``target_path`` as an incremental update.
+
+        The existing file is not rewritten; if the conversion is cancelled or
+        fails, it is truncated back to its original size.
+        """
+        from pypdf import PdfReader
+
+        start = time.perf_counter()
+        try:
+            appender = PdfAppender(target_path)
+        except Exception as e:
+            self._cleanup_temp_files()
+            self.conversion_signals.failed.emit(f"Cannot append to {target_path}: {e}")
+            return
+        try:
+            for file_obj in files_to_process:
+                if self.cancel_event.is_set():
+                    appender.abort()
+                    self._cleanup_temp_files()
+                    self.conversion_signals.failed.emit("Conversion cancelled")
+                    return
+
+                path = file_obj['path']
+                try:
+                    if file_obj['type'] == 'pdf' or path.lower().endswith('.pdf'):
+                        reader = PdfReader(path)
+                        appender.document.add_pdf_pages(reader, self.selected_pages(file_obj, reader))
+                    else:
+                        page = self.encode_page(path, layout, quality, auto_codec, codec_stats)
+                        if page is None:
+                            continue
+                        self.add_encoded_page(appender.document, page, layout)
+                except OutputError:
+                    raise
+                except Exception as e:
+                    self.report_skipped(path, e)
+
+            pages_added = appender.pages_added
+            appender.close()
+        except Exception as e:
+            appender.abort()
+            self._cleanup_temp_files()
+            self.conversion_signals.failed.emit(f"Append failed: {str(e)}")
+            return
+
+        self._cleanup_temp_files()
+        if not pages_added:
+            self.conversion_signals.failed.emit("No valid files to convert")
+            return
+        self.conversion_signals.progress.emit(self.lang.t(
+            "log_appended", count=pages_added, seconds=f"{time.perf_counter() - start:.2f}"))
+        self._report_codec_stats(codec_stats)
+        self._report_cleanup_stats()
+        self._report_cache_stats()
+        self._report_executor_stats()
+        self.conversion_signals.finished.emit(target_path)
+
+    def report_skipped(self, path, error):
+        """Log an input left out of the conversion; the rest of the job goes on."""
+        logger.warning("Skipped %s: %s", path, error)
+        if isinstance(error, ImageTooLargeError):
+            self.conversion_signals.progress.emit(self.lang.t("log_image_too_large", msg=str(error)))
+        else:
+            self.conversion_signals.progress.emit(self.lang.t(
+                "log_skipped_invalid", file=os.path.basename(path), reason=str(error) or type(error).__name__))
+
+    def optimize_output(self, path):
+        """Run the post-merge optimizer on ``path`` when enabled in settings."""
+        if not self.config.get_optimize_output():
+            return
+        self.conversion_signals.progress.emit(self.lang.t("log_optimizing"))
+        # Object streams would not survive linearizing, so they are not built then
+        report = optimize_pdf(path, object_streams=not self.config.get_linearize_output())
+        self.conversion_signals.progress.emit(self.lang.t("log_optimized", stats=report.summary()))
+
+    def linearize_output(self, path):
+        """Rewrite ``path`` for fast web view when enabled in settings."""
+        if not self.config.get_linearize_output():
+            return
+        report = linearize_pdf(path)
+        self.conversion_signals.progress.emit(self.lang.t(
+            "log_linearized", file=os.path.basename(path), stats=report.summary()))
+
+    def _report_cleanup_stats(self):
+        """Log blank pages dropped and border area trimmed."""
+        cleanup = self.scan_cleanup
+        if cleanup is not None and cleanup.stats.pages:
+            self.conversion_signals.progress.emit(self.lang.t("log_cleanup_stats", stats=cleanup.stats.summary()))
+
+    def _report_cache_stats(self):
+        """Log how many pages were reused from the page cache."""
+        cache = self.page_cache
+        if cache is not None and cache.stats.hits + cache.stats.misses:
+            self.conversion_signals.progress.emit(self.lang.t("log_page_cache", stats=cache.stats.summary()))
+
+    def _report_executor_stats(self):
+        """Log the load of each executor used during the conversion."""
+        for stats in self.executors.stats():
+            if stats.completed:
+                self.conversion_signals.progress.emit(self.lang.t("log_executor_stats", stats=stats.summary()))
+
+    def _report_codec_stats(self, codec_stats):
+        """Log how many pages used each codec and the bytes saved."""
+        if sum(codec_stats.counts.values()):
+            self.conversion_signals.progress.emit(self.lang.t("log_codec_stats", stats=codec_stats.summary()))
+
     def _cleanup_temp_files(self):
         """Clean up temporary PDF files created from HTML conversion."""
         for temp_file in self.temp_pdf_files:
@@ -293,65 +728,6 @@ class HomeInterface(QWidget):
 
     # ... (add_images, add_folder methods remain unchanged) ...
 
-    def add_image_files(self, files):
-        new = [f for f in files if f not in self.image_files]
-        if new:
-            self.image_files.extend(new)
-            self.apply_sort() # Sort immediately after adding
-            InfoBar.success(
-                self.lang.t("images_added_title"), 
-                self.lang.t("images_added_body", n=len(new)), 
-                parent=self, 
-                position=InfoBarPosition.TOP_RIGHT
-            )
-
-    def refresh_list(self):
-        self.listWidget.clear()
-        # Use a default icon while loading
-        default_icon = Icons.photo()
-        
-        for f in self.image_files:
-            item = QListWidgetItem(os.path.basename(f))
-            item.setIcon(default_icon)
-            self.listWidget.addItem(item)
-            
-            # Load thumbnail async
-            worker = ThumbnailRunnable(f, item)
-            worker.signals.loaded.connect(self.on_thumbnail_loaded)
-            self.thread_pool.start(worker)
-            
-        self.emptyHint.setVisible(len(self.image_files) == 0)
-
-    def on_thumbnail_loaded(self, item, image):
-        # Check if item is still valid (attached to a list widget)
-        if item.listWidget() is not None:
-            icon = QIcon(QPixmap.fromImage(image))
-            item.setIcon(icon)
-
-    def apply_sort(self):
-        """Sort image files based on current selection and refresh list."""
-        idx = self.sortCombo.currentIndex()
-        
-        # Disable controls while sorting
-        self.set_controls_enabled(False)
-        
-        # Run sort in background
-        worker = SortRunnable(self.image_files, idx)
-        worker.signals.finished.connect(self.on_sort_finished)
-        self.thread_pool.start(worker)
-
-    def on_sort_finished(self, sorted_files):
-        self.image_files = sorted_files
-        self.refresh_list()
-        self.set_controls_enabled(True)
-
-    def set_controls_enabled(self, enabled):
-        self.sortCombo.setEnabled(enabled)
-        self.addImagesBtn.setEnabled(enabled)
-        self.addFolderBtn.setEnabled(enabled)
-        self.clearBtn.setEnabled(enabled)
-        self.convertBtn.setEnabled(enabled)
-
     # ... (browse_output_path, clear_images, convert_images, perform_conversion, process_image, resize_image methods remain unchanged) ...
 
     # ... (rest of methods) ...
@@ -371,8 +747,11 @@ class HomeInterface(QWidget):
         list_h_layout.setContentsMargins(0, 0, 0, 0)
         list_h_layout.setSpacing(10)
         
-        self.listWidget = DropListWidget(self.add_image_files, self.sync_files_from_list, self)
-        list_h_layout.addWidget(self.listWidget)
+        self.listView = DropListView(self.add_image_files, self.move_rows, self, onFoldersDropped=self.ingest_folders)
+        self.listView.setModel(self.file_model)
+        self.listView.doubleClicked.connect(self.edit_page_range)
+        self.listView.verticalScrollBar().valueChanged.connect(self.prioritize_visible_thumbnails)
+        list_h_layout.addWidget(self.listView)
         
         # Control buttons (vertical layout on the right)
         controls = QWidget(self)
@@ -410,9 +789,9 @@ class HomeInterface(QWidget):
         layout.addWidget(self.progressLog)
         
         # Empty Hint
-        # Use a layout on listWidget to center the label perfectly
-        list_layout = QVBoxLayout(self.listWidget)
-        self.emptyHint = SubtitleLabel(self.lang.t("empty_hint"), self.listWidget)
+        # Use a layout on listView to center the label perfectly
+        list_layout = QVBoxLayout(self.listView)
+        self.emptyHint = SubtitleLabel(self.lang.t("empty_hint"), self.listView)
         self.emptyHint.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.emptyHint.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
         
@@ -426,14 +805,17 @@ class HomeInterface(QWidget):
         self.addImagesBtn = PushButton(self.lang.t("add_images"), self)
         self.addFolderBtn = PushButton(self.lang.t("add_folder"), self)
         self.clearBtn = PushButton(self.lang.t("clear_all"), self)
+        self.watchBtn = PushButton(self.lang.t("watch_folder"), self)
         
         self.addImagesBtn.clicked.connect(self.add_images)
         self.addFolderBtn.clicked.connect(self.add_folder)
         self.clearBtn.clicked.connect(self.clear_images)
+        self.watchBtn.clicked.connect(self.toggle_watch)
         
         hb.addWidget(self.addImagesBtn)
         hb.addWidget(self.addFolderBtn)
         hb.addWidget(self.clearBtn)
+        hb.addWidget(self.watchBtn)
         layout.addWidget(buttons)
         
         # Settings Row
@@ -522,6 +904,7 @@ class HomeInterface(QWidget):
         self.addImagesBtn.setText(self.lang.t("add_images"))
         self.addFolderBtn.setText(self.lang.t("add_folder"))
         self.clearBtn.setText(self.lang.t("clear_all"))
+        self.watchBtn.setText(self.lang.t("stop_watching" if self.watcher is not None else "watch_folder"))
         self.browseBtn.setText(self.lang.t("browse"))
         self.convertBtn.setText(self.lang.t("convert"))
         self.cancelBtn.setText(self.lang.t("cancel"))
@@ -538,7 +921,7 @@ class HomeInterface(QWidget):
         
         self.methodCombo.blockSignals(True)
         self.methodCombo.clear()
-        self.methodCombo.addItems([self.lang.t("method_one"), self.lang.t("method_all")])
+        self.methodCombo.addItems([self.lang.t("method_one"), self.lang.t("method_all"), self.lang.t("method_append")])
         self.methodCombo.setCurrentIndex(method_idx if method_idx >= 0 else 1)
         self.methodCombo.blockSignals(False)
         
@@ -559,7 +942,9 @@ class HomeInterface(QWidget):
             self.lang.t("sort_name"),
             self.lang.t("sort_mtime"),
             self.lang.t("sort_ctime"),
-            self.lang.t("sort_size")
+            self.lang.t("sort_size"),
+            self.lang.t("sort_natural"),
+            self.lang.t("sort_taken")
         ])
         self.sortCombo.setCurrentIndex(sort_idx if sort_idx >= 0 else 0)
         self.sortCombo.blockSignals(False)
@@ -580,13 +965,13 @@ class HomeInterface(QWidget):
         border_color = "#404040" if is_dark else "#d0d0d0"
         bg_color = "#202020" if is_dark else "#f9f9f9"
         
-        self.listWidget.setStyleSheet(f"""
-            ListWidget {{
+        self.listView.setStyleSheet(f"""
+            ListView {{
                 border: 2px dashed {border_color};
                 border-radius: 10px;
                 background-color: {bg_color};
             }}
-            ListWidget::item {{
+            ListView::item {{
                 height: 72px;
                 padding: 4px;
             }}
@@ -597,38 +982,312 @@ class HomeInterface(QWidget):
             self, 
             self.lang.t("add_images"), 
             "", 
-            "Images and HTML (*.png *.jpg *.jpeg *.bmp *.gif *.tiff *.webp *.html *.htm);;Images (*.png *.jpg *.jpeg *.bmp *.gif *.tiff *.webp);;HTML (*.html *.htm)"
+            "Images, HTML, PDF and archives (*.png *.jpg *.jpeg *.bmp *.gif *.tiff *.webp *.html *.htm *.pdf *.zip *.cbz *.tar *.cbt *.tgz *.tar.gz *.tar.bz2 *.tar.xz);;Images (*.png *.jpg *.jpeg *.bmp *.gif *.tiff *.webp);;HTML (*.html *.htm);;PDF (*.pdf);;Archives (*.zip *.cbz *.tar *.cbt *.tgz *.tar.gz *.tar.bz2 *.tar.xz)"
         )
         if files:
             self.add_image_files(files)
 
     def add_folder(self):
+        if self.ingest is not None:
+            # While a folder is being scanned the button stops the scan
+            self.ingest.cancel_event.set()
+            return
         folder = QFileDialog.getExistingDirectory(self, self.lang.t("add_folder"), "")
         if folder:
-            exts = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tiff", ".webp", ".html", ".htm")
-            files = [os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(exts)]
-            if files:
-                self.add_image_files(files)
+            self.ingest_folders([folder])
+
+    def ingest_folders(self, folders):
+        """Add the files under ``folders`` (recursively), streaming them into the list as they are found."""
+        if self.ingest is not None:
+            self.queued_folders.extend(folders)
+            return
+        self.ingest = FolderIngest(self.config.get_ingest_include(), self.config.get_ingest_exclude())
+        self.ingest_added = 0
+        self.convertBtn.setEnabled(False)
+        self.addFolderBtn.setText(self.lang.t("stop_scan", n=0))
+        self.executors.get(BATCH_IO).submit(self.run_ingest, self.ingest, list(folders))
+
+    def run_ingest(self, ingest, folders):
+        """Walk ``folders``; runs on the batch I/O executor."""
+        try:
+            ingest.run(folders, self.ingest_signals.batch.emit)
+        except Exception as e:
+            logger.exception("Folder scan failed")
+            self.ingest_signals.failed.emit(str(e) or type(e).__name__)
+        finally:
+            self.ingest_signals.finished.emit(ingest.stats)
+
+    def on_ingest_failed(self, msg):
+        InfoBar.error(
+            self.lang.t("scan_failed_title"),
+            self.lang.t("scan_failed_body", msg=msg),
+            parent=self,
+            position=InfoBarPosition.TOP_RIGHT
+        )
+
+    def on_ingest_batch(self, paths):
+        if self.ingest is None or self.ingest.cancel_event.is_set():
+            # Found before the scan was stopped or the list cleared
+            return
+        # Appended unsorted; the list is sorted once when the walk ends
+        new_files = self.file_model.add_paths(paths)
+        self.probe_files(new_files)
+        self.ingest_added += len(new_files)
+        self.addFolderBtn.setText(self.lang.t("stop_scan", n=f"{self.ingest_added:,}"))
+
+    def on_ingest_finished(self, stats):
+        self.ingest = None
+        self.addFolderBtn.setText(self.lang.t("add_folder"))
+        self.convertBtn.setEnabled(not self.is_converting and self.watcher is None)
+        if self.queued_folders:
+            folders, self.queued_folders = self.queued_folders, []
+            self.ingest_folders(folders)
+            return
+        if self.ingest_added:
+            self.apply_sort()
+            InfoBar.success(
+                self.lang.t("images_added_title"), 
+                self.lang.t("images_added_body", n=self.ingest_added), 
+                parent=self, 
+                position=InfoBarPosition.TOP_RIGHT
+            )
+        elif not stats.cancelled:
+            InfoBar.info(
+                self.lang.t("no_images_title"), 
+                "No files found", 
+                parent=self, 
+                position=InfoBarPosition.TOP_RIGHT
+            )
+
+    def toggle_watch(self):
+        if self.watcher is not None:
+            self.stop_watch()
+        elif self.is_converting:
+            InfoBar.warning(self.lang.t("watch_folder"), self.lang.t("watch_busy"),
+                            parent=self, position=InfoBarPosition.TOP_RIGHT)
+        else:
+            self.start_watch()
+
+    def start_watch(self):
+        """Watch a folder and convert files as they arrive, with the current settings.
+
+        One by one writes a PDF per new file into the output folder; the
+        merge methods append new files to a rolling PDF, created on the first
+        arrival if it does not exist yet.
+        """
+        folder = QFileDialog.getExistingDirectory(self, self.lang.t("watch_folder"), "")
+        if not folder:
+            return
+        out_dir = self.pathEdit.text().strip()
+        if not out_dir:
+            InfoBar.warning(
+                self.lang.t("no_output_title"), 
+                self.lang.t("no_output_body"), 
+                parent=self, 
+                position=InfoBarPosition.TOP_RIGHT
+            )
+            return
+        try:
+            os.makedirs(out_dir, exist_ok=True)
+        except Exception as e:
+            InfoBar.error("Error", str(e), parent=self)
+            return
+        target = None
+        if self.methodCombo.currentIndex() != 0:
+            target, _ = QFileDialog.getSaveFileName(self, self.lang.t("watch_rolling_pdf"), out_dir, "PDF Files (*.pdf)",
+                                                    options=QFileDialog.Option.DontConfirmOverwrite)
+            if not target:
+                return
+        
+        self.cancel_event.clear()
+        self.scan_cleanup = self.create_scan_cleanup()
+        self.page_cache = self.create_page_cache()
+        self.watch_settings = (self.get_page_layout(), self.get_quality_setting(), self.config.get_auto_codec())
+        self.watch_out_dir = out_dir
+        self.watch_target = target
+        self.watcher = FolderWatcher([folder], self.convert_arrivals, self.config.get_ingest_include(),
+                                     self.config.get_ingest_exclude(),
+                                     settle_seconds=self.config.get_watch_settle_seconds(),
+                                     use_inotify=not self.config.get_watch_polling())
+        if target:
+            self.watcher.ignore(target)
+        self.watcher.start()
+        
+        self.watchBtn.setText(self.lang.t("stop_watching"))
+        self.convertBtn.setEnabled(False)
+        self.progressLog.setVisible(True)
+        self.clear_progress_log()
+        self.log_progress(self.lang.t("log_watching", folder=folder, target=target or out_dir))
+
+    def stop_watch(self):
+        """Stop watching; a conversion of new arrivals in progress is cancelled."""
+        watcher, self.watcher = self.watcher, None
+        self.cancel_event.set()
+        watcher.stop(wait=False)
+        while watcher.alive:
+            QApplication.processEvents()
+            time.sleep(0.05)
+        self.watchBtn.setText(self.lang.t("watch_folder"))
+        self.convertBtn.setEnabled(self.ingest is None)
+        self.log_progress(self.lang.t("log_watch_stopped"))
+
+    def convert_arrivals(self, paths):
+        """Convert files that arrived in the watched folder; runs on the watch thread.
+
+        Work goes to the long-lived executors and HTML to the preview
+        renderer's open browser, so an arrival only costs its own conversion.
+        """
+        watcher = self.watcher
+        if watcher is None:
+            return
+        lower_thread_priority()
+        started = time.perf_counter()
+        files = []
+        for path in paths:
+            file_obj = CatalogEntry(path)
+            if probe_entry(file_obj, self.config.get_max_image_pixels()).ok:
+                files.append(file_obj)
+            else:
+                self.conversion_signals.progress.emit(self.lang.t(
+                    "log_skipped_invalid", file=os.path.basename(path), reason=file_obj.problem))
+        html_to_pdf_map = {}
+        temp_files = []
+        try:
+            for file_obj in files:
+                if file_obj.type == 'html' and not self.cancel_event.is_set():
+                    temp_pdf = tempfile.NamedTemporaryFile(delete=False, prefix='.html_', suffix='.pdf',
+                                                           dir=self.watch_out_dir if self.watch_target is None else None)
+                    temp_pdf.close()
+                    watcher.ignore(temp_pdf.name)
+                    temp_files.append(temp_pdf.name)
+                    if self.executors.get(BROWSER).submit(self.html_previews.render_pdf, file_obj.path,
+                                                          temp_pdf.name).result():
+                        html_to_pdf_map[file_obj.path] = temp_pdf.name
+                    else:
+                        self.conversion_signals.progress.emit(self.lang.t("log_failed", file=os.path.basename(file_obj.path)))
+                elif file_obj.type == 'archive' and not self.cancel_event.is_set():
+                    layout, quality, auto_codec = self.watch_settings
+                    pdf_path = self.render_archive(file_obj.path, self.watch_out_dir if self.watch_target is None else None,
+                                                   layout, quality, auto_codec, CodecStats(), temp_files)
+                    if pdf_path:
+                        watcher.ignore(pdf_path)
+                        html_to_pdf_map[file_obj.path] = pdf_path
+            if self.watch_target is None:
+                count = self.convert_arrivals_one_by_one(watcher, files, html_to_pdf_map)
             else:
-                InfoBar.info(
-                    self.lang.t("no_images_title"), 
-                    "No files found", 
-                    parent=self, 
-                    position=InfoBarPosition.TOP_RIGHT
-                )
+                count = self.append_arrivals(files, html_to_pdf_map)
+        except Exception as e:
+            logger.exception("Converting watched files failed")
+            self.conversion_signals.progress.emit(self.lang.t("log_error", msg=str(e) or type(e).__name__))
+            # Nothing of the batch was kept; hand it over again once it settles,
+            # a few times at most
+            given_up = watcher.forget(paths)
+            if given_up:
+                self.conversion_signals.progress.emit(self.lang.t(
+                    "log_watch_gave_up", files=len(given_up), retries=watcher.max_retries + 1))
+            return
+        finally:
+            for temp_file in temp_files:
+                if os.path.exists(temp_file):
+                    os.unlink(temp_file)
+        self.conversion_signals.progress.emit(self.lang.t(
+            "log_watch_converted", count=count, files=len(paths), target=self.watch_target or self.watch_out_dir,
+            seconds=f"{time.perf_counter() - started:.2f}"))
+
+    def convert_arrivals_one_by_one(self, watcher, files, html_to_pdf_map):
+        """Write one PDF per arrival into the output folder; returns how many were written."""
+        layout, quality, auto_codec = self.watch_settings
+        codec_stats = CodecStats()
+        save_paths = unique_output_paths([f.path for f in files], self.watch_out_dir)
+        memory_limit = self.tile_memory_limit(self.executors.get(BATCH_CPU))
+        futures = []
+        for file_obj in files:
+            # Outputs may land in the watched folder; they are not inputs
+            watcher.ignore(save_paths[file_obj.path])
+            futures.append((file_obj.path, self.executors.get(BATCH_CPU if file_obj.type == 'image' else BATCH_IO).submit(
+                self.convert_one, file_obj, save_paths[file_obj.path],
+                html_to_pdf_map, layout, quality, auto_codec, codec_stats, memory_limit)))
+        count = 0
+        for path, future in futures:
+            try:
+                if future.result():
+                    count += 1
+            except Exception as e:
+                self.report_skipped(path, e)
+        return count
+
+    def append_arrivals(self, files, html_to_pdf_map):
+        """Add the pages of the arrivals to the rolling PDF; returns the number of pages added.
+
+        Images are encoded in parallel on the batch CPU executor and written
+        in arrival order. An existing rolling PDF is extended with an
+        incremental update rather than rewritten. A file that cannot be read
+        is reported and skipped; only a failure to write the target aborts.
+        """
+        from pypdf import PdfReader
+
+        layout, quality, auto_codec = self.watch_settings
+        codec_stats = CodecStats()
+        pool = self.executors.get(BATCH_CPU)
+        memory_limit = self.tile_memory_limit(pool)
+        encoded = {f.path: pool.submit(self.encode_page, f.path, layout, quality, auto_codec, codec_stats, memory_limit)
+                   for f in files if f.type == 'image'}
+        target = self.watch_target
+        appender = fp = temp_path = None
+        try:
+            if os.path.exists(target) and os.path.getsize(target):
+                appender = PdfAppender(target)
+                document = appender.document
+            else:
+                temp_path = partial_path(target)
+                fp = open(temp_path, 'wb')
+                document = ImagePdfDocument(fp)
+            for file_obj in files:
+                if self.cancel_event.is_set():
+                    raise MergeCancelled("Conversion cancelled")
+                path = file_obj.path
+                try:
+                    if file_obj.type in ('html', 'archive'):
+                        if path in html_to_pdf_map:
+                            document.add_pdf_pages(PdfReader(html_to_pdf_map[path]))
+                    elif file_obj.type == 'pdf':
+                        reader = PdfReader(path)
+                        document.add_pdf_pages(reader, self.selected_pages(file_obj, reader))
+                    else:
+                        page = encoded[path].result()
+                        if page is not None:
+                            self.add_encoded_page(document, page, layout)
+                except OutputError:
+                    raise
+                except Exception as e:
+                    self.report_skipped(path, e)
+            pages = len(document.page_refs)
+            if appender is not None:
+                appender.close()
+            else:
+                if pages:
+                    document.close()
+                fp.close()
+                if pages:
+                    move_into_place(temp_path, target)
+                else:
+                    os.unlink(temp_path)
+        except BaseException:
+            cancel_and_wait(encoded.values())
+            if appender is not None:
+                appender.abort()
+            elif fp is not None:
+                fp.close()
+                os.unlink(temp_path)
+            raise
+        return pages
 
     def add_image_files(self, files):
-        # Convert to file objects with metadata
-        existing_paths = [item['path'] for item in self.image_files]
-        new_files = []
-        for f in files:
-            if f not in existing_paths:
-                # Determine file type
-                file_type = 'html' if f.lower().endswith(('.html', '.htm')) else 'image'
-                new_files.append({'path': f, 'type': file_type})
+        # Queue the files not in the list yet (membership is a hash lookup)
+        new_files = self.file_model.add_paths(files)
         
         if new_files:
-            self.image_files.extend(new_files)
+            self.probe_files(new_files)
             self.apply_sort() # Sort immediately after adding
             InfoBar.success(
                 self.lang.t("images_added_title"), 
@@ -637,60 +1296,124 @@ class HomeInterface(QWidget):
                 position=InfoBarPosition.TOP_RIGHT
             )
 
-    def refresh_list(self):
-        self.listWidget.clear()
-        # Use default icons
-        photo_icon = Icons.photo().icon()
-        html_icon = FluentIcon.DOCUMENT.icon()
-        
-        for file_obj in self.image_files:
-            path = file_obj['path']
-            file_type = file_obj['type']
-            
-            item = QListWidgetItem(os.path.basename(path))
-            # Store the full file object in item data for reliable sync
-            item.setData(Qt.ItemDataRole.UserRole, file_obj)
-            
-            if file_type == 'html':
-                # Use HTML icon for HTML files
-                item.setIcon(html_icon)
-            else:
-                # Use photo icon and load thumbnail async
-                item.setIcon(photo_icon)
-                worker = ThumbnailRunnable(path, item)
-                worker.signals.loaded.connect(self.on_thumbnail_loaded)
-                self.thread_pool.start(worker)
-            
-            self.listWidget.addItem(item)
-            
+    def probe_files(self, entries):
+        """Read the headers of ``entries`` in the background and flag the files that cannot be converted."""
+        futures = probe_entries(entries, self.executors.get(BATCH_IO), self.probe_signals.probed.emit,
+                                self.config.get_max_image_pixels())
+        self.probe_pending += len(futures)
+
+    def on_probed(self, entries):
+        self.probe_pending -= 1
+        self.probe_flagged += sum(1 for entry in entries if entry.problem)
+        self.file_model.update_entries(entries)
+        if self.probe_pending == 0 and self.probe_flagged:
+            InfoBar.warning(
+                self.lang.t("invalid_files_title"), 
+                self.lang.t("invalid_files_body", n=self.probe_flagged), 
+                parent=self, 
+                position=InfoBarPosition.TOP_RIGHT
+            )
+            self.probe_flagged = 0
+
+    def update_empty_hint(self):
         self.emptyHint.setVisible(len(self.image_files) == 0)
 
-    def on_thumbnail_loaded(self, item, image):
-        # Check if item is still valid (attached to a list widget)
-        if item.listWidget() is not None:
-            icon = QIcon(QPixmap.fromImage(image))
-            item.setIcon(icon)
+    def request_thumbnail(self, path):
+        """Queue the thumbnail of a row the list is about to paint."""
+        if path.lower().endswith(('.html', '.htm')):
+            if self.config.get_html_previews() and self.html_previews.available:
+                self.html_thumbnails.request(path)
+        else:
+            self.thumbnails.request(path)
+
+    def prioritize_visible_thumbnails(self, *args):
+        """Move the thumbnails of the rows on screen to the front of the queue."""
+        viewport = self.listView.viewport().rect()
+        first = self.listView.indexAt(viewport.topLeft())
+        visible = []
+        if first.isValid():
+            last = self.listView.indexAt(viewport.bottomLeft())
+            last_row = last.row() if last.isValid() else self.file_model.rowCount() - 1
+            visible = [self.image_files[row].path for row in range(first.row(), last_row + 1)]
+        self.thumbnails.prioritize(visible)
+        self.html_thumbnails.prioritize(visible)
+
+    def on_thumbnail_loaded(self, path, image):
+        self.file_model.set_thumbnail(path, QIcon(QPixmap.fromImage(image)))
+
+    def edit_page_range(self, index):
+        """Ask which pages of a PDF input to use (double-click on the item)."""
+        file_obj = self.file_model.data(index, Qt.ItemDataRole.UserRole)
+        if not file_obj or file_obj['type'] != 'pdf':
+            return
+        spec, ok = QInputDialog.getText(self, self.lang.t("page_range_title"),
+                                        self.lang.t("page_range_body"), text=file_obj.get('pages', ''))
+        if not ok:
+            return
+        if file_obj.probe is None:
+            # Not probed yet: read the page count off the UI thread
+            future = self.executors.get(INTERACTIVE).submit(probe_entry, file_obj, self.config.get_max_image_pixels())
+            self.wait_for_future(future)
+        try:
+            page_count = file_obj.probe.pages if file_obj.probe is not None else 0
+            if not parse_page_range(spec, page_count):
+                raise ValueError(spec)
+        except Exception:
+            InfoBar.error(self.lang.t("page_range_title"), self.lang.t("page_range_invalid", spec=spec),
+                          parent=self, position=InfoBarPosition.TOP_RIGHT)
+            return
+        file_obj['pages'] = spec.strip()
+        self.file_model.update_row(index.row())
 
     def apply_sort(self):
-        """Sort image files based on current selection and refresh list."""
+        """Sort image files based on current selection (a layout change, rows are not rebuilt).
+
+        Name sorts run at once. Sorts by file metadata first bring the
+        metadata index up to date in the background, then sort in memory.
+        """
         idx = self.sortCombo.currentIndex()
-        # 0: Name, 1: MTime, 2: CTime, 3: Size
-        if idx == 0:
-            # Sort by basename, case insensitive
-            self.image_files.sort(key=lambda x: os.path.basename(x['path']).lower())
-        elif idx == 1:
-            self.image_files.sort(key=lambda x: os.path.getmtime(x['path']))
-        elif idx == 2:
-            self.image_files.sort(key=lambda x: os.path.getctime(x['path']))
-        elif idx == 3:
-            self.image_files.sort(key=lambda x: os.path.getsize(x['path']))
-            
-        self.refresh_list()
+        if idx in (SORT_NAME, SORT_NATURAL):
+            self.sort_by(idx)
+            return
+        self.sort_generation += 1
+        self.executors.get(INTERACTIVE).submit(self.load_sort_metadata, idx, list(self.image_files),
+                                               self.sort_generation)
 
-    def on_sort_finished(self, sorted_files):
-        self.image_files = sorted_files
-        self.refresh_list()
-        self.set_controls_enabled(True)
+    def load_sort_metadata(self, idx, entries, generation):
+        """Gather what sort ``idx`` needs for ``entries``; runs on the interactive executor."""
+        done = partial(self.sort_signals.metadata_loaded.emit, generation)
+        try:
+            self.metadata_index.refresh(entries)
+        except Exception:
+            logger.exception("Could not refresh file metadata")
+        if idx == SORT_TAKEN:
+            # Header-only reads, in parallel at interactive priority; the sort
+            # is applied when the last one is in, without holding this thread
+            read_taken_dates(entries, self.executors.get(INTERACTIVE), done)
+        else:
+            done()
+
+    def on_sort_metadata_loaded(self, generation):
+        # A newer sort request supersedes this one
+        if generation == self.sort_generation:
+            self.sort_by(self.sortCombo.currentIndex())
+
+    def sort_by(self, idx):
+        """Sort the list in memory by sort ``idx``; files with unknown metadata go last."""
+        if idx == SORT_NAME:
+            # Sort by basename, case insensitive
+            self.file_model.sort_files(lambda x: os.path.basename(x.path).lower())
+        elif idx == SORT_NATURAL:
+            self.file_model.sort_files(lambda x: natural_key(os.path.basename(x.path)))
+        elif idx == SORT_MTIME:
+            self.file_model.sort_files(lambda x: (x.mtime is None, x.mtime or 0))
+        elif idx == SORT_CTIME:
+            self.file_model.sort_files(lambda x: (x.ctime is None, x.ctime or 0))
+        elif idx == SORT_SIZE:
+            self.file_model.sort_files(lambda x: (x.size is None, x.size or 0))
+        elif idx == SORT_TAKEN:
+            # Photos without a capture date follow, by modification time
+            self.file_model.sort_files(lambda x: (not x.taken, x.taken or '', x.mtime or 0))
 
     def set_controls_enabled(self, enabled):
         self.sortCombo.setEnabled(enabled)
@@ -706,8 +1429,24 @@ class HomeInterface(QWidget):
             self.pathEdit.setText(folder)
 
     def clear_images(self):
-        self.image_files = []
-        self.refresh_list()
+        if self.ingest is not None:
+            self.queued_folders = []
+            self.ingest.cancel_event.set()
+        self.thumbnails.cancel_all()
+        self.html_thumbnails.cancel_all()
+        self.file_model.clear()
+    
+    def shutdown(self):
+        """Stop background work and quit preview browsers when the window closes."""
+        if self.ingest is not None:
+            self.ingest.cancel_event.set()
+        if self.watcher is not None:
+            self.cancel_event.set()
+            self.watcher.stop(wait=False)
+        self.thumbnails.cancel_all()
+        self.html_thumbnails.cancel_all()
+        self.executors.shutdown()
+        self.html_previews.close()
     
     def log_progress(self, message):
         """Append message to progress log with auto-scroll."""
@@ -740,65 +1479,35 @@ class HomeInterface(QWidget):
     
     def move_item_up(self):
         """Move selected item up in the list."""
-        current_row = self.listWidget.currentRow()
+        current_row = self.listView.currentIndex().row()
         if current_row > 0:
-            # Remove item from widget (preserves data)
-            item = self.listWidget.takeItem(current_row)
-            # Re-insert it one position up
-            self.listWidget.insertItem(current_row - 1, item)
-            # Select the moved item
-            self.listWidget.setCurrentRow(current_row - 1)
-            # Sync image_files from widget order
-            self.sync_files_from_list()
+            self.move_rows([current_row], current_row - 1)
     
     def move_item_down(self):
         """Move selected item down in the list."""
-        current_row = self.listWidget.currentRow()
-        if current_row >= 0 and current_row < self.listWidget.count() - 1:
-            # Remove item from widget (preserves data)
-            item = self.listWidget.takeItem(current_row)
-            # Re-insert it one position down
-            self.listWidget.insertItem(current_row + 1, item)
-            # Select the moved item
-            self.listWidget.setCurrentRow(current_row + 1)
-            # Sync image_files from widget order
-            self.sync_files_from_list()
+        current_row = self.listView.currentIndex().row()
+        if current_row >= 0 and current_row < self.file_model.rowCount() - 1:
+            self.move_rows([current_row], current_row + 2)
     
-    def remove_selected_items(self):
-        """Remove selected items from the list."""
-        selected_items = self.listWidget.selectedItems()
-        if not selected_items:
+    def move_rows(self, rows, destination):
+        """Move rows before ``destination`` (buttons and drag-drop) and keep them selected."""
+        new_rows = self.file_model.move_rows(rows, destination)
+        if not new_rows:
             return
-        
-        # Get indices of selected items
-        indices_to_remove = []
-        for item in selected_items:
-            row = self.listWidget.row(item)
-            indices_to_remove.append(row)
-        
-        # Remove from image_files (reverse order to maintain indices)
-        for index in sorted(indices_to_remove, reverse=True):
-            if 0 <= index < len(self.image_files):
-                del self.image_files[index]
-        
-        # Refresh list
-        self.refresh_list()
+        selection = self.listView.selectionModel()
+        selection.clearSelection()
+        for row in new_rows:
+            selection.select(self.file_model.index(row), selection.SelectionFlag.Select)
+        selection.setCurrentIndex(self.file_model.index(new_rows[0]), selection.SelectionFlag.NoUpdate)
     
-    def sync_files_from_list(self):
-        """Sync image_files list order from current listWidget order (after drag-drop)."""
-        # Build new ordered list from widget items using stored data
-        new_order = []
-        for i in range(self.listWidget.count()):
-            item = self.listWidget.item(i)
-            # Retrieve the file object stored in item data
-            file_obj = item.data(Qt.ItemDataRole.UserRole)
-            if file_obj:
-                new_order.append(file_obj)
-        
-        # Update image_files with new order
-        if len(new_order) == len(self.image_files):
-            self.image_files = new_order
-            print(f"DEBUG: Synced order - {[os.path.basename(f['path']) for f in self.image_files]}")
+    def remove_selected_items(self):
+        """Remove selected items from the list."""
+        rows = [index.row() for index in self.listView.selectionModel().selectedRows()]
+        if rows:
+            paths = [self.image_files[row].path for row in rows]
+            self.thumbnails.cancel(paths)
+            self.html_thumbnails.cancel(paths)
+            self.file_model.remove_rows(rows)
 
     def cancel_conversion(self):
         if self.is_converting:
@@ -831,17 +1540,24 @@ class HomeInterface(QWidget):
                 InfoBar.error("Error", str(e), parent=self)
                 return
         
-        method = self.methodCombo.currentIndex() # 0: One by one, 1: All in one
+        method = self.methodCombo.currentIndex() # 0: One by one, 1: All in one, 2: Append
         target_path = out_dir
         
-        if method == 1: # All in one
+        if self.config.get_fanout_enabled() and method != 2:
+            # Each output profile names its own files inside the output folder
+            pass
+        elif method == 1: # All in one
             pdf_path, _ = QFileDialog.getSaveFileName(self, "Save PDF As", out_dir, "PDF Files (*.pdf)")
             if not pdf_path:
                 return
             target_path = pdf_path
+        elif method == 2: # Append to existing PDF
+            pdf_path, _ = QFileDialog.getOpenFileName(self, self.lang.t("method_append"), out_dir, "PDF Files (*.pdf)")
+            if not pdf_path:
+                return
+            target_path = pdf_path
         
-        # IMPORTANT: Convert HTML files to PDF on MAIN THREAD first
-        # WebEngine requires main Qt thread
+        # Convert HTML files to PDF first, before the conversion thread starts
         self.temp_pdf_files = []
         html_to_pdf_map = {}  # Maps original HTML path to temp PDF path
         
@@ -858,51 +1574,61 @@ class HomeInterface(QWidget):
         self.clear_progress_log()
         self.log_progress(self.lang.t("log_starting"))
         
-        # Count HTML files for progress display
-        html_count = sum(1 for f in self.image_files if f['type'] == 'html')
-        html_idx = 0
+        # In one-by-one mode HTML is rendered into the output folder so the
+        # result can be renamed into place instead of copied
+        render_dir = out_dir if method == 0 and not self.config.get_fanout_enabled() else None
         
+        # Render every HTML file on the browser executor up front; the UI
+        # thread only waits for the results, in list order
+        self.executors.reset_stats()
+        browser = self.executors.get(BROWSER)
+        renders = []
         for file_obj in self.image_files:
+            if file_obj['type'] == 'html' and not file_obj.problem:
+                path = file_obj['path']
+                # Create temp PDF
+                temp_pdf = tempfile.NamedTemporaryFile(delete=False, prefix='.html_', suffix='.pdf', dir=render_dir)
+                temp_pdf.close()
+                self.temp_pdf_files.append(temp_pdf.name)
+                renders.append((path, browser.submit(self.render_html, path, temp_pdf.name)))
+        html_count = len(renders)
+        
+        for html_idx, (path, future) in enumerate(renders, 1):
             # Check for cancellation
             if self.cancel_event.is_set():
-                self._cleanup_temp_files()
-                self.is_converting = False
-                self.convertBtn.setEnabled(True)
-                self.convertBtn.setText(self.lang.t("convert"))
-                self.cancelBtn.setVisible(False)
-                return
-                
-            if file_obj['type'] == 'html':
-                path = file_obj['path']
-                html_idx += 1
-                
-                # Log start
-                filename = os.path.basename(path)
-                self.log_progress(self.lang.t("log_converting_html", idx=html_idx, total=html_count, file=filename))
-                
-                # Update UI to show progress
-                self.convertBtn.setText(f"Converting HTML {html_idx}/{html_count}...")
-                QApplication.processEvents()
-                
-                try:
-                    # Create temp PDF
-                    temp_pdf = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-                    temp_pdf.close()
-                    temp_pdf_path = temp_pdf.name
-                    self.temp_pdf_files.append(temp_pdf_path)
-                    
-                    # Convert HTML to PDF (on main thread)
-                    converter = HtmlToPdfConverter()
-                    result_path = converter.convert_file_sync(path, temp_pdf_path)
-                    
-                    if result_path:
-                        html_to_pdf_map[path] = result_path
-                        self.log_progress(self.lang.t("log_converted", file=filename))
-                    else:
-                        self.log_progress(self.lang.t("log_failed", file=filename))
-                        print(f"Failed to convert HTML: {path}")
-                except Exception as e:
-                    print(f"Error converting HTML {path}: {e}")
+                break
+            
+            # Log start
+            filename = os.path.basename(path)
+            self.log_progress(self.lang.t("log_converting_html", idx=html_idx, total=html_count, file=filename))
+            
+            # Update UI to show progress
+            self.convertBtn.setText(f"Converting HTML {html_idx}/{html_count}...")
+            self.wait_for_future(future)
+            
+            try:
+                result_path = future.result()
+                if result_path:
+                    html_to_pdf_map[path] = result_path
+                    self.log_progress(self.lang.t("log_converted", file=filename))
+                else:
+                    self.log_progress(self.lang.t("log_failed", file=filename))
+                    print(f"Failed to convert HTML: {path}")
+            except Exception as e:
+                print(f"Error converting HTML {path}: {e}")
+        
+        if self.cancel_event.is_set():
+            # Drop queued renders and let the running one finish before its file is removed
+            for _, future in renders:
+                future.cancel()
+            for _, future in renders:
+                self.wait_for_future(future)
+            self._cleanup_temp_files()
+            self.is_converting = False
+            self.convertBtn.setEnabled(True)
+            self.convertBtn.setText(self.lang.t("convert"))
+            self.cancelBtn.setVisible(False)
+            return
         
         # Now start background thread with converted files
         self.convertBtn.setText(self.lang.t("converting") if hasattr(self.lang, 't') else "Converting...")
@@ -914,31 +1640,203 @@ class HomeInterface(QWidget):
         # Pass a copy of the current (sorted) list to the thread
         files_to_convert = self.image_files[:]
         
-        t = threading.Thread(target=self.perform_conversion, args=(target_path, method, files_to_convert, html_to_pdf_map))
+        t = threading.Thread(target=self.perform_conversion, args=(target_path, method, files_to_convert, html_to_pdf_map),
+                             name='conversion')
         t.start()
 
 
 
-    def process_image(self, path):
-        img = Image.open(path)
-        if img.mode in ("RGBA", "P"):
-            img = img.convert("RGB")
-        
-        if not self.originalCheck.isChecked():
-            img = self.resize_image(img)
-            
-        return img
-
-    def resize_image(self, img):
-        if self.portraitCheck.isChecked():
-            base_height = 842
-            w_percent = base_height / float(img.size[1])
-            w_size = int(float(img.size[0]) * float(w_percent))
-            return img.resize((w_size, base_height), Image.Resampling.LANCZOS)
-        base_width = 842
-        h_percent = base_width / float(img.size[0])
-        h_size = int(float(img.size[1]) * float(h_percent))
-        return img.resize((base_width, h_size), Image.Resampling.LANCZOS)
+    def render_html(self, path, pdf_path):
+        """Render an HTML file to ``pdf_path`` in a headless browser; runs on the browser executor."""
+        converter = HtmlToPdfConverter()
+        try:
+            return converter.convert_file_sync(path, pdf_path)
+        finally:
+            converter.cleanup()
+
+    def render_archive(self, path, render_dir, layout, quality, auto_codec, codec_stats, temp_files=None):
+        """Convert the members of an archive into a temp PDF without extracting it.
+
+        The temp file is recorded in ``temp_files`` (the conversion's list by
+        default) for cleanup. Returns its path, or ``None`` if no page was written.
+        """
+        temp_pdf = tempfile.NamedTemporaryFile(delete=False, prefix='.archive_', suffix='.pdf', dir=render_dir)
+        (self.temp_pdf_files if temp_files is None else temp_files).append(temp_pdf.name)
+        filename = os.path.basename(path)
+        with temp_pdf:
+            converter = StreamConverter(temp_pdf, layout, quality, auto_codec, self.config.get_archive_order(),
+                                        cleanup=self.scan_cleanup,
+                                        max_pixels=self.config.get_max_image_pixels(),
+                                        memory_limit=self.tile_memory_limit(), codec_stats=codec_stats)
+            converter.add(path)
+            stats = converter.close()
+        for label, reason in stats.skipped:
+            self.conversion_signals.progress.emit(self.lang.t(
+                "log_skipped_invalid", file=os.path.relpath(label, os.path.dirname(path)), reason=reason))
+        if not stats.pages:
+            self.conversion_signals.progress.emit(self.lang.t("log_failed", file=filename))
+            return None
+        self.conversion_signals.progress.emit(self.lang.t("log_archive_converted", file=filename, stats=stats.summary()))
+        return temp_pdf.name
+
+    def wait_for_future(self, future):
+        """Wait for background work on the UI thread, keeping the window responsive."""
+        while not future.done():
+            QApplication.processEvents()
+            time.sleep(0.05)
+
+    def tile_memory_limit(self, pool=None):
+        """Memory bound for decoding one image, split between the workers of ``pool`` if given."""
+        limit = self.config.get_tile_memory_mb() * MB
+        return limit // pool.max_workers if pool is not None else limit
+
+    def process_image(self, path, layout, memory_limit=None):
+        """Open and downsample an image for its page.
+
+        Images too large to convert in one piece are processed band by band;
+        if even the downsampled result exceeds the memory bound a
+        ``TiledImage`` is returned and encoded strip by strip. Returns
+        ``None`` for a blank page dropped by scan cleanup. ``memory_limit``
+        defaults to the whole tile memory budget.
+        """
+        img = open_image(path, self.config.get_max_image_pixels())
+        target = layout.target_size(*img.size)
+        if memory_limit is None:
+            memory_limit = self.tile_memory_limit()
+        if needs_tiling(img, memory_limit):
+            tiled = TiledImage(path, img, target, memory_limit)
+            if not tiled.fits_in_memory():
+                return tiled
+            img = tiled.assemble()
+        elif target is not None and img.format == "JPEG":
+            # Let libjpeg decode at a reduced DCT scale instead of full size
+            img.draft("RGB", target)
+        if self.scan_cleanup is not None:
+            img = self.scan_cleanup.apply(img)
+            if img is None:
+                return None
+        return self.resize_image(img, layout)
+
+    def encode_page(self, path, layout, quality, auto_codec, codec_stats, memory_limit=None):
+        """Encoded page for an image file, from the page cache when possible.
+
+        Returns ``None`` for a blank page dropped by scan cleanup. Encoding is
+        lazy: tiled images are still encoded strip by strip as the page is
+        written, and the cache entry is stored as the strips pass through.
+        """
+        cache = self.page_cache
+        key = None
+        if cache is not None:
+            key = cache.key(path, self.page_settings(path, layout, quality, auto_codec, memory_limit))
+            found, page = cache.lookup(key, codec_stats)
+            if found:
+                return page
+
+        img = self.process_image(path, layout, memory_limit)
+        if img is None:
+            if key is not None:
+                cache.store_blank(key)
+            return None
+        if isinstance(img, TiledImage):
+            page = EncodedPage(img.size, img.iter_encoded_strips(quality, auto_codec, codec_stats), strips=True)
+        else:
+            page = EncodedPage(img.size, iter([encode_image(img, quality, auto_codec, codec_stats)]))
+        return cache.store(key, page) if key is not None else page
+
+    def page_settings(self, path, layout, quality, auto_codec, memory_limit=None):
+        """Every setting that changes how the image file ``path`` is encoded, for cache keys.
+
+        The memory bound only matters for images processed band by band, so
+        other images share cache entries between conversion modes.
+        """
+        cleanup = self.scan_cleanup
+        if memory_limit is None:
+            memory_limit = self.tile_memory_limit()
+        with open_image(path, self.config.get_max_image_pixels()) as img:
+            tiled = needs_tiling(img, memory_limit)
+        return {
+            'layout': [layout.page_size, layout.portrait, layout.margin_mm, layout.max_dpi],
+            'quality': quality,
+            'auto_codec': auto_codec,
+            'cleanup': None if cleanup is None else [
+                cleanup.drop_blank, cleanup.trim_borders, cleanup.ink_delta, cleanup.blank_fraction],
+            'tile_memory': memory_limit if tiled else None,
+        }
+
+    def selected_pages(self, file_obj, reader):
+        """Page indices of a PDF input chosen by its page range (all by default)."""
+        return parse_page_range(file_obj.get('pages'), len(reader.pages))
+
+    def save_pdf_pages(self, file_obj, save_path):
+        """Write the selected pages of a PDF input to ``save_path``."""
+        if not file_obj.get('pages'):
+            copy_into_place(file_obj['path'], save_path)
+            return
+        from pypdf import PdfReader
+
+        reader = PdfReader(file_obj['path'])
+        temp_path = partial_path(save_path)
+        try:
+            with open(temp_path, 'wb') as fp:
+                document = ImagePdfDocument(fp)
+                document.add_pdf_pages(reader, self.selected_pages(file_obj, reader), outline=True)
+                document.close()
+            move_into_place(temp_path, save_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+    def save_page_pdf(self, page, save_path, layout):
+        """Write an encoded page into a one-page PDF."""
+        temp_path = partial_path(save_path)
+        try:
+            with open(temp_path, 'wb') as fp:
+                document = ImagePdfDocument(fp)
+                self.add_encoded_page(document, page, layout)
+                document.close()
+            move_into_place(temp_path, save_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+    def add_encoded_page(self, document, page, layout):
+        """Add an encoded page (single image or strips) to ``document``."""
+        if page.strips:
+            document.add_strip_page(page.images, page.size[0], page.size[1], layout)
+        else:
+            document.add_image_page(next(iter(page.images)), layout)
+
+    def create_scan_cleanup(self):
+        """Scan cleanup stage from settings, or ``None`` when it is disabled."""
+        drop_blank = self.config.get_drop_blank_pages()
+        trim_borders = self.config.get_trim_borders()
+        if not drop_blank and not trim_borders:
+            return None
+        return ScanCleanup(drop_blank, trim_borders, self.config.get_blank_ink_delta(),
+                           self.config.get_blank_ink_fraction())
+
+    def create_page_cache(self):
+        """Persistent page cache from settings, or ``None`` when it is disabled."""
+        if not self.config.get_page_cache_enabled():
+            return None
+        return PageCache(str(self.config.config_dir / 'page_cache'), self.config.get_page_cache_mb() * MB,
+                         self.config.get_page_cache_hash_content())
+
+    def resize_image(self, img, layout):
+        """Downsample only when the image exceeds the layout's max DPI."""
+        return resample_for_layout(img, layout)
+
+    def get_page_layout(self):
+        """Build the page layout from the page options."""
+        margin_mm = 0 if self.marginCheck.isChecked() else self.config.get_page_margin_mm()
+        if self.originalCheck.isChecked():
+            return PageLayout(PAGE_FIT, margin_mm=margin_mm)
+        return PageLayout(
+            self.config.get_page_size(),
+            portrait=self.portraitCheck.isChecked(),
+            margin_mm=margin_mm,
+            max_dpi=self.config.get_max_dpi(),
+        )
 
     def get_quality_setting(self):
         idx = self.compressionCombo.currentIndex()
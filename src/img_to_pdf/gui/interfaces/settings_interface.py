@@ -2,13 +2,16 @@ from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout
 from PyQt6.QtCore import pyqtSignal
 
 from qfluentwidgets import (
-    ComboBox, InfoBar, InfoBarPosition, SubtitleLabel, BodyLabel
+    ComboBox, InfoBar, InfoBarPosition, SubtitleLabel, BodyLabel, SwitchButton
 )
 
 from ...core.theme_manager import ThemeManager
 from ...core.config_manager import ConfigManager
 from ...core.language_manager import LanguageManager
 
+# Volume size choices for splitting merged output, 0 keeps a single file
+VOLUME_SIZES_MB = [0, 100, 500, 1024, 2048]
+
 class SettingsInterface(QWidget):
     """Settings page."""
     
@@ -64,12 +67,141 @@ class SettingsInterface(QWidget):
         lang_layout.addStretch()
         layout.addLayout(lang_layout)
         
+        # Page size used when "Original Size" is off
+        page_layout = QHBoxLayout()
+        self.page_size_label = BodyLabel(self.lang.t("page_size"), self)
+        self.page_size_combo = ComboBox(self)
+        self.page_size_combo.addItems([self.lang.t("page_size_a4"), self.lang.t("page_size_letter")])
+        self.page_size_combo.setCurrentIndex(1 if self.config.get_page_size() == 'letter' else 0)
+        self.page_size_combo.currentIndexChanged.connect(self.on_page_size_changed)
+        page_layout.addWidget(self.page_size_label)
+        page_layout.addWidget(self.page_size_combo)
+        page_layout.addStretch()
+        layout.addLayout(page_layout)
+        
+        # Content-aware codec selection
+        codec_layout = QHBoxLayout()
+        self.auto_codec_label = BodyLabel(self.lang.t("auto_codec"), self)
+        self.auto_codec_switch = SwitchButton(self)
+        self.auto_codec_switch.setChecked(self.config.get_auto_codec())
+        self.auto_codec_switch.checkedChanged.connect(self.on_auto_codec_changed)
+        codec_layout.addWidget(self.auto_codec_label)
+        codec_layout.addWidget(self.auto_codec_switch)
+        codec_layout.addStretch()
+        layout.addLayout(codec_layout)
+        
+        # Post-merge optimizer
+        optimize_layout = QHBoxLayout()
+        self.optimize_label = BodyLabel(self.lang.t("optimize_output"), self)
+        self.optimize_switch = SwitchButton(self)
+        self.optimize_switch.setChecked(self.config.get_optimize_output())
+        self.optimize_switch.checkedChanged.connect(self.on_optimize_changed)
+        optimize_layout.addWidget(self.optimize_label)
+        optimize_layout.addWidget(self.optimize_switch)
+        optimize_layout.addStretch()
+        layout.addLayout(optimize_layout)
+        
+        # Scan cleanup: blank pages and scanner borders
+        blank_layout = QHBoxLayout()
+        self.blank_label = BodyLabel(self.lang.t("drop_blank_pages"), self)
+        self.blank_switch = SwitchButton(self)
+        self.blank_switch.setChecked(self.config.get_drop_blank_pages())
+        self.blank_switch.checkedChanged.connect(self.on_drop_blank_changed)
+        blank_layout.addWidget(self.blank_label)
+        blank_layout.addWidget(self.blank_switch)
+        blank_layout.addStretch()
+        layout.addLayout(blank_layout)
+        
+        trim_layout = QHBoxLayout()
+        self.trim_label = BodyLabel(self.lang.t("trim_borders"), self)
+        self.trim_switch = SwitchButton(self)
+        self.trim_switch.setChecked(self.config.get_trim_borders())
+        self.trim_switch.checkedChanged.connect(self.on_trim_borders_changed)
+        trim_layout.addWidget(self.trim_label)
+        trim_layout.addWidget(self.trim_switch)
+        trim_layout.addStretch()
+        layout.addLayout(trim_layout)
+        
+        # Linearized ("fast web view") output
+        linearize_layout = QHBoxLayout()
+        self.linearize_label = BodyLabel(self.lang.t("linearize_output"), self)
+        self.linearize_switch = SwitchButton(self)
+        self.linearize_switch.setChecked(self.config.get_linearize_output())
+        self.linearize_switch.checkedChanged.connect(self.on_linearize_changed)
+        self.linearize_switch.setToolTip(self.lang.t("linearize_output_tip"))
+        linearize_layout.addWidget(self.linearize_label)
+        linearize_layout.addWidget(self.linearize_switch)
+        linearize_layout.addStretch()
+        layout.addLayout(linearize_layout)
+        
+        # Produce every output profile from one decode pass
+        fanout_layout = QHBoxLayout()
+        self.fanout_label = BodyLabel(self.lang.t("fanout_enabled"), self)
+        self.fanout_switch = SwitchButton(self)
+        self.fanout_switch.setChecked(self.config.get_fanout_enabled())
+        self.fanout_switch.checkedChanged.connect(self.on_fanout_changed)
+        fanout_layout.addWidget(self.fanout_label)
+        fanout_layout.addWidget(self.fanout_switch)
+        fanout_layout.addStretch()
+        layout.addLayout(fanout_layout)
+        
+        # Reuse encoded pages of unchanged images across runs
+        page_cache_layout = QHBoxLayout()
+        self.page_cache_label = BodyLabel(self.lang.t("page_cache_enabled"), self)
+        self.page_cache_switch = SwitchButton(self)
+        self.page_cache_switch.setChecked(self.config.get_page_cache_enabled())
+        self.page_cache_switch.checkedChanged.connect(self.on_page_cache_changed)
+        page_cache_layout.addWidget(self.page_cache_label)
+        page_cache_layout.addWidget(self.page_cache_switch)
+        page_cache_layout.addStretch()
+        layout.addLayout(page_cache_layout)
+        
+        # Render HTML inputs in a headless browser for their list thumbnails
+        html_previews_layout = QHBoxLayout()
+        self.html_previews_label = BodyLabel(self.lang.t("html_previews"), self)
+        self.html_previews_switch = SwitchButton(self)
+        self.html_previews_switch.setChecked(self.config.get_html_previews())
+        self.html_previews_switch.checkedChanged.connect(self.on_html_previews_changed)
+        html_previews_layout.addWidget(self.html_previews_label)
+        html_previews_layout.addWidget(self.html_previews_switch)
+        html_previews_layout.addStretch()
+        layout.addLayout(html_previews_layout)
+        
+        # Split merged output into volumes
+        volume_layout = QHBoxLayout()
+        self.volume_label = BodyLabel(self.lang.t("volume_size"), self)
+        self.volume_combo = ComboBox(self)
+        self.volume_combo.addItems(self.volume_size_items())
+        volume_size = self.config.get_volume_size_mb()
+        self.volume_combo.setCurrentIndex(VOLUME_SIZES_MB.index(volume_size) if volume_size in VOLUME_SIZES_MB else 0)
+        self.volume_combo.currentIndexChanged.connect(self.on_volume_size_changed)
+        volume_layout.addWidget(self.volume_label)
+        volume_layout.addWidget(self.volume_combo)
+        volume_layout.addStretch()
+        layout.addLayout(volume_layout)
+        
         layout.addStretch()
     
+    def volume_size_items(self):
+        return [self.lang.t("volume_size_off")] + [
+            f"{size // 1024} GB" if size >= 1024 else f"{size} MB" for size in VOLUME_SIZES_MB[1:]
+        ]
+    
     def update_texts(self):
         self.title.setText(self.lang.t("settings"))
         self.theme_label.setText(self.lang.t("theme"))
         self.lang_label.setText(self.lang.t("language"))
+        self.auto_codec_label.setText(self.lang.t("auto_codec"))
+        self.page_size_label.setText(self.lang.t("page_size"))
+        self.optimize_label.setText(self.lang.t("optimize_output"))
+        self.blank_label.setText(self.lang.t("drop_blank_pages"))
+        self.trim_label.setText(self.lang.t("trim_borders"))
+        self.linearize_label.setText(self.lang.t("linearize_output"))
+        self.linearize_switch.setToolTip(self.lang.t("linearize_output_tip"))
+        self.fanout_label.setText(self.lang.t("fanout_enabled"))
+        self.page_cache_label.setText(self.lang.t("page_cache_enabled"))
+        self.html_previews_label.setText(self.lang.t("html_previews"))
+        self.volume_label.setText(self.lang.t("volume_size"))
         
         # Update combo items without triggering signals if possible, or just leave them
         # Re-populating combos might be annoying for user if they are open, but okay for now.
@@ -91,6 +223,20 @@ class SettingsInterface(QWidget):
         self.lang_combo.addItems([self.lang.t("en_label"), self.lang.t("vi_label")])
         self.lang_combo.setCurrentIndex(current_lang_idx)
         
+        self.page_size_combo.blockSignals(True)
+        current_page_idx = self.page_size_combo.currentIndex()
+        self.page_size_combo.clear()
+        self.page_size_combo.addItems([self.lang.t("page_size_a4"), self.lang.t("page_size_letter")])
+        self.page_size_combo.setCurrentIndex(current_page_idx)
+        self.page_size_combo.blockSignals(False)
+        
+        self.volume_combo.blockSignals(True)
+        current_volume_idx = self.volume_combo.currentIndex()
+        self.volume_combo.clear()
+        self.volume_combo.addItems(self.volume_size_items())
+        self.volume_combo.setCurrentIndex(current_volume_idx)
+        self.volume_combo.blockSignals(False)
+        
         self.theme_combo.blockSignals(False)
         self.lang_combo.blockSignals(False)
 
@@ -108,3 +254,43 @@ class SettingsInterface(QWidget):
         self.config.save()
         self.language_changed.emit(lang_code)
         self.update_texts()
+
+    def on_auto_codec_changed(self, checked):
+        self.config.set_auto_codec(checked)
+        self.config.save()
+
+    def on_page_size_changed(self, index):
+        self.config.set_page_size('letter' if index == 1 else 'a4')
+        self.config.save()
+
+    def on_optimize_changed(self, checked):
+        self.config.set_optimize_output(checked)
+        self.config.save()
+
+    def on_drop_blank_changed(self, checked):
+        self.config.set_drop_blank_pages(checked)
+        self.config.save()
+
+    def on_trim_borders_changed(self, checked):
+        self.config.set_trim_borders(checked)
+        self.config.save()
+
+    def on_linearize_changed(self, checked):
+        self.config.set_linearize_output(checked)
+        self.config.save()
+
+    def on_fanout_changed(self, checked):
+        self.config.set_fanout_enabled(checked)
+        self.config.save()
+
+    def on_page_cache_changed(self, checked):
+        self.config.set_page_cache_enabled(checked)
+        self.config.save()
+
+    def on_html_previews_changed(self, checked):
+        self.config.set_html_previews(checked)
+        self.config.save()
+
+    def on_volume_size_changed(self, index):
+        self.config.set_volume_size_mb(VOLUME_SIZES_MB[index])
+        self.config.save()
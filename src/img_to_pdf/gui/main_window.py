@@ -129,4 +129,5 @@ class MainWindow(FluentWindow):
             'height': self.height()
         })
         self.config.save()
+        self.home_interface.shutdown()
         event.accept()
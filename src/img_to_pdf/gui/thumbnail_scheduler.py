@@ -0,0 +1,200 @@
+"""Thumbnail loading for the file list, visible rows first.
+
+Requests queue in the scheduler rather than the executor, and only
+``max_in_flight`` decodes run at once. Whenever the list scrolls or is
+re-sorted the rows on screen move to the front of the queue, and rows that
+are removed or cleared are cancelled: queued ones are dropped, running ones
+stop before decoding and their results are discarded. The same scheduling
+serves image thumbnails and the browser-rendered previews of HTML files.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List
+
+from PyQt6.QtCore import Qt, pyqtSignal, QObject, QBuffer, QByteArray, QIODevice
+from PyQt6.QtGui import QImage, QImageReader
+
+from ..core.thumbnails import make_thumbnail
+
+THUMBNAIL_SIZE = 64
+
+
+def encode_thumbnail(img):
+    """PNG bytes of a thumbnail QImage, for the thumbnail cache."""
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    img.save(buffer, "PNG")
+    buffer.close()
+    return bytes(data)
+
+
+class ThumbnailSignals(QObject):
+    loaded = pyqtSignal(str, QImage)
+    done = pyqtSignal(str)
+
+
+class ThumbnailJob:
+    def __init__(self, path, cache=None, cancelled=None):
+        self.path = path
+        self.cache = cache
+        self.cancelled = cancelled or threading.Event()
+        self.signals = ThumbnailSignals()
+
+    def run(self):
+        try:
+            if not self.cancelled.is_set():
+                self.load()
+        except Exception:
+            pass
+        finally:
+            self.signals.done.emit(self.path)
+
+    def cache_key(self):
+        return self.cache.key(self.path, THUMBNAIL_SIZE)
+
+    def render(self):
+        """PNG bytes of the thumbnail, or ``None``."""
+        try:
+            # EXIF thumbnail or DCT-scaled decode instead of full resolution
+            return make_thumbnail(self.path, THUMBNAIL_SIZE)
+        except Exception:
+            img = self.read_scaled()
+            return encode_thumbnail(img) if not img.isNull() else None
+
+    def load(self):
+        key = self.cache_key() if self.cache is not None else None
+        if key is not None:
+            data = self.cache.get(key)
+            if data is not None:
+                img = QImage.fromData(data)
+                if not img.isNull():
+                    self.signals.loaded.emit(self.path, img)
+                    return
+        if self.cancelled.is_set():
+            return
+        data = self.render()
+        img = QImage.fromData(data) if data else QImage()
+        if not img.isNull():
+            if key is not None:
+                self.cache.put(key, data)
+            if not self.cancelled.is_set():
+                self.signals.loaded.emit(self.path, img)
+
+    def read_scaled(self):
+        """Decode with Qt for formats Pillow cannot read, scaled while decoding."""
+        reader = QImageReader(self.path)
+        reader.setAutoTransform(True)
+        size = reader.size()
+        if size.isValid():
+            size.scale(THUMBNAIL_SIZE, THUMBNAIL_SIZE, Qt.AspectRatioMode.KeepAspectRatio)
+            reader.setScaledSize(size)
+        img = reader.read()
+        if img.isNull():
+            return img
+        return img.scaled(THUMBNAIL_SIZE, THUMBNAIL_SIZE, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+
+
+class HtmlPreviewJob(ThumbnailJob):
+    """Thumbnail of an HTML file rendered by ``renderer``, cached by file content."""
+
+    def __init__(self, path, cache=None, cancelled=None, renderer=None):
+        super().__init__(path, cache, cancelled)
+        self.renderer = renderer
+
+    def cache_key(self):
+        return self.cache.content_key(self.path, THUMBNAIL_SIZE)
+
+    def render(self):
+        return self.renderer.render(self.path, THUMBNAIL_SIZE)
+
+
+class ThumbnailScheduler(QObject):
+    """Runs thumbnail jobs on ``executor``, at most ``max_in_flight`` at a time.
+
+    Queued paths start in request order; :meth:`prioritize` moves the paths
+    currently on screen ahead of the rest. ``loaded`` is emitted on the GUI
+    thread, and never for a path that was cancelled. ``job_factory`` makes
+    the job for a path, ``ThumbnailJob`` by default.
+    """
+
+    loaded = pyqtSignal(str, QImage)
+
+    def __init__(self, executor, cache=None, max_in_flight: int = 0, job_factory=ThumbnailJob, parent=None):
+        super().__init__(parent)
+        self.executor = executor
+        self.cache = cache
+        self.job_factory = job_factory
+        # Queued jobs wait here, where they can still be reordered or dropped
+        self.max_in_flight = max_in_flight or executor.max_workers
+        self._pending: 'OrderedDict[str, None]' = OrderedDict()
+        self._visible: List[str] = []
+        self._in_flight: Dict[str, threading.Event] = {}
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def request(self, path: str) -> None:
+        running = self._in_flight.get(path)
+        if path in self._pending or (running is not None and not running.is_set()):
+            return
+        # A cancelled job for the same path still running is waited for
+        self._pending[path] = None
+        self._start_next()
+
+    def prioritize(self, visible_paths: Iterable[str]) -> None:
+        """Load ``visible_paths`` (top to bottom) before anything else that is queued."""
+        self._visible = list(visible_paths)
+        self._start_next()
+
+    def cancel(self, paths: Iterable[str]) -> None:
+        """Forget ``paths``: drop them from the queue and discard running jobs."""
+        for path in paths:
+            self._pending.pop(path, None)
+            cancelled = self._in_flight.get(path)
+            if cancelled is not None:
+                cancelled.set()
+
+    def cancel_all(self) -> None:
+        self._pending.clear()
+        self._visible = []
+        for cancelled in self._in_flight.values():
+            cancelled.set()
+
+    def _next_path(self):
+        for path in self._visible:
+            if path in self._pending and path not in self._in_flight:
+                del self._pending[path]
+                return path
+        for path in self._pending:
+            if path not in self._in_flight:
+                del self._pending[path]
+                return path
+        return None
+
+    def _start_next(self) -> None:
+        while len(self._in_flight) < self.max_in_flight:
+            path = self._next_path()
+            if path is None:
+                return
+            cancelled = threading.Event()
+            self._in_flight[path] = cancelled
+            job = self.job_factory(path, self.cache, cancelled)
+            job.signals.loaded.connect(self._on_loaded)
+            job.signals.done.connect(self._on_done)
+            self.executor.submit(job.run)
+
+    def _on_loaded(self, path, image):
+        cancelled = self._in_flight.get(path)
+        if cancelled is not None and not cancelled.is_set():
+            self.loaded.emit(path, image)
+
+    def _on_done(self, path):
+        self._in_flight.pop(path, None)
+        self._start_next()
@@ -0,0 +1,144 @@
+"""ArchiveReader on damaged archives, and StreamConverter skipping what it cannot read."""
+
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+from PIL import Image
+from pypdf import PdfReader, PdfWriter
+
+from img_to_pdf.core.archive_input import ORDER_ARCHIVE, ArchiveReader
+from img_to_pdf.core.stream_convert import StreamConverter
+
+
+def jpeg_bytes(seed):
+    out = io.BytesIO()
+    Image.effect_noise((96, 64), 32 + seed).convert('RGB').save(out, 'JPEG')
+    return out.getvalue()
+
+
+PAGES = {f"p{i}.jpg": jpeg_bytes(i) for i in (1, 2, 3, 10)}
+
+
+def make_zip(path):
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in PAGES.items():
+            archive.writestr(name, data)
+    return str(path)
+
+
+def corrupt_member(path, name):
+    """Flip a byte in the middle of a ZIP member's compressed data."""
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo(name)
+    with open(path, 'r+b') as fp:
+        fp.seek(info.header_offset + 26)
+        name_length, extra_length = int.from_bytes(fp.read(2), 'little'), int.from_bytes(fp.read(2), 'little')
+        fp.seek(info.header_offset + 30 + name_length + extra_length + info.compress_size // 2)
+        byte = fp.read(1)
+        fp.seek(-1, os.SEEK_CUR)
+        fp.write(bytes([byte[0] ^ 0xFF]))
+
+
+def make_tar_gz(path):
+    with tarfile.open(path, 'w:gz') as archive:
+        for name, data in PAGES.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return str(path)
+
+
+def truncate(path, keep):
+    with open(path, 'r+b') as fp:
+        fp.truncate(int(os.path.getsize(path) * keep))
+
+
+def test_natural_order(tmp_path):
+    with ArchiveReader(make_zip(tmp_path / "book.cbz")) as archive:
+        assert [name for name, _ in archive] == ["p1.jpg", "p2.jpg", "p3.jpg", "p10.jpg"]
+        assert archive.skipped == []
+
+
+def test_zip_member_with_bad_data_is_skipped(tmp_path):
+    path = make_zip(tmp_path / "book.cbz")
+    corrupt_member(path, "p2.jpg")
+    with ArchiveReader(path) as archive:
+        members = dict(archive)
+        assert sorted(members) == ["p1.jpg", "p10.jpg", "p3.jpg"]
+        assert members["p3.jpg"] == PAGES["p3.jpg"]
+        assert [name for name, _ in archive.skipped] == ["p2.jpg"]
+
+
+def test_truncated_tar_gz_yields_members_before_the_damage(tmp_path):
+    path = make_tar_gz(tmp_path / "book.tar.gz")
+    truncate(path, 0.6)
+    with ArchiveReader(path, ORDER_ARCHIVE) as archive:
+        members = dict(archive)
+        assert members
+        assert all(PAGES[name] == data for name, data in members.items())
+        assert archive.skipped[0][0] == ''
+        assert len(members) + len(archive.skipped) - 1 <= len(PAGES)
+
+
+def test_truncated_tar_stream_stops_at_the_damage(tmp_path):
+    path = make_tar_gz(tmp_path / "book.tar.gz")
+    truncate(path, 0.6)
+
+    class Pipe(io.RawIOBase):
+        """A non-seekable view of the file, like stdin."""
+
+        def __init__(self, fp):
+            self.fp = fp
+
+        def readable(self):
+            return True
+
+        def readinto(self, buffer):
+            data = self.fp.read(len(buffer))
+            buffer[:len(data)] = data
+            return len(data)
+
+    with open(path, 'rb') as fp, ArchiveReader(io.BufferedReader(Pipe(fp)), ORDER_ARCHIVE) as archive:
+        members = dict(archive)
+        assert list(members) == list(PAGES)[:len(members)]
+        assert len(archive.skipped) == 1
+        assert archive.name == '<stream>'
+
+
+def test_not_an_archive(tmp_path):
+    path = tmp_path / "junk.zip"
+    path.write_bytes(b"PK")
+    with pytest.raises(ValueError):
+        ArchiveReader(str(path))
+
+
+def test_stream_converter_skips_damaged_members(tmp_path):
+    path = make_zip(tmp_path / "book.cbz")
+    corrupt_member(path, "p2.jpg")
+    out = io.BytesIO()
+    converter = StreamConverter(out)
+    converter.add(path)
+    stats = converter.close()
+    assert stats.pages == 3
+    assert [label for label, _ in stats.skipped] == [f"{path}:p2.jpg"]
+    assert len(PdfReader(out).pages) == 3
+
+
+def test_stream_converter_adds_owner_password_pdf_members(tmp_path):
+    writer = PdfWriter()
+    writer.add_blank_page(width=200, height=100)
+    writer.encrypt(user_password='', owner_password='secret', algorithm='RC4-128')
+    pdf = io.BytesIO()
+    writer.write(pdf)
+    path = tmp_path / "mixed.zip"
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr("a.pdf", pdf.getvalue())
+        archive.writestr("b.jpg", PAGES["p1.jpg"])
+    out = io.BytesIO()
+    converter = StreamConverter(out)
+    converter.add(str(path))
+    stats = converter.close()
+    assert (stats.pages, stats.skipped) == (2, [])
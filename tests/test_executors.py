@@ -0,0 +1,116 @@
+"""Named executors: per-pool limits, task counters and cancellation."""
+
+import threading
+
+import pytest
+
+from img_to_pdf.core import executors as executors_module
+from img_to_pdf.core.executors import (BATCH_CPU, BATCH_IO, BROWSER, INTERACTIVE, Executors, NamedExecutor,
+                                       cancel_and_wait, default_workers)
+
+
+def test_configured_limits_and_defaults():
+    pools = Executors({BATCH_CPU: 3, BATCH_IO: 0})
+    try:
+        assert pools.get(BATCH_CPU).max_workers == 3
+        assert pools.get(BATCH_IO).max_workers == default_workers(BATCH_IO)
+        assert pools.get(BROWSER).max_workers == 1
+        assert pools.get(INTERACTIVE) is pools.get(INTERACTIVE)
+    finally:
+        pools.shutdown(wait=True)
+
+
+def test_unknown_name_is_rejected():
+    with pytest.raises(ValueError):
+        Executors().get('gpu')
+
+
+def test_batch_pools_run_at_low_priority(monkeypatch):
+    lowered = []
+    monkeypatch.setattr(executors_module, 'lower_thread_priority', lambda: lowered.append(True))
+    pools = Executors({BATCH_CPU: 1, INTERACTIVE: 1})
+    try:
+        assert pools.get(BATCH_CPU).low_priority and not pools.get(INTERACTIVE).low_priority
+        pools.get(BATCH_CPU).submit(lambda: None).result()
+        pools.get(INTERACTIVE).submit(lambda: None).result()
+    finally:
+        pools.shutdown(wait=True)
+    assert lowered == [True]
+
+
+def test_concurrency_never_exceeds_the_limit():
+    pool = NamedExecutor('test', 2)
+    lock = threading.Lock()
+    active = [0, 0]  # current, peak
+
+    def task():
+        with lock:
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        threading.Event().wait(0.01)
+        with lock:
+            active[0] -= 1
+
+    try:
+        for future in [pool.submit(task) for _ in range(8)]:
+            future.result()
+    finally:
+        pool.shutdown()
+    assert active[1] <= 2
+
+
+def test_stats_count_queued_running_and_failed():
+    pool = NamedExecutor('test', 1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocker():
+        started.set()
+        release.wait()
+
+    def boom():
+        raise RuntimeError("boom")
+
+    try:
+        futures = [pool.submit(blocker), pool.submit(boom), pool.submit(lambda: 42)]
+        started.wait()
+        stats = pool.stats()
+        assert (stats.running, stats.queued) == (1, 2)
+        release.set()
+        with pytest.raises(RuntimeError):
+            futures[1].result()
+        assert futures[2].result() == 42
+        stats = pool.stats()
+        assert (stats.running, stats.queued, stats.completed, stats.failed) == (0, 0, 3, 1)
+        assert 0.0 < stats.utilization <= 1.0
+        assert "3 done (1 failed)" in stats.summary()
+        pool.reset_stats()
+        assert (pool.stats().completed, pool.stats().failed) == (0, 0)
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+def test_cancel_and_wait_drops_queued_tasks():
+    pool = NamedExecutor('test', 1)
+    release = threading.Event()
+    started = threading.Event()
+    ran = []
+
+    def blocker():
+        started.set()
+        release.wait()
+
+    try:
+        running = pool.submit(blocker)
+        queued = [pool.submit(ran.append, n) for n in range(3)]
+        started.wait()
+        threading.Timer(0.05, release.set).start()
+        cancel_and_wait([running] + queued)
+        assert running.done() and not running.cancelled()
+        assert all(future.cancelled() for future in queued)
+        assert ran == []
+        assert pool.stats().queued == 0
+    finally:
+        release.set()
+        pool.shutdown()
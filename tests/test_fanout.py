@@ -0,0 +1,75 @@
+"""Fan-out encoding: one decode, one output per profile."""
+
+import os
+
+from PIL import Image
+from pypdf import PdfReader, PdfWriter
+
+from img_to_pdf.core.fanout import METHOD_ALL_IN_ONE, METHOD_ONE_BY_ONE, FanOutEncoder, OutputProfile
+
+ARCHIVE = OutputProfile('archive', quality=95, page_size='a4', max_dpi=300)
+PREVIEW = OutputProfile('preview', quality=50, page_size='a4', max_dpi=75)
+
+
+def scan(seed=0):
+    return Image.merge('RGB', [Image.effect_noise((1240, 1754), 40 + seed + i) for i in range(3)])
+
+
+def image_widths(path):
+    return [page['/Resources']['/XObject']['/Im0']['/Width'] for page in PdfReader(path).pages]
+
+
+def test_profile_from_dict_ignores_unknown_keys():
+    profile = OutputProfile.from_dict({'name': 'web', 'quality': 60, 'colour': 'blue'})
+    assert (profile.name, profile.quality, profile.method) == ('web', 60, METHOD_ALL_IN_ONE)
+
+
+def test_draft_size_serves_the_largest_profile(tmp_path):
+    encoder = FanOutEncoder.for_profiles([ARCHIVE, PREVIEW], str(tmp_path), 'job')
+    assert encoder.draft_size((4960, 7016)) == ARCHIVE.layout.target_size(4960, 7016)
+    encoder.abort()
+    encoder = FanOutEncoder.for_profiles([PREVIEW, OutputProfile('full')], str(tmp_path), 'job')
+    assert encoder.draft_size((4960, 7016)) is None
+    encoder.abort()
+
+
+def test_all_in_one_outputs_per_profile(tmp_path):
+    encoder = FanOutEncoder.for_profiles([ARCHIVE, PREVIEW], str(tmp_path), 'job')
+    for i in range(2):
+        encoder.add_image(f"scan{i}.png", scan(i))
+    paths = encoder.close()
+    assert [os.path.basename(p) for p in paths] == ["job_archive.pdf", "job_preview.pdf"]
+    archive, preview = paths
+    assert image_widths(archive) == [1240, 1240]
+    assert image_widths(preview) == [620, 620]
+    assert os.path.getsize(preview) < os.path.getsize(archive)
+    assert [o.stats.counts['photo'] for o in encoder.outputs] == [2, 2]
+
+
+def test_one_by_one_numbers_same_named_sources(tmp_path):
+    profile = OutputProfile('single', method=METHOD_ONE_BY_ONE)
+    sources = ["a/scan.png", "b/scan.png"]
+    encoder = FanOutEncoder.for_profiles([profile, PREVIEW], str(tmp_path), 'job', sources)
+    img = Image.new('RGB', (200, 100), 'white')
+    for source in sources:
+        encoder.add_image(source, img)
+    paths = encoder.close()
+    assert sorted(os.listdir(tmp_path / "single")) == ["scan (2).pdf", "scan.pdf"]
+    assert len(PdfReader(paths[-1]).pages) == 2
+
+
+def test_pdf_pages_go_to_every_profile(tmp_path):
+    writer = PdfWriter()
+    writer.add_blank_page(width=100, height=100)
+    source = str(tmp_path / "in.pdf")
+    writer.write(source)
+    encoder = FanOutEncoder.for_profiles([ARCHIVE, PREVIEW], str(tmp_path), 'job')
+    encoder.add_pdf(source, PdfReader(source))
+    assert [len(PdfReader(p).pages) for p in encoder.close()] == [1, 1]
+
+
+def test_abort_removes_outputs(tmp_path):
+    encoder = FanOutEncoder.for_profiles([ARCHIVE, PREVIEW], str(tmp_path), 'job')
+    encoder.add_image("scan.png", Image.new('RGB', (200, 100)))
+    encoder.abort()
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,68 @@
+"""FileCatalog ordering: block moves, scattered moves, removals and the row index."""
+
+from img_to_pdf.core.file_catalog import FileCatalog
+
+
+def make_catalog(count):
+    catalog = FileCatalog()
+    catalog.extend(catalog.new_entries(f"f{i}.png" for i in range(count)))
+    return catalog
+
+
+def paths(catalog):
+    return [entry.path for entry in catalog]
+
+
+def test_new_entries_skips_known_and_repeated_paths():
+    catalog = make_catalog(3)
+    entries = catalog.new_entries(["f1.png", "g.png", "g.png", "h.pdf"])
+    assert [(entry.path, entry.type) for entry in entries] == [("g.png", "image"), ("h.pdf", "pdf")]
+
+
+def test_move_block_down():
+    catalog = make_catalog(6)
+    new_first = catalog.move_block(1, 2, 5)
+    assert paths(catalog) == ["f0.png", "f3.png", "f4.png", "f1.png", "f2.png", "f5.png"]
+    assert new_first == 3
+
+
+def test_move_block_up():
+    catalog = make_catalog(6)
+    new_first = catalog.move_block(3, 4, 1)
+    assert paths(catalog) == ["f0.png", "f3.png", "f4.png", "f1.png", "f2.png", "f5.png"]
+    assert new_first == 1
+
+
+def test_move_block_to_end():
+    catalog = make_catalog(4)
+    new_first = catalog.move_block(0, 0, 4)
+    assert paths(catalog) == ["f1.png", "f2.png", "f3.png", "f0.png"]
+    assert new_first == 3
+
+
+def test_move_block_keeps_row_index_current():
+    catalog = make_catalog(6)
+    catalog.row_of("f0.png")  # Builds the index
+    catalog.move_block(4, 5, 0)
+    assert [catalog.row_of(path) for path in paths(catalog)] == list(range(6))
+
+
+def test_moved_order_gathers_scattered_rows():
+    catalog = make_catalog(6)
+    order, new_rows = catalog.moved_order([0, 2, 4], 6)
+    catalog.reorder(order)
+    assert paths(catalog) == ["f1.png", "f3.png", "f5.png", "f0.png", "f2.png", "f4.png"]
+    assert new_rows == [3, 4, 5]
+
+
+def test_remove_rows_updates_membership_and_rows():
+    catalog = make_catalog(5)
+    removed = catalog.remove_rows([3, 1, 7])
+    assert [entry.path for entry in removed] == ["f1.png", "f3.png"]
+    assert "f1.png" not in catalog
+    assert catalog.row_of("f4.png") == 2
+    assert catalog.row_of("f1.png") == -1
+
+
+def test_row_ranges_bottom_first():
+    assert FileCatalog.row_ranges([1, 2, 3, 7, 5, 6]) == [(5, 7), (1, 3)]
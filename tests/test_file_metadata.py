@@ -0,0 +1,88 @@
+"""MetadataIndex refreshes and capture date reads."""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from img_to_pdf.core.file_catalog import CatalogEntry
+from img_to_pdf.core.file_metadata import MetadataIndex, natural_key, read_taken_dates
+
+
+def write(path, data):
+    with open(path, 'wb') as fp:
+        fp.write(data)
+    return str(path)
+
+
+def test_refresh_fills_size_and_times(tmp_path):
+    entries = [CatalogEntry(write(tmp_path / f"{i}.png", b"x" * (i + 1))) for i in range(3)]
+    assert MetadataIndex().refresh(entries) == 1
+    assert [entry.size for entry in entries] == [1, 2, 3]
+    assert all(entry.mtime is not None for entry in entries)
+
+
+def test_refresh_sees_in_place_edits(tmp_path):
+    path = write(tmp_path / "a.jpg", b"x" * 10)
+    folder_mtime = os.stat(tmp_path).st_mtime_ns
+    entry = CatalogEntry(path)
+    index = MetadataIndex()
+    index.refresh([entry])
+    entry.taken = "2020-01-01 00:00:00"
+    entry.probe = object()
+
+    # Rewriting the file keeps the folder's modification time
+    with open(path, 'r+b') as fp:
+        fp.write(b"y" * 20)
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 10**9))
+    assert os.stat(tmp_path).st_mtime_ns == folder_mtime
+
+    index.refresh([entry])
+    assert entry.size == 20
+    assert entry.taken is None
+    assert entry.probe is None
+
+
+def test_refresh_keeps_cached_values_of_unchanged_files(tmp_path):
+    entry = CatalogEntry(write(tmp_path / "a.jpg", b"x"))
+    index = MetadataIndex()
+    index.refresh([entry])
+    entry.taken = ''
+    index.refresh([entry])
+    assert entry.taken == ''
+
+
+def test_refresh_clears_removed_files(tmp_path):
+    path = write(tmp_path / "a.png", b"x")
+    entry = CatalogEntry(path)
+    index = MetadataIndex()
+    index.refresh([entry])
+    os.unlink(path)
+    index.refresh([entry])
+    assert entry.size is None and entry.mtime is None
+
+
+def test_read_taken_dates_calls_back_when_done(tmp_path):
+    exif = Image.Exif()
+    exif[0x0132] = "2021:06:05 04:03:02"   # DateTime
+    dated = tmp_path / "dated.jpg"
+    Image.new('RGB', (8, 8)).save(dated, exif=exif)
+    plain = tmp_path / "plain.jpg"
+    Image.new('RGB', (8, 8)).save(plain)
+    entries = [CatalogEntry(str(dated)), CatalogEntry(str(plain)), CatalogEntry(str(tmp_path / "page.html"))]
+
+    done = threading.Event()
+    with ThreadPoolExecutor(2) as executor:
+        assert read_taken_dates(entries, executor, done.set) == 2
+        assert done.wait(5)
+    assert [entry.taken for entry in entries] == ["2021-06-05 04:03:02", "", ""]
+
+    done.clear()
+    assert read_taken_dates(entries, None, done.set) == 0
+    assert done.is_set()
+
+
+def test_natural_key():
+    names = ["img10.png", "IMG2.png", "img1.png", "img02.png"]
+    assert sorted(names, key=natural_key) == ["img1.png", "IMG2.png", "img02.png", "img10.png"]
@@ -0,0 +1,100 @@
+"""Header probing: structure checks on images and PDF encryption."""
+
+import io
+
+from PIL import Image
+from pypdf import PdfReader, PdfWriter
+
+from img_to_pdf.core.file_catalog import CatalogEntry
+from img_to_pdf.core.file_probe import probe_entry, probe_image, probe_pdf
+from img_to_pdf.core.pdf_writer import ImagePdfDocument
+
+
+def jpeg_bytes(size=(64, 48), **params):
+    out = io.BytesIO()
+    Image.effect_noise(size, 64).convert('RGB').save(out, 'JPEG', **params)
+    return out.getvalue()
+
+
+def write(path, data):
+    with open(path, 'wb') as fp:
+        fp.write(data)
+    return str(path)
+
+
+def test_complete_jpeg_is_ok(tmp_path):
+    info, _ = probe_image(write(tmp_path / "a.jpg", jpeg_bytes()))
+    assert info.ok
+    assert (info.format, info.width, info.height, info.mode) == ('JPEG', 64, 48, 'RGB')
+
+
+def test_truncated_jpeg_is_flagged(tmp_path):
+    data = jpeg_bytes(size=(256, 256))
+    info, _ = probe_image(write(tmp_path / "cut.jpg", data[:len(data) // 2]))
+    assert "truncated JPEG" in info.error
+
+
+def test_jpeg_with_trailing_data_is_ok(tmp_path):
+    # Motion photos append a video after the image's end marker
+    path = write(tmp_path / "motion.jpg", jpeg_bytes() + b"\0\0\0\x18ftypmp42" + bytes(range(256)) * 64)
+    info, _ = probe_image(path)
+    assert info.ok, info.error
+
+
+def test_truncated_jpeg_with_exif_thumbnail_is_flagged(tmp_path):
+    # The thumbnail's end marker inside APP1 does not count for the main image
+    thumb = jpeg_bytes(size=(16, 16))
+    exif = Image.Exif()
+    exif[0x010F] = "Camera"
+    data = jpeg_bytes(size=(256, 256), exif=exif.tobytes() + thumb, progressive=True)
+    info, _ = probe_image(write(tmp_path / "cut.jpg", data[:len(data) - 2048]))
+    assert "truncated JPEG" in info.error
+
+
+def test_truncated_png_is_flagged(tmp_path):
+    out = io.BytesIO()
+    Image.effect_noise((128, 128), 64).save(out, 'PNG')
+    data = out.getvalue()
+    info, _ = probe_image(write(tmp_path / "cut.png", data[:-100]))
+    assert "truncated PNG" in info.error
+
+
+def make_pdf(path, pages=2, **encrypt):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=100)
+    if encrypt:
+        writer.encrypt(algorithm='RC4-128', **encrypt)
+    with open(path, 'wb') as fp:
+        writer.write(fp)
+    return str(path)
+
+
+def test_owner_password_pdf_is_ok(tmp_path):
+    path = make_pdf(tmp_path / "restricted.pdf", user_password='', owner_password='secret')
+    assert PdfReader(path).is_encrypted
+    info = probe_pdf(path)
+    assert info.ok, info.error
+    assert info.pages == 2
+
+
+def test_owner_password_pdf_pages_copy_unencrypted(tmp_path):
+    path = make_pdf(tmp_path / "restricted.pdf", user_password='', owner_password='secret')
+    out = io.BytesIO()
+    document = ImagePdfDocument(out)
+    document.add_pdf_pages(PdfReader(path))
+    document.close()
+    copied = PdfReader(out)
+    assert not copied.is_encrypted
+    assert len(copied.pages) == 2
+
+
+def test_user_password_pdf_is_flagged(tmp_path):
+    path = make_pdf(tmp_path / "locked.pdf", user_password='open', owner_password='secret')
+    assert probe_pdf(path).error == "password protected PDF"
+
+
+def test_probe_entry_stores_result(tmp_path):
+    entry = CatalogEntry(str(tmp_path / "missing.png"))
+    assert probe_entry(entry).error == "file not found"
+    assert entry.problem == "file not found"
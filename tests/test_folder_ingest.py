@@ -0,0 +1,76 @@
+"""FolderIngest: walk order, filtering, symlink loops and batching."""
+
+import os
+
+import pytest
+
+from img_to_pdf.core.folder_ingest import FolderIngest
+
+
+def touch(root, relative):
+    path = os.path.join(root, *relative.split('/'))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb'):
+        pass
+    return path
+
+
+def relative_paths(root, found):
+    return [os.path.relpath(path, root).replace(os.sep, '/') for path in found]
+
+
+def test_walks_files_before_subfolders_in_name_order(tmp_path):
+    for name in ["b.png", "A.jpg", "sub/c.pdf", "sub/deeper/d.html", "z.png", "notes.txt"]:
+        touch(tmp_path, name)
+    ingest = FolderIngest()
+    found = relative_paths(tmp_path, ingest.walk([str(tmp_path)]))
+    assert found == ["A.jpg", "b.png", "z.png", "sub/c.pdf", "sub/deeper/d.html"]
+    assert ingest.stats.files == 5
+    assert ingest.stats.skipped == 1
+    assert ingest.stats.folders == 3
+
+
+def test_hidden_entries_and_excluded_folders_are_skipped(tmp_path):
+    for name in [".hidden.png", ".cache/a.png", "raw/b.png", "keep/c.png"]:
+        touch(tmp_path, name)
+    ingest = FolderIngest(exclude=['.*', 'raw'])
+    assert relative_paths(tmp_path, ingest.walk([str(tmp_path)])) == ["keep/c.png"]
+
+
+def test_include_globs_match_relative_paths(tmp_path):
+    for name in ["scans/a.png", "scans/b.jpg", "other/c.png"]:
+        touch(tmp_path, name)
+    ingest = FolderIngest(include=['scans/*.png'])
+    assert relative_paths(tmp_path, ingest.walk([str(tmp_path)])) == ["scans/a.png"]
+
+
+def test_symlink_loop_is_walked_once(tmp_path):
+    touch(tmp_path, "sub/a.png")
+    try:
+        os.symlink(str(tmp_path), os.path.join(str(tmp_path), "sub", "up"), target_is_directory=True)
+    except (OSError, NotImplementedError):
+        pytest.skip("symlinks are not available")
+    ingest = FolderIngest()
+    assert relative_paths(tmp_path, ingest.walk([str(tmp_path)])) == ["sub/a.png"]
+    assert ingest.stats.loops == 1
+
+
+def test_run_hands_over_every_file_in_batches(tmp_path):
+    expected = sorted(touch(tmp_path, f"{i:03d}.png") for i in range(25))
+    batches = []
+    stats = FolderIngest().run([str(tmp_path)], batches.append, batch_size=10, batch_seconds=60)
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    assert [path for batch in batches for path in batch] == expected
+    assert stats.files == 25
+
+
+def test_cancelled_walk_stops(tmp_path):
+    for i in range(5):
+        touch(tmp_path, f"{i}/a.png")
+    ingest = FolderIngest()
+    found = []
+    for path in ingest.walk([str(tmp_path)]):
+        found.append(path)
+        ingest.cancel_event.set()
+    assert len(found) == 1
+    assert ingest.stats.cancelled
@@ -0,0 +1,85 @@
+"""FolderWatcher reporting of settled files, and retries after forget."""
+
+import threading
+import time
+
+from img_to_pdf.core.folder_watcher import FolderWatcher
+
+
+def watch(tmp_path, on_ready):
+    watcher = FolderWatcher([str(tmp_path)], on_ready, settle_seconds=0.05, poll_seconds=0.02, use_inotify=False)
+    watcher.start()
+    # Files already there when the first scan runs are not reported
+    time.sleep(0.2)
+    return watcher
+
+
+def test_reports_new_files_once(tmp_path):
+    (tmp_path / "old.png").write_bytes(b"x")
+    calls = []
+    reported = threading.Event()
+
+    def on_ready(paths):
+        calls.append(paths)
+        reported.set()
+
+    watcher = watch(tmp_path, on_ready)
+    try:
+        (tmp_path / "new.png").write_bytes(b"x")
+        (tmp_path / "notes.txt").write_bytes(b"x")
+        assert reported.wait(5)
+        time.sleep(0.3)
+    finally:
+        watcher.stop()
+    assert calls == [[str(tmp_path / "new.png")]]
+
+
+def test_forgotten_files_are_reported_again(tmp_path):
+    calls = []
+    retried = threading.Event()
+
+    def on_ready(paths):
+        calls.append(paths)
+        if len(calls) == 1:
+            watcher.forget(paths)
+        else:
+            retried.set()
+
+    watcher = watch(tmp_path, on_ready)
+    try:
+        (tmp_path / "a.png").write_bytes(b"x")
+        assert retried.wait(5)
+    finally:
+        watcher.stop()
+    assert calls[:2] == [[str(tmp_path / "a.png")]] * 2
+
+
+def test_forgotten_files_are_given_up_after_max_retries(tmp_path):
+    calls = []
+    given_up = []
+    events = [threading.Event(), threading.Event()]
+
+    def on_ready(paths):
+        calls.append(paths)
+        given_up.extend(watcher.forget(paths))
+        if given_up:
+            events[len(given_up) - 1].set()
+
+    watcher = FolderWatcher([str(tmp_path)], on_ready, settle_seconds=0.02, poll_seconds=0.01,
+                            use_inotify=False, max_retries=2)
+    watcher.start()
+    time.sleep(0.1)
+    try:
+        (tmp_path / "bad.png").write_bytes(b"x")
+        assert events[0].wait(5)
+        time.sleep(0.2)
+        assert len(calls) == 3
+        # A new version of the file gets a fresh set of retries
+        (tmp_path / "bad.png").write_bytes(b"xy")
+        assert events[1].wait(5)
+        time.sleep(0.2)
+    finally:
+        watcher.stop()
+    path = str(tmp_path / "bad.png")
+    assert calls == [[path]] * 6
+    assert given_up == [path] * 2
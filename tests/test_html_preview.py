@@ -0,0 +1,104 @@
+"""HtmlPreviewRenderer with a stand-in browser: scaling, warm browsers, launch failures."""
+
+import importlib.util
+import io
+import threading
+
+import pytest
+from PIL import Image
+
+from img_to_pdf.core import html_preview
+from img_to_pdf.core.html_preview import HtmlPreviewRenderer
+from img_to_pdf.core.html_to_pdf_converter import BrowserUnavailableError
+
+
+def screenshot():
+    out = io.BytesIO()
+    Image.new('RGBA', (1920, 1080), (0, 0, 255, 255)).save(out, 'PNG')
+    return out.getvalue()
+
+
+class Browser:
+    """Counts launches and renders; fails to start when ``broken`` is set."""
+
+    broken = False
+    launches = 0
+
+    def __init__(self):
+        if Browser.broken:
+            raise BrowserUnavailableError("No compatible browser found.")
+        Browser.launches += 1
+        self.renders = 0
+        self.closed = False
+
+    def capture_png(self, path, settle_seconds):
+        self.renders += 1
+        return screenshot()
+
+    def convert_file_sync(self, path, pdf_path):
+        return pdf_path
+
+    def cleanup(self):
+        self.closed = True
+
+
+@pytest.fixture
+def browser(monkeypatch):
+    monkeypatch.setattr(Browser, 'broken', False)
+    monkeypatch.setattr(Browser, 'launches', 0)
+    monkeypatch.setattr(html_preview, 'HtmlToPdfConverter', Browser)
+    return Browser
+
+
+def test_render_scales_to_png_thumbnail(browser):
+    data = HtmlPreviewRenderer().render("page.html", 96)
+    with Image.open(io.BytesIO(data)) as img:
+        assert (img.format, img.mode, img.size) == ('PNG', 'RGB', (96, 54))
+
+
+def test_browser_stays_open_per_thread(browser):
+    renderer = HtmlPreviewRenderer()
+    renderer.render("a.html", 96)
+    renderer.render("b.html", 96)
+    assert renderer.render_pdf("c.html", "c.pdf") == "c.pdf"
+    assert browser.launches == 1
+    thread = threading.Thread(target=renderer.render, args=("d.html", 96))
+    thread.start()
+    thread.join()
+    assert browser.launches == 2
+    converters = list(renderer._converters)
+    renderer.close()
+    assert all(converter.closed for converter in converters)
+
+
+def test_launch_failure_is_remembered(browser):
+    renderer = HtmlPreviewRenderer()
+    browser.broken = True
+    with pytest.raises(BrowserUnavailableError):
+        renderer.render("a.html", 96)
+    assert not renderer.available
+    # Later rows fail at once, even if a browser could start now
+    browser.broken = False
+    with pytest.raises(BrowserUnavailableError, match="No compatible browser"):
+        renderer.render_pdf("b.html", "b.pdf")
+    assert browser.launches == 0
+
+
+def test_render_failure_in_running_browser_is_remembered(browser, monkeypatch):
+    def fail(self, path, settle_seconds):
+        raise BrowserUnavailableError("browser crashed")
+
+    monkeypatch.setattr(Browser, 'capture_png', fail)
+    renderer = HtmlPreviewRenderer()
+    with pytest.raises(BrowserUnavailableError):
+        renderer.render("a.html", 96)
+    assert not renderer.available
+
+
+def test_missing_selenium_disables_previews():
+    if importlib.util.find_spec("selenium") is not None:
+        pytest.skip("selenium is installed; this would launch a real browser")
+    renderer = HtmlPreviewRenderer()
+    with pytest.raises(BrowserUnavailableError, match="Selenium is not installed"):
+        renderer.render("a.html", 96)
+    assert not renderer.available
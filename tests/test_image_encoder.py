@@ -0,0 +1,99 @@
+"""Codec choice per image class, and lossless codecs decoding back to the same pixels."""
+
+import io
+
+from PIL import Image, ImageChops, ImageDraw
+from pypdf import PdfReader
+
+from img_to_pdf.core.image_analysis import BILEVEL, FLAT, GRAYSCALE, PHOTO, classify_image
+from img_to_pdf.core.image_encoder import CodecStats, encode_image
+from img_to_pdf.core.pdf_writer import ImagePdfDocument
+
+
+def text_scan():
+    img = Image.new('L', (400, 300), 255)
+    draw = ImageDraw.Draw(img)
+    for y in range(20, 280, 20):
+        draw.rectangle((20, y, 380, y + 6), fill=0)
+    return img
+
+
+def screenshot():
+    img = Image.new('RGB', (400, 300), (240, 240, 250))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((0, 0, 400, 40), fill=(30, 90, 200))
+    draw.rectangle((50, 80, 200, 200), fill=(200, 50, 50))
+    return img
+
+
+def photo():
+    return Image.merge('RGB', [Image.effect_noise((300, 200), 60 + 10 * i) for i in range(3)])
+
+
+def gray_photo():
+    return Image.effect_noise((300, 200), 60).convert('RGB')
+
+
+def decoded(encoded):
+    """The image a PDF reader gets back from the embedded stream."""
+    out = io.BytesIO()
+    document = ImagePdfDocument(out)
+    document.add_image_page(encoded)
+    document.close()
+    return PdfReader(out).pages[0].images[0].image
+
+
+def same_pixels(a, b):
+    return ImageChops.difference(a.convert('RGB'), b.convert('RGB')).getbbox() is None
+
+
+def test_classes():
+    assert classify_image(text_scan()) == BILEVEL
+    assert classify_image(screenshot()) == FLAT
+    assert classify_image(photo()) == PHOTO
+    assert classify_image(gray_photo()) == GRAYSCALE
+
+
+def test_photo_stays_rgb_jpeg():
+    encoded = encode_image(photo(), 80)
+    assert (encoded.filter, encoded.color_space, encoded.image_class) == ('DCTDecode', 'DeviceRGB', PHOTO)
+
+
+def test_gray_photo_becomes_gray_jpeg():
+    encoded = encode_image(gray_photo(), 80)
+    assert (encoded.filter, encoded.color_space) == ('DCTDecode', 'DeviceGray')
+
+
+def test_screenshot_is_lossless_flate():
+    img = screenshot()
+    encoded = encode_image(img, 80)
+    assert (encoded.filter, encoded.color_space) == ('FlateDecode', 'DeviceRGB')
+    assert same_pixels(decoded(encoded), img)
+
+
+def test_text_scan_is_one_bit():
+    img = text_scan()
+    encoded = encode_image(img, 80)
+    assert encoded.bits_per_component == 1
+    assert encoded.filter in ('CCITTFaxDecode', 'FlateDecode')
+    assert same_pixels(decoded(encoded), img)
+
+
+def test_auto_codec_off_always_uses_jpeg():
+    for img in (text_scan(), screenshot(), photo()):
+        assert encode_image(img, 80, auto_codec=False).filter == 'DCTDecode'
+
+
+def test_transparent_image_is_flattened_on_white():
+    img = Image.new('RGBA', (64, 64), (0, 0, 0, 0))
+    encoded = encode_image(img, 80)
+    assert decoded(encoded).convert('RGB').getpixel((10, 10)) == (255, 255, 255)
+
+
+def test_stats_count_classes_and_savings():
+    stats = CodecStats()
+    for img in (text_scan(), screenshot(), photo()):
+        encode_image(img, 80, stats=stats)
+    assert (stats.counts[BILEVEL], stats.counts[FLAT], stats.counts[PHOTO]) == (1, 1, 1)
+    assert stats.saved_bytes > 0
+    assert "saved" in stats.summary()
@@ -0,0 +1,56 @@
+"""Output naming and placement: unique names, and sources left intact."""
+
+import os
+
+import pytest
+
+from img_to_pdf.core.output_files import (PARTIAL_SUFFIX, copy_into_place, move_into_place, partial_path,
+                                          unique_output_paths)
+
+
+def write(path, data):
+    with open(path, 'wb') as fp:
+        fp.write(data)
+    return str(path)
+
+
+def test_same_base_names_get_numbered(tmp_path):
+    paths = unique_output_paths(["a/scan.png", "b/scan.jpg", "c/Scan.tif", "d/other.png"], str(tmp_path))
+    assert [os.path.basename(p) for p in paths.values()] == ["scan.pdf", "scan (2).pdf", "Scan (3).pdf", "other.pdf"]
+
+
+def test_partial_path_is_hidden_next_to_output(tmp_path):
+    path = partial_path(str(tmp_path / "out.pdf"))
+    assert os.path.dirname(path) == str(tmp_path)
+    assert os.path.basename(path).startswith(".out.pdf.")
+    assert path.endswith(PARTIAL_SUFFIX)
+    assert os.path.getsize(path) == 0
+
+
+def test_move_replaces_existing_output(tmp_path):
+    final = write(tmp_path / "out.pdf", b"old")
+    move_into_place(write(tmp_path / "new.part", b"new"), final)
+    assert open(final, 'rb').read() == b"new"
+    assert os.listdir(tmp_path) == ["out.pdf"]
+
+
+def test_copy_does_not_share_the_source_file(tmp_path):
+    source = write(tmp_path / "input.pdf", b"%PDF-1.4 source")
+    final = str(tmp_path / "out" / "input.pdf")
+    os.mkdir(tmp_path / "out")
+    copy_into_place(source, final)
+    assert open(final, 'rb').read() == b"%PDF-1.4 source"
+    assert os.stat(source).st_nlink == 1
+    assert not os.path.samefile(source, final)
+    with open(final, 'ab') as fp:
+        fp.write(b" edited")
+    assert open(source, 'rb').read() == b"%PDF-1.4 source"
+    assert os.listdir(tmp_path / "out") == ["input.pdf"]
+
+
+def test_failed_copy_keeps_existing_output(tmp_path):
+    final = write(tmp_path / "out.pdf", b"old")
+    with pytest.raises(FileNotFoundError):
+        copy_into_place(str(tmp_path / "missing.pdf"), final)
+    assert open(final, 'rb').read() == b"old"
+    assert os.listdir(tmp_path) == ["out.pdf"]
@@ -0,0 +1,109 @@
+"""Page cache and the disk store under it: hits return identical bytes, LRU eviction."""
+
+import os
+
+from PIL import Image
+
+from img_to_pdf.core.disk_cache import DiskCache
+from img_to_pdf.core.image_encoder import CodecStats, encode_image
+from img_to_pdf.core.page_cache import EncodedPage, PageCache
+
+SETTINGS = {'quality': 80, 'auto_codec': True}
+
+
+def write(path, data):
+    with open(path, 'wb') as fp:
+        fp.write(data)
+    return str(path)
+
+
+def images():
+    return [encode_image(Image.effect_noise((64, 48), 40 + i).convert('RGB'), 80) for i in range(3)]
+
+
+def test_disk_cache_round_trip(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache"), 1 << 20, '.bin')
+    assert cache.read("a") is None
+    cache.write("a", b"payload")
+    assert cache.read("a") == b"payload"
+    assert (len(cache), cache.total_bytes) == (1, 7)
+    # A new instance indexes what is on disk
+    assert DiskCache(str(tmp_path / "cache"), 1 << 20, '.bin').read("a") == b"payload"
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    directory = str(tmp_path / "cache")
+    cache = DiskCache(directory, 1000, '.bin')
+    for n, key in enumerate("abc"):
+        cache.write(key, bytes(100))
+        os.utime(cache.path(key), (1000 + n, 1000 + n))
+    cache = DiskCache(directory, 250, '.bin')
+    cache.load()
+    assert len(cache) == 3
+    cache.touch("a")
+    cache.write("d", bytes(100))
+    assert sorted(name[0] for name in os.listdir(directory)) == ["a", "d"]
+    assert cache.evicted == 2
+    assert cache.total_bytes == 200
+
+
+def test_unusable_directory_is_unavailable(tmp_path):
+    blocker = write(tmp_path / "file", b"")
+    cache = DiskCache(os.path.join(blocker, "cache"), 1 << 20, '.bin')
+    assert not cache.available
+    assert cache.read("a") is None
+
+
+def test_page_hit_returns_identical_bytes(tmp_path):
+    source = write(tmp_path / "scan.png", b"image")
+    cache = PageCache(str(tmp_path / "cache"), 1 << 20)
+    key = cache.key(source, SETTINGS)
+    assert cache.lookup(key) == (False, None)
+    originals = images()[:1]
+    stored = cache.store(key, EncodedPage((64, 48), iter(originals)))
+    assert stored.images == originals
+
+    stats = CodecStats()
+    found, page = cache.lookup(key, stats)
+    assert found and not page.strips and page.size == (64, 48)
+    assert page.images == originals
+    assert sum(stats.counts.values()) == 1
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+def test_strips_are_cached_once_all_have_passed(tmp_path):
+    source = write(tmp_path / "scan.tif", b"image")
+    cache = PageCache(str(tmp_path / "cache"), 1 << 20)
+    key = cache.key(source, SETTINGS)
+    strips = images()
+    page = cache.store(key, EncodedPage((64, 144), iter(strips), strips=True))
+    first = next(iter(page.images))
+    assert first == strips[0]
+    assert cache.lookup(key)[0] is False
+    assert list(page.images) == strips[1:]
+    found, cached = cache.lookup(key)
+    assert found and cached.strips
+    assert [image.data for image in cached.images] == [image.data for image in strips]
+
+
+def test_blank_page_is_cached(tmp_path):
+    source = write(tmp_path / "blank.png", b"image")
+    cache = PageCache(str(tmp_path / "cache"), 1 << 20)
+    key = cache.key(source, SETTINGS)
+    cache.store_blank(key)
+    assert cache.lookup(key) == (True, None)
+
+
+def test_key_changes_with_source_and_settings(tmp_path):
+    source = write(tmp_path / "scan.png", b"image")
+    cache = PageCache(str(tmp_path / "cache"), 1 << 20)
+    key = cache.key(source, SETTINGS)
+    assert cache.key(source, dict(SETTINGS, quality=50)) != key
+    os.utime(source, ns=(0, 1_000_000_000))
+    assert cache.key(source, SETTINGS) != key
+
+
+def test_content_hash_key_survives_a_move(tmp_path):
+    cache = PageCache(str(tmp_path / "cache"), 1 << 20, hash_content=True)
+    key = cache.key(write(tmp_path / "a.png", b"image"), SETTINGS)
+    assert cache.key(write(tmp_path / "b.png", b"image"), SETTINGS) == key
@@ -0,0 +1,47 @@
+"""Page sizing through the placement matrix, and resampling only above the max DPI."""
+
+import pytest
+from PIL import Image
+
+from img_to_pdf.core.fanout import resample_for_layout
+from img_to_pdf.core.page_layout import PAGE_FIT, PAGE_SIZES, POINTS_PER_MM, PageLayout
+
+
+def test_fit_page_matches_image_plus_margins():
+    layout = PageLayout(PAGE_FIT, margin_mm=10)
+    page_w, page_h, matrix = layout.placement(800, 600)
+    margin = 10 * POINTS_PER_MM
+    assert (page_w, page_h) == pytest.approx((800 + 2 * margin, 600 + 2 * margin))
+    assert matrix == pytest.approx((800, 0, 0, 600, margin, margin))
+
+
+def test_image_is_scaled_to_fit_and_centered():
+    page_w, page_h, (draw_w, _, _, draw_h, x, y) = PageLayout('a4').placement(3000, 1000)
+    assert (page_w, page_h) == PAGE_SIZES['a4']
+    assert draw_w == pytest.approx(page_w)
+    assert draw_h == pytest.approx(page_w / 3)
+    assert (x, y) == pytest.approx((0, (page_h - draw_h) / 2))
+
+
+def test_landscape_swaps_page_sides():
+    page_w, page_h, _ = PageLayout('letter', portrait=False).placement(100, 100)
+    assert (page_w, page_h) == (792.0, 612.0)
+
+
+def test_effective_dpi():
+    # 2480 pixels across the 210 mm of an A4 page is 300 dpi
+    assert PageLayout('a4').effective_dpi(2480, 3508) == pytest.approx(300, abs=0.5)
+
+
+def test_target_size_only_above_max_dpi():
+    layout = PageLayout('a4', max_dpi=150)
+    assert layout.target_size(1200, 1600) is None
+    assert layout.target_size(2480, 3508) == (1240, 1754)
+    assert PageLayout('a4').target_size(2480, 3508) is None
+    assert PageLayout(PAGE_FIT, max_dpi=150).target_size(2480, 3508) is None
+
+
+def test_resample_keeps_images_within_max_dpi():
+    img = Image.new('RGB', (1200, 1600))
+    assert resample_for_layout(img, PageLayout('a4', max_dpi=150)) is img
+    assert resample_for_layout(Image.new('RGB', (2480, 3508)), PageLayout('a4', max_dpi=150)).size == (1240, 1754)
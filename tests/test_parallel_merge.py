@@ -0,0 +1,77 @@
+"""Fragment splicing and the hierarchical parallel merge."""
+
+import io
+
+import pytest
+from pypdf import PdfReader, PdfWriter
+
+from img_to_pdf.core.parallel_merge import MergeInput, ParallelMerger
+from img_to_pdf.core.pdf_writer import PdfName, PdfObjectWriter, PdfRef
+
+
+def make_pdf(path, widths, title):
+    """A PDF with one blank page per width and a bookmark on its first page."""
+    writer = PdfWriter()
+    for width in widths:
+        writer.add_blank_page(width=width, height=100)
+    writer.add_outline_item(title, 0)
+    with open(path, 'wb') as fp:
+        writer.write(fp)
+    return str(path)
+
+
+def page_widths(path):
+    return [int(page.mediabox.width) for page in PdfReader(path).pages]
+
+
+def outline(path):
+    reader = PdfReader(path)
+    return [(item.title, reader.get_destination_page_number(item)) for item in reader.outline]
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    return [MergeInput(make_pdf(tmp_path / f"in{i}.pdf", [100 + 10 * i, 105 + 10 * i], f"File {i}"))
+            for i in range(7)]
+
+
+def test_splice_renumbers_objects_but_not_stream_data():
+    fragment = io.BytesIO()
+    part = PdfObjectWriter.for_fragment(fragment, first_num=2)
+    stream = part.alloc()
+    part.write_stream(stream, {}, b"3 0 R stays as written")
+    page = part.write_object(part.alloc(), {'Type': PdfName('Page'), 'Parent': PdfRef(1), 'Contents': stream})
+
+    out = io.BytesIO()
+    writer = PdfObjectWriter(out)
+    pages = writer.alloc()
+    writer.write_object(writer.alloc(), {'Filler': True})
+    delta = writer.splice(fragment, part.offsets, 2, part.next_num)
+    assert delta == 1
+    writer.write_object(pages, {'Type': PdfName('Pages'), 'Kids': [PdfRef(page.num + delta)], 'Count': 1})
+    writer.close(writer.write_object(writer.alloc(), {'Type': PdfName('Catalog'), 'Pages': pages}))
+
+    reader = PdfReader(out)
+    assert len(reader.pages) == 1
+    assert reader.pages[0].get_object().raw_get('/Contents').idnum == stream.num + delta
+    assert reader.pages[0]['/Contents'].get_object().get_data() == b"3 0 R stays as written"
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_merge_keeps_input_order_and_bookmarks(tmp_path, inputs, workers):
+    output = str(tmp_path / "merged.pdf")
+    report = ParallelMerger(chunk_size=2, workers=workers, low_priority=False).merge(inputs, output)
+    expected = [width for i in range(7) for width in (100 + 10 * i, 105 + 10 * i)]
+    assert page_widths(output) == expected
+    assert report.pages == 14
+    assert report.chunks == (4 if workers > 1 else 1)
+    assert outline(output) == [(f"File {i}", 2 * i) for i in range(7)]
+
+
+def test_merge_takes_selected_pages(tmp_path, inputs):
+    output = str(tmp_path / "merged.pdf")
+    selected = [MergeInput(item.path, [1]) for item in inputs[:3]] + [MergeInput(inputs[3].path, [1, 0])]
+    ParallelMerger(chunk_size=1, workers=2, low_priority=False).merge(selected, output)
+    assert page_widths(output) == [105, 115, 125, 135, 130]
+    # Bookmarks pointing at pages that were left out are dropped
+    assert outline(output) == [("File 3", 4)]
@@ -0,0 +1,89 @@
+"""Incremental append: the file reopens with the old pages followed by the new ones."""
+
+import pytest
+from PIL import Image
+from pypdf import PdfReader, PdfWriter
+
+from img_to_pdf.core.image_encoder import encode_image
+from img_to_pdf.core.pdf_append import PdfAppender
+from img_to_pdf.core.pdf_optimizer import optimize_pdf
+
+
+def make_pdf(path, widths, **encrypt):
+    writer = PdfWriter()
+    for width in widths:
+        writer.add_blank_page(width=width, height=100)
+    if encrypt:
+        writer.encrypt(algorithm='RC4-128', **encrypt)
+    writer.write(str(path))
+    return str(path)
+
+
+def page_widths(path):
+    return [int(page.mediabox.width) for page in PdfReader(path).pages]
+
+
+def append_images(path, *sizes):
+    appender = PdfAppender(path)
+    for size in sizes:
+        appender.document.add_image_page(encode_image(Image.new('RGB', size, 'white'), 80))
+    appender.close()
+
+
+def test_appended_file_has_old_and_new_pages(tmp_path):
+    path = make_pdf(tmp_path / "log.pdf", [100, 200])
+    with open(path, 'rb') as fp:
+        original = fp.read()
+    append_images(path, (300, 50), (400, 50))
+    with open(path, 'rb') as fp:
+        assert fp.read().startswith(original)
+    assert page_widths(path) == [100, 200, 300, 400]
+
+
+def test_append_twice(tmp_path):
+    path = make_pdf(tmp_path / "log.pdf", [100])
+    append_images(path, (200, 50))
+    append_images(path, (300, 50))
+    assert page_widths(path) == [100, 200, 300]
+
+
+def test_append_to_file_with_xref_stream(tmp_path):
+    path = make_pdf(tmp_path / "log.pdf", [100, 200])
+    optimize_pdf(path, str(tmp_path / "packed.pdf"), object_streams=True)
+    path = str(tmp_path / "packed.pdf")
+    append_images(path, (300, 50))
+    assert page_widths(path) == [100, 200, 300]
+
+
+def test_appended_pdf_pages(tmp_path):
+    path = make_pdf(tmp_path / "log.pdf", [100])
+    appender = PdfAppender(path)
+    appender.document.add_pdf_pages(PdfReader(make_pdf(tmp_path / "more.pdf", [500, 600])))
+    appender.close()
+    assert page_widths(path) == [100, 500, 600]
+
+
+def test_abort_leaves_file_untouched(tmp_path):
+    path = make_pdf(tmp_path / "log.pdf", [100])
+    with open(path, 'rb') as fp:
+        original = fp.read()
+    appender = PdfAppender(path)
+    appender.document.add_image_page(encode_image(Image.new('RGB', (64, 64)), 80))
+    appender.abort()
+    with open(path, 'rb') as fp:
+        assert fp.read() == original
+
+
+def test_nothing_added_leaves_file_untouched(tmp_path):
+    path = make_pdf(tmp_path / "log.pdf", [100])
+    with open(path, 'rb') as fp:
+        original = fp.read()
+    PdfAppender(path).close()
+    with open(path, 'rb') as fp:
+        assert fp.read() == original
+
+
+def test_encrypted_file_is_rejected(tmp_path):
+    path = make_pdf(tmp_path / "locked.pdf", [100], user_password='open', owner_password='secret')
+    with pytest.raises(ValueError):
+        PdfAppender(path)
@@ -0,0 +1,114 @@
+"""Linearized output checked against qpdf's linearization rules (through pikepdf)."""
+
+import io
+import re
+
+import pytest
+from PIL import Image
+from pypdf import PdfReader, PdfWriter
+
+from img_to_pdf.core.image_encoder import encode_image
+from img_to_pdf.core.pdf_linearizer import linearize_pdf
+from img_to_pdf.core.pdf_writer import ImagePdfDocument
+
+pikepdf = pytest.importorskip("pikepdf")
+
+
+def check_linearization(path):
+    with pikepdf.open(path) as pdf:
+        assert pdf.is_linearized
+        ok = pdf.check_linearization(io.BytesIO())
+        assert ok and not pdf.get_warnings(), pdf.get_warnings()
+
+
+def image_pdf(path, pages=4):
+    with open(path, 'wb') as fp:
+        document = ImagePdfDocument(fp)
+        for i in range(pages):
+            document.add_image_page(encode_image(Image.effect_noise((96, 64), 32 + i).convert('RGB'), 80))
+        document.close()
+    return str(path)
+
+
+def outline_pdf(path, page_mode=None, open_action=False):
+    pdf = pikepdf.new()
+    font = pdf.make_indirect(pikepdf.Dictionary(Type=pikepdf.Name.Font, Subtype=pikepdf.Name.Type1,
+                                                BaseFont=pikepdf.Name.Helvetica))
+    for i in range(6):
+        content = pdf.make_stream(f"BT /F1 12 Tf 20 20 Td (Page {i + 1}) Tj ET".encode('ascii'))
+        pdf.pages.append(pikepdf.Page(pikepdf.Dictionary(
+            Type=pikepdf.Name.Page, MediaBox=[0, 0, 200, 300], Contents=content,
+            Resources=pikepdf.Dictionary(Font=pikepdf.Dictionary(F1=font)))))
+    with pdf.open_outline() as outline:
+        for i in range(6):
+            item = pikepdf.OutlineItem(f"Chapter {i + 1}", i)
+            item.children.append(pikepdf.OutlineItem("Section", i))
+            outline.root.append(item)
+    if page_mode:
+        pdf.Root.PageMode = pikepdf.Name(page_mode)
+    if open_action:
+        pdf.Root.OpenAction = pdf.make_indirect(pikepdf.Dictionary(
+            S=pikepdf.Name.GoTo, D=pikepdf.Array([pdf.pages[2].obj, pikepdf.Name.Fit])))
+    pdf.save(path)
+    return str(path)
+
+
+def first_page_end(path):
+    with open(path, 'rb') as fp:
+        return int(re.search(rb'/E (\d+)', fp.read(1024)).group(1))
+
+
+def object_offset(path, ref):
+    with open(path, 'rb') as fp:
+        return fp.read().index(b"\n%d 0 obj" % ref.idnum) + 1
+
+
+def test_image_document(tmp_path):
+    path = image_pdf(tmp_path / "images.pdf")
+    report = linearize_pdf(path)
+    check_linearization(path)
+    assert report.pages == 4
+    assert report.first_page_bytes < report.file_bytes
+
+
+def test_single_page(tmp_path):
+    path = image_pdf(tmp_path / "one.pdf", pages=1)
+    linearize_pdf(path)
+    check_linearization(path)
+
+
+def test_outline_in_document_section(tmp_path):
+    path = outline_pdf(tmp_path / "book.pdf")
+    linearize_pdf(path)
+    check_linearization(path)
+    chapters = [item.title for item in PdfReader(path).outline if not isinstance(item, list)]
+    assert chapters == [f"Chapter {i}" for i in range(1, 7)]
+
+
+def test_outline_shown_on_open_goes_with_first_page(tmp_path):
+    path = outline_pdf(tmp_path / "book.pdf", page_mode='/UseOutlines')
+    linearize_pdf(path)
+    check_linearization(path)
+    reader = PdfReader(path)
+    assert object_offset(path, reader.trailer['/Root'].raw_get('/Outlines')) < first_page_end(path)
+    assert reader.outline[0].title == "Chapter 1"
+
+
+def test_open_action_objects_go_with_catalog(tmp_path):
+    path = outline_pdf(tmp_path / "book.pdf", page_mode='/UseOutlines', open_action=True)
+    linearize_pdf(path)
+    check_linearization(path)
+    reader = PdfReader(path)
+    assert object_offset(path, reader.trailer['/Root'].raw_get('/OpenAction')) < first_page_end(path)
+    assert reader.get_page_number(reader.trailer['/Root']['/OpenAction']['/D'][0].get_object()) == 2
+
+
+def test_pages_keep_their_order(tmp_path):
+    writer = PdfWriter()
+    for width in range(100, 600, 100):
+        writer.add_blank_page(width=width, height=100)
+    path = str(tmp_path / "sizes.pdf")
+    writer.write(path)
+    linearize_pdf(path)
+    check_linearization(path)
+    assert [int(page.mediabox.width) for page in PdfReader(path).pages] == [100, 200, 300, 400, 500]
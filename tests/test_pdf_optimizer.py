@@ -0,0 +1,93 @@
+"""Optimizer and object copier: duplicate objects written once, pages left intact."""
+
+import io
+import os
+
+from PIL import Image
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from img_to_pdf.core.image_encoder import encode_image
+from img_to_pdf.core.pdf_copier import PdfObjectCopier
+from img_to_pdf.core.pdf_optimizer import optimize_pdf
+from img_to_pdf.core.pdf_writer import ImagePdfDocument, PdfObjectWriter
+
+
+IMAGE = encode_image(Image.effect_noise((160, 120), 64).convert('RGB'), 80)
+
+
+def image_pdf(path, pages=2):
+    """A PDF whose pages show the same picture, each page with its own copy of it."""
+    with open(path, 'wb') as fp:
+        document = ImagePdfDocument(fp)
+        for _ in range(pages):
+            document.add_image_page(IMAGE)
+        document.close()
+    return str(path)
+
+
+def image_ids(path):
+    return [page['/Resources'].raw_get('/XObject').get_object().raw_get('/Im0').idnum
+            for page in PdfReader(path).pages]
+
+
+def test_duplicate_images_are_written_once(tmp_path):
+    path = image_pdf(tmp_path / "doc.pdf", pages=3)
+    assert len(set(image_ids(path))) == 3
+    before = os.path.getsize(path)
+    report = optimize_pdf(path)
+    assert report.objects_deduplicated >= 2
+    assert report.bytes_after == os.path.getsize(path) < before
+    assert len(set(image_ids(path))) == 1
+    assert len(PdfReader(path).pages) == 3
+
+
+def test_unused_resources_are_dropped_and_streams_compressed(tmp_path):
+    writer = PdfWriter()
+    page = writer.add_blank_page(width=200, height=200)
+    font = DictionaryObject({NameObject('/Type'): NameObject('/Font'), NameObject('/Subtype'): NameObject('/Type1'),
+                             NameObject('/BaseFont'): NameObject('/Helvetica')})
+    page[NameObject('/Resources')] = DictionaryObject({NameObject('/Font'): DictionaryObject({
+        NameObject('/F1'): writer._add_object(font),
+        NameObject('/F2'): writer._add_object(DictionaryObject(font)),
+    })})
+    content = DecodedStreamObject()
+    content.set_data(b"BT /F1 12 Tf 20 20 Td (Hello) Tj ET\n" * 20)
+    page[NameObject('/Contents')] = writer._add_object(content)
+    source = str(tmp_path / "text.pdf")
+    writer.write(source)
+
+    target = str(tmp_path / "small.pdf")
+    optimize_pdf(source, target)
+    optimized = PdfReader(target).pages[0]
+    assert list(optimized['/Resources']['/Font']) == ['/F1']
+    assert optimized['/Contents'].get_object().get('/Filter') == '/FlateDecode'
+    assert optimized.extract_text().startswith("Hello")
+
+
+def test_file_is_kept_when_not_smaller(tmp_path):
+    path = image_pdf(tmp_path / "doc.pdf", pages=1)
+    optimize_pdf(path)
+    with open(path, 'rb') as fp:
+        data = fp.read()
+    report = optimize_pdf(path)
+    assert report.bytes_after == report.bytes_before
+    with open(path, 'rb') as fp:
+        assert fp.read() == data
+    assert not os.path.exists(path + '.optimizing')
+
+
+def test_copiers_sharing_digests_dedupe_across_sources(tmp_path):
+    first = PdfReader(image_pdf(tmp_path / "a.pdf", pages=1))
+    second = PdfReader(image_pdf(tmp_path / "b.pdf", pages=1))
+    out = io.BytesIO()
+    writer = PdfObjectWriter(out)
+    document = ImagePdfDocument(writer=writer)
+    digests = {}
+    for reader in (first, second):
+        document.add_pdf_pages(reader, copier=PdfObjectCopier(reader, writer, dedupe=True, digests=digests))
+    document.close()
+    merged = PdfReader(out)
+    ids = {page['/Resources'].raw_get('/XObject').get_object().raw_get('/Im0').idnum for page in merged.pages}
+    assert len(merged.pages) == 2
+    assert len(ids) == 1
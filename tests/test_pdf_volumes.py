@@ -0,0 +1,97 @@
+"""Volume splitting: every volume stays within its page count and byte cap."""
+
+import json
+import os
+
+import pytest
+from PIL import Image
+from pypdf import PdfReader, PdfWriter
+
+from img_to_pdf.core.image_encoder import encode_image
+from img_to_pdf.core.page_layout import PageLayout
+from img_to_pdf.core.pdf_volumes import VolumeWriter
+
+LAYOUT = PageLayout()
+
+
+def photo(seed):
+    # Noise keeps every page about the same, incompressible size
+    return encode_image(Image.effect_noise((200, 150), 40 + seed).convert('RGB'), 90)
+
+
+def readable_pages(volumes):
+    return [len(PdfReader(volume.path).pages) for volume in volumes]
+
+
+def test_page_cap(tmp_path):
+    writer = VolumeWriter(str(tmp_path / "book.pdf"), max_pages=3)
+    for i in range(7):
+        writer.add_image_page(photo(i), LAYOUT, f"p{i}.jpg")
+    volumes = writer.close()
+    assert [v.pages for v in volumes] == [3, 3, 1]
+    assert readable_pages(volumes) == [3, 3, 1]
+    assert [os.path.basename(v.path) for v in volumes] == ["book_part001.pdf", "book_part002.pdf", "book_part003.pdf"]
+
+
+def test_byte_cap(tmp_path):
+    page_bytes = len(photo(0).data)
+    cap = int(page_bytes * 3.5)
+    writer = VolumeWriter(str(tmp_path / "book.pdf"), max_bytes=cap)
+    for i in range(10):
+        writer.add_image_page(photo(i), LAYOUT, f"p{i}.jpg")
+    volumes = writer.close()
+    assert sum(v.pages for v in volumes) == 10
+    assert len(volumes) > 3
+    for volume in volumes:
+        assert volume.bytes == os.path.getsize(volume.path) <= cap
+    assert readable_pages(volumes) == [v.pages for v in volumes]
+
+
+def test_pdf_pages_respect_both_caps(tmp_path):
+    source = PdfWriter()
+    for i in range(8):
+        source.add_blank_page(width=100 + i, height=100)
+    source_path = str(tmp_path / "in.pdf")
+    source.write(source_path)
+
+    writer = VolumeWriter(str(tmp_path / "out.pdf"), max_bytes=2000, max_pages=3)
+    writer.add_pdf_pages(PdfReader(source_path), source_path)
+    volumes = writer.close()
+    assert all(v.pages <= 3 and v.bytes <= 2000 for v in volumes)
+    widths = [int(page.mediabox.width) for v in volumes for page in PdfReader(v.path).pages]
+    assert widths == list(range(100, 108))
+
+
+def test_index_lists_sources_per_volume(tmp_path):
+    writer = VolumeWriter(str(tmp_path / "book.pdf"), max_pages=2)
+    for name in ("a.jpg", "b.jpg", "c.jpg"):
+        writer.add_image_page(photo(0), LAYOUT, name)
+    writer.close()
+    with open(writer.index_path, encoding='utf-8') as f:
+        index = json.load(f)
+    assert [(v['pages'], v['sources']) for v in index['volumes']] == [(2, ["a.jpg", "b.jpg"]), (1, ["c.jpg"])]
+
+
+def test_failed_page_leaves_no_trace(tmp_path):
+    writer = VolumeWriter(str(tmp_path / "book.pdf"))
+    writer.add_image_page(photo(0), LAYOUT, "a.jpg")
+
+    def broken_strips():
+        yield photo(1)
+        raise OSError("truncated file")
+
+    with pytest.raises(OSError):
+        writer.add_strip_page(broken_strips(), 200, 300, LAYOUT, "b.jpg")
+    writer.add_image_page(photo(2), LAYOUT, "c.jpg")
+    volumes = writer.close()
+    assert [v.pages for v in volumes] == [2]
+    assert readable_pages(volumes) == [2]
+    assert volumes[0].sources == ["a.jpg", "c.jpg"]
+
+
+def test_abort_removes_volumes(tmp_path):
+    writer = VolumeWriter(str(tmp_path / "book.pdf"), max_pages=1)
+    for i in range(3):
+        writer.add_image_page(photo(i), LAYOUT, f"p{i}.jpg")
+    writer.abort()
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,79 @@
+"""Blank-page detection and border trimming on synthetic scans."""
+
+from PIL import Image, ImageDraw
+
+from img_to_pdf.core.image_analysis import analyze_page
+from img_to_pdf.core.scan_cleanup import ScanCleanup
+
+SIZE = (1000, 1400)
+
+
+def page(text=True, border=0, paper=245, noise=False):
+    """A scanned page: paper tone, optional text block and black scanner border."""
+    img = Image.new('L', SIZE, paper)
+    if noise:
+        # Paper grain stays well within the ink threshold
+        img = Image.blend(img, Image.effect_noise(SIZE, 8), 0.1)
+    draw = ImageDraw.Draw(img)
+    if text:
+        for y in range(300, 900, 30):
+            draw.rectangle((250, y, 750, y + 10), fill=20)
+    if border:
+        draw.rectangle((0, 0, SIZE[0], border), fill=0)
+        draw.rectangle((0, 0, border, SIZE[1]), fill=0)
+    return img.convert('RGB')
+
+
+def inside(bbox, box):
+    return bbox[0] <= box[0] and bbox[1] <= box[1] and bbox[2] >= box[2] and bbox[3] >= box[3]
+
+
+def test_blank_page():
+    assert analyze_page(page(text=False))['blank']
+    assert analyze_page(page(text=False, noise=True))['blank']
+
+
+def test_blank_page_with_scanner_border():
+    assert analyze_page(page(text=False, border=40))['blank']
+
+
+def test_text_page_is_not_blank_and_box_fits_text():
+    result = analyze_page(page())
+    assert not result['blank']
+    left, top, right, bottom = result['bbox']
+    assert inside(result['bbox'], (250, 300, 751, 881))
+    assert right - left < 600 and bottom - top < 700
+
+
+def test_box_excludes_scanner_border():
+    left, top, _, _ = analyze_page(page(border=40))['bbox']
+    assert left > 40 and top > 40
+
+
+def test_single_speck_is_blank():
+    img = page(text=False)
+    ImageDraw.Draw(img).rectangle((500, 700, 502, 702), fill=(0, 0, 0))
+    assert analyze_page(img)['blank']
+
+
+def test_modes_other_than_rgb():
+    assert not analyze_page(page().convert('P'))['blank']
+    assert not analyze_page(page().convert('RGBA'))['blank']
+    assert analyze_page(page(text=False).convert('L').convert('1', dither=Image.Dither.NONE))['blank']
+
+
+def test_cleanup_drops_blank_and_trims():
+    cleanup = ScanCleanup()
+    assert cleanup.apply(page(text=False)) is None
+    trimmed = cleanup.apply(page(border=40))
+    assert trimmed.size[0] < SIZE[0] and trimmed.size[1] < SIZE[1]
+    stats = cleanup.stats
+    assert (stats.pages, stats.dropped) == (2, 1)
+    assert stats.area_after < stats.area_before
+    assert "1 of 2 pages blank" in stats.summary()
+
+
+def test_cleanup_options_off():
+    cleanup = ScanCleanup(drop_blank=False, trim_borders=False)
+    img = page(text=False, border=40)
+    assert cleanup.apply(img) is img
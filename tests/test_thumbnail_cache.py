@@ -0,0 +1,67 @@
+"""Thumbnail cache: memory LRU in front of the disk store, keys that follow file changes."""
+
+import os
+
+from img_to_pdf.core.thumbnail_cache import ThumbnailCache
+
+
+def write(path, data):
+    with open(path, 'wb') as fp:
+        fp.write(data)
+    return str(path)
+
+
+def test_put_then_get(tmp_path):
+    cache = ThumbnailCache(str(tmp_path / "thumbs"), 1 << 20)
+    assert cache.get("k") is None
+    cache.put("k", b"png")
+    assert cache.get("k") == b"png"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_disk_entries_survive_a_restart(tmp_path):
+    ThumbnailCache(str(tmp_path / "thumbs"), 1 << 20).put("k", b"png")
+    cache = ThumbnailCache(str(tmp_path / "thumbs"), 1 << 20)
+    cache.load()
+    assert cache.get("k") == b"png"
+
+
+def test_memory_keeps_most_recent_items(tmp_path):
+    directory = tmp_path / "thumbs"
+    cache = ThumbnailCache(str(directory), 1 << 20, memory_items=2)
+    for key in "abc":
+        cache.put(key, key.encode('ascii'))
+    for name in os.listdir(directory):
+        os.unlink(directory / name)
+    # Only the two most recent are still served without the disk store
+    assert [cache.get(key) for key in "abc"] == [None, b"b", b"c"]
+
+
+def test_unusable_directory_keeps_memory_cache(tmp_path):
+    blocker = write(tmp_path / "file", b"")
+    cache = ThumbnailCache(os.path.join(blocker, "thumbs"), 1 << 20)
+    cache.put("k", b"png")
+    assert cache.get("k") == b"png"
+
+
+def test_key_follows_file_changes(tmp_path):
+    path = write(tmp_path / "a.jpg", b"one")
+    key = ThumbnailCache.key(path, 96)
+    assert ThumbnailCache.key(path, 128) != key
+    write(path, b"two!")
+    assert ThumbnailCache.key(path, 96) != key
+    assert ThumbnailCache.key(str(tmp_path / "missing.jpg"), 96) is None
+
+
+def test_content_key_survives_copies(tmp_path):
+    key = ThumbnailCache.content_key(write(tmp_path / "a.html", b"<p>x</p>"), 96)
+    assert ThumbnailCache.content_key(write(tmp_path / "b.html", b"<p>x</p>"), 96) == key
+    assert ThumbnailCache.content_key(write(tmp_path / "c.html", b"<p>y</p>"), 96) != key
+
+
+def test_clear(tmp_path):
+    cache = ThumbnailCache(str(tmp_path / "thumbs"), 1 << 20)
+    cache.put("k", b"png")
+    cache.clear()
+    assert cache.get("k") is None
+    assert os.listdir(tmp_path / "thumbs") == []
@@ -0,0 +1,98 @@
+"""ThumbnailScheduler ordering and cancellation, with jobs run by hand."""
+
+import pytest
+
+QImage = pytest.importorskip("PyQt6.QtGui").QImage
+
+from img_to_pdf.gui.thumbnail_scheduler import ThumbnailScheduler, ThumbnailSignals
+
+
+class Executor:
+    """Collects submitted jobs instead of running them."""
+
+    max_workers = 2
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn):
+        self.jobs.append(fn.__self__)
+
+
+class Job:
+    def __init__(self, path, cache=None, cancelled=None):
+        self.path = path
+        self.cancelled = cancelled
+        self.signals = ThumbnailSignals()
+
+    def run(self):
+        if not self.cancelled.is_set():
+            self.signals.loaded.emit(self.path, QImage(1, 1, QImage.Format.Format_RGB32))
+        self.signals.done.emit(self.path)
+
+
+def scheduler_with(executor):
+    scheduler = ThumbnailScheduler(executor, job_factory=Job)
+    loaded = []
+    scheduler.loaded.connect(lambda path, image: loaded.append(path))
+    return scheduler, loaded
+
+
+def finish(executor, path):
+    job = next(job for job in executor.jobs if job.path == path)
+    executor.jobs.remove(job)
+    job.run()
+
+
+def test_at_most_max_in_flight_run():
+    executor = Executor()
+    scheduler, _ = scheduler_with(executor)
+    for path in "abcde":
+        scheduler.request(path)
+    assert [job.path for job in executor.jobs] == ["a", "b"]
+    assert (scheduler.in_flight, scheduler.pending) == (2, 3)
+
+
+def test_visible_rows_go_first():
+    executor = Executor()
+    scheduler, loaded = scheduler_with(executor)
+    for path in "abcde":
+        scheduler.request(path)
+    scheduler.prioritize(["e", "d"])
+    finish(executor, "a")
+    finish(executor, "b")
+    assert [job.path for job in executor.jobs] == ["e", "d"]
+    assert loaded == ["a", "b"]
+
+
+def test_cancelled_rows_are_dropped_or_discarded():
+    executor = Executor()
+    scheduler, loaded = scheduler_with(executor)
+    for path in "abc":
+        scheduler.request(path)
+    scheduler.cancel(["a", "c"])
+    finish(executor, "a")
+    assert loaded == []
+    assert [job.path for job in executor.jobs] == ["b"]
+    assert scheduler.pending == 0
+
+
+def test_repeated_request_is_ignored_while_running():
+    executor = Executor()
+    scheduler, _ = scheduler_with(executor)
+    scheduler.request("a")
+    scheduler.request("a")
+    assert [job.path for job in executor.jobs] == ["a"]
+    assert scheduler.pending == 0
+
+
+def test_cancel_all():
+    executor = Executor()
+    scheduler, loaded = scheduler_with(executor)
+    for path in "abcd":
+        scheduler.request(path)
+    scheduler.cancel_all()
+    finish(executor, "a")
+    finish(executor, "b")
+    assert loaded == []
+    assert executor.jobs == []
@@ -0,0 +1,97 @@
+"""Thumbnail sources: embedded EXIF thumbnail, DCT-scaled JPEG decode, full decode."""
+
+import io
+import struct
+
+from PIL import Image
+
+from img_to_pdf.core.thumbnails import SOURCE_EXIF, SOURCE_FULL, SOURCE_SCALED, load_thumbnail, make_thumbnail
+
+
+def jpeg_bytes(img, **params):
+    out = io.BytesIO()
+    img.save(out, 'JPEG', **params)
+    return out.getvalue()
+
+
+def exif_with_thumbnail(thumb_jpeg, orientation=1):
+    """Little-endian EXIF block: IFD0 with the orientation, IFD1 pointing at ``thumb_jpeg``."""
+    ifd0 = 8
+    ifd1 = ifd0 + 2 + 12 + 4
+    data = ifd1 + 2 + 2 * 12 + 4
+    tiff = b'II*\x00' + struct.pack('<I', ifd0)
+    tiff += struct.pack('<H', 1) + struct.pack('<HHIHH', 0x0112, 3, 1, orientation, 0) + struct.pack('<I', ifd1)
+    tiff += struct.pack('<H', 2)
+    tiff += struct.pack('<HHII', 0x0201, 4, 1, data) + struct.pack('<HHII', 0x0202, 4, 1, len(thumb_jpeg))
+    tiff += struct.pack('<I', 0)
+    return b'Exif\x00\x00' + tiff + thumb_jpeg
+
+
+def camera_jpeg(path, size=(1600, 1200), thumb_size=(160, 120), orientation=1):
+    """A camera-style JPEG: red image with a green embedded thumbnail."""
+    thumb = jpeg_bytes(Image.new('RGB', thumb_size, (0, 200, 0)))
+    data = jpeg_bytes(Image.new('RGB', size, (200, 0, 0)), exif=exif_with_thumbnail(thumb, orientation))
+    with open(path, 'wb') as fp:
+        fp.write(data)
+    return str(path)
+
+
+def is_green(img):
+    r, g, b = img.convert('RGB').getpixel((img.width // 2, img.height // 2))
+    return g > 150 and r < 60
+
+
+def test_camera_jpeg_uses_exif_thumbnail(tmp_path):
+    thumb, source = load_thumbnail(camera_jpeg(tmp_path / "photo.jpg"), 96)
+    assert source == SOURCE_EXIF
+    assert is_green(thumb)
+    assert thumb.size == (96, 72)
+
+
+def test_small_exif_thumbnail_falls_back_to_scaled_decode(tmp_path):
+    thumb, source = load_thumbnail(camera_jpeg(tmp_path / "photo.jpg"), 256)
+    assert source == SOURCE_SCALED
+    assert not is_green(thumb)
+    assert thumb.size == (256, 192)
+
+
+def test_letterboxed_exif_thumbnail_is_not_used(tmp_path):
+    _, source = load_thumbnail(camera_jpeg(tmp_path / "photo.jpg", thumb_size=(160, 160)), 96)
+    assert source == SOURCE_SCALED
+
+
+def test_scaled_decode_without_exif(tmp_path):
+    path = tmp_path / "plain.jpg"
+    path.write_bytes(jpeg_bytes(Image.new('RGB', (1600, 1200), (200, 0, 0))))
+    thumb, source = load_thumbnail(str(path), 96)
+    assert source == SOURCE_SCALED
+    assert thumb.size == (96, 72)
+    _, source = load_thumbnail(str(path), 96, scaled=False)
+    assert source == SOURCE_FULL
+
+
+def test_exif_path_can_be_switched_off(tmp_path):
+    thumb, source = load_thumbnail(camera_jpeg(tmp_path / "photo.jpg"), 96, use_exif=False)
+    assert source == SOURCE_SCALED
+    assert not is_green(thumb)
+
+
+def test_orientation_applies_to_exif_thumbnail(tmp_path):
+    # Orientation 6: the stored image is rotated 90 degrees clockwise for display
+    thumb, source = load_thumbnail(camera_jpeg(tmp_path / "photo.jpg", orientation=6), 96)
+    assert source == SOURCE_EXIF
+    assert thumb.size == (72, 96)
+
+
+def test_png_is_decoded_whole(tmp_path):
+    path = tmp_path / "shot.png"
+    Image.new('RGBA', (400, 200), (0, 0, 255, 128)).save(path)
+    thumb, source = load_thumbnail(str(path), 96)
+    assert source == SOURCE_FULL
+    assert thumb.size == (96, 48)
+
+
+def test_make_thumbnail_returns_png(tmp_path):
+    data = make_thumbnail(camera_jpeg(tmp_path / "photo.jpg"), 96)
+    with Image.open(io.BytesIO(data)) as img:
+        assert (img.format, img.size) == ('PNG', (96, 72))
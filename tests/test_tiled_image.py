@@ -0,0 +1,57 @@
+"""TiledImage: band reading under a memory bound and the codec of its strips."""
+
+from PIL import Image
+
+from img_to_pdf.core.tiled_image import MB, TiledImage, needs_tiling, open_image
+
+
+def mixed_tiff(path, size=(2000, 3000)):
+    """An uncompressed TIFF whose top quarter is white paper and the rest a colour photo."""
+    width, height = size
+    img = Image.new('RGB', size, 'white')
+    photo = Image.merge('RGB', [Image.effect_noise((width, height * 3 // 4), 48 + 8 * i) for i in range(3)])
+    img.paste(photo, (0, height // 4))
+    img.save(path, 'TIFF')
+    return str(path)
+
+
+def test_bands_are_read_by_rows(tmp_path):
+    path = mixed_tiff(tmp_path / "scan.tif")
+    img = open_image(path)
+    assert needs_tiling(img, 4 * MB)
+    tiled = TiledImage(path, img, None, 4 * MB)
+    assert tiled.band_decoding
+    bands = list(tiled.iter_bands())
+    assert len(bands) > 4
+    assert sum(band.size[1] for band in bands) == 3000
+    assert all(band.size[0] == 2000 for band in bands)
+
+
+def test_downsampled_bands_assemble_to_target_size(tmp_path):
+    path = mixed_tiff(tmp_path / "scan.tif")
+    tiled = TiledImage(path, open_image(path), (500, 750), 4 * MB)
+    assert tiled.factor == 4
+    assembled = tiled.assemble()
+    assert assembled.size == (500, 750)
+    assert assembled.getpixel((250, 10)) == (255, 255, 255)
+
+
+def test_white_top_does_not_make_photo_strips_bilevel(tmp_path):
+    path = mixed_tiff(tmp_path / "scan.tif")
+    tiled = TiledImage(path, open_image(path), None, 4 * MB)
+    strips = list(tiled.iter_encoded_strips(85))
+    assert len(strips) > 4
+    assert {strip.filter for strip in strips} == {'DCTDecode'}
+    assert {strip.color_space for strip in strips} == {'DeviceRGB'}
+
+
+def test_bilevel_scan_strips_stay_bilevel(tmp_path):
+    img = Image.new('L', (2000, 3000), 255)
+    for y in range(0, 3000, 40):
+        img.paste(0, (100, y, 1900, y + 8))
+    path = str(tmp_path / "text.tif")
+    img.save(path, 'TIFF')
+    tiled = TiledImage(path, open_image(path), None, 2 * MB)
+    strips = list(tiled.iter_encoded_strips(85))
+    assert len(strips) > 1
+    assert {strip.filter for strip in strips} == {'CCITTFaxDecode'}